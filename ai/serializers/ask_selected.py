@@ -2,7 +2,7 @@ import logging
 
 from pydantic import BaseModel, field_validator
 
-from ai.utils import remove_newlines_whitespace
+from ai.utils import remove_newlines_whitespace, validate_search_profile
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -21,6 +21,7 @@ class AskSelectedInputSerializer(BaseModel):
         book (str): The book from the user.
         chapter (str): The chapter from the user.
         query (str): User's question or search query (required, non-empty after strip).
+        search_profile (str | None): Optional search profile ("fast", "balanced" or "accurate").
     """
 
     collection_name: str
@@ -29,6 +30,7 @@ class AskSelectedInputSerializer(BaseModel):
     book: str
     chapter: str
     query: str
+    search_profile: str | None = None
 
     @field_validator("selected_text")
     @classmethod
@@ -149,3 +151,20 @@ class AskSelectedInputSerializer(BaseModel):
             logger.error("query cannot be empty")
             raise ValueError("query cannot be empty")
         return value
+
+    @field_validator("search_profile")
+    @classmethod
+    def validate_profile(cls, value: str | None) -> str | None:
+        """
+        Validate that the optional search_profile field names a known search profile.
+
+        Parameters:
+            value (str | None): The search_profile string from the request.
+
+        Returns:
+            str | None: Lowercase profile name, or None to use the endpoint's default profile.
+
+        Raises:
+            ValueError: If the search_profile is not one of the search profiles.
+        """
+        return validate_search_profile(value)
@@ -2,6 +2,8 @@ import logging
 
 from pydantic import BaseModel, field_validator
 
+from ai.utils import validate_search_profile
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -15,10 +17,12 @@ class GeneralQuestionInputSerializer(BaseModel):
     Fields:
         collection_name (str): Name of the Milvus collection to search (max 3 chars).
         query (str): User's question or search query (required, non-empty after strip).
+        search_profile (str | None): Optional search profile ("fast", "balanced" or "accurate").
     """
 
     collection_name: str
     query: str
+    search_profile: str | None = None
 
     @field_validator("collection_name")
     @classmethod
@@ -59,3 +63,20 @@ class GeneralQuestionInputSerializer(BaseModel):
             logger.error("query cannot be empty")
             raise ValueError("query cannot be empty")
         return value
+
+    @field_validator("search_profile")
+    @classmethod
+    def validate_profile(cls, value: str | None) -> str | None:
+        """
+        Validate that the optional search_profile field names a known search profile.
+
+        Parameters:
+            value (str | None): The search_profile string from the request.
+
+        Returns:
+            str | None: Lowercase profile name, or None to use the endpoint's default profile.
+
+        Raises:
+            ValueError: If the search_profile is not one of the search profiles.
+        """
+        return validate_search_profile(value)
@@ -139,3 +139,14 @@ class TestAskSelectedInputSerializer:
         del payload["query"]
         with pytest.raises(ValidationError):
             AskSelectedInputSerializer(**payload)
+
+    def test_search_profile_is_optional(self):
+        """search_profile should default to None and be normalized when given."""
+        assert AskSelectedInputSerializer(**_valid_payload()).search_profile is None
+        assert AskSelectedInputSerializer(**_valid_payload(search_profile="  ")).search_profile is None
+        assert AskSelectedInputSerializer(**_valid_payload(search_profile=" Fast ")).search_profile == "fast"
+
+    def test_unknown_search_profile_raises(self):
+        """An unknown search_profile should raise ValidationError."""
+        with pytest.raises(ValidationError):
+            AskSelectedInputSerializer(**_valid_payload(search_profile="exhaustive"))
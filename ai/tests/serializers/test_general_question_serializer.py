@@ -66,3 +66,14 @@ class TestGeneralQuestionInputSerializer:
         del payload["collection_name"]
         with pytest.raises(ValidationError):
             GeneralQuestionInputSerializer(**payload)
+
+    def test_search_profile_is_optional(self):
+        """search_profile should default to None and be normalized when given."""
+        assert GeneralQuestionInputSerializer(**_valid_payload()).search_profile is None
+        assert GeneralQuestionInputSerializer(**_valid_payload(search_profile="  ")).search_profile is None
+        assert GeneralQuestionInputSerializer(**_valid_payload(search_profile=" Fast ")).search_profile == "fast"
+
+    def test_unknown_search_profile_raises(self):
+        """An unknown search_profile should raise ValidationError."""
+        with pytest.raises(ValidationError):
+            GeneralQuestionInputSerializer(**_valid_payload(search_profile="exhaustive"))
@@ -5,7 +5,7 @@ from unittest.mock import patch
 import pytest
 from django.test import SimpleTestCase
 
-from ai.utils import async_read_file, clean_llm_output, stringify_vdb_results
+from ai.utils import async_read_file, clean_llm_output, stringify_vdb_results, validate_search_profile
 
 
 @pytest.mark.asyncio
@@ -135,6 +135,25 @@ class TestStringifyVdbResults(SimpleTestCase):
         assert "The earth was formless and empty. (Genesis 1:2 WEB)" in result
         assert result.count("\n") == 1  # Results separated by newline
 
+    async def test_stringify_vdb_results_passage(self):
+        """Test that merged neighboring verses are shown as a verse range."""
+        vdb_results = [
+            {
+                "entity": {
+                    "text": "For God so loved the world... For God did not send His Son...",
+                    "book": "John",
+                    "chapter": 3,
+                    "verse": 16,
+                    "verse_end": 17,
+                    "version": "BSB",
+                }
+            }
+        ]
+
+        result = await stringify_vdb_results(vdb_results)
+
+        assert result.endswith("(John 3:16-17 BSB)")
+
     async def test_stringify_vdb_results_with_missing_fields(self):
         """Test stringifying results with missing optional fields."""
         vdb_results = [{"entity": {"text": "Test verse", "book": "", "chapter": "", "verse": "", "version": ""}}]
@@ -201,6 +220,24 @@ class TestStringifyVdbResults(SimpleTestCase):
         )
 
 
+class TestValidateSearchProfile(SimpleTestCase):
+    """Tests for validate_search_profile function."""
+
+    def test_known_profile_is_lowercased(self):
+        """Test that a known profile name is trimmed and lowercased."""
+        assert validate_search_profile("  Accurate ") == "accurate"
+
+    def test_missing_profile_returns_none(self):
+        """Test that a missing or blank profile falls back to the default profile."""
+        assert validate_search_profile(None) is None
+        assert validate_search_profile("   ") is None
+
+    def test_unknown_profile_raises(self):
+        """Test that an unknown profile name is rejected."""
+        with pytest.raises(ValueError, match="search_profile must be one of"):
+            validate_search_profile("turbo")
+
+
 @pytest.mark.asyncio
 class TestCleanLLMOutput(SimpleTestCase):
     """Tests for clean_llm_output function."""
@@ -0,0 +1,85 @@
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+from django.test import SimpleTestCase
+
+from ai.vdb.build_report import BuildReport, estimate_record_bytes
+
+
+class TestEstimateRecordBytes(SimpleTestCase):
+    """Tests for estimate_record_bytes function."""
+
+    def test_estimate_record_bytes(self):
+        """Test that strings, integers and vectors are counted by their wire size."""
+        record = {"text": "Amen", "version": "bsb", "book": "Job", "chapter": 1, "verse": 2}
+
+        assert estimate_record_bytes(record) == 4 + 3 + 3 + 2 + 2
+        assert estimate_record_bytes({**record, "dense_embedding": [0.1, 0.2]}) == 14 + 8
+        assert estimate_record_bytes({**record, "dense_embedding": b"\x01\x02"}) == 14 + 2
+
+
+class TestBuildReport(SimpleTestCase):
+    """Tests for BuildReport class."""
+
+    def test_stage_timings_and_counters(self):
+        """Test that stage times, records, bytes and embedding batch sizes are accumulated per collection."""
+        report = BuildReport({"database_type": "dense"})
+        with report.stage("bsb", "embed"):
+            pass
+        report.add_stage_time("bsb", "insert", 0.5)
+        report.add_stage_time("bsb", "insert", 0.25)
+        report.record_sent("bsb", [{"text": "Amen"}, {"text": "Selah"}])
+        report.record_embedding_batch(2)
+        report.record_embedding_batch(2)
+        report.record_embedding_batch(1)
+        report.record_result("bsb", {"verses": 2, "seconds": 1.0, "verses_per_second": 2.0})
+
+        summary = report.to_dict()
+
+        entry = summary["collections"]["bsb"]
+        assert entry["stage_seconds"]["insert"] == 0.75
+        assert entry["records_sent"] == 2
+        assert entry["bytes_sent"] == 9
+        assert entry["verses_per_second"] == 2.0
+        assert summary["embedding_batch_size_histogram"] == {"1": 1, "2": 2}
+        assert summary["embedding_requests"] == 3
+        assert summary["settings"] == {"database_type": "dense"}
+
+    def test_timed_iter(self):
+        """Test that iterating through timed_iter yields every item and records the stage."""
+        report = BuildReport()
+
+        assert list(report.timed_iter("bsb", "parse", iter([1, 2, 3]))) == [1, 2, 3]
+        assert report.to_dict()["collections"]["bsb"]["stage_seconds"]["parse"] >= 0
+
+    def test_has_activity(self):
+        """Test that only builds that sent records or failed have something to report."""
+        report = BuildReport()
+        report.add_stage_time("bsb", "index", 0.1)
+        assert not report.has_activity
+
+        report.record_result("web", error=RuntimeError("Connection lost"))
+        assert report.has_activity
+        assert report.to_dict()["collections"]["web"]["error"] == "Connection lost"
+
+    def test_write(self):
+        """Test that the report is written as JSON into the report directory."""
+        report = BuildReport()
+        report.record_sent("bsb", [{"text": "Amen"}])
+
+        with tempfile.TemporaryDirectory() as report_directory:
+            path = report.write(Path(report_directory).joinpath("reports"))
+
+            assert path.name.startswith("build-") and path.suffix == ".json"
+            with path.open("r", encoding="utf-8") as file:
+                data = json.load(file)
+            assert data["collections"]["bsb"]["records_sent"] == 1
+            if data["peak_rss_bytes"] is not None:
+                assert data["peak_rss_bytes"] > 0
+
+    def test_unknown_stage(self):
+        """Test that only known stages can be timed."""
+        with pytest.raises(KeyError):
+            BuildReport().add_stage_time("bsb", "upload", 1.0)
@@ -0,0 +1,118 @@
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.test import SimpleTestCase
+
+from ai.vdb.bulk_import import BulkImporter, load_bulk_writer
+
+
+def make_response(data):
+    """Create a mock REST response with a JSON body."""
+    response = MagicMock()
+    response.json.return_value = {"code": 0, "data": data}
+    return response
+
+
+class TestLoadBulkWriter(SimpleTestCase):
+    """Tests for load_bulk_writer function."""
+
+    def test_load_bulk_writer_missing_extra(self):
+        """Test that a missing bulk_writer extra raises an ImportError with install instructions."""
+        with patch("ai.vdb.bulk_import.logger"):
+            with patch("ai.vdb.bulk_import.importlib.import_module", side_effect=ModuleNotFoundError("minio")):
+                with pytest.raises(ImportError, match="pymilvus\\[bulk_writer\\]"):
+                    load_bulk_writer()
+
+
+class TestBulkImporter(SimpleTestCase):
+    """Tests for BulkImporter class."""
+
+    def make_importer(self):
+        """Create an importer backed by a mocked bulk_writer module."""
+        self.bulk_writer = MagicMock()
+        with patch("ai.vdb.bulk_import.load_bulk_writer", return_value=self.bulk_writer):
+            return BulkImporter(
+                milvus_url="http://milvus:19530",
+                database_name="faith_db",
+                api_key="root:secret",
+                endpoint="seaweedfs-s3:8333",
+                bucket_name="milvus-bucket",
+                access_key="minioadmin",
+                secret_key="minioadmin",
+                timeout=60,
+                poll_interval=0,
+            )
+
+    def test_writer_appends_and_commits(self):
+        """Test that records are written row by row and committed files are returned."""
+        importer = self.make_importer()
+        self.bulk_writer.RemoteBulkWriter.return_value.batch_files = [["bulk_import/faith_db/bsb/1.parquet"]]
+        records = [{"text": "a", "book": "Genesis", "chapter": 1}, {"text": "b", "book": "Genesis", "chapter": 2}]
+
+        writer = importer.open_writer(MagicMock(), "bsb")
+        try:
+            with patch("ai.vdb.bulk_import.logger"):
+                assert writer.append("bsb", records) == 2
+            files = writer.commit()
+        finally:
+            writer.close()
+
+        remote_writer = self.bulk_writer.RemoteBulkWriter.return_value
+        assert remote_writer.append_row.call_count == 2
+        remote_writer.commit.assert_called_once()
+        assert files == [["bulk_import/faith_db/bsb/1.parquet"]]
+        assert writer.chapter_counts == {("Genesis", 1): 1, ("Genesis", 2): 1}
+        assert self.bulk_writer.RemoteBulkWriter.call_args.kwargs["remote_path"] == "bulk_import/faith_db/bsb"
+        assert not os.path.exists(writer.local_path)
+
+    def test_import_files_waits_for_completion(self):
+        """Test that the import job is polled until it completes."""
+        importer = self.make_importer()
+        self.bulk_writer.bulk_import.return_value = make_response({"jobId": "42"})
+        self.bulk_writer.get_import_progress.side_effect = [
+            make_response({"state": "Importing", "progress": 50}),
+            make_response({"state": "Completed", "progress": 100, "importedRows": 31102}),
+        ]
+
+        with patch("ai.vdb.bulk_import.logger"):
+            imported_rows = importer.import_files("bsb", [["bulk_import/faith_db/bsb/1.parquet"]])
+
+        assert imported_rows == 31102
+        assert self.bulk_writer.get_import_progress.call_count == 2
+        self.bulk_writer.bulk_import.assert_called_once_with(
+            url="http://milvus:19530",
+            api_key="root:secret",
+            db_name="faith_db",
+            collection_name="bsb",
+            files=[["bulk_import/faith_db/bsb/1.parquet"]],
+        )
+
+    def test_import_files_failed_job(self):
+        """Test that a failed import job raises an error with the reason."""
+        importer = self.make_importer()
+        self.bulk_writer.bulk_import.return_value = make_response({"jobId": "42"})
+        self.bulk_writer.get_import_progress.return_value = make_response({"state": "Failed", "reason": "bad file"})
+
+        with patch("ai.vdb.bulk_import.logger"):
+            with pytest.raises(RuntimeError, match="bad file"):
+                importer.import_files("bsb", [["bulk_import/faith_db/bsb/1.parquet"]])
+
+    def test_import_files_timeout(self):
+        """Test that an import job that never finishes times out."""
+        importer = self.make_importer()
+        importer.timeout = 0
+        self.bulk_writer.bulk_import.return_value = make_response({"jobId": "42"})
+        self.bulk_writer.get_import_progress.return_value = make_response({"state": "Importing", "progress": 10})
+
+        with patch("ai.vdb.bulk_import.logger"):
+            with pytest.raises(TimeoutError):
+                importer.import_files("bsb", [["bulk_import/faith_db/bsb/1.parquet"]])
+
+    def test_import_files_without_files(self):
+        """Test that no import job is started when there is nothing to import."""
+        importer = self.make_importer()
+
+        with patch("ai.vdb.bulk_import.logger"):
+            assert importer.import_files("bsb", []) == 0
+        self.bulk_writer.bulk_import.assert_not_called()
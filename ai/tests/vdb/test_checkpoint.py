@@ -0,0 +1,157 @@
+import hashlib
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from ai.vdb.checkpoint import IngestCheckpoint, file_checksum
+
+SIGNATURE = {"database_type": "dense", "embedding_model": "test-model", "document_template": ""}
+
+
+def make_records(book, chapter, count):
+    """Create verse records for a single chapter."""
+    return [{"text": f"{book} {chapter}:{verse}", "book": book, "chapter": chapter} for verse in range(count)]
+
+
+class TestFileChecksum(SimpleTestCase):
+    """Tests for file_checksum function."""
+
+    def test_file_checksum(self):
+        """Test that the checksum is the SHA-256 of the file contents."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir).joinpath("1.json")
+            path.write_bytes(b'{"1": "text"}')
+
+            assert file_checksum(path) == hashlib.sha256(b'{"1": "text"}').hexdigest()
+
+
+class TestIngestCheckpoint(SimpleTestCase):
+    """Tests for IngestCheckpoint class."""
+
+    def setUp(self):
+        """Set up a temporary checkpoint directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        """Clean up temporary files."""
+        self.temp_dir.cleanup()
+
+    def make_checkpoint(self):
+        """Create a checkpoint for the bsb collection."""
+        return IngestCheckpoint(self.directory, "faith_db", "bsb")
+
+    def test_nothing_written_until_progress(self):
+        """Test that a reset checkpoint does not create any files."""
+        checkpoint = self.make_checkpoint()
+        checkpoint.reset(SIGNATURE)
+        checkpoint.save()
+
+        assert not checkpoint.exists()
+        assert not any(self.directory.iterdir())
+
+    def test_completed_chapter_round_trip(self):
+        """Test that a fully inserted chapter is reported complete after reloading."""
+        checkpoint = self.make_checkpoint()
+        checkpoint.reset(SIGNATURE)
+        records = make_records("Genesis", 1, 3)
+        checkpoint.expect_chapter("Genesis", 1, "abc", len(records))
+        checkpoint.mark_started(records)
+        checkpoint.record_inserted(records)
+
+        reloaded = self.make_checkpoint()
+        assert reloaded.load(SIGNATURE)
+        assert reloaded.chapter_state("Genesis", 1, "abc") == "complete"
+        assert reloaded.chapter_state("Genesis", 1, "changed") == "stale"
+        assert reloaded.chapter_state("Genesis", 2, "abc") == "new"
+        assert reloaded.is_complete()
+
+    def test_chapter_counts_complete_chapters(self):
+        """Test that per-chapter verse counts (from bulk imports) complete chapters like inserted records."""
+        checkpoint = self.make_checkpoint()
+        checkpoint.reset(SIGNATURE)
+        checkpoint.expect_chapter("Genesis", 1, "abc", 3)
+        checkpoint.expect_chapter("Genesis", 2, "def", 2)
+        chapter_counts = {("Genesis", 1): 3, ("Genesis", 2): 1}
+        checkpoint.mark_chapters_started(chapter_counts)
+        checkpoint.record_chapter_counts(chapter_counts)
+
+        reloaded = self.make_checkpoint()
+        assert reloaded.load(SIGNATURE)
+        assert reloaded.chapter_state("Genesis", 1, "abc") == "complete"
+        assert reloaded.chapter_state("Genesis", 2, "def") == "stale"
+
+    def test_unchanged_checkpoint_is_not_rewritten(self):
+        """Test that saving again without new progress does not rewrite the file."""
+        checkpoint = self.make_checkpoint()
+        checkpoint.reset(SIGNATURE)
+        records = make_records("Genesis", 1, 3)
+        checkpoint.expect_chapter("Genesis", 1, "abc", len(records))
+        checkpoint.mark_started(records)
+
+        with patch("ai.vdb.checkpoint.os.replace") as mock_replace:
+            checkpoint.save()
+            checkpoint.record_inserted(records[:1])
+            mock_replace.assert_not_called()
+            checkpoint.record_inserted(records[1:])
+            mock_replace.assert_called_once()
+
+    def test_partially_inserted_chapter_is_stale(self):
+        """Test that a chapter interrupted mid-insert must be replaced on resume."""
+        checkpoint = self.make_checkpoint()
+        checkpoint.reset(SIGNATURE)
+        records = make_records("Genesis", 1, 4)
+        checkpoint.expect_chapter("Genesis", 1, "abc", len(records))
+        checkpoint.expect_chapter("Genesis", 2, "def", 2)
+        checkpoint.mark_started(records[:2])
+        checkpoint.record_inserted(records[:2])
+        checkpoint.save()
+
+        reloaded = self.make_checkpoint()
+        assert reloaded.load(SIGNATURE)
+        assert reloaded.chapter_state("Genesis", 1, "abc") == "stale"
+        assert reloaded.chapter_state("Genesis", 2, "def") == "new"
+        assert not reloaded.is_complete()
+
+    def test_empty_chapter_is_complete(self):
+        """Test that a chapter without verses is complete as soon as it is registered."""
+        checkpoint = self.make_checkpoint()
+        checkpoint.reset(SIGNATURE)
+        checkpoint.expect_chapter("Genesis", 1, "abc", 0)
+
+        assert checkpoint.chapter_state("Genesis", 1, "abc") == "complete"
+
+    def test_load_rejects_different_signature(self):
+        """Test that a checkpoint written with other settings cannot be resumed."""
+        checkpoint = self.make_checkpoint()
+        checkpoint.reset(SIGNATURE)
+        checkpoint.expect_chapter("Genesis", 1, "abc", 0)
+        checkpoint.save()
+
+        with patch("ai.vdb.checkpoint.logger"):
+            assert not self.make_checkpoint().load({**SIGNATURE, "embedding_model": "other-model"})
+
+    def test_load_corrupt_file(self):
+        """Test that an unreadable checkpoint is treated as missing."""
+        checkpoint = self.make_checkpoint()
+        checkpoint.path.parent.mkdir(parents=True)
+        checkpoint.path.write_text("{not json", encoding="utf-8")
+
+        with patch("ai.vdb.checkpoint.logger") as mock_logger:
+            assert not checkpoint.load(SIGNATURE)
+        mock_logger.warning.assert_called_once()
+
+    def test_reset_removes_existing_file(self):
+        """Test that resetting a checkpoint deletes the previous file."""
+        checkpoint = self.make_checkpoint()
+        checkpoint.reset(SIGNATURE)
+        checkpoint.expect_chapter("Genesis", 1, "abc", 0)
+        checkpoint.save()
+        assert checkpoint.exists()
+
+        checkpoint.reset(SIGNATURE)
+
+        assert not checkpoint.exists()
+        assert checkpoint.chapter_state("Genesis", 1, "abc") == "new"
@@ -0,0 +1,95 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from ai.vdb.coalescing_cache import CoalescingCache
+
+
+class UpperCache(CoalescingCache):
+    """Cache storing upper-cased values and sharing them with a prefix."""
+
+    description = "test cache"
+
+    def prepare_value(self, value):
+        return value.upper()
+
+    def encode_shared(self, value):
+        return f"shared:{value}"
+
+    def decode_shared(self, stored):
+        return stored.removeprefix("shared:")
+
+
+class TestCoalescingCache(SimpleTestCase):
+    """Tests for CoalescingCache class."""
+
+    @pytest.mark.asyncio
+    async def test_computes_only_misses_once(self):
+        """Test that repeated and cached keys are not computed again."""
+        cache = UpperCache(max_entries=8, ttl_seconds=0)
+        compute_many = AsyncMock(side_effect=lambda items: list(items))
+
+        first = await cache.get_or_compute_many(["a", "b", "a"], ["x", "y", "x"], compute_many)
+        second = await cache.get_or_compute_many(["b", "c"], ["y", "z"], compute_many)
+
+        assert first == ["X", "Y", "X"]
+        assert second == ["Y", "Z"]
+        assert [call.args[0] for call in compute_many.await_args_list] == [["x", "y"], ["z"]]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_are_coalesced(self):
+        """Test that concurrent lookups of a key wait for one computation and are counted as coalesced."""
+        cache = UpperCache(max_entries=8, ttl_seconds=0)
+        release = asyncio.Event()
+        calls = []
+
+        async def compute_many(items):
+            calls.append(list(items))
+            await release.wait()
+            return list(items)
+
+        lookups = [asyncio.create_task(cache.get_or_compute_many(["a"], ["x"], compute_many)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*lookups)
+
+        assert calls == [["x"]]
+        assert results == [["X"]] * 3
+        assert cache.stats()["coalesced"] == 2
+        assert cache.stats()["hit_rate"] == pytest.approx(2 / 3, abs=1e-4)
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_uses_encoding_hooks(self):
+        """Test that values go through encode_shared() and decode_shared() between workers."""
+        shared_cache = LocMemCache("coalescing-cache-test", {})
+        first_worker = UpperCache(max_entries=8, ttl_seconds=60, shared_cache=shared_cache)
+        second_worker = UpperCache(max_entries=8, ttl_seconds=60, shared_cache=shared_cache)
+        compute_many = AsyncMock(side_effect=lambda items: list(items))
+
+        await first_worker.get_or_compute_many(["a"], ["x"], compute_many)
+        result = await second_worker.get_or_compute_many(["a"], ["x"], compute_many)
+
+        assert result == ["X"]
+        assert await shared_cache.aget("a") == "shared:X"
+        compute_many.assert_awaited_once()
+        assert second_worker.stats()["shared_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_errors_are_logged(self):
+        """Test that shared cache failures fall back to computing and name the cache in the log."""
+        shared_cache = MagicMock()
+        shared_cache.aget = AsyncMock(side_effect=ConnectionError("Cache unavailable"))
+        shared_cache.aset = AsyncMock(side_effect=ConnectionError("Cache unavailable"))
+        cache = UpperCache(max_entries=8, ttl_seconds=0, shared_cache=shared_cache)
+
+        with patch("ai.vdb.coalescing_cache.logger") as mock_logger:
+            result = await cache.get_or_compute_many(["a"], ["x"], AsyncMock(return_value=["x"]))
+
+        assert result == ["X"]
+        assert mock_logger.warning.call_args_list[0].args[0].startswith("Shared test cache lookup failed")
+        assert mock_logger.warning.call_args_list[1].args[0].startswith("Shared test cache update failed")
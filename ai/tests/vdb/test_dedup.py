@@ -0,0 +1,146 @@
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from django.test import SimpleTestCase
+
+from ai.vdb.dedup import DeduplicatingEmbedder
+from ai.vdb.embedding_cache import EmbeddingCache
+
+
+class TestDeduplicatingEmbedder(SimpleTestCase):
+    """Tests for DeduplicatingEmbedder class."""
+
+    def setUp(self):
+        """Record every text sent to the fake embedding service."""
+        self.embedded = []
+
+    def embed_texts(self, texts):
+        """Fake embedding service returning the text length as a vector."""
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def test_embed_duplicates_within_batch(self):
+        """Test that repeated texts in one batch are embedded once."""
+        embedder = DeduplicatingEmbedder(self.embed_texts)
+
+        embeddings = embedder.embed(["Jesus wept.", "Amen.", "Jesus wept."])
+
+        assert self.embedded == ["Jesus wept.", "Amen."]
+        assert [embedding.tolist() for embedding in embeddings] == [[11.0, 1.0], [5.0, 1.0], [11.0, 1.0]]
+        assert embeddings[0].dtype == np.float32
+
+    def test_embed_reuses_across_calls(self):
+        """Test that a text embedded for one version is reused for another."""
+        embedder = DeduplicatingEmbedder(self.embed_texts)
+
+        embedder.embed(["In the beginning", "Amen."])
+        embeddings = embedder.embed(["In the beginning", "Selah"])
+
+        assert self.embedded == ["In the beginning", "Amen.", "Selah"]
+        assert embeddings[0].tolist() == [16.0, 1.0]
+
+    def test_concurrent_batches_wait_for_claimed_texts(self):
+        """Test that a batch needing an in-flight text waits instead of embedding it again."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_embed(texts):
+            started.set()
+            release.wait(timeout=5)
+            return self.embed_texts(texts)
+
+        embedder = DeduplicatingEmbedder(slow_embed)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(embedder.embed, ["Amen."])
+            started.wait(timeout=5)
+            second = executor.submit(embedder.embed, ["Amen.", "Selah"])
+            release.set()
+            first_embeddings = first.result(timeout=5)
+            second_embeddings = second.result(timeout=5)
+
+        assert sorted(self.embedded) == ["Amen.", "Selah"]
+        assert second_embeddings[0].tolist() == first_embeddings[0].tolist()
+
+    def test_failed_embedding_can_be_retried(self):
+        """Test that texts from a failed request are not left claimed."""
+        calls = [0]
+
+        def flaky_embed(texts):
+            calls[0] += 1
+            if calls[0] == 1:
+                raise RuntimeError("Embedding service unavailable")
+            return self.embed_texts(texts)
+
+        embedder = DeduplicatingEmbedder(flaky_embed)
+        with pytest.raises(RuntimeError, match="unavailable"):
+            embedder.embed(["Amen."])
+
+        assert embedder.embed(["Amen."])[0].tolist() == [5.0, 1.0]
+
+    def test_embed_with_cache(self):
+        """Test that cached texts are not embedded and new ones are stored in the cache."""
+        with tempfile.TemporaryDirectory() as cache_directory:
+            cache = EmbeddingCache(cache_directory, "test-model", "")
+            cache.put_many(["Amen."], [[5.0, 1.0]])
+            embedder = DeduplicatingEmbedder(self.embed_texts, cache)
+
+            embedder.embed(["Amen.", "Selah", "Selah"])
+            embedder.embed(["Selah"])
+
+            assert self.embedded == ["Selah"]
+            assert cache.get_many(["Selah"])[0].tolist() == [5.0, 1.0]
+
+    def test_cache_write_error_does_not_block_waiting_batches(self):
+        """Test that a failed cache write still hands the vectors to batches waiting for them."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_embed(texts):
+            started.set()
+            release.wait(timeout=5)
+            return self.embed_texts(texts)
+
+        cache = MagicMock()
+        cache.get_many.side_effect = lambda texts: [None] * len(texts)
+        cache.put_many.side_effect = OSError("No space left on device")
+        embedder = DeduplicatingEmbedder(slow_embed, cache)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(embedder.embed, ["Amen."])
+            started.wait(timeout=5)
+            second = executor.submit(embedder.embed, ["Amen."])
+            # Both batches have registered (and the second one waits) once both are counted
+            while embedder.requested_texts < 2:
+                time.sleep(0.001)
+            release.set()
+            with pytest.raises(OSError, match="No space"):
+                first.result(timeout=5)
+            assert second.result(timeout=5)[0].tolist() == [5.0, 1.0]
+
+        assert embedder._futures == {}
+
+    def test_cache_is_read_once_per_batch(self):
+        """Test that all texts of a batch are looked up in the cache with a single call."""
+        cache = MagicMock()
+        cache.get_many.side_effect = lambda texts: [None] * len(texts)
+        embedder = DeduplicatingEmbedder(self.embed_texts, cache)
+
+        embedder.embed(["Amen.", "Selah", "Amen."])
+
+        cache.get_many.assert_called_once_with(["Amen.", "Selah"])
+
+    def test_reset_releases_vectors(self):
+        """Test that reset forgets retained vectors and logs statistics."""
+        embedder = DeduplicatingEmbedder(self.embed_texts)
+        embedder.embed(["Amen.", "Amen."])
+
+        with patch("ai.vdb.dedup.logger") as mock_logger:
+            embedder.reset()
+        embedder.embed(["Amen."])
+
+        mock_logger.info.assert_called_once()
+        assert self.embedded == ["Amen.", "Amen."]
@@ -1,9 +1,23 @@
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import base64
+from unittest.mock import AsyncMock, MagicMock, call, patch
 
+import httpx
+import numpy as np
 import pytest
 from django.test import SimpleTestCase
+from openai import APIConnectionError, APIStatusError, BadRequestError, InternalServerError
 
-from ai.vdb.embedding import Embedding
+from ai.vdb.embedding import (
+    Embedding,
+    EmbeddingEndpoint,
+    EmbeddingLoadBalancer,
+    EmbeddingMicroBatcher,
+    decode_embeddings,
+    estimate_tokens,
+    normalize_embeddings,
+    split_prompts,
+)
 
 
 def create_mock_getenv(**env_vars):
@@ -23,6 +37,27 @@ def create_mock_getenv(**env_vars):
     return mock_getenv
 
 
+def status_error(error_class, status_code, message="Embedding request failed"):
+    """Create an error the OpenAI client raises for an HTTP status code."""
+    request = httpx.Request("POST", "http://embedding:11435/v1/embeddings")
+    return error_class(message, response=httpx.Response(status_code, request=request), body=None)
+
+
+def echo_response(model, input, **kwargs):
+    """Embed each prompt as [its length], like an embedding service would answer."""
+    return MagicMock(data=[MagicMock(embedding=[float(len(prompt))]) for prompt in input])
+
+
+def make_endpoints(count):
+    """Create embedding endpoints with mock clients."""
+    return [EmbeddingEndpoint(f"http://embedding-{index}:11435/v1", MagicMock(), AsyncMock()) for index in range(count)]
+
+
+def base64_embedding(values):
+    """Encode an embedding the way services answer encoding_format="base64"."""
+    return base64.b64encode(np.asarray(values, dtype="<f4").tobytes()).decode("ascii")
+
+
 class TestEmbeddingInit(SimpleTestCase):
     """Tests for Embedding initialization."""
 
@@ -110,7 +145,9 @@ class TestEmbeddingInit(SimpleTestCase):
             with patch("ai.vdb.embedding.OpenAI") as mock_openai:
                 with patch("ai.vdb.embedding.AsyncOpenAI"):
                     embedding = Embedding()
-                    mock_openai.assert_called_once_with(base_url="http://embedding:11435/v1", api_key="sk-test")
+                    mock_openai.assert_called_once_with(
+                        base_url="http://embedding:11435/v1", api_key="sk-test", max_retries=0
+                    )
                     assert embedding.client is not None
 
     def test_embedding_init_creates_sync_client_api_mode(self):
@@ -126,7 +163,9 @@ class TestEmbeddingInit(SimpleTestCase):
             with patch("ai.vdb.embedding.OpenAI") as mock_openai:
                 with patch("ai.vdb.embedding.AsyncOpenAI"):
                     embedding = Embedding()
-                    mock_openai.assert_called_once_with(base_url="https://openrouter.ai/api/v1", api_key="sk-or-key")
+                    mock_openai.assert_called_once_with(
+                        base_url="https://openrouter.ai/api/v1", api_key="sk-or-key", max_retries=0
+                    )
                     assert embedding.client is not None
 
     def test_embedding_init_creates_async_client_local_mode(self):
@@ -141,7 +180,9 @@ class TestEmbeddingInit(SimpleTestCase):
             with patch("ai.vdb.embedding.OpenAI"):
                 with patch("ai.vdb.embedding.AsyncOpenAI") as mock_async_openai:
                     embedding = Embedding()
-                    mock_async_openai.assert_called_once_with(base_url="http://embedding:11435/v1", api_key="sk-test")
+                    mock_async_openai.assert_called_once_with(
+                        base_url="http://embedding:11435/v1", api_key="sk-test", max_retries=0
+                    )
                     assert embedding.async_client is not None
 
     def test_embedding_init_creates_async_client_api_mode(self):
@@ -158,7 +199,7 @@ class TestEmbeddingInit(SimpleTestCase):
                 with patch("ai.vdb.embedding.AsyncOpenAI") as mock_async_openai:
                     embedding = Embedding()
                     mock_async_openai.assert_called_once_with(
-                        base_url="https://openrouter.ai/api/v1", api_key="sk-or-key"
+                        base_url="https://openrouter.ai/api/v1", api_key="sk-or-key", max_retries=0
                     )
                     assert embedding.async_client is not None
 
@@ -190,6 +231,18 @@ class TestEmbeddingInit(SimpleTestCase):
                         mock_logger.error.assert_called_once_with("Base embedding URL is not set")
 
 
+class TestEstimateTokens(SimpleTestCase):
+    """Tests for the estimate_tokens function."""
+
+    def test_estimate_tokens_grows_with_length(self):
+        """Test that longer texts are estimated to use more tokens."""
+        assert estimate_tokens("a" * 300) > estimate_tokens("a" * 30)
+
+    def test_estimate_tokens_minimum_one(self):
+        """Test that even an empty text counts as one token."""
+        assert estimate_tokens("") == 1
+
+
 class TestEmbeddingSize(SimpleTestCase):
     """Tests for the embedding_size method."""
 
@@ -241,6 +294,25 @@ class TestEmbeddingSize(SimpleTestCase):
                     assert size == embedding_size
                     mock_client.embeddings.create.assert_called_once_with(model="test-model", input=["Hello, world!"])
 
+    def test_embedding_size_is_cached(self):
+        """Test that the embedding dimension is only requested from the service once."""
+        with patch("ai.vdb.embedding.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(EMBEDDING_MODEL_ID="test-model")
+
+            with patch("ai.vdb.embedding.OpenAI") as mock_openai_class:
+                with patch("ai.vdb.embedding.AsyncOpenAI"):
+                    mock_client = MagicMock()
+                    mock_openai_class.return_value = mock_client
+                    mock_embedding_data = MagicMock()
+                    mock_embedding_data.embedding = [0.1] * 256
+                    mock_client.embeddings.create.return_value = MagicMock(data=[mock_embedding_data])
+
+                    embedding = Embedding()
+
+                    assert embedding.embedding_size() == 256
+                    assert embedding.embedding_size() == 256
+                    mock_client.embeddings.create.assert_called_once()
+
 
 class TestEmbedMethod(SimpleTestCase):
     """Tests for the embed method."""
@@ -517,6 +589,428 @@ class TestAsyncEmbedMethod(SimpleTestCase):
                         await embedding.async_embed(["text"], prompt_type="async_invalid")
 
 
+class TestEmbeddingMicroBatcher(SimpleTestCase):
+    """Tests for EmbeddingMicroBatcher class."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_request(self):
+        """Test that concurrent calls are sent together, identical texts once, and scattered back in order."""
+        requests = []
+
+        async def send_batch(texts):
+            requests.append(list(texts))
+            return [[float(len(text))] for text in texts]
+
+        batcher = EmbeddingMicroBatcher(send_batch, max_wait_seconds=0.01)
+
+        results = await asyncio.gather(
+            batcher.embed(["Amen"]), batcher.embed(["Jesus wept", "Amen"]), batcher.embed(["Selah"])
+        )
+
+        assert requests == [["Amen", "Jesus wept", "Selah"]]
+        assert results == [[[4.0]], [[10.0], [4.0]], [[5.0]]]
+        assert batcher.stats() == {"calls": 3, "requests": 1, "texts": 3, "texts_per_request": 3.0}
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_sent_without_waiting(self):
+        """Test that a full batch is sent at once and split into requests of max_batch_size texts."""
+        requests = []
+
+        async def send_batch(texts):
+            requests.append(list(texts))
+            return [[0.0] for _ in texts]
+
+        batcher = EmbeddingMicroBatcher(send_batch, max_wait_seconds=60, max_batch_size=2)
+
+        result = await asyncio.wait_for(batcher.embed(["a", "b", "c"]), timeout=1)
+
+        assert requests == [["a", "b"], ["c"]]
+        assert len(result) == 3
+
+    @pytest.mark.asyncio
+    async def test_error_reaches_every_caller(self):
+        """Test that a failed request is raised in every call of the batch."""
+        batcher = EmbeddingMicroBatcher(AsyncMock(side_effect=ConnectionError("Embedding service down")))
+
+        results = await asyncio.gather(batcher.embed(["a"]), batcher.embed(["b"]), return_exceptions=True)
+
+        assert all(isinstance(result, ConnectionError) for result in results)
+
+    def test_invalid_settings(self):
+        """Test that a non-positive batch size is rejected."""
+        with patch("ai.vdb.embedding.logger"):
+            with pytest.raises(ValueError, match="micro-batch"):
+                EmbeddingMicroBatcher(AsyncMock(), max_batch_size=0)
+
+    @pytest.mark.asyncio
+    async def test_async_embed_coalesces_queries(self):
+        """Test that concurrent async_embed calls reach the embedding service as one request."""
+        with patch("ai.vdb.embedding.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(
+                EMBEDDING_MODEL_ID="test-model", EMBEDDING_MODEL_QUERY_PROMPT="Query: {text}"
+            )
+            with patch("ai.vdb.embedding.OpenAI"):
+                with patch("ai.vdb.embedding.AsyncOpenAI") as mock_async_openai_class:
+                    mock_async_client = AsyncMock()
+                    mock_async_openai_class.return_value = mock_async_client
+                    mock_response = MagicMock()
+                    mock_response.data = [MagicMock(embedding=[1.0, 0.0]), MagicMock(embedding=[0.0, 2.0])]
+                    mock_async_client.embeddings.create.return_value = mock_response
+
+                    embedding = Embedding()
+                    first, second = await asyncio.gather(
+                        embedding.async_embed(["Amen"], prompt_type="query"),
+                        embedding.async_embed(["Selah"], prompt_type="query", normalize=True),
+                    )
+
+                    mock_async_client.embeddings.create.assert_called_once_with(
+                        model="test-model", input=["Query: Amen", "Query: Selah"]
+                    )
+                    assert first == [[1.0, 0.0]]
+                    assert second == [pytest.approx([0.0, 1.0])]
+
+    @pytest.mark.asyncio
+    async def test_micro_batching_disabled(self):
+        """Test that EMBEDDING_MICRO_BATCH_WAIT_MS=0 sends every call on its own."""
+        with patch("ai.vdb.embedding.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(EMBEDDING_MICRO_BATCH_WAIT_MS="0")
+            with patch("ai.vdb.embedding.OpenAI"):
+                with patch("ai.vdb.embedding.AsyncOpenAI"):
+                    embedding = Embedding()
+
+        assert embedding.micro_batcher is None
+
+
+class TestEmbeddingArrays(SimpleTestCase):
+    """Tests for the NumPy return path of embed and async_embed."""
+
+    def test_decode_embeddings(self):
+        """Test that base64 and plain list embeddings decode into one float32 matrix."""
+        matrix = decode_embeddings([MagicMock(embedding=base64_embedding([1.0, 2.0])), MagicMock(embedding=[3.0, 4.0])])
+
+        assert matrix.dtype == np.float32
+        assert matrix.flags["C_CONTIGUOUS"]
+        assert matrix.tolist() == [[1.0, 2.0], [3.0, 4.0]]
+
+    def test_normalize_embeddings(self):
+        """Test that every row is scaled to unit length and zero rows stay zero."""
+        normalized = normalize_embeddings(np.array([[3.0, 4.0], [0.0, 0.0]], dtype=np.float32))
+
+        assert normalized.tolist() == [pytest.approx([0.6, 0.8]), [0.0, 0.0]]
+
+    def test_embed_as_array(self):
+        """Test that as_array requests base64 embeddings and returns a normalized matrix."""
+        with patch("ai.vdb.embedding.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(
+                EMBEDDING_MODEL_ID="test-model", EMBEDDING_MODEL_DOCUMENT_PROMPT=""
+            )
+            with patch("ai.vdb.embedding.OpenAI") as mock_openai_class:
+                with patch("ai.vdb.embedding.AsyncOpenAI"):
+                    mock_client = MagicMock()
+                    mock_openai_class.return_value = mock_client
+                    mock_response = MagicMock()
+                    mock_response.data = [MagicMock(embedding=base64_embedding([3.0, 4.0]))]
+                    mock_client.embeddings.create.return_value = mock_response
+
+                    embedding = Embedding()
+                    result = embedding.embed(["text"], normalize=True, as_array=True)
+
+                    mock_client.embeddings.create.assert_called_once_with(
+                        model="test-model", input=["text"], encoding_format="base64"
+                    )
+                    assert result.shape == (1, 2)
+                    assert result[0].tolist() == pytest.approx([0.6, 0.8])
+
+    @pytest.mark.asyncio
+    async def test_async_embed_as_array(self):
+        """Test that concurrent as_array calls share one base64 request and each get their own rows."""
+        with patch("ai.vdb.embedding.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(
+                EMBEDDING_MODEL_ID="test-model", EMBEDDING_MODEL_QUERY_PROMPT=""
+            )
+            with patch("ai.vdb.embedding.OpenAI"):
+                with patch("ai.vdb.embedding.AsyncOpenAI") as mock_async_openai_class:
+                    mock_async_client = AsyncMock()
+                    mock_async_openai_class.return_value = mock_async_client
+                    mock_response = MagicMock()
+                    mock_response.data = [
+                        MagicMock(embedding=base64_embedding([1.0, 0.0])),
+                        MagicMock(embedding=base64_embedding([0.0, 2.0])),
+                    ]
+                    mock_async_client.embeddings.create.return_value = mock_response
+
+                    embedding = Embedding()
+                    first, second = await asyncio.gather(
+                        embedding.async_embed(["Amen"], prompt_type="query", as_array=True),
+                        embedding.async_embed(["Selah"], prompt_type="query", as_array=True),
+                    )
+
+                    mock_async_client.embeddings.create.assert_called_once_with(
+                        model="test-model", input=["Amen", "Selah"], encoding_format="base64"
+                    )
+                    assert first.tolist() == [[1.0, 0.0]]
+                    assert second.tolist() == [[0.0, 2.0]]
+
+
+class TestEmbeddingRequests(SimpleTestCase):
+    """Tests for batch splitting and retries of embedding requests."""
+
+    def create_embedding(self, mock_client, **env):
+        """Create an Embedding whose sync and async clients are mock_client."""
+        with patch("ai.vdb.embedding.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(
+                EMBEDDING_MODEL_ID="test-model", EMBEDDING_MODEL_DOCUMENT_PROMPT="", **env
+            )
+            with patch("ai.vdb.embedding.OpenAI", return_value=mock_client):
+                with patch("ai.vdb.embedding.AsyncOpenAI", return_value=mock_client):
+                    return Embedding()
+
+    def test_split_prompts(self):
+        """Test that sub-batches respect both limits and an oversized prompt gets its own."""
+        prompts = ["a" * 3, "b" * 3, "c" * 30, "d" * 3, "e" * 3, "f" * 3]
+
+        assert split_prompts(prompts, max_items=2, max_tokens=5) == [
+            ["aaa", "bbb"],
+            ["c" * 30],
+            ["ddd", "eee"],
+            ["fff"],
+        ]
+
+    def test_large_batch_is_split_in_order(self):
+        """Test that a batch over EMBEDDING_BATCH_SIZE is sent as several requests and reassembled."""
+        mock_client = MagicMock()
+        mock_client.embeddings.create.side_effect = echo_response
+        embedding = self.create_embedding(mock_client, EMBEDDING_BATCH_SIZE="2")
+
+        result = embedding.embed(["a", "bb", "ccc", "dddd", "eeeee"], as_array=True)
+
+        assert mock_client.embeddings.create.call_count == 3
+        assert result.tolist() == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+
+    def test_transient_error_is_retried_with_backoff(self):
+        """Test that connection and server errors are retried after exponentially growing delays."""
+        mock_client = MagicMock()
+        request = httpx.Request("POST", "http://embedding:11435/v1/embeddings")
+        mock_client.embeddings.create.side_effect = [
+            APIConnectionError(request=request),
+            status_error(InternalServerError, 503),
+            echo_response("test-model", ["Amen"]),
+        ]
+        embedding = self.create_embedding(mock_client)
+
+        with patch("ai.vdb.embedding.time.sleep") as mock_sleep, patch("ai.vdb.embedding.logger"):
+            result = embedding.embed(["Amen"])
+
+        assert result == [[4.0]]
+        assert mock_sleep.call_args_list == [call(0.5), call(1.0)]
+
+    def test_retries_are_limited(self):
+        """Test that the error is raised once EMBEDDING_MAX_RETRIES is used up."""
+        mock_client = MagicMock()
+        mock_client.embeddings.create.side_effect = status_error(InternalServerError, 500)
+        embedding = self.create_embedding(mock_client, EMBEDDING_MAX_RETRIES="2", EMBEDDING_RETRY_BACKOFF_MS="0")
+
+        with patch("ai.vdb.embedding.logger"):
+            with pytest.raises(InternalServerError):
+                embedding.embed(["Amen"])
+
+        assert mock_client.embeddings.create.call_count == 3
+
+    def test_rejected_batch_is_halved(self):
+        """Test that a request rejected as too large is retried as two smaller requests."""
+        mock_client = MagicMock()
+        mock_client.embeddings.create.side_effect = [
+            status_error(APIStatusError, 413),
+            echo_response("test-model", ["a"]),
+            echo_response("test-model", ["bb"]),
+        ]
+        embedding = self.create_embedding(mock_client)
+
+        with patch("ai.vdb.embedding.logger"):
+            result = embedding.embed(["a", "bb"])
+
+        assert result == [[1.0], [2.0]]
+        assert [kwargs["input"] for _, kwargs in mock_client.embeddings.create.call_args_list] == [
+            ["a", "bb"],
+            ["a"],
+            ["bb"],
+        ]
+
+    def test_context_limit_bad_request_is_halved(self):
+        """Test that a 400 naming the context length is treated as an oversized batch."""
+        mock_client = MagicMock()
+        mock_client.embeddings.create.side_effect = [
+            status_error(BadRequestError, 400, "Input exceeds the maximum context length of 512 tokens"),
+            echo_response("test-model", ["a"]),
+            echo_response("test-model", ["bb"]),
+        ]
+        embedding = self.create_embedding(mock_client)
+
+        with patch("ai.vdb.embedding.logger"):
+            assert embedding.embed(["a", "bb"]) == [[1.0], [2.0]]
+
+    def test_other_bad_request_fails_fast(self):
+        """Test that a 400 unrelated to the batch size is raised after a single request."""
+        mock_client = MagicMock()
+        mock_client.embeddings.create.side_effect = status_error(BadRequestError, 400, "Model 'wrong-model' not found")
+        embedding = self.create_embedding(mock_client)
+
+        with pytest.raises(BadRequestError, match="not found"):
+            embedding.embed(["a", "bb", "ccc", "dddd"])
+
+        assert mock_client.embeddings.create.call_count == 1
+
+    def test_bad_request_mentioning_tokens_fails_fast(self):
+        """Test that a 400 that only mentions context or tokens in passing is not treated as oversized."""
+        mock_client = MagicMock()
+        mock_client.embeddings.create.side_effect = status_error(
+            BadRequestError, 400, "Invalid value for 'context': unknown tokens option"
+        )
+        embedding = self.create_embedding(mock_client)
+
+        with pytest.raises(BadRequestError, match="Invalid value"):
+            embedding.embed(["a", "bb", "ccc", "dddd"])
+
+        assert mock_client.embeddings.create.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_async_embed_retries(self):
+        """Test that async requests are retried too."""
+        mock_client = AsyncMock()
+        mock_client.embeddings.create.side_effect = [
+            status_error(InternalServerError, 502),
+            echo_response("test-model", ["Amen"]),
+        ]
+        embedding = self.create_embedding(mock_client, EMBEDDING_RETRY_BACKOFF_MS="0")
+
+        with patch("ai.vdb.embedding.logger"):
+            result = await embedding.async_embed(["Amen"], as_array=True)
+
+        assert result.tolist() == [[4.0]]
+
+    def test_invalid_settings(self):
+        """Test that non-positive request limits are rejected."""
+        with patch("ai.vdb.embedding.logger"):
+            with pytest.raises(ValueError, match="request limits"):
+                self.create_embedding(MagicMock(), EMBEDDING_BATCH_MAX_TOKENS="0")
+
+
+class TestEmbeddingLoadBalancer(SimpleTestCase):
+    """Tests for EmbeddingLoadBalancer class."""
+
+    def test_least_outstanding_requests(self):
+        """Test that requests go to the endpoint with the fewest requests in flight."""
+        balancer = EmbeddingLoadBalancer(make_endpoints(3))
+
+        first, second, third = balancer.acquire(), balancer.acquire(), balancer.acquire()
+        balancer.release(second, 0.01)
+
+        assert len({first.base_url, second.base_url, third.base_url}) == 3
+        assert balancer.acquire() is second
+
+    def test_failing_endpoint_is_ejected_and_returns(self):
+        """Test that an endpoint is skipped after consecutive failures until its ejection is over."""
+        endpoints = make_endpoints(2)
+        balancer = EmbeddingLoadBalancer(endpoints, failure_threshold=2, ejection_seconds=30)
+
+        with patch("ai.vdb.embedding.time.monotonic", return_value=100.0), patch("ai.vdb.embedding.logger"):
+            for _ in range(2):
+                endpoints[0].outstanding += 1
+                balancer.release(endpoints[0], 0.01, failed=True)
+            routed = [balancer.acquire() for _ in range(3)]
+            stats = balancer.stats()
+        with patch("ai.vdb.embedding.time.monotonic", return_value=131.0):
+            returned = balancer.acquire()
+
+        assert all(endpoint is endpoints[1] for endpoint in routed)
+        assert stats[0]["ejected"] is True
+        assert stats[0]["failures"] == 2
+        assert returned is endpoints[0]
+
+    def test_all_endpoints_ejected(self):
+        """Test that requests are still routed when every endpoint is ejected."""
+        endpoints = make_endpoints(2)
+        for endpoint in endpoints:
+            endpoint.ejected_until = float("inf")
+        balancer = EmbeddingLoadBalancer(endpoints)
+
+        assert balancer.acquire() in endpoints
+
+    def test_latency_tracking(self):
+        """Test that the latency of each endpoint is a moving average of its successful requests."""
+        endpoints = make_endpoints(1)
+        balancer = EmbeddingLoadBalancer(endpoints, latency_smoothing=0.5)
+
+        for elapsed in [0.1, 0.3]:
+            balancer.release(balancer.acquire(), elapsed)
+
+        assert balancer.stats() == [
+            {
+                "url": "http://embedding-0:11435/v1",
+                "outstanding": 0,
+                "requests": 2,
+                "failures": 0,
+                "ejected": False,
+                "latency_ms": 200.0,
+            }
+        ]
+
+    def test_invalid_settings(self):
+        """Test that a balancer without endpoints is rejected."""
+        with patch("ai.vdb.embedding.logger"):
+            with pytest.raises(ValueError, match="load balancer"):
+                EmbeddingLoadBalancer([])
+
+    def test_embedding_size_fails_over(self):
+        """Test that the dimension probe is sent to another endpoint when the first one is down."""
+        request = httpx.Request("POST", "http://embedding-0:11435/v1/embeddings")
+        clients = [MagicMock(), MagicMock()]
+        clients[0].embeddings.create.side_effect = APIConnectionError(request=request)
+        clients[1].embeddings.create.return_value = MagicMock(data=[MagicMock(embedding=[0.1] * 8)])
+        with patch("ai.vdb.embedding.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(
+                BASE_EMBEDDING_URL="http://embedding-0:11435/v1,http://embedding-1:11435/v1",
+                EMBEDDING_RETRY_BACKOFF_MS="0",
+            )
+            with patch("ai.vdb.embedding.OpenAI", side_effect=clients):
+                with patch("ai.vdb.embedding.AsyncOpenAI"):
+                    embedding = Embedding()
+
+        with patch("ai.vdb.embedding.logger"):
+            assert embedding.embedding_size() == 8
+
+    @pytest.mark.asyncio
+    async def test_embedding_uses_every_endpoint(self):
+        """Test that a comma-separated BASE_EMBEDDING_URL spreads requests and retries over the endpoints."""
+        clients = [AsyncMock(), AsyncMock()]
+        clients[0].embeddings.create.side_effect = status_error(InternalServerError, 503)
+        clients[1].embeddings.create.side_effect = echo_response
+        with patch("ai.vdb.embedding.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(
+                EMBEDDING_MODEL_ID="test-model",
+                BASE_EMBEDDING_URL="http://embedding-0:11435/v1, http://embedding-1:11435/v1",
+                EMBEDDING_RETRY_BACKOFF_MS="0",
+                EMBEDDING_MICRO_BATCH_WAIT_MS="0",
+            )
+            with patch("ai.vdb.embedding.OpenAI"):
+                with patch("ai.vdb.embedding.AsyncOpenAI", side_effect=clients) as mock_async_openai:
+                    embedding = Embedding()
+
+        with patch("ai.vdb.embedding.logger"):
+            results = await asyncio.gather(*(embedding.async_embed([text]) for text in ["a", "bb", "ccc"]))
+
+        assert [call.kwargs["base_url"] for call in mock_async_openai.call_args_list] == [
+            "http://embedding-0:11435/v1",
+            "http://embedding-1:11435/v1",
+        ]
+        assert results == [[[1.0]], [[2.0]], [[3.0]]]
+        assert clients[0].embeddings.create.await_count >= 1
+        assert [endpoint["failures"] for endpoint in embedding.stats()["endpoints"]] == [
+            clients[0].embeddings.create.await_count,
+            0,
+        ]
+
+
 class TestEmbeddingIntegration(SimpleTestCase):
     """Integration tests for Embedding class."""
 
@@ -0,0 +1,148 @@
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+from django.test import SimpleTestCase
+
+from ai.vdb.embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache(SimpleTestCase):
+    """Tests for EmbeddingCache class."""
+
+    def setUp(self):
+        """Set up a temporary cache directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_directory = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        """Clean up temporary files."""
+        self.temp_dir.cleanup()
+
+    def test_get_many_returns_none_for_misses(self):
+        """Test that unknown texts are reported as misses."""
+        cache = EmbeddingCache(self.cache_directory, "test-model", "{text}")
+
+        assert cache.get_many(["a", "b"]) == [None, None]
+        assert cache.misses == 2
+
+    def test_put_and_get_before_flush(self):
+        """Test that pending embeddings are served before they are written to disk."""
+        cache = EmbeddingCache(self.cache_directory, "test-model", "{text}")
+        cache.put_many(["a"], [[1.0, 2.0]])
+
+        result = cache.get_many(["a", "b"])
+
+        assert result[0].tolist() == [1.0, 2.0]
+        assert result[1] is None
+        assert cache.hits == 1
+
+    def test_flush_persists_across_instances(self):
+        """Test that flushed embeddings are loaded by a new cache instance."""
+        cache = EmbeddingCache(self.cache_directory, "test-model", "{text}")
+        cache.put_many(["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+        cache.flush()
+        cache.put_many(["c"], [[5.0, 6.0]])
+        cache.flush()
+
+        reloaded = EmbeddingCache(self.cache_directory, "test-model", "{text}")
+        result = reloaded.get_many(["c", "a", "b"])
+
+        assert len(reloaded) == 3
+        assert [vector.tolist() for vector in result] == [[5.0, 6.0], [1.0, 2.0], [3.0, 4.0]]
+        assert result[0].dtype == np.float32
+
+    def test_namespaces_separate_models_and_templates(self):
+        """Test that a different model or prompt template never returns cached vectors."""
+        cache = EmbeddingCache(self.cache_directory, "test-model", "{text}")
+        cache.put_many(["a"], [[1.0, 2.0]])
+        cache.flush()
+
+        other_model = EmbeddingCache(self.cache_directory, "other-model", "{text}")
+        other_template = EmbeddingCache(self.cache_directory, "test-model", "passage: {text}")
+
+        assert other_model.get_many(["a"]) == [None]
+        assert other_template.get_many(["a"]) == [None]
+
+    def test_flush_without_pending_writes_nothing(self):
+        """Test that flushing an empty cache does not create files."""
+        cache = EmbeddingCache(self.cache_directory, "test-model", "{text}")
+        cache.flush()
+
+        assert not any(self.cache_directory.iterdir())
+
+    def test_put_many_flushes_at_threshold(self):
+        """Test that the cache writes to disk once enough embeddings are pending."""
+        cache = EmbeddingCache(self.cache_directory, "test-model", "{text}", flush_threshold=2)
+        cache.put_many(["a", "b"], [[1.0], [2.0]])
+
+        assert cache.matrix_path.exists()
+        assert cache.matrix_path.stat().st_size == 2 * 4
+
+    def test_dimension_mismatch_raises(self):
+        """Test that vectors with a different dimension are rejected."""
+        cache = EmbeddingCache(self.cache_directory, "test-model", "{text}")
+        cache.put_many(["a"], [[1.0, 2.0]])
+
+        with pytest.raises(ValueError, match="does not match"):
+            cache.put_many(["b"], [[1.0, 2.0, 3.0]])
+
+    def test_index_entries_past_matrix_end_are_dropped(self):
+        """Test that an index written for rows that never reached disk is ignored."""
+        cache = EmbeddingCache(self.cache_directory, "test-model", "{text}")
+        cache.put_many(["a"], [[1.0, 2.0]])
+        cache.flush()
+        # Simulate an interrupted write: the index references a row that does not exist
+        with cache.index_path.open("w", encoding="utf-8") as file:
+            json.dump({EmbeddingCache.text_key("a"): 0, EmbeddingCache.text_key("b"): 1}, file)
+
+        reloaded = EmbeddingCache(self.cache_directory, "test-model", "{text}")
+
+        assert reloaded.get_many(["a"])[0].tolist() == [1.0, 2.0]
+        assert reloaded.get_many(["b"]) == [None]
+
+    def test_corrupt_cache_is_ignored(self):
+        """Test that an unreadable cache namespace is treated as empty."""
+        cache = EmbeddingCache(self.cache_directory, "test-model", "{text}")
+        cache.put_many(["a"], [[1.0, 2.0]])
+        cache.flush()
+        cache.meta_path.write_text("not json", encoding="utf-8")
+
+        reloaded = EmbeddingCache(self.cache_directory, "test-model", "{text}")
+
+        assert reloaded.get_many(["a"]) == [None]
+
+    def test_flush_after_truncated_row_keeps_rows_aligned(self):
+        """Test that rows appended after a partial trailing row are found at their indexed positions."""
+        cache = EmbeddingCache(self.cache_directory, "test-model", "{text}")
+        cache.put_many(["a"], [[1.0, 2.0]])
+        cache.flush()
+        # Simulate an interrupted write that left half a row at the end of the matrix
+        with cache.matrix_path.open("ab") as file:
+            file.write(np.array([9.0], dtype=np.float32).tobytes())
+
+        reloaded = EmbeddingCache(self.cache_directory, "test-model", "{text}")
+        reloaded.put_many(["b"], [[3.0, 4.0]])
+        reloaded.flush()
+        result = EmbeddingCache(self.cache_directory, "test-model", "{text}").get_many(["a", "b"])
+
+        assert [vector.tolist() for vector in result] == [[1.0, 2.0], [3.0, 4.0]]
+        assert reloaded.matrix_path.stat().st_size == 2 * 2 * 4
+
+    def test_flush_after_unloadable_cache_starts_fresh(self):
+        """Test that a matrix whose index could not be loaded is rewritten from the first row."""
+        cache = EmbeddingCache(self.cache_directory, "test-model", "{text}")
+        cache.put_many(["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+        cache.flush()
+        cache.index_path.unlink()
+
+        reloaded = EmbeddingCache(self.cache_directory, "test-model", "{text}")
+        reloaded.put_many(["c"], [[5.0, 6.0]])
+        reloaded.flush()
+        result = EmbeddingCache(self.cache_directory, "test-model", "{text}").get_many(["c", "a"])
+
+        assert result[0].tolist() == [5.0, 6.0]
+        assert result[1] is None
+        assert reloaded.matrix_path.stat().st_size == 2 * 4
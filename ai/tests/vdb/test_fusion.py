@@ -0,0 +1,68 @@
+import pytest
+from django.test import SimpleTestCase
+
+from ai.vdb.fusion import merge_version_results, normalize_scores, verse_key
+
+
+def make_hit(book, chapter, verse, distance, text="text"):
+    """Create a search result for a verse."""
+    return {"distance": distance, "entity": {"book": book, "chapter": chapter, "verse": verse, "text": text}}
+
+
+class TestNormalizeScores(SimpleTestCase):
+    """Tests for normalize_scores function."""
+
+    def test_min_max(self):
+        """Test that the best hit scores 1 and the worst 0."""
+        hits = [make_hit("John", 3, 16, 12.0), make_hit("John", 3, 17, 8.0), make_hit("John", 1, 1, 4.0)]
+
+        assert normalize_scores(hits) == [1.0, 0.5, 0.0]
+
+    def test_lower_is_better(self):
+        """Test that Hamming distances are inverted."""
+        hits = [make_hit("John", 3, 16, 2), make_hit("John", 3, 17, 10)]
+
+        assert normalize_scores(hits, higher_is_better=False) == [1.0, 0.0]
+
+    def test_ties_and_empty(self):
+        """Test that equal distances all score 1 and no hits give no scores."""
+        assert normalize_scores([make_hit("John", 3, 16, 0.5), make_hit("John", 3, 17, 0.5)]) == [1.0, 1.0]
+        assert normalize_scores([]) == []
+
+
+class TestMergeVersionResults(SimpleTestCase):
+    """Tests for merge_version_results function."""
+
+    def test_deduplicates_verses_across_versions(self):
+        """Test that a verse found in several versions is kept once, with its best-scoring wording."""
+        results = {
+            "bsb": [make_hit("John", 3, 16, 0.9, "bsb 3:16"), make_hit("John", 1, 1, 0.5, "bsb 1:1")],
+            "kjv": [
+                make_hit("Genesis", 1, 1, 20.0, "kjv Gen 1:1"),
+                make_hit("John", 1, 1, 15.0, "kjv 1:1"),
+                make_hit("John", 3, 16, 10.0, "kjv 3:16"),
+            ],
+        }
+
+        merged = merge_version_results(results, limit=10)
+
+        assert [hit["entity"]["text"] for hit in merged] == ["bsb 3:16", "kjv Gen 1:1", "kjv 1:1"]
+        assert merged[0]["versions"] == ["bsb", "kjv"]
+        assert merged[2]["versions"] == ["bsb", "kjv"]
+        assert merged[2]["score"] == pytest.approx(0.5)
+
+    def test_limit_and_priority(self):
+        """Test that ties keep the first collection's hit and the result is trimmed to the limit."""
+        results = {
+            "bsb": [make_hit("John", 3, 16, 1.0, "bsb")],
+            "kjv": [make_hit("John", 3, 16, 2.0, "kjv"), make_hit("John", 3, 17, 1.0)],
+        }
+
+        merged = merge_version_results(results, limit=1)
+
+        assert len(merged) == 1
+        assert merged[0]["entity"]["text"] == "bsb"
+
+    def test_verse_key(self):
+        """Test that hits are identified by book, chapter and verse."""
+        assert verse_key(make_hit("John", 3, 16, 0.1)) == ("John", 3, 16)
@@ -0,0 +1,264 @@
+import json
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from django.test import SimpleTestCase
+
+from ai.vdb.ingest import (
+    IngestPipeline,
+    batch_verses,
+    chapter_progress,
+    iter_collection_verses,
+    read_chapter_verses,
+)
+
+
+def write_chapter(root: Path, version: str, book: str, chapter: int, verses: dict):
+    """Write a chapter JSON file in the same layout as fAIth/bible_data."""
+    chapter_directory = root.joinpath(version, book)
+    chapter_directory.mkdir(parents=True, exist_ok=True)
+    with chapter_directory.joinpath(f"{chapter}.json").open("w", encoding="utf-8") as file:
+        json.dump(verses, file)
+
+
+class TestReadChapterVerses(SimpleTestCase):
+    """Tests for read_chapter_verses function."""
+
+    def setUp(self):
+        """Set up a temporary Bible data root."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        """Clean up temporary files."""
+        self.temp_dir.cleanup()
+
+    def test_read_chapter_verses_skips_headers_and_cleans_text(self):
+        """Test that headers are skipped and words-of-Jesus spans are removed."""
+        write_chapter(
+            self.root,
+            "bsb",
+            "John",
+            3,
+            {"header_1": "Jesus and Nicodemus", "1": " Now there was a man ", "2": '<span class="wj">Truly</span>'},
+        )
+        with patch("fAIth.bible_globals.BIBLE_DATA_ROOT", self.root):
+            records = read_chapter_verses("bsb", "John", 3)
+
+        assert records == [
+            {"text": "Now there was a man", "version": "bsb", "book": "John", "chapter": 3, "verse": 1},
+            {"text": "Truly", "version": "bsb", "book": "John", "chapter": 3, "verse": 2},
+        ]
+
+    def test_read_chapter_verses_missing_file(self):
+        """Test that a missing chapter file yields no records."""
+        with patch("fAIth.bible_globals.BIBLE_DATA_ROOT", self.root):
+            with patch("ai.vdb.ingest.logger") as mock_logger:
+                records = read_chapter_verses("bsb", "John", 99)
+
+        assert records == []
+        mock_logger.error.assert_called_once()
+
+
+class TestIterCollectionVerses(SimpleTestCase):
+    """Tests for iter_collection_verses function."""
+
+    def setUp(self):
+        """Set up a temporary Bible data root with two books."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        write_chapter(self.root, "web", "Genesis", 1, {"1": "a", "2": "b"})
+        write_chapter(self.root, "web", "Genesis", 2, {"1": "c"})
+        write_chapter(self.root, "web", "Exodus", 1, {"1": "d"})
+
+    def tearDown(self):
+        """Clean up temporary files."""
+        self.temp_dir.cleanup()
+
+    def test_iter_collection_verses_in_canonical_order(self):
+        """Test that verses are streamed book by book and chapter by chapter."""
+        with patch("fAIth.bible_globals.BIBLE_DATA_ROOT", self.root):
+            with patch("fAIth.bible_globals.IN_ORDER_BOOKS", ["Genesis", "Exodus"]):
+                with patch("fAIth.bible_globals.CHAPTER_SELECTION", {"Genesis": 2, "Exodus": 1}):
+                    records = list(iter_collection_verses("web"))
+
+        assert [record["text"] for record in records] == ["a", "b", "c", "d"]
+        assert [(record["book"], record["chapter"]) for record in records] == [
+            ("Genesis", 1),
+            ("Genesis", 1),
+            ("Genesis", 2),
+            ("Exodus", 1),
+        ]
+
+
+class TestChapterProgress(SimpleTestCase):
+    """Tests for chapter_progress function."""
+
+    def test_chapter_progress(self):
+        """Test that progress counts chapters across books in canonical order."""
+        with patch("fAIth.bible_globals.IN_ORDER_BOOKS", ["Genesis", "Exodus"]):
+            with patch("fAIth.bible_globals.CHAPTER_SELECTION", {"Genesis": 3, "Exodus": 1}):
+                assert chapter_progress("Genesis", 1) == 25.0
+                assert chapter_progress("Exodus", 1) == 100.0
+                assert chapter_progress("Unknown", 1) == 0.0
+
+
+class TestBatchVerses(SimpleTestCase):
+    """Tests for batch_verses function."""
+
+    def test_batch_verses_respects_max_items(self):
+        """Test that batches never exceed the item limit."""
+        records = [{"text": "x"} for _ in range(5)]
+
+        batches = list(batch_verses(records, max_items=2, max_tokens=1000))
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+
+    def test_batch_verses_respects_max_tokens(self):
+        """Test that batches are closed before exceeding the token budget."""
+        # Each 30-character text is estimated at 11 tokens
+        records = [{"text": "x" * 30} for _ in range(4)]
+
+        batches = list(batch_verses(records, max_items=100, max_tokens=25))
+
+        assert [len(batch) for batch in batches] == [2, 2]
+
+    def test_batch_verses_oversized_record_gets_own_batch(self):
+        """Test that a record larger than the token budget is still emitted."""
+        records = [{"text": "short"}, {"text": "x" * 300}, {"text": "short"}]
+
+        batches = list(batch_verses(records, max_items=100, max_tokens=10))
+
+        assert [len(batch) for batch in batches] == [1, 1, 1]
+
+    def test_batch_verses_spans_chapters(self):
+        """Test that records from different chapters share a batch."""
+        records = [
+            {"text": "a", "book": "Genesis", "chapter": 1},
+            {"text": "b", "book": "Genesis", "chapter": 2},
+            {"text": "c", "book": "Exodus", "chapter": 1},
+        ]
+
+        batches = list(batch_verses(records, max_items=10, max_tokens=1000))
+
+        assert len(batches) == 1
+        assert batches[0] == records
+
+    def test_batch_verses_empty(self):
+        """Test that no batches are produced for no records."""
+        assert list(batch_verses([], max_items=10, max_tokens=1000)) == []
+
+
+class TestIngestPipeline(SimpleTestCase):
+    """Tests for IngestPipeline class."""
+
+    def test_pipeline_inserts_all_batches(self):
+        """Test that every embedded record is inserted in insert_batch_size chunks."""
+        inserted_chunks = []
+
+        def embed_batch(batch):
+            for record in batch:
+                record["dense_embedding"] = [1.0]
+            return batch
+
+        def insert_records(collection_name, records):
+            inserted_chunks.append((collection_name, list(records)))
+            return len(records)
+
+        pipeline = IngestPipeline(embed_batch, insert_records, embedding_concurrency=1, insert_batch_size=4)
+        batches = [[{"text": str(i)}, {"text": str(i + 1)}] for i in range(0, 10, 2)]
+        with patch("ai.vdb.ingest.logger"):
+            stats = pipeline.run("bsb", batches)
+
+        assert stats["verses"] == 10
+        assert [len(records) for _, records in inserted_chunks] == [4, 4, 2]
+        assert all(collection_name == "bsb" for collection_name, _ in inserted_chunks)
+        assert [record["text"] for _, records in inserted_chunks for record in records] == [str(i) for i in range(10)]
+
+    def test_pipeline_runs_embeddings_concurrently(self):
+        """Test that several embedding batches are in flight at the same time."""
+        lock = threading.Lock()
+        in_flight = [0]
+        peak = [0]
+        release = threading.Event()
+
+        def embed_batch(batch):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+                if peak[0] >= 3:
+                    release.set()
+            release.wait(timeout=5)
+            with lock:
+                in_flight[0] -= 1
+            return batch
+
+        pipeline = IngestPipeline(embed_batch, lambda name, records: len(records), embedding_concurrency=3)
+        with patch("ai.vdb.ingest.logger"):
+            stats = pipeline.run("bsb", [[{"text": "x"}] for _ in range(6)])
+
+        assert stats["verses"] == 6
+        assert peak[0] == 3
+
+    def test_pipeline_inserts_in_reading_order(self):
+        """Test that batches are inserted in reading order even when later batches finish embedding first."""
+        inserted_texts = []
+
+        def embed_batch(batch):
+            # Earlier batches take longer, so they finish embedding last
+            time.sleep(0.02 * (5 - int(batch[0]["text"])))
+            return batch
+
+        def insert_records(collection_name, records):
+            inserted_texts.extend(record["text"] for record in records)
+            return len(records)
+
+        pipeline = IngestPipeline(embed_batch, insert_records, embedding_concurrency=3, insert_batch_size=1)
+        with patch("ai.vdb.ingest.logger"):
+            pipeline.run("bsb", [[{"text": str(i)}] for i in range(5)])
+
+        assert inserted_texts == [str(i) for i in range(5)]
+
+    def test_pipelines_share_embedding_executor(self):
+        """Test that pipelines running at the same time can share one embedding executor."""
+        inserted = []
+        lock = threading.Lock()
+
+        def insert_records(collection_name, records):
+            with lock:
+                inserted.extend((collection_name, record["text"]) for record in records)
+            return len(records)
+
+        with ThreadPoolExecutor(max_workers=1) as embedding_executor:
+            pipeline = IngestPipeline(lambda batch: batch, insert_records, embedding_executor=embedding_executor)
+            with patch("ai.vdb.ingest.logger"):
+                with ThreadPoolExecutor(max_workers=2) as build_executor:
+                    futures = [
+                        build_executor.submit(pipeline.run, name, [[{"text": str(i)}] for i in range(20)])
+                        for name in ["bsb", "web"]
+                    ]
+                    stats = [future.result(timeout=10) for future in futures]
+
+        assert [result["verses"] for result in stats] == [20, 20]
+        assert sorted(inserted) == sorted((name, str(i)) for name in ["bsb", "web"] for i in range(20))
+
+    def test_pipeline_insert_error_propagates(self):
+        """Test that insert failures are raised after the pipeline drains."""
+
+        def insert_records(collection_name, records):
+            raise RuntimeError("Insert failed")
+
+        pipeline = IngestPipeline(lambda batch: batch, insert_records, insert_batch_size=1)
+        with patch("ai.vdb.ingest.logger"):
+            with pytest.raises(RuntimeError, match="Insert failed"):
+                pipeline.run("bsb", [[{"text": "x"}] for _ in range(5)])
+
+    def test_pipeline_invalid_concurrency(self):
+        """Test that a non-positive concurrency is rejected."""
+        with pytest.raises(ValueError):
+            IngestPipeline(lambda batch: batch, lambda name, records: 0, embedding_concurrency=0)
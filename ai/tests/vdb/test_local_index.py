@@ -0,0 +1,263 @@
+import json
+import math
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from django.test import SimpleTestCase
+
+from ai.vdb.local_index import (
+    BM25Index,
+    LocalCollection,
+    LocalVectorIndex,
+    build_local_snapshot,
+    tokenize,
+    weighted_fusion,
+)
+from ai.vdb.snapshot import VectorSnapshot, snapshot_path, write_snapshot
+from ai.vdb.storage import EmbeddingStorage
+
+VERSES = [
+    ("Genesis", 1, 1, "In the beginning God created the heavens and the earth."),
+    ("Genesis", 1, 2, "Now the earth was formless and void."),
+    ("John", 1, 1, "In the beginning was the Word, and the Word was with God."),
+    ("John", 11, 35, "Jesus wept."),
+]
+VECTORS = np.array([[1.0, 0.0, 0.0, 0.0], [0.8, 0.6, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 0.0, 1.0]])
+BOOKS = ["Genesis"] * 39 + ["John"]
+
+
+def make_columns():
+    """Create the verse columns of a small collection."""
+    return {
+        "text": [text for _, _, _, text in VERSES],
+        "version": ["bsb"] * len(VERSES),
+        "book": [book for book, _, _, _ in VERSES],
+        "chapter": np.array([chapter for _, chapter, _, _ in VERSES], dtype=np.int16),
+        "verse": np.array([verse for _, _, verse, _ in VERSES], dtype=np.int16),
+    }
+
+
+def make_records():
+    """Create the verse records of a small collection."""
+    return [
+        {"text": text, "version": "bsb", "book": book, "chapter": chapter, "verse": verse}
+        for book, chapter, verse, text in VERSES
+    ]
+
+
+class TestBM25Index(SimpleTestCase):
+    """Tests for BM25Index class."""
+
+    def test_tokenize(self):
+        """Test that text is split into lowercase words."""
+        assert tokenize("Jesus wept. In the BEGINNING!") == ["jesus", "wept", "in", "the", "beginning"]
+
+    def test_scores_match_bm25(self):
+        """Test that scores follow the BM25 formula and unmatched documents score 0."""
+        index = BM25Index(["jesus wept", "jesus said", "the word"], k1=1.2, b=0.75)
+
+        scores = index.scores("Jesus wept")
+
+        # "wept": df 1 of 3 documents, every document has 2 tokens (normalization factor k1)
+        idf_wept = math.log(1 + (3 - 1 + 0.5) / (1 + 0.5))
+        idf_jesus = math.log(1 + (3 - 2 + 0.5) / (2 + 0.5))
+        term_weight = (1.2 + 1) / (1 + 1.2)
+        assert scores[0] == pytest.approx((idf_wept + idf_jesus) * term_weight, rel=1e-5)
+        assert scores[1] == pytest.approx(idf_jesus * term_weight, rel=1e-5)
+        assert scores[2] == 0
+        assert index.scores("unknown words").sum() == 0
+
+
+class TestLocalCollection(SimpleTestCase):
+    """Tests for LocalCollection class."""
+
+    def setUp(self):
+        patcher = patch("fAIth.bible_globals.IN_ORDER_BOOKS", BOOKS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_dense_scores_are_cosine(self):
+        """Test that float vectors are scored by cosine similarity."""
+        collection = LocalCollection(make_columns(), VECTORS.astype(np.float32))
+
+        scores = collection.dense_scores([2.0, 0.0, 0.0, 0.0])
+
+        assert scores.tolist() == pytest.approx([1.0, 0.8, 0.0, 0.0])
+
+    def test_binary_scores_match_rerank(self):
+        """Test that packed sign bits are scored like EmbeddingStorage.rerank()."""
+        rng = np.random.default_rng(0)
+        documents = rng.normal(size=(5, 16)).astype(np.float32)
+        query = rng.normal(size=16).astype(np.float32)
+        storage = EmbeddingStorage("binary")
+        packed = storage.to_array([storage.encode(document) for document in documents])
+        columns = {name: np.resize(values, 5) for name, values in make_columns().items()}
+        hits = [
+            {"id": index, "distance": 0, "entity": {"dense_embedding": packed[index].tobytes()}} for index in range(5)
+        ]
+
+        scores = LocalCollection(columns, packed).dense_scores(query)
+        expected = {hit["id"]: hit["distance"] for hit in storage.rerank(query, hits, limit=5)}
+
+        assert scores.tolist() == pytest.approx([expected[index] for index in range(5)], rel=1e-5)
+
+    def test_top_hits_and_scope(self):
+        """Test that hits are ranked, scoped and shaped like Milvus results."""
+        collection = LocalCollection(make_columns())
+        scores = collection.sparse_scores("In the beginning")
+
+        hits = collection.top_hits(scores, limit=5, mask=None, positive_only=True)
+        scoped = collection.top_hits(scores, limit=5, mask=collection.scope_mask(book="John"), positive_only=True)
+
+        assert [hit["id"] for hit in hits][:2] in ([0, 2], [2, 0])
+        assert len(hits) == 3
+        assert [hit["entity"]["book"] for hit in scoped] == ["John"]
+        assert scoped[0]["entity"] == {
+            "version": "bsb",
+            "book": "John",
+            "chapter": 1,
+            "verse": 1,
+            "text": "In the beginning was the Word, and the Word was with God.",
+        }
+
+    def test_scope_mask(self):
+        """Test chapter range and testament masks."""
+        collection = LocalCollection(make_columns())
+
+        assert collection.scope_mask() is None
+        assert collection.scope_mask(book="John", chapter_start=11).tolist() == [False, False, False, True]
+        assert collection.scope_mask(testament="old").tolist() == [True, True, False, False]
+
+
+class TestWeightedFusion(SimpleTestCase):
+    """Tests for weighted_fusion function."""
+
+    def test_fusion(self):
+        """Test that BM25 and cosine scores are normalized and summed by weight."""
+        sparse_hits = [{"id": 1, "distance": 0.0}, {"id": 2, "distance": 5.0}]
+        dense_hits = [{"id": 1, "distance": 1.0}]
+
+        fused = weighted_fusion(sparse_hits, dense_hits, sparse_weight=0.2, dense_weight=0.8, limit=5)
+
+        assert [hit["id"] for hit in fused] == [1, 2]
+        assert fused[0]["distance"] == pytest.approx(0.2 * 0.5 + 0.8)
+        assert fused[1]["distance"] == pytest.approx(0.2 * (0.5 + math.atan(5.0) / math.pi))
+
+
+class TestLocalVectorIndex(SimpleTestCase):
+    """Tests for LocalVectorIndex class."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.snapshot_directory = Path(self.temp_dir.name, "snapshots")
+        self.index_directory = Path(self.temp_dir.name, "local_index")
+        for patcher in (
+            patch("fAIth.bible_globals.IN_ORDER_BOOKS", BOOKS),
+            patch("ai.vdb.local_index.source_data_checksum", return_value="abc"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def write_snapshot(self, storage_signature="float:0"):
+        """Write a snapshot of the small collection."""
+        metadata = {
+            "collection": "bsb",
+            "embedding_model": "test-model",
+            "document_template": "{text}",
+            "embedding_storage": storage_signature,
+            "source_checksum": "abc",
+        }
+        path = snapshot_path(self.snapshot_directory, "bsb", "test-model")
+        write_snapshot(path, metadata, make_records(), VECTORS)
+
+    def load(self, database_type="hybrid"):
+        """Load the index of the small collection."""
+        with patch("ai.vdb.local_index.logger"):
+            return LocalVectorIndex.load(
+                collection_names=["bsb"],
+                database_type=database_type,
+                storage=EmbeddingStorage(),
+                model_name="test-model",
+                document_template="{text}",
+                snapshot_directory=self.snapshot_directory,
+                index_directory=self.index_directory,
+            )
+
+    def test_load_memory_maps_snapshot_vectors(self):
+        """Test that snapshot vectors are normalized into a memory-mapped matrix."""
+        self.write_snapshot()
+
+        index = self.load()
+
+        dense_matrix = index.collections["bsb"].dense_matrix
+        assert isinstance(dense_matrix, np.memmap)
+        assert self.index_directory.joinpath("bsb--test-model.npy").exists()
+        assert np.linalg.norm(dense_matrix, axis=1) == pytest.approx(np.ones(4))
+
+    def test_hybrid_search(self):
+        """Test that hybrid search combines keyword and vector matches."""
+        self.write_snapshot()
+        index = self.load()
+
+        results = index.search_many("bsb", ["Jesus wept", "beginning"], [[0, 0, 0, 1], [1, 0, 0, 0]], limit=2)
+
+        assert [hit["entity"]["verse"] for hit in results[0]] == [35, 1]
+        assert results[1][0]["entity"]["book"] == "Genesis"
+
+    def test_scoped_dense_search(self):
+        """Test that a scope restricts dense search."""
+        self.write_snapshot()
+        index = self.load("dense")
+
+        results = index.search_many("bsb", ["beginning"], [[1, 0, 0, 0]], limit=5, scope={"book": "John"})
+
+        assert {hit["entity"]["book"] for hit in results[0]} == {"John"}
+
+    def test_missing_or_incompatible_snapshot(self):
+        """Test that dense collections need a matching snapshot while hybrid ones fall back to BM25."""
+        self.write_snapshot(storage_signature="binary:0")
+        with patch("ai.vdb.local_index.iter_collection_verses", return_value=iter(make_records())):
+            hybrid_index = self.load("hybrid")
+
+        assert "bsb" not in self.load("dense")
+        assert hybrid_index.collections["bsb"].dense_matrix is None
+        results = hybrid_index.search_many("bsb", ["Jesus wept"], [[0, 0, 0, 1]], limit=1)
+        assert results[0][0]["entity"]["verse"] == 35
+
+    def test_unknown_collection(self):
+        """Test that searching a collection that is not loaded is rejected."""
+        with patch("ai.vdb.local_index.logger"):
+            with pytest.raises(ValueError, match="not in the local index"):
+                LocalVectorIndex("sparse").search_many("kjv", ["Jesus wept"], None)
+
+
+class TestBuildLocalSnapshot(SimpleTestCase):
+    """Tests for build_local_snapshot function."""
+
+    def test_build_local_snapshot(self):
+        """Test that verses are embedded without Milvus into a loadable snapshot."""
+        embedding_engine = MagicMock()
+        embedding_engine.model_name = "test-model"
+        embedding_engine.document_template = "{text}"
+        embedding_engine.embed.side_effect = lambda texts, **kwargs: [[1.0, -1.0] for _ in texts]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with (
+                patch("ai.vdb.local_index.iter_collection_verses", return_value=iter(make_records())),
+                patch("ai.vdb.local_index.source_data_checksum", return_value="abc"),
+            ):
+                path = build_local_snapshot(
+                    "bsb", "dense", embedding_engine, EmbeddingStorage(), temp_dir, batch_size=3
+                )
+            snapshot = VectorSnapshot(path)
+
+            assert len(snapshot) == 4
+            assert snapshot.dense_embeddings.shape == (4, 2)
+            assert snapshot.metadata["embedding_storage"] == "float:0"
+            assert snapshot.metadata["source_checksum"] == "abc"
+            assert embedding_engine.embed.call_count == 2
+            assert json.loads(json.dumps(snapshot.metadata))["collection"] == "bsb"
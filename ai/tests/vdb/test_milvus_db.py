@@ -1,10 +1,18 @@
+import json
+import tempfile
+import threading
+import time
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from django.core.cache.backends.locmem import LocMemCache
 from django.test import SimpleTestCase
+from pymilvus import CollectionSchema, DataType, FieldSchema
 
 from ai.vdb.milvus_db import VectorDatabaseBuilder, VectorDatabaseQuerier
+from ai.vdb.result_cache import generation_key
+from ai.vdb.snapshot import VectorSnapshot
 
 
 def create_mock_getenv(**env_vars):
@@ -608,6 +616,31 @@ class TestDropCollection(SimpleTestCase):
                     assert "bsb" not in collections_after
                     assert "web" in collections_after
 
+    def test_drop_collection_invalidates_cached_search_results(self):
+        """Test that dropping a collection invalidates the web workers' cached search results."""
+        env_vars = {
+            "MILVUS_HOST": "http://milvus",
+            "MILVUS_PORT": "19530",
+            "MILVUS_DATABASE_NAME": "faith_db",
+            "MILVUS_USERNAME": "root",
+            "MILVUS_PASSWORD": "secure_password",
+            "DATABASE_TYPE": "hybrid",
+            "EMBEDDING_MODEL_ID": "test-model",
+            "SEARCH_RESULT_CACHE_ALIAS": "shared",
+        }
+        shared_cache = LocMemCache("builder-invalidation-test", {})
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(**env_vars)
+            with patch("ai.vdb.milvus_db.Embedding"):
+                with patch("ai.vdb.milvus_db.MilvusClient"):
+                    with patch("ai.vdb.milvus_db.caches", {"shared": shared_cache}):
+                        builder = VectorDatabaseBuilder()
+
+                        builder.drop_collection("bsb")
+
+        assert shared_cache.get(generation_key("bsb")) is not None
+        assert shared_cache.get(generation_key("kjv")) is None
+
     def test_drop_collection_warning(self):
         """Test that warning is logged when dropping non-existent collection."""
         env_vars = {
@@ -734,6 +767,725 @@ class TestCreateCollections(SimpleTestCase):
                                 builder.create_collections(["INVALID"])
 
 
+class TestPopulateCollection(SimpleTestCase):
+    """Tests for populate_collection method."""
+
+    def make_builder(self, database_type="dense", **extra_env):
+        """Create a builder with mocked Milvus and embedding clients."""
+        env_vars = {
+            "MILVUS_HOST": "http://milvus",
+            "MILVUS_PORT": "19530",
+            "MILVUS_DATABASE_NAME": "faith_db",
+            "MILVUS_USERNAME": "root",
+            "MILVUS_PASSWORD": "secure_password",
+            "DATABASE_TYPE": database_type,
+            "EMBEDDING_MODEL_ID": "test-model",
+            "EMBEDDING_CACHE_ENABLED": "False",
+            "MILVUS_RESUMABLE_INGEST": "False",
+            "MILVUS_BUILD_REPORT": "False",
+            **extra_env,
+        }
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(**env_vars)
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                with patch("ai.vdb.milvus_db.MilvusClient") as mock_client_class:
+                    mock_client_class.return_value = MagicMock()
+                    mock_embedding = MagicMock()
+                    mock_embedding.model_name = "test-model"
+                    mock_embedding.document_template = "{text}"
+                    mock_embedding.embedding_size.return_value = 2
+                    mock_embedding.embed.side_effect = lambda batch, **kwargs: [[0.1, 0.2] for _ in batch]
+                    mock_embedding_class.return_value = mock_embedding
+                    return VectorDatabaseBuilder()
+
+    def make_records(self, count):
+        """Create verse records spread over several chapters."""
+        return [
+            {"text": f"verse {i}", "version": "bsb", "book": "Genesis", "chapter": i // 3 + 1, "verse": i % 3 + 1}
+            for i in range(count)
+        ]
+
+    def test_populate_batches_embeddings_across_chapters(self):
+        """Test that embedding requests are filled across chapter boundaries."""
+        builder = self.make_builder(EMBEDDING_BATCH_SIZE="4", MILVUS_INSERT_BATCH_SIZE="100")
+        with patch("ai.vdb.milvus_db.iter_collection_verses", return_value=iter(self.make_records(10))):
+            with patch("ai.vdb.milvus_db.logger"):
+                stats = builder.populate_collection("bsb")
+
+        assert stats["verses"] == 10
+        # 10 verses over 4 chapters need only 3 embedding requests of up to 4 verses
+        batch_sizes = [len(call.args[0]) for call in builder.embedding_engine.embed.call_args_list]
+        assert batch_sizes == [4, 4, 2]
+        # Everything fits in a single insert request
+        builder.client.insert.assert_called_once()
+        inserted_records = builder.client.insert.call_args.kwargs["data"]
+        assert len(inserted_records) == 10
+        assert all(record["dense_embedding"] == pytest.approx([0.1, 0.2]) for record in inserted_records)
+
+    def test_populate_flushes_inserts_in_chunks(self):
+        """Test that inserts are flushed whenever the buffer reaches the insert batch size."""
+        builder = self.make_builder(EMBEDDING_BATCH_SIZE="2", MILVUS_INSERT_BATCH_SIZE="4")
+        with patch("ai.vdb.milvus_db.iter_collection_verses", return_value=iter(self.make_records(9))):
+            with patch("ai.vdb.milvus_db.logger"):
+                stats = builder.populate_collection("bsb")
+
+        assert stats["verses"] == 9
+        insert_sizes = [len(call.kwargs["data"]) for call in builder.client.insert.call_args_list]
+        assert insert_sizes == [4, 4, 1]
+
+    def test_populate_sparse_skips_embedding(self):
+        """Test that sparse collections are populated without calling the embedding service."""
+        builder = self.make_builder(database_type="sparse")
+        with patch("ai.vdb.milvus_db.iter_collection_verses", return_value=iter(self.make_records(5))):
+            with patch("ai.vdb.milvus_db.logger"):
+                stats = builder.populate_collection("bsb")
+
+        assert stats["verses"] == 5
+        builder.embedding_engine.embed.assert_not_called()
+        inserted_records = builder.client.insert.call_args.kwargs["data"]
+        assert all("dense_embedding" not in record for record in inserted_records)
+
+    def test_populate_empty_collection(self):
+        """Test that nothing is inserted when there are no verses."""
+        builder = self.make_builder()
+        with patch("ai.vdb.milvus_db.iter_collection_verses", return_value=iter([])):
+            with patch("ai.vdb.milvus_db.logger"):
+                stats = builder.populate_collection("bsb")
+
+        assert stats["verses"] == 0
+        builder.client.insert.assert_not_called()
+
+    def test_populate_with_concurrent_embedding(self):
+        """Test that concurrent embedding workers still insert every verse exactly once."""
+        builder = self.make_builder(
+            EMBEDDING_BATCH_SIZE="2", MILVUS_INSERT_BATCH_SIZE="3", EMBEDDING_BUILD_CONCURRENCY="4"
+        )
+        with patch("ai.vdb.milvus_db.iter_collection_verses", return_value=iter(self.make_records(25))):
+            with patch("ai.vdb.milvus_db.logger"):
+                stats = builder.populate_collection("bsb")
+
+        assert stats["verses"] == 25
+        inserted_texts = [
+            record["text"] for call in builder.client.insert.call_args_list for record in call.kwargs["data"]
+        ]
+        assert sorted(inserted_texts) == sorted(f"verse {i}" for i in range(25))
+        assert builder.embedding_engine.embed.call_count == 13
+
+    def test_populate_reports_throughput(self):
+        """Test that ingest statistics include throughput in verses per second."""
+        builder = self.make_builder()
+        with patch("ai.vdb.milvus_db.iter_collection_verses", return_value=iter(self.make_records(6))):
+            with patch("ai.vdb.milvus_db.logger"):
+                stats = builder.populate_collection("bsb")
+
+        assert stats["collection"] == "bsb"
+        assert stats["verses_per_second"] >= 0
+
+    def test_populate_embedding_error_propagates(self):
+        """Test that an embedding failure stops the build and is raised."""
+        builder = self.make_builder(EMBEDDING_BATCH_SIZE="2")
+        builder.embedding_engine.embed.side_effect = Exception("Embedding failed")
+        with patch("ai.vdb.milvus_db.iter_collection_verses", return_value=iter(self.make_records(10))):
+            with patch("ai.vdb.ingest.logger"):
+                with pytest.raises(Exception, match="Embedding failed"):
+                    builder.populate_collection("bsb")
+
+        builder.client.insert.assert_not_called()
+
+    def test_populate_uses_embedding_cache(self):
+        """Test that a rebuild with a warm cache only embeds texts it has not seen."""
+        with tempfile.TemporaryDirectory() as cache_directory:
+            cache_env = {"EMBEDDING_CACHE_ENABLED": "True", "EMBEDDING_CACHE_DIRECTORY": cache_directory}
+            first_builder = self.make_builder(**cache_env)
+            with patch("ai.vdb.milvus_db.iter_collection_verses", return_value=iter(self.make_records(6))):
+                with patch("ai.vdb.milvus_db.logger"):
+                    first_builder.populate_collection("bsb")
+            assert sum(len(call.args[0]) for call in first_builder.embedding_engine.embed.call_args_list) == 6
+
+            # A second build (new process) with two new verses only embeds the new ones
+            second_builder = self.make_builder(**cache_env)
+            with patch("ai.vdb.milvus_db.iter_collection_verses", return_value=iter(self.make_records(8))):
+                with patch("ai.vdb.milvus_db.logger"):
+                    stats = second_builder.populate_collection("bsb")
+
+            assert stats["verses"] == 8
+            embedded_texts = [
+                text for call in second_builder.embedding_engine.embed.call_args_list for text in call.args[0]
+            ]
+            assert embedded_texts == ["verse 6", "verse 7"]
+            inserted_records = second_builder.client.insert.call_args.kwargs["data"]
+            assert all(record["dense_embedding"] == pytest.approx([0.1, 0.2]) for record in inserted_records)
+            assert all(isinstance(record["dense_embedding"], list) for record in inserted_records)
+
+    def test_populate_with_bulk_import(self):
+        """Test that a new collection is written to import files and loaded with one import job."""
+        with patch("ai.vdb.milvus_db.BulkImporter") as mock_importer_class:
+            builder = self.make_builder(MILVUS_BULK_IMPORT="True", EMBEDDING_BATCH_SIZE="4")
+        mock_importer = mock_importer_class.return_value
+        mock_writer = mock_importer.open_writer.return_value
+        mock_writer.append.side_effect = lambda collection_name, records: len(records)
+        mock_writer.commit.return_value = [["bulk_import/faith_db/bsb/1.parquet"]]
+        schema = MagicMock()
+
+        with patch("ai.vdb.milvus_db.iter_collection_verses", return_value=iter(self.make_records(10))):
+            with patch("ai.vdb.milvus_db.logger"):
+                stats = builder.populate_collection("bsb", schema=schema)
+
+        assert stats["verses"] == 10
+        builder.client.insert.assert_not_called()
+        mock_importer.open_writer.assert_called_once_with(schema, "bsb")
+        assert sum(len(call.args[1]) for call in mock_writer.append.call_args_list) == 10
+        mock_importer.import_files.assert_called_once_with("bsb", [["bulk_import/faith_db/bsb/1.parquet"]])
+        mock_writer.close.assert_called_once()
+
+    def test_populate_without_schema_skips_bulk_import(self):
+        """Test that collections populated without a new schema (e.g. resumed) use row-wise inserts."""
+        with patch("ai.vdb.milvus_db.BulkImporter") as mock_importer_class:
+            builder = self.make_builder(MILVUS_BULK_IMPORT="True")
+
+        with patch("ai.vdb.milvus_db.iter_collection_verses", return_value=iter(self.make_records(3))):
+            with patch("ai.vdb.milvus_db.logger"):
+                builder.populate_collection("bsb")
+
+        mock_importer_class.return_value.open_writer.assert_not_called()
+        builder.client.insert.assert_called_once()
+
+    def test_create_collections_builds_versions_in_parallel(self):
+        """Test that several versions are read and inserted at the same time."""
+        builder = self.make_builder(MILVUS_PARALLEL_COLLECTION_BUILDS="2")
+        # Both versions must be reading at once to get past the barrier
+        barrier = threading.Barrier(2, timeout=5)
+
+        def iter_verses(collection_name):
+            barrier.wait()
+            yield from [dict(record, version=collection_name) for record in self.make_records(4)]
+
+        with patch("fAIth.bible_globals.VERSION_SELECTION", ["bsb", "web"]):
+            with patch("ai.vdb.milvus_db.iter_collection_verses", side_effect=iter_verses):
+                with patch("ai.vdb.milvus_db.logger"):
+                    results = builder.create_collections(["bsb", "web"])
+
+        assert {name: stats["verses"] for name, stats in results.items()} == {"bsb": 4, "web": 4}
+        inserted_versions = {
+            call.kwargs["collection_name"]: {record["version"] for record in call.kwargs["data"]}
+            for call in builder.client.insert.call_args_list
+        }
+        assert inserted_versions == {"bsb": {"bsb"}, "web": {"web"}}
+
+    def test_parallel_builds_share_insert_budget(self):
+        """Test that concurrent collection builds never exceed MILVUS_INSERT_CONCURRENCY inserts."""
+        builder = self.make_builder(
+            MILVUS_PARALLEL_COLLECTION_BUILDS="3", MILVUS_INSERT_CONCURRENCY="1", MILVUS_INSERT_BATCH_SIZE="1"
+        )
+        lock = threading.Lock()
+        in_flight = [0]
+        peak = [0]
+
+        def insert(collection_name, data):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+
+        builder.client.insert.side_effect = insert
+        with patch("fAIth.bible_globals.VERSION_SELECTION", ["bsb", "web", "kjv"]):
+            with patch("ai.vdb.milvus_db.iter_collection_verses", side_effect=lambda name: iter(self.make_records(3))):
+                with patch("ai.vdb.milvus_db.logger"):
+                    results = builder.create_collections(["bsb", "web", "kjv"])
+
+        assert sum(stats["verses"] for stats in results.values()) == 9
+        assert peak[0] == 1
+
+    def test_parallel_build_failure_does_not_stop_other_versions(self):
+        """Test that one failing version is reported after the other versions finish."""
+        builder = self.make_builder()
+
+        def insert(collection_name, data):
+            if collection_name == "web":
+                raise RuntimeError("Insert failed")
+
+        builder.client.insert.side_effect = insert
+        with patch("fAIth.bible_globals.VERSION_SELECTION", ["bsb", "web"]):
+            with patch("ai.vdb.milvus_db.iter_collection_verses", side_effect=lambda name: iter(self.make_records(3))):
+                with patch("ai.vdb.milvus_db.logger"):
+                    with pytest.raises(RuntimeError, match="Insert failed"):
+                        builder.create_collections(["bsb", "web"])
+
+        inserted_collections = {call.kwargs["collection_name"] for call in builder.client.insert.call_args_list}
+        assert inserted_collections == {"bsb", "web"}
+
+    def test_create_collections_embeds_shared_texts_once(self):
+        """Test that verse texts shared by several versions are embedded only once."""
+        builder = self.make_builder()
+        version_texts = {"bsb": ["Jesus wept.", "In the beginning", "Amen."], "web": ["Jesus wept.", "Amen.", "Selah"]}
+
+        def iter_verses(collection_name):
+            for verse, text in enumerate(version_texts[collection_name], start=1):
+                yield {"text": text, "version": collection_name, "book": "John", "chapter": 11, "verse": verse}
+
+        with patch("fAIth.bible_globals.VERSION_SELECTION", ["bsb", "web"]):
+            with patch("ai.vdb.milvus_db.iter_collection_verses", side_effect=iter_verses):
+                with patch("ai.vdb.milvus_db.logger"):
+                    results = builder.create_collections(["bsb", "web"])
+
+        embedded_texts = [text for call in builder.embedding_engine.embed.call_args_list for text in call.args[0]]
+        assert sorted(embedded_texts) == ["Amen.", "In the beginning", "Jesus wept.", "Selah"]
+        assert {name: stats["verses"] for name, stats in results.items()} == {"bsb": 3, "web": 3}
+        inserted_records = [record for call in builder.client.insert.call_args_list for record in call.kwargs["data"]]
+        assert all(record["dense_embedding"] == pytest.approx([0.1, 0.2]) for record in inserted_records)
+
+    def test_populate_truncates_embeddings(self):
+        """Test that EMBEDDING_DIMENSIONS keeps only the leading dimensions of each vector."""
+        builder = self.make_builder(EMBEDDING_DIMENSIONS="1")
+        with patch("ai.vdb.milvus_db.iter_collection_verses", return_value=iter(self.make_records(3))):
+            with patch("ai.vdb.milvus_db.logger"):
+                builder.populate_collection("bsb")
+
+        inserted_records = builder.client.insert.call_args.kwargs["data"]
+        assert all(record["dense_embedding"] == pytest.approx([0.1]) for record in inserted_records)
+        assert builder._create_schema().fields[1].params["dim"] == 1
+
+    def test_binary_storage_schema_and_insert(self):
+        """Test that binary storage uses a binary vector field, a Hamming index and packed sign bits."""
+        builder = self.make_builder(EMBEDDING_STORAGE_MODE="binary")
+        builder.embedding_engine.embedding_size.return_value = 8
+        builder.embedding_engine.embed.side_effect = lambda batch, **kwargs: [
+            [0.1, -0.1, 0.1, -0.1, 0.1, -0.1, 0.1, -0.1] for _ in batch
+        ]
+        with patch("ai.vdb.milvus_db.iter_collection_verses", return_value=iter(self.make_records(2))):
+            with patch("ai.vdb.milvus_db.logger"):
+                builder.populate_collection("bsb")
+
+        inserted_records = builder.client.insert.call_args.kwargs["data"]
+        assert all(record["dense_embedding"] == bytes([0b10101010]) for record in inserted_records)
+        dense_field = builder._create_schema().fields[1]
+        assert dense_field.dtype == DataType.BINARY_VECTOR
+        assert dense_field.params["dim"] == 8
+        builder._create_index_params(builder._create_schema())
+        index_kwargs = builder.client.prepare_index_params.return_value.add_index.call_args.kwargs
+        assert index_kwargs["index_type"] == "BIN_FLAT"
+        assert index_kwargs["metric_type"] == "HAMMING"
+
+    def test_invalid_parallel_collection_builds(self):
+        """Test that a non-positive number of parallel builds is rejected."""
+        with pytest.raises(ValueError, match="must be positive integers"):
+            self.make_builder(MILVUS_PARALLEL_COLLECTION_BUILDS="0")
+
+    def test_invalid_batch_size(self):
+        """Test that non-positive batch sizes are rejected."""
+        with pytest.raises(ValueError, match="must be positive"):
+            self.make_builder(EMBEDDING_BATCH_SIZE="0")
+
+    def test_invalid_build_concurrency(self):
+        """Test that a non-positive embedding concurrency is rejected."""
+        with pytest.raises(ValueError, match="must be a positive integer"):
+            self.make_builder(EMBEDDING_BUILD_CONCURRENCY="0")
+
+
+class BuilderWithBibleDataTestCase(SimpleTestCase):
+    """Base class for builder tests that read a small temporary Bible version (bsb)."""
+
+    def setUp(self):
+        """Set up a temporary Bible data root and checkpoint directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_root = Path(self.temp_dir.name).joinpath("bible_data")
+        self.checkpoint_directory = Path(self.temp_dir.name).joinpath("checkpoints")
+        # Collection descriptions of the fake Milvus server, shared by every builder of a test
+        self.milvus_collections = {}
+        self.write_chapter("Genesis", 1, {"1": "In the beginning", "2": "And the earth"})
+        self.write_chapter("Genesis", 2, {"1": "Thus the heavens"})
+        self.write_chapter("Exodus", 1, {"1": "These are the names"})
+        self.patchers = [
+            patch("fAIth.bible_globals.BIBLE_DATA_ROOT", self.data_root),
+            patch("fAIth.bible_globals.IN_ORDER_BOOKS", ["Genesis", "Exodus"]),
+            patch("fAIth.bible_globals.CHAPTER_SELECTION", {"Genesis": 2, "Exodus": 1}),
+            patch("fAIth.bible_globals.VERSION_SELECTION", ["bsb"]),
+            patch("ai.vdb.milvus_db.logger"),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        """Stop patches and clean up temporary files."""
+        for patcher in self.patchers:
+            patcher.stop()
+        self.temp_dir.cleanup()
+
+    def write_chapter(self, book, chapter, verses):
+        """Write a chapter JSON file in the same layout as fAIth/bible_data."""
+        chapter_directory = self.data_root.joinpath("bsb", book)
+        chapter_directory.mkdir(parents=True, exist_ok=True)
+        with chapter_directory.joinpath(f"{chapter}.json").open("w", encoding="utf-8") as file:
+            json.dump(verses, file)
+
+    def make_builder(self, **extra_env):
+        """Create a dense builder with resumable ingest writing to the temporary checkpoint directory."""
+        env_vars = {
+            "MILVUS_HOST": "http://milvus",
+            "MILVUS_PORT": "19530",
+            "MILVUS_DATABASE_NAME": "faith_db",
+            "MILVUS_USERNAME": "root",
+            "MILVUS_PASSWORD": "secure_password",
+            "DATABASE_TYPE": "dense",
+            "EMBEDDING_MODEL_ID": "test-model",
+            "EMBEDDING_CACHE_ENABLED": "False",
+            "MILVUS_RESUMABLE_INGEST": "True",
+            "MILVUS_CHECKPOINT_DIRECTORY": str(self.checkpoint_directory),
+            "MILVUS_SNAPSHOT_DIRECTORY": str(Path(self.temp_dir.name).joinpath("snapshots")),
+            "MILVUS_BUILD_REPORT_DIRECTORY": str(Path(self.temp_dir.name).joinpath("reports")),
+            "EMBEDDING_BATCH_SIZE": "1",
+            "MILVUS_INSERT_BATCH_SIZE": "1",
+            **extra_env,
+        }
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(**env_vars)
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                with patch("ai.vdb.milvus_db.MilvusClient") as mock_client_class:
+                    mock_client_class.return_value = MagicMock()
+                    mock_embedding = MagicMock()
+                    mock_embedding.model_name = "test-model"
+                    mock_embedding.document_template = "{text}"
+                    mock_embedding.embedding_size.return_value = 2
+                    mock_embedding.embed.side_effect = lambda batch, **kwargs: [[0.1, 0.2] for _ in batch]
+                    mock_embedding_class.return_value = mock_embedding
+                    builder = VectorDatabaseBuilder()
+        builder.client.create_collection.side_effect = lambda collection_name, schema, **kwargs: (
+            self.milvus_collections.update({collection_name: schema.to_dict()})
+        )
+        builder.client.describe_collection.side_effect = lambda collection_name: self.milvus_collections[
+            collection_name
+        ]
+        return builder
+
+    def inserted_texts(self, builder):
+        """Collect the texts of all records a builder inserted."""
+        return [record["text"] for call in builder.client.insert.call_args_list for record in call.kwargs["data"]]
+
+
+class TestResumableIngest(BuilderWithBibleDataTestCase):
+    """Tests for checkpointed, resumable collection builds."""
+
+    def test_fresh_build_writes_checkpoint(self):
+        """Test that a completed build records every chapter as complete."""
+        builder = self.make_builder()
+        builder.create_collections(["bsb"])
+
+        checkpoint_path = self.checkpoint_directory.joinpath("faith_db", "bsb.json")
+        with checkpoint_path.open("r", encoding="utf-8") as file:
+            data = json.load(file)
+        assert set(data["chapters"]) == {"Genesis:1", "Genesis:2", "Exodus:1"}
+        assert all(entry["complete"] for entry in data["chapters"].values())
+        assert data["signature"]["embedding_model"] == "test-model"
+
+    def test_resume_skips_completed_chapters(self):
+        """Test that an interrupted build only re-ingests the chapters it did not finish."""
+        first_builder = self.make_builder()
+        # Fail on the third insert (the first verse of Genesis 2)
+        first_builder.client.insert.side_effect = [None, None, RuntimeError("Connection lost")]
+        with pytest.raises(RuntimeError, match="Connection lost"):
+            first_builder.create_collections(["bsb"])
+
+        second_builder = self.make_builder()
+        second_builder.client.list_collections.return_value = ["bsb"]
+        second_builder.create_collections(["bsb"], resume=True)
+
+        second_builder.client.drop_collection.assert_not_called()
+        second_builder.client.create_collection.assert_not_called()
+        second_builder.embedding_engine.embedding_size.assert_not_called()
+        assert self.inserted_texts(second_builder) == ["Thus the heavens", "These are the names"]
+
+    def test_resume_replaces_changed_chapters(self):
+        """Test that a chapter whose source file changed is deleted and re-ingested."""
+        self.make_builder().create_collections(["bsb"])
+        self.write_chapter("Genesis", 2, {"1": "Thus the heavens and the earth were finished"})
+
+        builder = self.make_builder()
+        builder.client.list_collections.return_value = ["bsb"]
+        builder.create_collections(["bsb"], resume=True)
+
+        builder.client.delete.assert_called_once_with(
+            collection_name="bsb", filter='book == "Genesis" and chapter == 2'
+        )
+        assert self.inserted_texts(builder) == ["Thus the heavens and the earth were finished"]
+
+    def test_resume_rebuilds_on_different_settings(self):
+        """Test that a checkpoint written with another embedding model forces a full rebuild."""
+        self.make_builder().create_collections(["bsb"])
+
+        builder = self.make_builder()
+        builder.embedding_engine.model_name = "other-model"
+        builder.client.list_collections.return_value = ["bsb"]
+        builder.create_collections(["bsb"], resume=True)
+
+        builder.client.drop_collection.assert_called_once_with(collection_name="bsb")
+        assert len(self.inserted_texts(builder)) == 4
+
+    def test_resume_leaves_collection_without_checkpoint(self):
+        """Test that an existing collection built without a checkpoint is left untouched."""
+        builder = self.make_builder()
+        self.milvus_collections["bsb"] = builder._create_schema(2).to_dict()
+        builder.client.list_collections.return_value = ["bsb"]
+        builder.create_collections(["bsb"], resume=True)
+
+        builder.client.drop_collection.assert_not_called()
+        builder.client.insert.assert_not_called()
+
+
+class TestCollectionMetadata(BuilderWithBibleDataTestCase):
+    """Tests for the embedding settings recorded with each collection."""
+
+    def test_schema_records_embedding_settings(self):
+        """Test that new collections record the model, its dimension and the storage settings."""
+        builder = self.make_builder()
+        builder.create_collections(["bsb"])
+
+        _, metadata = builder.read_collection_metadata("bsb")
+        assert metadata == {
+            "database_type": "dense",
+            "embedding_model": "test-model",
+            "embedding_dimension": 2,
+            "embedding_storage": "float:0",
+        }
+        assert builder.schema_incompatibility("bsb") is None
+
+    def test_new_collection_reuses_recorded_dimension(self):
+        """Test that the dimension of an existing collection is reused instead of asking the embedding service."""
+        self.make_builder().create_collections(["bsb"])
+
+        builder = self.make_builder(MILVUS_RESUMABLE_INGEST="False")
+        builder.client.list_collections.return_value = ["bsb"]
+        builder._create_schema = MagicMock(wraps=builder._create_schema)
+        builder.create_collections(["bsb"])
+
+        builder._create_schema.assert_called_once_with(2)
+        builder.embedding_engine.embedding_size.assert_not_called()
+
+    def test_resume_rebuilds_on_different_storage(self):
+        """Test that a collection stored with other dimensions is rebuilt."""
+        self.make_builder().create_collections(["bsb"])
+
+        builder = self.make_builder(EMBEDDING_DIMENSIONS="1")
+        builder.client.list_collections.return_value = ["bsb"]
+        builder.create_collections(["bsb"], resume=True)
+
+        builder.client.drop_collection.assert_called_once_with(collection_name="bsb")
+        assert builder.read_collection_metadata("bsb")[1]["embedding_storage"] == "float:1"
+
+    def test_incompatible_vector_fields(self):
+        """Test that a collection built for another database type or vector type is detected."""
+        self.make_builder(DATABASE_TYPE="sparse").create_collections(["bsb"])
+
+        assert "DATABASE_TYPE" in self.make_builder().schema_incompatibility("bsb")
+
+        self.make_builder().create_collections(["bsb"])
+        reason = self.make_builder(EMBEDDING_STORAGE_MODE="binary").schema_incompatibility("bsb")
+        assert "EMBEDDING_STORAGE_MODE" in reason
+
+    def test_book_partition_key(self):
+        """Test that collections are partitioned by book and a changed setting is only logged."""
+        builder = self.make_builder()
+        builder.create_collections(["bsb"])
+
+        book_field = next(field for field in builder._create_schema(2).fields if field.name == "book")
+        assert book_field.is_partition_key
+        assert builder.client.create_collection.call_args.kwargs["num_partitions"] == 64
+        with patch("ai.vdb.milvus_db.logger") as mock_logger:
+            assert self.make_builder(MILVUS_BOOK_PARTITION_KEY="False").schema_incompatibility("bsb") is None
+        assert "MILVUS_BOOK_PARTITION_KEY" in mock_logger.warning.call_args.args[0]
+
+    def test_baseline_schema_is_reused(self):
+        """Test that a collection built before partition keys and recorded settings is not rebuilt."""
+        baseline_schema = CollectionSchema(
+            fields=[
+                FieldSchema(name="id", dtype=DataType.INT64, is_primary=True),
+                FieldSchema(name="dense_embedding", dtype=DataType.FLOAT_VECTOR, dim=2),
+                FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=2048, enable_analyzer=True),
+                FieldSchema(name="version", dtype=DataType.VARCHAR, max_length=8),
+                FieldSchema(name="book", dtype=DataType.VARCHAR, max_length=32),
+                FieldSchema(name="chapter", dtype=DataType.INT16),
+                FieldSchema(name="verse", dtype=DataType.INT16),
+            ],
+            auto_id=True,
+        )
+        self.milvus_collections["bsb"] = baseline_schema.to_dict()
+
+        with patch("ai.vdb.milvus_db.logger"):
+            assert self.make_builder().schema_incompatibility("bsb") is None
+
+    def test_collection_without_recorded_settings(self):
+        """Test that collections created before settings were recorded are only checked by field type."""
+        builder = self.make_builder()
+        description = builder._create_schema(2).to_dict()
+        description["description"] = ""
+        self.milvus_collections["bsb"] = description
+
+        assert builder.schema_incompatibility("bsb") is None
+
+    def test_compact_verse_ids(self):
+        """Test that compact collections store packed ids instead of the hydrated verse fields."""
+        builder = self.make_builder(MILVUS_COMPACT_VERSE_IDS="True")
+        builder.create_collections(["bsb"])
+
+        schema = builder._create_schema(2)
+        inserted = [record for call in builder.client.insert.call_args_list for record in call.kwargs["data"]]
+        assert [field.name for field in schema.fields] == ["id", "dense_embedding", "book", "chapter", "verse"]
+        assert not schema.auto_id
+        assert inserted[2]["id"] == (0 << 20) | (2 << 10) | 1
+        assert {"text", "version"}.isdisjoint(inserted[2])
+        assert builder.read_collection_metadata("bsb")[1]["verse_ids"] == "packed"
+        assert builder.schema_incompatibility("bsb") is None
+        assert "MILVUS_COMPACT_VERSE_IDS" in self.make_builder().schema_incompatibility("bsb")
+
+    def test_compact_hybrid_keeps_text(self):
+        """Test that compact hybrid collections keep the text BM25 is computed from."""
+        builder = self.make_builder(DATABASE_TYPE="hybrid", MILVUS_COMPACT_VERSE_IDS="True")
+
+        field_names = [field.name for field in builder._create_schema(2).fields]
+
+        assert "text" in field_names
+        assert "version" not in field_names
+
+
+class TestBuildReports(BuilderWithBibleDataTestCase):
+    """Tests for the JSON report written after a build."""
+
+    def read_reports(self):
+        """Load every report written to the temporary report directory."""
+        reports = []
+        for path in sorted(Path(self.temp_dir.name).joinpath("reports").glob("build-*.json")):
+            with path.open("r", encoding="utf-8") as file:
+                reports.append(json.load(file))
+        return reports
+
+    def test_build_writes_report(self):
+        """Test that a build reports per-stage times, throughput, payload size and embedding batch sizes."""
+        builder = self.make_builder()
+        builder.create_collections(["bsb"])
+
+        (report,) = self.read_reports()
+        entry = report["collections"]["bsb"]
+        assert set(entry["stage_seconds"]) == {"parse", "embed", "insert", "index"}
+        assert entry["verses"] == 4
+        assert entry["records_sent"] == 4
+        assert entry["bytes_sent"] > 0
+        assert report["embedding_batch_size_histogram"] == {"1": 4}
+        assert report["settings"]["embedding_model"] == "test-model"
+
+    def test_failed_build_writes_report(self):
+        """Test that a failed build still leaves a report with the error."""
+        builder = self.make_builder()
+        builder.client.insert.side_effect = RuntimeError("Connection lost")
+        with pytest.raises(RuntimeError, match="Connection lost"):
+            builder.create_collections(["bsb"])
+
+        (report,) = self.read_reports()
+        assert report["collections"]["bsb"]["error"] == "Connection lost"
+
+    def test_no_report_without_work_or_when_disabled(self):
+        """Test that no-op resumes and disabled reports write nothing."""
+        self.make_builder(MILVUS_BUILD_REPORT="False").create_collections(["bsb"])
+        assert self.read_reports() == []
+
+        builder = self.make_builder()
+        builder.client.list_collections.return_value = ["bsb"]
+        builder.create_collections(["bsb"], resume=True)
+        assert self.read_reports() == []
+
+
+class TestVectorSnapshots(BuilderWithBibleDataTestCase):
+    """Tests for exporting and restoring collection snapshots."""
+
+    def export_built_collection(self):
+        """Build the bsb collection and export it, returning the builder used."""
+        builder = self.make_builder()
+        builder.create_collections(["bsb"])
+        inserted = [dict(record) for call in builder.client.insert.call_args_list for record in call.kwargs["data"]]
+        iterator = MagicMock()
+        iterator.next.side_effect = [list(reversed(inserted)), []]
+        builder.client.query_iterator.return_value = iterator
+        builder.export_snapshot("bsb")
+        return builder
+
+    def test_export_snapshot(self):
+        """Test that a built collection is exported in canonical order with its vectors."""
+        builder = self.export_built_collection()
+
+        snapshot = VectorSnapshot(Path(self.temp_dir.name).joinpath("snapshots", "bsb--test-model.npz"))
+        records = list(snapshot.iter_records())
+        assert [record["text"] for record in records][0] == "In the beginning"
+        assert len(records) == 4
+        assert records[0]["dense_embedding"].tolist() == pytest.approx([0.1, 0.2])
+        assert snapshot.metadata["embedding_model"] == "test-model"
+        builder.client.query_iterator.assert_called_once()
+
+    def test_export_compact_collection(self):
+        """Test that the text and version of compact collections are restored from the Bible data."""
+        builder = self.make_builder(MILVUS_COMPACT_VERSE_IDS="True")
+        builder.create_collections(["bsb"])
+        inserted = [dict(record) for call in builder.client.insert.call_args_list for record in call.kwargs["data"]]
+        iterator = MagicMock()
+        iterator.next.side_effect = [inserted, []]
+        builder.client.query_iterator.return_value = iterator
+
+        builder.export_snapshot("bsb")
+
+        output_fields = builder.client.query_iterator.call_args.kwargs["output_fields"]
+        snapshot = VectorSnapshot(Path(self.temp_dir.name).joinpath("snapshots", "bsb--test-model.npz"))
+        records = list(snapshot.iter_records())
+        assert output_fields == ["book", "chapter", "verse", "dense_embedding"]
+        assert [record["text"] for record in records][-1] == "These are the names"
+        assert {record["version"] for record in records} == {"bsb"}
+
+    def test_restore_snapshot_skips_embedding(self):
+        """Test that a new collection is restored from a matching snapshot without embedding calls."""
+        self.export_built_collection()
+
+        builder = self.make_builder()
+        builder.create_collections(["bsb"])
+
+        builder.embedding_engine.embed.assert_not_called()
+        inserted = [record for call in builder.client.insert.call_args_list for record in call.kwargs["data"]]
+        assert [record["text"] for record in inserted] == [
+            "In the beginning",
+            "And the earth",
+            "Thus the heavens",
+            "These are the names",
+        ]
+        assert all(record["dense_embedding"] == pytest.approx([0.1, 0.2]) for record in inserted)
+        assert all(isinstance(record["dense_embedding"], list) for record in inserted)
+
+    def test_restore_ignores_snapshot_of_changed_data(self):
+        """Test that a snapshot is not restored after the Bible data changed."""
+        self.export_built_collection()
+        self.write_chapter("Exodus", 1, {"1": "Now these are the names"})
+
+        builder = self.make_builder()
+        builder.create_collections(["bsb"])
+
+        embedded_texts = [text for call in builder.embedding_engine.embed.call_args_list for text in call.args[0]]
+        assert "Now these are the names" in embedded_texts
+
+    def test_restore_ignores_snapshot_with_different_storage(self):
+        """Test that a snapshot exported with another storage mode is not restored."""
+        self.export_built_collection()
+
+        builder = self.make_builder(EMBEDDING_DIMENSIONS="1")
+        builder.create_collections(["bsb"])
+
+        builder.embedding_engine.embed.assert_called()
+
+    def test_restore_disabled(self):
+        """Test that MILVUS_SNAPSHOT_RESTORE=False always builds from the Bible data."""
+        self.export_built_collection()
+
+        builder = self.make_builder(MILVUS_SNAPSHOT_RESTORE="False")
+        builder.create_collections(["bsb"])
+
+        builder.embedding_engine.embed.assert_called()
+
+
 class TestClose(SimpleTestCase):
     """Tests for close method."""
 
@@ -860,6 +1612,7 @@ class TestVectorDatabaseQuerierLoadDatabaseAndCollections(SimpleTestCase):
 
                         assert querier.async_client is not None
                         assert mock_async_client.load_collection.call_count == len(mock_collections)
+                        assert querier.loaded_collections == ["web", "bsb"]
 
     @pytest.mark.asyncio
     async def test_load_database_not_found(self):
@@ -990,6 +1743,7 @@ class TestVectorDatabaseQuerierSearch(SimpleTestCase):
             "MILVUS_PASSWORD": "admin",
             "DATABASE_TYPE": "hybrid",
             "EMBEDDING_MODEL_ID": "test-model",
+            "SEARCH_RESULT_CACHE_SIZE": "0",
             "SPARSE_WEIGHT": "0.2",
             "DENSE_WEIGHT": "0.8",
         }
@@ -1022,6 +1776,7 @@ class TestVectorDatabaseQuerierSearch(SimpleTestCase):
             "MILVUS_PASSWORD": "admin",
             "DATABASE_TYPE": "dense",
             "EMBEDDING_MODEL_ID": "test-model",
+            "SEARCH_RESULT_CACHE_SIZE": "0",
         }
         with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
             mock_getenv.side_effect = create_mock_getenv(**env_vars)
@@ -1052,6 +1807,7 @@ class TestVectorDatabaseQuerierSearch(SimpleTestCase):
             "MILVUS_PASSWORD": "admin",
             "DATABASE_TYPE": "sparse",
             "EMBEDDING_MODEL_ID": "test-model",
+            "SEARCH_RESULT_CACHE_SIZE": "0",
         }
         with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
             mock_getenv.side_effect = create_mock_getenv(**env_vars)
@@ -1070,6 +1826,687 @@ class TestVectorDatabaseQuerierSearch(SimpleTestCase):
                 assert result == [{"text": "result"}]
                 mock_async_client.search.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_search_reuses_cached_query_embedding(self):
+        """Test that repeated queries are embedded once, and not at all with the cache disabled."""
+        env_vars = {
+            "MILVUS_HOST": "http://milvus",
+            "MILVUS_PORT": "19530",
+            "MILVUS_DATABASE_NAME": "faith_db",
+            "MILVUS_USERNAME": "admin",
+            "MILVUS_PASSWORD": "admin",
+            "DATABASE_TYPE": "dense",
+            "EMBEDDING_MODEL_ID": "test-model",
+            "SEARCH_RESULT_CACHE_SIZE": "0",
+        }
+        for cache_size, expected_calls in (("16", 1), ("0", 2)):
+            with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+                mock_getenv.side_effect = create_mock_getenv(QUERY_EMBEDDING_CACHE_SIZE=cache_size, **env_vars)
+                with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                    mock_embedding = AsyncMock()
+                    mock_embedding.model_name = "test-model"
+                    mock_embedding.query_template = ""
+                    mock_embedding.async_embed.return_value = [[0.1, 0.2, 0.3]]
+                    mock_embedding_class.return_value = mock_embedding
+
+                    mock_async_client = AsyncMock()
+                    mock_async_client.search.return_value = [[{"text": "result"}]]
+
+                    querier = VectorDatabaseQuerier()
+                    querier.async_client = mock_async_client
+
+                    await querier.search("bsb", "For God so loved the world", limit=5)
+                    await querier.search("bsb", "For God so loved the world", limit=5)
+
+                    assert mock_embedding.async_embed.await_count == expected_calls
+                    search_data = mock_async_client.search.call_args.kwargs["data"]
+                    assert search_data[0] == pytest.approx([0.1, 0.2, 0.3])
+
+    @pytest.mark.asyncio
+    async def test_search_dense_binary_reranks(self):
+        """Test that binary dense search oversamples and re-ranks candidates with the float query."""
+        env_vars = {
+            "MILVUS_HOST": "http://milvus",
+            "MILVUS_PORT": "19530",
+            "MILVUS_DATABASE_NAME": "faith_db",
+            "MILVUS_USERNAME": "admin",
+            "MILVUS_PASSWORD": "admin",
+            "DATABASE_TYPE": "dense",
+            "EMBEDDING_MODEL_ID": "test-model",
+            "SEARCH_RESULT_CACHE_SIZE": "0",
+            "EMBEDDING_STORAGE_MODE": "binary",
+            "EMBEDDING_BINARY_OVERSAMPLING": "3",
+        }
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(**env_vars)
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                query_vector = [0.5, 0.5, 0.5, 0.5, -0.5, -0.5, -0.5, -0.5]
+                mock_embedding = AsyncMock()
+                mock_embedding.async_embed.return_value = [query_vector]
+                mock_embedding_class.return_value = mock_embedding
+
+                mock_async_client = AsyncMock()
+                mock_async_client.search.return_value = [
+                    [
+                        {"id": 1, "distance": 0, "entity": {"text": "far", "dense_embedding": bytes([0b00001111])}},
+                        {"id": 2, "distance": 1, "entity": {"text": "near", "dense_embedding": bytes([0b11110000])}},
+                    ]
+                ]
+
+                querier = VectorDatabaseQuerier()
+                querier.async_client = mock_async_client
+
+                result = await querier.search("bsb", "God", limit=1)
+
+                assert [hit["entity"] for hit in result] == [{"text": "near"}]
+                search_kwargs = mock_async_client.search.call_args.kwargs
+                assert search_kwargs["limit"] == 3
+                assert search_kwargs["data"] == [bytes([0b11110000])]
+                assert search_kwargs["search_params"]["metric_type"] == "HAMMING"
+                assert "dense_embedding" in search_kwargs["output_fields"]
+
+    @pytest.mark.asyncio
+    async def test_search_hybrid_binary_does_not_return_vectors(self):
+        """Test that hybrid search with binary storage does not fetch the packed dense vectors."""
+        env_vars = {
+            "MILVUS_HOST": "http://milvus",
+            "MILVUS_PORT": "19530",
+            "MILVUS_DATABASE_NAME": "faith_db",
+            "MILVUS_USERNAME": "admin",
+            "MILVUS_PASSWORD": "admin",
+            "DATABASE_TYPE": "hybrid",
+            "EMBEDDING_MODEL_ID": "test-model",
+            "SEARCH_RESULT_CACHE_SIZE": "0",
+            "EMBEDDING_STORAGE_MODE": "binary",
+        }
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(**env_vars)
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                mock_embedding = AsyncMock()
+                mock_embedding.async_embed.return_value = [[0.5, 0.5, 0.5, 0.5, -0.5, -0.5, -0.5, -0.5]]
+                mock_embedding_class.return_value = mock_embedding
+
+                mock_async_client = AsyncMock()
+                mock_async_client.hybrid_search.return_value = [[{"id": 1, "distance": 0.5, "entity": {"text": "a"}}]]
+
+                querier = VectorDatabaseQuerier()
+                querier.async_client = mock_async_client
+
+                result = await querier.search("bsb", "God", limit=1)
+
+                assert [hit["entity"] for hit in result] == [{"text": "a"}]
+                assert "dense_embedding" not in mock_async_client.hybrid_search.call_args.kwargs["output_fields"]
+
+
+class TestVectorDatabaseQuerierSearchMany(SimpleTestCase):
+    """Tests for VectorDatabaseQuerier.search_many method."""
+
+    env_vars = {
+        "MILVUS_HOST": "http://milvus",
+        "MILVUS_PORT": "19530",
+        "MILVUS_DATABASE_NAME": "faith_db",
+        "MILVUS_USERNAME": "admin",
+        "MILVUS_PASSWORD": "admin",
+        "EMBEDDING_MODEL_ID": "test-model",
+        "SEARCH_RESULT_CACHE_SIZE": "0",
+    }
+
+    @pytest.mark.asyncio
+    async def test_search_many_dense_uses_one_request(self):
+        """Test that all queries are embedded in one request and searched in one multi-vector search."""
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(DATABASE_TYPE="dense", **self.env_vars)
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                mock_embedding = AsyncMock()
+                mock_embedding.model_name = "test-model"
+                mock_embedding.query_template = ""
+                mock_embedding.async_embed.return_value = [[0.1, 0.2], [0.3, 0.4]]
+                mock_embedding_class.return_value = mock_embedding
+
+                mock_async_client = AsyncMock()
+                mock_async_client.search.return_value = [[{"text": "first"}], [{"text": "second"}]]
+
+                querier = VectorDatabaseQuerier()
+                querier.async_client = mock_async_client
+
+                results = await querier.search_many("bsb", ["Who is Jesus?", "Jesus wept"], limit=5)
+
+                assert results == [[{"text": "first"}], [{"text": "second"}]]
+                mock_embedding.async_embed.assert_awaited_once()
+                assert mock_embedding.async_embed.call_args.args[0] == ["Who is Jesus?", "Jesus wept"]
+                mock_async_client.search.assert_called_once()
+                search_data = mock_async_client.search.call_args.kwargs["data"]
+                assert len(search_data) == 2
+                assert search_data[1] == pytest.approx([0.3, 0.4])
+
+    @pytest.mark.asyncio
+    async def test_search_many_hydrates_compact_results(self):
+        """Test that compact collections are searched without output fields and hydrated from ALL_VERSES."""
+        all_verses = {"bsb": {"John": {11: {"35": "35) Jesus wept."}}}}
+        with (
+            patch("ai.vdb.milvus_db.os.getenv") as mock_getenv,
+            patch("fAIth.bible_globals.IN_ORDER_BOOKS", ["Genesis", "John"]),
+            patch("fAIth.bible_globals.ALL_VERSES", all_verses),
+        ):
+            mock_getenv.side_effect = create_mock_getenv(
+                DATABASE_TYPE="hybrid", MILVUS_COMPACT_VERSE_IDS="True", **self.env_vars
+            )
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                mock_embedding = AsyncMock()
+                mock_embedding.model_name = "test-model"
+                mock_embedding.query_template = ""
+                mock_embedding.async_embed.return_value = [[0.1, 0.2]]
+                mock_embedding_class.return_value = mock_embedding
+
+                mock_async_client = AsyncMock()
+                verse_id = (1 << 20) | (11 << 10) | 35
+                mock_async_client.hybrid_search.return_value = [[{"id": verse_id, "distance": 0.7, "entity": {}}]]
+
+                querier = VectorDatabaseQuerier()
+                querier.async_client = mock_async_client
+
+                results = await querier.search_many("bsb", ["Jesus wept"], limit=5)
+
+                assert mock_async_client.hybrid_search.call_args.kwargs["output_fields"] == []
+                assert results[0][0]["entity"] == {
+                    "version": "bsb",
+                    "book": "John",
+                    "chapter": 11,
+                    "verse": 35,
+                    "text": "Jesus wept.",
+                }
+
+    @pytest.mark.asyncio
+    async def test_search_many_diversifies_candidates(self):
+        """Test that a larger candidate set is fetched with vectors and re-ranked into a diverse top-k."""
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(
+                DATABASE_TYPE="hybrid",
+                SEARCH_DIVERSITY="0.5",
+                SEARCH_DIVERSITY_CANDIDATES="2",
+                SEARCH_MERGE_NEIGHBOR_VERSES="True",
+                **self.env_vars,
+            )
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                mock_embedding = AsyncMock()
+                mock_embedding.model_name = "test-model"
+                mock_embedding.query_template = ""
+                mock_embedding.async_embed.return_value = [[0.1, 0.2]]
+                mock_embedding_class.return_value = mock_embedding
+
+                candidates = [
+                    (16, 0.9, [1.0, 0.0]),
+                    (17, 0.85, [0.0, 1.0]),
+                    (5, 0.89, [1.0, 0.01]),
+                    (35, 0.3, [0.7, 0.7]),
+                ]
+                mock_async_client = AsyncMock()
+                mock_async_client.hybrid_search.return_value = [
+                    [
+                        {
+                            "id": verse,
+                            "distance": distance,
+                            "entity": {
+                                "book": "John",
+                                "chapter": 3,
+                                "verse": verse,
+                                "text": f"verse {verse}",
+                                "dense_embedding": vector,
+                            },
+                        }
+                        for verse, distance, vector in candidates
+                    ]
+                ]
+
+                querier = VectorDatabaseQuerier()
+                querier.async_client = mock_async_client
+
+                results = await querier.search_many("bsb", ["God so loved"], limit=2)
+
+                call_kwargs = mock_async_client.hybrid_search.call_args.kwargs
+                assert call_kwargs["limit"] == 4
+                assert "dense_embedding" in call_kwargs["output_fields"]
+                assert len(results[0]) == 1
+                assert results[0][0]["entity"] == {
+                    "book": "John",
+                    "chapter": 3,
+                    "verse": 16,
+                    "verse_end": 17,
+                    "text": "verse 16 verse 17",
+                }
+
+    @pytest.mark.asyncio
+    async def test_search_many_reranks_candidates(self):
+        """Test that candidates are re-ordered by the reranker and trimmed to the limit."""
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(
+                DATABASE_TYPE="sparse", RERANKER="lexical", RERANK_CANDIDATES="3", **self.env_vars
+            )
+            with patch("ai.vdb.milvus_db.Embedding"):
+                mock_async_client = AsyncMock()
+                mock_async_client.search.return_value = [
+                    [
+                        {"id": 1, "distance": 3.0, "entity": {"text": "Jesus wept."}},
+                        {"id": 2, "distance": 2.0, "entity": {"text": "Lazarus, come out!"}},
+                        {"id": 3, "distance": 1.0, "entity": {"text": "Amen"}},
+                    ]
+                ]
+
+                querier = VectorDatabaseQuerier()
+                querier.async_client = mock_async_client
+
+                results = await querier.search_many("bsb", ["Lazarus"], limit=1)
+
+                assert mock_async_client.search.call_args.kwargs["limit"] == 3
+                assert [hit["id"] for hit in results[0]] == [2]
+
+    def test_invalid_diversity(self):
+        """Test that a diversity outside 0-1 is rejected."""
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(SEARCH_DIVERSITY="2", **self.env_vars)
+            with patch("ai.vdb.milvus_db.Embedding"), patch("ai.vdb.milvus_db.logger"):
+                with pytest.raises(ValueError, match="Invalid search diversity"):
+                    VectorDatabaseQuerier()
+
+    @pytest.mark.asyncio
+    async def test_search_many_embeds_only_uncached_queries(self):
+        """Test that cached queries are not sent to the embedding service again."""
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(DATABASE_TYPE="dense", **self.env_vars)
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                mock_embedding = AsyncMock()
+                mock_embedding.model_name = "test-model"
+                mock_embedding.query_template = ""
+                mock_embedding.async_embed.side_effect = [[[0.1, 0.2]], [[0.3, 0.4]]]
+                mock_embedding_class.return_value = mock_embedding
+
+                mock_async_client = AsyncMock()
+                mock_async_client.search.return_value = [[], []]
+
+                querier = VectorDatabaseQuerier()
+                querier.async_client = mock_async_client
+
+                await querier.search("bsb", "Who is Jesus?", limit=5)
+                await querier.search_many("bsb", ["Who is Jesus?", "Jesus wept"], limit=5)
+
+                assert mock_embedding.async_embed.call_args.args[0] == ["Jesus wept"]
+                search_data = mock_async_client.search.call_args.kwargs["data"]
+                assert search_data[0] == pytest.approx([0.1, 0.2])
+                assert search_data[1] == pytest.approx([0.3, 0.4])
+
+    @pytest.mark.asyncio
+    async def test_search_many_hybrid(self):
+        """Test that hybrid search sends every query in both the sparse and dense requests."""
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(DATABASE_TYPE="hybrid", **self.env_vars)
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                mock_embedding = AsyncMock()
+                mock_embedding.async_embed.return_value = [[0.1, 0.2], [0.3, 0.4]]
+                mock_embedding_class.return_value = mock_embedding
+
+                mock_async_client = AsyncMock()
+                mock_async_client.hybrid_search.return_value = [[{"text": "first"}], [{"text": "second"}]]
+
+                querier = VectorDatabaseQuerier()
+                querier.async_client = mock_async_client
+
+                results = await querier.search_many("bsb", ["Who is Jesus?", "Jesus wept"], limit=5)
+
+                assert results == [[{"text": "first"}], [{"text": "second"}]]
+                mock_async_client.hybrid_search.assert_called_once()
+                sparse_request, dense_request = mock_async_client.hybrid_search.call_args.kwargs["reqs"]
+                assert sparse_request.data == ["Who is Jesus?", "Jesus wept"]
+                assert len(dense_request.data) == 2
+
+    @pytest.mark.asyncio
+    async def test_search_many_scoped(self):
+        """Test that a scope becomes a filter on every search request."""
+        for database_type in ("dense", "hybrid"):
+            with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+                mock_getenv.side_effect = create_mock_getenv(DATABASE_TYPE=database_type, **self.env_vars)
+                with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                    mock_embedding = AsyncMock()
+                    mock_embedding.async_embed.return_value = [[0.1, 0.2]]
+                    mock_embedding_class.return_value = mock_embedding
+
+                    querier = VectorDatabaseQuerier()
+                    querier.async_client = AsyncMock()
+                    querier.async_client.search.return_value = [[]]
+                    querier.async_client.hybrid_search.return_value = [[]]
+
+                    with patch("fAIth.bible_globals.IN_ORDER_BOOKS", ["Genesis", "John"]):
+                        await querier.search_many("bsb", ["Jesus wept"], limit=5, book="John", chapter_start=11)
+
+                    expected_filter = 'book == "John" and chapter == 11'
+                    if database_type == "dense":
+                        assert querier.async_client.search.call_args.kwargs["filter"] == expected_filter
+                    else:
+                        requests = querier.async_client.hybrid_search.call_args.kwargs["reqs"]
+                        assert [request.expr for request in requests] == [expected_filter, expected_filter]
+
+    @pytest.mark.asyncio
+    async def test_search_many_invalid_scope(self):
+        """Test that an unknown book is rejected before anything is embedded or searched."""
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(DATABASE_TYPE="dense", **self.env_vars)
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                mock_embedding = AsyncMock()
+                mock_embedding_class.return_value = mock_embedding
+
+                querier = VectorDatabaseQuerier()
+                querier.async_client = AsyncMock()
+
+                with patch("ai.vdb.scope.logger"):
+                    with pytest.raises(ValueError, match="Invalid book"):
+                        await querier.search_many("bsb", ["Jesus wept"], book='John" or book != "')
+                mock_embedding.async_embed.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_search_many_without_queries(self):
+        """Test that an empty query list does not reach the embedding service or Milvus."""
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(DATABASE_TYPE="dense", **self.env_vars)
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                mock_embedding = AsyncMock()
+                mock_embedding_class.return_value = mock_embedding
+
+                querier = VectorDatabaseQuerier()
+                querier.async_client = AsyncMock()
+
+                assert await querier.search_many("bsb", [], limit=5) == []
+                mock_embedding.async_embed.assert_not_awaited()
+                querier.async_client.search.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_search_many_profiles(self):
+        """Test that the search profile sets ef, the BM25 drop ratio and the hybrid ranker."""
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(
+                DATABASE_TYPE="hybrid", SEARCH_PROFILE_ACCURATE="ranker=rrf", **self.env_vars
+            )
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                mock_embedding_class.return_value.async_embed = AsyncMock(return_value=[[0.1, 0.2]])
+
+                querier = VectorDatabaseQuerier()
+                querier.async_client = AsyncMock()
+                querier.async_client.hybrid_search.return_value = [[]]
+
+                await querier.search_many("bsb", ["Jesus wept"], limit=5)
+                default_call = querier.async_client.hybrid_search.call_args.kwargs
+                await querier.search_many("bsb", ["Jesus wept"], limit=5, profile="accurate")
+                accurate_call = querier.async_client.hybrid_search.call_args.kwargs
+
+                sparse_request, dense_request = default_call["reqs"]
+                assert sparse_request.param["params"] == {"drop_ratio_search": 0.2}
+                assert dense_request.param["params"] == {"ef": 128}
+                assert default_call["ranker"].dict()["strategy"] == "weighted"
+                sparse_request, dense_request = accurate_call["reqs"]
+                assert sparse_request.param["params"] == {"drop_ratio_search": 0.0}
+                assert dense_request.param["params"] == {"ef": 256}
+                assert accurate_call["ranker"].dict() == {"strategy": "rrf", "params": {"k": 60}}
+
+    @pytest.mark.asyncio
+    async def test_search_many_adaptive_profile_lowers_ef(self):
+        """Test that the fast profile lowers ef once its p95 latency exceeds the target."""
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(
+                DATABASE_TYPE="dense", SEARCH_PROFILE="fast", SEARCH_TARGET_P95_MS="1", **self.env_vars
+            )
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                mock_embedding_class.return_value.async_embed = AsyncMock(return_value=[[0.1, 0.2]])
+
+                querier = VectorDatabaseQuerier()
+                querier.async_client = AsyncMock()
+                querier.async_client.search.return_value = [[]]
+                latency_tracker = querier.latency_trackers["fast"]
+
+                with patch("ai.vdb.milvus_db.time.perf_counter", side_effect=[0.0, 0.5] * 20):
+                    with patch("ai.vdb.search_profiles.logger"):
+                        for _ in range(20):
+                            await querier.search("bsb", "Jesus wept", limit=5)
+                await querier.search("bsb", "Jesus wept", limit=5)
+
+                assert latency_tracker.effort == pytest.approx(0.8)
+                assert querier.async_client.search.call_args.kwargs["search_params"]["params"] == {"ef": 51}
+                assert "balanced" not in querier.latency_trackers
+
+    @pytest.mark.asyncio
+    async def test_search_many_invalid_profile(self):
+        """Test that an unknown search profile is rejected."""
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(DATABASE_TYPE="dense", **self.env_vars)
+            with patch("ai.vdb.milvus_db.Embedding"):
+                querier = VectorDatabaseQuerier()
+
+                with patch("ai.vdb.milvus_db.logger"):
+                    with pytest.raises(ValueError, match="Invalid search profile"):
+                        await querier.search_many("bsb", ["Jesus wept"], profile="exhaustive")
+
+    @pytest.mark.asyncio
+    async def test_search_many_result_cache(self):
+        """Test that repeated searches are answered from the result cache without embedding or Milvus."""
+        env_vars = {**self.env_vars, "DATABASE_TYPE": "hybrid", "SEARCH_RESULT_CACHE_SIZE": "16"}
+        hit = {"id": 7, "distance": 0.9, "entity": {"version": "bsb", "book": "John", "chapter": 11, "verse": 35}}
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(**env_vars)
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                mock_embedding_class.return_value.async_embed = AsyncMock(return_value=[[0.1, 0.2]])
+
+                querier = VectorDatabaseQuerier()
+                querier.async_client = AsyncMock()
+                querier.async_client.hybrid_search.return_value = [[hit]]
+
+                first = await querier.search("bsb", "Jesus wept", limit=5)
+                second = await querier.search("bsb", "Jesus wept", limit=5)
+                await querier.search("bsb", "Jesus wept", limit=5, profile="accurate")
+
+                assert first == second
+                assert second[0]["entity"]["verse"] == 35
+                assert querier.async_client.hybrid_search.call_count == 2
+                assert querier.embedding_engine.async_embed.await_count == 1
+                assert querier.search_result_cache.stats()["hits"] == 1
+
+
+class TestVectorDatabaseQuerierSearchVersions(SimpleTestCase):
+    """Tests for VectorDatabaseQuerier.search_versions method."""
+
+    env_vars = {
+        "MILVUS_HOST": "http://milvus",
+        "MILVUS_PORT": "19530",
+        "MILVUS_DATABASE_NAME": "faith_db",
+        "MILVUS_USERNAME": "admin",
+        "MILVUS_PASSWORD": "admin",
+        "DATABASE_TYPE": "dense",
+        "EMBEDDING_MODEL_ID": "test-model",
+    }
+
+    def make_querier(self, mock_embedding_class, search_results):
+        """Create a dense querier whose collections return the given results."""
+        mock_embedding = AsyncMock()
+        mock_embedding.model_name = "test-model"
+        mock_embedding.query_template = ""
+        mock_embedding.async_embed.return_value = [[0.1, 0.2]]
+        mock_embedding_class.return_value = mock_embedding
+
+        async def search(collection_name, **kwargs):
+            results = search_results[collection_name]
+            if isinstance(results, Exception):
+                raise results
+            return [results]
+
+        querier = VectorDatabaseQuerier()
+        querier.async_client = AsyncMock()
+        querier.async_client.search.side_effect = search
+        querier.loaded_collections = list(search_results)
+        return querier
+
+    @staticmethod
+    def make_hit(verse, distance, text):
+        """Create a search result for a verse of John 3."""
+        return {"distance": distance, "entity": {"book": "John", "chapter": 3, "verse": verse, "text": text}}
+
+    @pytest.mark.asyncio
+    async def test_search_versions_merges_results(self):
+        """Test that all loaded collections are searched with one query embedding and merged by verse."""
+        search_results = {
+            "bsb": [self.make_hit(16, 0.9, "bsb 3:16"), self.make_hit(17, 0.7, "bsb 3:17"), self.make_hit(19, 0.5, "")],
+            "kjv": [
+                self.make_hit(16, 0.8, "kjv 3:16"),
+                self.make_hit(18, 0.75, "kjv 3:18"),
+                self.make_hit(20, 0.5, ""),
+            ],
+        }
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(**self.env_vars)
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                querier = self.make_querier(mock_embedding_class, search_results)
+
+                results = await querier.search_versions("For God so loved the world", limit=3)
+
+                querier.embedding_engine.async_embed.assert_awaited_once()
+                assert querier.async_client.search.call_count == 2
+                assert [hit["entity"]["text"] for hit in results] == ["bsb 3:16", "kjv 3:18", "bsb 3:17"]
+                assert results[0]["versions"] == ["bsb", "kjv"]
+
+    @pytest.mark.asyncio
+    async def test_search_versions_skips_failed_collections(self):
+        """Test that a failing collection is skipped unless every collection fails."""
+        search_results = {"bsb": RuntimeError("Collection not loaded"), "kjv": [self.make_hit(16, 0.8, "kjv")]}
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(**self.env_vars)
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                querier = self.make_querier(mock_embedding_class, search_results)
+
+                with patch("ai.vdb.milvus_db.logger"):
+                    results = await querier.search_versions("Jesus wept")
+                    assert [hit["versions"] for hit in results] == [["kjv"]]
+
+                    with pytest.raises(RuntimeError, match="not loaded"):
+                        await querier.search_versions("Jesus wept", collection_names=["bsb"])
+
+
+class TestVectorDatabaseQuerierLocalIndex(SimpleTestCase):
+    """Tests for searching the in-process index of VectorDatabaseQuerier."""
+
+    env_vars = {
+        "MILVUS_HOST": "http://milvus",
+        "MILVUS_PORT": "19530",
+        "MILVUS_DATABASE_NAME": "faith_db",
+        "MILVUS_USERNAME": "admin",
+        "MILVUS_PASSWORD": "admin",
+        "DATABASE_TYPE": "dense",
+        "EMBEDDING_MODEL_ID": "test-model",
+        "SEARCH_RESULT_CACHE_SIZE": "0",
+    }
+    local_hit = {"id": 3, "distance": 0.9, "entity": {"book": "John", "chapter": 11, "verse": 35, "text": "local"}}
+
+    def make_local_index(self):
+        """Create a local index that holds the bsb collection."""
+        local_index = MagicMock()
+        local_index.collection_names = ["bsb"]
+        local_index.__contains__.side_effect = lambda collection_name: collection_name == "bsb"
+        local_index.search_many.return_value = [[self.local_hit]]
+        return local_index
+
+    def make_querier(self, mock_getenv, mock_embedding_class, **env_vars):
+        """Create a dense querier with the given local search settings."""
+        mock_getenv.side_effect = create_mock_getenv(**self.env_vars, **env_vars)
+        mock_embedding = AsyncMock()
+        mock_embedding.model_name = "test-model"
+        mock_embedding.query_template = ""
+        mock_embedding.async_embed.return_value = [[0.1, 0.2]]
+        mock_embedding_class.return_value = mock_embedding
+        querier = VectorDatabaseQuerier()
+        querier.local_index = self.make_local_index()
+        return querier
+
+    def test_invalid_local_search_mode(self):
+        """Test that an unknown LOCAL_SEARCH_MODE is rejected."""
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                with patch("ai.vdb.milvus_db.logger"):
+                    with pytest.raises(ValueError, match="Invalid local search mode"):
+                        self.make_querier(mock_getenv, mock_embedding_class, LOCAL_SEARCH_MODE="always")
+
+    @pytest.mark.asyncio
+    async def test_fallback_on_milvus_error(self):
+        """Test that a failing Milvus search is answered from the local index."""
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                querier = self.make_querier(mock_getenv, mock_embedding_class, LOCAL_SEARCH_MODE="fallback")
+                querier.async_client = AsyncMock()
+                querier.async_client.search.side_effect = ConnectionError("Milvus is down")
+
+                with patch("ai.vdb.milvus_db.logger") as mock_logger:
+                    with patch("fAIth.bible_globals.IN_ORDER_BOOKS", ["Genesis", "John"]):
+                        results = await querier.search("bsb", "Jesus wept", limit=1, book="John")
+
+                assert results == [self.local_hit]
+                mock_logger.warning.assert_called_once()
+                querier.local_index.search_many.assert_called_once()
+                collection_name, queries, query_embeddings, limit, scope = (
+                    querier.local_index.search_many.call_args.args
+                )
+                assert (collection_name, queries, limit) == ("bsb", ["Jesus wept"], 1)
+                assert [list(embedding) for embedding in query_embeddings] == [[0.1, 0.2]]
+                assert scope == {"book": "John", "chapter_start": None, "chapter_end": None, "testament": None}
+
+    @pytest.mark.asyncio
+    async def test_fallback_uses_milvus_when_available(self):
+        """Test that fallback mode keeps searching Milvus while it answers."""
+        milvus_hit = {"id": 1, "distance": 0.5, "entity": {"text": "milvus"}}
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                querier = self.make_querier(mock_getenv, mock_embedding_class, LOCAL_SEARCH_MODE="fallback")
+                querier.async_client = AsyncMock()
+                querier.async_client.search.return_value = [[milvus_hit]]
+
+                results = await querier.search("bsb", "Jesus wept", limit=1)
+
+                assert results == [milvus_hit]
+                querier.local_index.search_many.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_primary_never_connects_to_milvus(self):
+        """Test that primary mode loads and searches only the local index."""
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(**self.env_vars, LOCAL_SEARCH_MODE="primary")
+            with patch("ai.vdb.milvus_db.Embedding") as mock_embedding_class:
+                mock_embedding_class.return_value.async_embed = AsyncMock(return_value=[[0.1, 0.2]])
+                with patch("ai.vdb.milvus_db.AsyncMilvusClient") as mock_async_client_class:
+                    with patch.object(VectorDatabaseQuerier, "_load_local_index", return_value=self.make_local_index()):
+                        with patch("ai.vdb.milvus_db.logger"):
+                            querier = await VectorDatabaseQuerier.load_database_and_collections()
+
+                            results = await querier.search("bsb", "Jesus wept", limit=1)
+
+                    mock_async_client_class.assert_not_called()
+                    assert querier.loaded_collections == ["bsb"]
+                    assert await querier.list_collections_in_database() == ["bsb"]
+                    assert results == [self.local_hit]
+
+    @pytest.mark.asyncio
+    async def test_fallback_when_milvus_is_unreachable_at_startup(self):
+        """Test that fallback mode starts on the local index when Milvus cannot be reached, and fails without one."""
+        with patch("ai.vdb.milvus_db.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(**self.env_vars, LOCAL_SEARCH_MODE="fallback")
+            with patch("ai.vdb.milvus_db.Embedding"):
+                with patch("ai.vdb.milvus_db.AsyncMilvusClient", side_effect=ConnectionError("Milvus is down")):
+                    with patch("ai.vdb.milvus_db.logger"):
+                        with patch.object(
+                            VectorDatabaseQuerier, "_load_local_index", return_value=self.make_local_index()
+                        ):
+                            querier = await VectorDatabaseQuerier.load_database_and_collections()
+
+                        empty_index = MagicMock()
+                        empty_index.collection_names = []
+                        with patch.object(VectorDatabaseQuerier, "_load_local_index", return_value=empty_index):
+                            with pytest.raises(ConnectionError):
+                                await VectorDatabaseQuerier.load_database_and_collections()
+
+                assert querier.async_client is None
+                assert querier.loaded_collections == ["bsb"]
+
 
 class TestVectorDatabaseQuerierClose(SimpleTestCase):
     """Tests for VectorDatabaseQuerier.close method."""
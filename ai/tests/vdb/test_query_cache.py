@@ -0,0 +1,158 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from ai.vdb.query_cache import QueryEmbeddingCache, normalize_query
+
+
+class TestNormalizeQuery(SimpleTestCase):
+    """Tests for normalize_query function."""
+
+    def test_collapses_whitespace_and_keeps_case(self):
+        """Test that whitespace differences are removed but case is kept."""
+        assert normalize_query("  For God\tso loved \n the world ") == "For God so loved the world"
+        assert normalize_query("Amen") != normalize_query("amen")
+
+    def test_unicode_normalization(self):
+        """Test that composed and decomposed characters share a key."""
+        assert normalize_query("Mos\u00e9") == normalize_query("Mose\u0301")
+
+
+class TestQueryEmbeddingCache(SimpleTestCase):
+    """Tests for QueryEmbeddingCache class."""
+
+    def make_cache(self, **kwargs):
+        """Create a cache for a test model and query template."""
+        return QueryEmbeddingCache("test-model", "Query: {text}", **kwargs)
+
+    @pytest.mark.asyncio
+    async def test_get_or_embed_caches(self):
+        """Test that a repeated (differently spaced) query is only embedded once."""
+        cache = self.make_cache()
+        embed = AsyncMock(return_value=[0.1, 0.2])
+
+        first = await cache.get_or_embed("Jesus wept", embed)
+        second = await cache.get_or_embed(" Jesus  wept ", embed)
+
+        embed.assert_awaited_once_with("Jesus wept")
+        assert second.tolist() == pytest.approx([0.1, 0.2])
+        assert first is second
+        assert not second.flags.writeable
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["hit_rate"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_get_or_embed_many_batches_misses(self):
+        """Test that misses are embedded in one request and hits are not embedded again."""
+        cache = self.make_cache()
+        cache.put("Amen", [1.0])
+        embed_many = AsyncMock(return_value=[[2.0], [3.0]])
+
+        embeddings = await cache.get_or_embed_many(["Selah", "Amen", "Hallelujah", "Selah"], embed_many)
+
+        embed_many.assert_awaited_once_with(["Selah", "Hallelujah"])
+        assert [embedding.tolist() for embedding in embeddings] == [[2.0], [1.0], [3.0], [2.0]]
+        assert cache.get("Hallelujah").tolist() == [3.0]
+
+    def test_key_depends_on_model_and_template(self):
+        """Test that another model or query template never shares entries."""
+        cache = self.make_cache()
+
+        assert cache.key("Amen") != QueryEmbeddingCache("other-model", "Query: {text}").key("Amen")
+        assert cache.key("Amen") != QueryEmbeddingCache("test-model", "{text}").key("Amen")
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted when the cache is full."""
+        cache = self.make_cache(max_entries=2)
+        cache.put("Amen", [1.0])
+        cache.put("Selah", [2.0])
+        cache.get("Amen")
+        cache.put("Hallelujah", [3.0])
+
+        assert cache.get("Selah") is None
+        assert cache.get("Amen").tolist() == [1.0]
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiration(self):
+        """Test that entries older than the TTL are dropped."""
+        cache = self.make_cache(ttl_seconds=10)
+        with patch("ai.vdb.coalescing_cache.time.monotonic", return_value=100.0):
+            cache.put("Amen", [1.0])
+        with patch("ai.vdb.coalescing_cache.time.monotonic", return_value=105.0):
+            assert cache.get("Amen") is not None
+        with patch("ai.vdb.coalescing_cache.time.monotonic", return_value=111.0):
+            assert cache.get("Amen") is None
+
+        assert cache.stats()["expirations"] == 1
+
+    def test_invalid_settings(self):
+        """Test that a non-positive size is rejected."""
+        with patch("ai.vdb.query_cache.logger"):
+            with pytest.raises(ValueError, match="must be positive"):
+                self.make_cache(max_entries=0)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_request(self):
+        """Test that concurrent lookups of the same query wait for a single embedding request."""
+        cache = self.make_cache()
+        release = asyncio.Event()
+        calls = []
+
+        async def slow_embed(query):
+            calls.append(query)
+            await release.wait()
+            return [0.5]
+
+        lookups = [asyncio.create_task(cache.get_or_embed("Amen", slow_embed)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*lookups)
+
+        assert calls == ["Amen"]
+        assert all(result.tolist() == [0.5] for result in results)
+        assert cache.stats()["coalesced"] == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_embedding_is_not_cached(self):
+        """Test that an embedding error is raised and the next lookup retries."""
+        cache = self.make_cache()
+        embed = AsyncMock(side_effect=[RuntimeError("Embedding service unavailable"), [0.5]])
+
+        with pytest.raises(RuntimeError, match="unavailable"):
+            await cache.get_or_embed("Amen", embed)
+
+        assert (await cache.get_or_embed("Amen", embed)).tolist() == [0.5]
+
+    @pytest.mark.asyncio
+    async def test_shared_cache(self):
+        """Test that embeddings stored by one worker are used by another."""
+        shared_cache = LocMemCache("query-embedding-test", {})
+        embed = AsyncMock(return_value=[0.25, 0.75])
+        first_worker = self.make_cache(shared_cache=shared_cache)
+        second_worker = self.make_cache(shared_cache=shared_cache)
+
+        await first_worker.get_or_embed("Amen", embed)
+        embedding = await second_worker.get_or_embed("Amen", embed)
+
+        embed.assert_awaited_once()
+        assert embedding.tolist() == [0.25, 0.75]
+        assert second_worker.stats()["shared_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_errors_are_ignored(self):
+        """Test that an unavailable shared cache falls back to embedding."""
+        shared_cache = MagicMock()
+        shared_cache.aget = AsyncMock(side_effect=ConnectionError("Cache unavailable"))
+        shared_cache.aset = AsyncMock(side_effect=ConnectionError("Cache unavailable"))
+        cache = self.make_cache(shared_cache=shared_cache)
+
+        with patch("ai.vdb.coalescing_cache.logger"):
+            embedding = await cache.get_or_embed("Amen", AsyncMock(return_value=[0.5]))
+
+        assert embedding.dtype == np.float32
+        assert cache.get("Amen") is not None
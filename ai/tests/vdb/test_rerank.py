@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+from django.test import SimpleTestCase
+
+from ai.vdb.rerank import (
+    cosine_similarity_matrix,
+    diversify_results,
+    maximal_marginal_relevance,
+    merge_neighbor_verses,
+    text_similarity_matrix,
+)
+
+
+def make_hit(verse, distance, text="text", chapter=3, version="bsb"):
+    """Create a Milvus-style search hit."""
+    return {
+        "id": verse,
+        "distance": distance,
+        "entity": {"version": version, "book": "John", "chapter": chapter, "verse": verse, "text": text},
+    }
+
+
+class TestSimilarity(SimpleTestCase):
+    """Tests for cosine_similarity_matrix and text_similarity_matrix functions."""
+
+    def test_cosine_similarity_matrix(self):
+        """Test that rows are compared by cosine and zero rows are similar to nothing."""
+        similarity = cosine_similarity_matrix(np.array([[2.0, 0.0], [1.0, 1.0], [0.0, 0.0]]))
+
+        assert similarity[0, 1] == pytest.approx(np.sqrt(0.5))
+        assert similarity[0, 0] == pytest.approx(1.0)
+        assert similarity[2].tolist() == [0.0, 0.0, 0.0]
+
+    def test_text_similarity_matrix(self):
+        """Test that texts are compared by word overlap."""
+        similarity = text_similarity_matrix(["Jesus wept.", "Jesus WEPT!", "In the beginning", ""])
+
+        assert similarity[0, 1] == 1.0
+        assert similarity[0, 2] == 0.0
+        assert similarity[3, 3] == 1.0
+
+
+class TestMaximalMarginalRelevance(SimpleTestCase):
+    """Tests for maximal_marginal_relevance function."""
+
+    def test_redundant_candidates_are_skipped(self):
+        """Test that a near-duplicate of a selected candidate loses to a less relevant novel one."""
+        similarity = cosine_similarity_matrix(np.array([[1.0, 0.0], [0.99, 0.01], [0.0, 1.0]]))
+
+        assert maximal_marginal_relevance([1.0, 0.95, 0.6], similarity, limit=2, diversity=0.5) == [0, 2]
+        assert maximal_marginal_relevance([1.0, 0.95, 0.6], similarity, limit=2, diversity=0.0) == [0, 1]
+        assert maximal_marginal_relevance([1.0], similarity[:1, :1], limit=5, diversity=0.5) == [0]
+
+
+class TestMergeNeighborVerses(SimpleTestCase):
+    """Tests for merge_neighbor_verses function."""
+
+    def test_consecutive_verses_become_passages(self):
+        """Test that consecutive verses of a chapter are merged at the position of the best one."""
+        hits = [
+            make_hit(17, 0.9, "For God did not send"),
+            make_hit(1, 0.8, "In the beginning", chapter=1),
+            make_hit(16, 0.7, "For God so loved"),
+            make_hit(16, 0.6, "For God so loved", version="kjv"),
+            make_hit(19, 0.5),
+        ]
+
+        merged = merge_neighbor_verses(hits)
+
+        assert [hit["distance"] for hit in merged] == [0.9, 0.8, 0.6, 0.5]
+        assert merged[0]["entity"]["verse"] == 16
+        assert merged[0]["entity"]["verse_end"] == 17
+        assert merged[0]["entity"]["text"] == "For God so loved For God did not send"
+        assert "verse_end" not in hits[0]["entity"]
+
+
+class TestDiversifyResults(SimpleTestCase):
+    """Tests for diversify_results function."""
+
+    def test_diversify_with_vectors(self):
+        """Test that parallel verses are dropped in favor of different ones."""
+        hits = [make_hit(16, 0.9), make_hit(5, 0.89, chapter=1), make_hit(35, 0.5, chapter=11)]
+        vectors = np.array([[1.0, 0.0], [1.0, 0.01], [0.0, 1.0]])
+
+        results = diversify_results(hits, limit=2, diversity=0.5, vectors=vectors)
+
+        assert [hit["entity"]["verse"] for hit in results] == [16, 35]
+
+    def test_diversify_by_text_and_lower_is_better(self):
+        """Test that texts are compared without vectors and Hamming distances rank ascending."""
+        hits = [make_hit(1, 3, "Jesus wept"), make_hit(4, 4, "Jesus wept"), make_hit(8, 10, "Amen")]
+
+        results = diversify_results(hits, limit=2, diversity=0.5, higher_is_better=False)
+
+        assert [hit["entity"]["verse"] for hit in results] == [1, 8]
+        assert diversify_results([], limit=2, diversity=0.5) == []
+
+    def test_neighbors_are_only_merged_on_request(self):
+        """Test that consecutive verses stay separate results unless merging is requested."""
+        hits = [make_hit(16, 0.9, "For God so loved"), make_hit(17, 0.8, "For God did not send")]
+        vectors = np.array([[1.0, 0.0], [0.0, 1.0]])
+
+        separate = diversify_results(hits, limit=2, diversity=0.5, vectors=vectors)
+        merged = diversify_results(hits, limit=2, diversity=0.5, vectors=vectors, merge_neighbors=True)
+
+        assert [hit["entity"]["verse"] for hit in separate] == [16, 17]
+        assert [(hit["entity"]["verse"], hit["entity"]["verse_end"]) for hit in merged] == [(16, 17)]
@@ -0,0 +1,148 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+from django.test import SimpleTestCase
+
+from ai.vdb.reranker import EndpointScorer, LexicalScorer, SearchReranker, load_reranker
+
+
+def create_mock_getenv(**env_vars):
+    """Create a mock getenv function with predefined environment variables."""
+
+    def mock_getenv(key, default=None):
+        return env_vars.get(key, default)
+
+    return mock_getenv
+
+
+def make_hits(*texts):
+    """Create Milvus-style search hits in the given order."""
+    return [{"id": index, "distance": 1.0 - index / 10, "entity": {"text": text}} for index, text in enumerate(texts)]
+
+
+class StaticScorer:
+    """Scorer returning fixed scores, optionally after a delay or with an error."""
+
+    signature = "static"
+
+    def __init__(self, scores=None, delay=0.0, error=None):
+        self._scores = scores
+        self.delay = delay
+        self.error = error
+
+    async def scores(self, query, texts):
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self._scores
+
+    async def close(self):
+        pass
+
+
+class TestEndpointScorer(SimpleTestCase):
+    """Tests for EndpointScorer class."""
+
+    @pytest.mark.asyncio
+    async def test_scores_from_rerank_endpoint(self):
+        """Test that both rerank response formats are mapped back to the document order."""
+        requests = []
+        responses = [
+            {"results": [{"index": 1, "relevance_score": 0.9}, {"index": 0, "relevance_score": 0.2}]},
+            [{"index": 0, "score": 0.4}],
+        ]
+
+        def handler(request):
+            requests.append(json.loads(request.content))
+            return httpx.Response(200, json=responses[len(requests) - 1])
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        scorer = EndpointScorer("http://reranker:11436/v1/", "bge-reranker", client=client)
+
+        assert await scorer.scores("Jesus wept", ["Amen", "Jesus wept."]) == [0.2, 0.9]
+        assert await scorer.scores("Jesus wept", ["Amen", "Selah"]) == [0.4, float("-inf")]
+        assert requests[0] == {
+            "model": "bge-reranker",
+            "query": "Jesus wept",
+            "documents": ["Amen", "Jesus wept."],
+            "top_n": 2,
+        }
+        assert scorer.signature == "endpoint:bge-reranker"
+        await scorer.close()
+
+    def test_missing_settings(self):
+        """Test that a missing URL or model is rejected."""
+        with patch("ai.vdb.reranker.logger"):
+            with pytest.raises(ValueError, match="Rerank URL or model ID is not set"):
+                EndpointScorer("", "bge-reranker")
+
+
+class TestSearchReranker(SimpleTestCase):
+    """Tests for SearchReranker class."""
+
+    @pytest.mark.asyncio
+    async def test_lexical_rerank(self):
+        """Test that the local scorer moves exact word matches up."""
+        reranker = SearchReranker(LexicalScorer())
+
+        hits, rescored = await reranker.rerank("Lazarus", make_hits("Jesus wept.", "Lazarus, come out!", "Amen"))
+
+        assert rescored
+        assert hits[0]["entity"]["text"] == "Lazarus, come out!"
+        assert reranker.stats()["reranked"] == 1
+
+    @pytest.mark.asyncio
+    async def test_budget_exceeded_keeps_search_order(self):
+        """Test that a scorer slower than the budget leaves the candidates untouched."""
+        reranker = SearchReranker(StaticScorer([0.0, 1.0], delay=1.0), budget_seconds=0.01)
+        hits = make_hits("first", "second")
+
+        with patch("ai.vdb.reranker.logger"):
+            result, rescored = await reranker.rerank("query", hits)
+
+        assert not rescored
+        assert result == hits
+        assert reranker.stats()["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_scorer_error_keeps_search_order(self):
+        """Test that a failing scorer leaves the candidates untouched."""
+        reranker = SearchReranker(StaticScorer(error=httpx.ConnectError("refused")))
+        hits = make_hits("first", "second")
+
+        with patch("ai.vdb.reranker.logger"):
+            result, rescored = await reranker.rerank("query", hits)
+
+        assert (result, rescored) == (hits, False)
+        assert reranker.stats()["errors"] == 1
+
+    def test_invalid_settings(self):
+        """Test that a non-positive budget is rejected."""
+        with patch("ai.vdb.reranker.logger"):
+            with pytest.raises(ValueError, match="must be positive"):
+                SearchReranker(LexicalScorer(), budget_seconds=0)
+
+
+class TestLoadReranker(SimpleTestCase):
+    """Tests for load_reranker function."""
+
+    def test_load_reranker(self):
+        """Test that re-ranking is off by default and configured from the environment."""
+        env_vars = {"RERANKER": "lexical", "RERANK_BUDGET_MS": "50", "RERANK_CANDIDATES": "4"}
+        with patch("ai.vdb.reranker.os.getenv", side_effect=create_mock_getenv()):
+            assert load_reranker() is None
+        with patch("ai.vdb.reranker.os.getenv", side_effect=create_mock_getenv(**env_vars)):
+            reranker = load_reranker()
+
+        assert reranker.signature == "lexical"
+        assert (reranker.budget_seconds, reranker.candidate_factor) == (0.05, 4)
+
+    def test_invalid_reranker(self):
+        """Test that an unknown reranker is rejected."""
+        with patch("ai.vdb.reranker.os.getenv", side_effect=create_mock_getenv(RERANKER="llm")):
+            with patch("ai.vdb.reranker.logger"):
+                with pytest.raises(ValueError, match="Invalid reranker"):
+                    load_reranker()
@@ -0,0 +1,202 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from ai.vdb.result_cache import SearchResultCache, compact_hit, generation_key, invalidate_search_results
+
+CONTEXT = {"database_type": "hybrid", "limit": 5, "profile": "balanced", "book": None}
+
+
+def make_hit(verse, text="Jesus wept."):
+    """Create a Milvus-style search hit."""
+    return {
+        "id": verse,
+        "distance": 0.5,
+        "entity": {"version": "bsb", "book": "John", "chapter": 11, "verse": verse, "text": text, "extra": "x"},
+    }
+
+
+def make_search_many(calls):
+    """Create a search function that records the queries it is asked to search."""
+
+    async def search_many(queries):
+        calls.append(list(queries))
+        return [[make_hit(35, query)] for query in queries]
+
+    return search_many
+
+
+class TestCompactHit(SimpleTestCase):
+    """Tests for compact_hit function."""
+
+    def test_keeps_result_fields(self):
+        """Test that only the id, distance and displayed entity fields are kept."""
+        assert compact_hit(make_hit(35)) == {
+            "id": 35,
+            "distance": 0.5,
+            "entity": {"version": "bsb", "book": "John", "chapter": 11, "verse": 35, "text": "Jesus wept."},
+        }
+
+
+class TestSearchResultCache(SimpleTestCase):
+    """Tests for SearchResultCache class."""
+
+    @pytest.mark.asyncio
+    async def test_searches_only_misses(self):
+        """Test that cached queries are served from memory and misses are searched together."""
+        cache = SearchResultCache()
+        calls = []
+        search_many = make_search_many(calls)
+
+        await cache.get_or_search_many("bsb", ["Jesus wept"], CONTEXT, search_many)
+        results = await cache.get_or_search_many("bsb", [" Jesus  wept", "Amen", "Selah"], CONTEXT, search_many)
+
+        assert calls == [["Jesus wept"], ["Amen", "Selah"]]
+        assert [hits[0]["entity"]["text"] for hits in results] == ["Jesus wept", "Amen", "Selah"]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 3
+
+    @pytest.mark.asyncio
+    async def test_key_depends_on_search_settings(self):
+        """Test that another collection, limit or scope never shares entries."""
+        cache = SearchResultCache()
+        calls = []
+        search_many = make_search_many(calls)
+
+        await cache.get_or_search_many("bsb", ["Amen"], CONTEXT, search_many)
+        await cache.get_or_search_many("kjv", ["Amen"], CONTEXT, search_many)
+        await cache.get_or_search_many("bsb", ["Amen"], {**CONTEXT, "limit": 10}, search_many)
+        await cache.get_or_search_many("bsb", ["Amen"], {**CONTEXT, "book": "John"}, search_many)
+
+        assert len(calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_concurrent_searches_share_one_request(self):
+        """Test that a classroom asking the same question at once causes a single search."""
+        cache = SearchResultCache()
+        release = asyncio.Event()
+        calls = []
+
+        async def slow_search_many(queries):
+            calls.append(list(queries))
+            await release.wait()
+            return [[make_hit(35)] for _ in queries]
+
+        lookups = [
+            asyncio.create_task(cache.get_or_search_many("bsb", ["Jesus wept"], CONTEXT, slow_search_many))
+            for _ in range(30)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*lookups)
+
+        assert calls == [["Jesus wept"]]
+        assert all(result == results[0] for result in results)
+        assert cache.stats()["coalesced"] == 29
+        assert cache.stats()["hit_rate"] == pytest.approx(29 / 30, abs=1e-4)
+
+    @pytest.mark.asyncio
+    async def test_failed_search_is_not_cached(self):
+        """Test that a search error is raised and the next lookup retries."""
+        cache = SearchResultCache()
+        search_many = AsyncMock(side_effect=[RuntimeError("Milvus unavailable"), [[make_hit(35)]]])
+
+        with pytest.raises(RuntimeError, match="unavailable"):
+            await cache.get_or_search_many("bsb", ["Amen"], CONTEXT, search_many)
+
+        assert (await cache.get_or_search_many("bsb", ["Amen"], CONTEXT, search_many))[0][0]["id"] == 35
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_and_ttl(self):
+        """Test that the least recently used entry is evicted and old entries expire."""
+        cache = SearchResultCache(max_entries=2, ttl_seconds=10)
+        calls = []
+        search_many = make_search_many(calls)
+
+        with patch("ai.vdb.result_cache.time.monotonic", return_value=100.0):
+            await cache.get_or_search_many("bsb", ["Amen", "Selah"], CONTEXT, search_many)
+            await cache.get_or_search_many("bsb", ["Amen"], CONTEXT, search_many)
+            await cache.get_or_search_many("bsb", ["Hallelujah"], CONTEXT, search_many)
+        with patch("ai.vdb.result_cache.time.monotonic", return_value=111.0):
+            await cache.get_or_search_many("bsb", ["Amen"], CONTEXT, search_many)
+
+        assert calls == [["Amen", "Selah"], ["Hallelujah"], ["Amen"]]
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["expirations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self):
+        """Test that invalidating a collection only drops its own entries."""
+        cache = SearchResultCache()
+        calls = []
+        search_many = make_search_many(calls)
+        await cache.get_or_search_many("bsb", ["Amen"], CONTEXT, search_many)
+        await cache.get_or_search_many("kjv", ["Amen"], CONTEXT, search_many)
+
+        cache.invalidate("bsb")
+
+        assert cache.stats()["entries"] == 1
+        assert cache.stats()["invalidations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rebuilt_collection_is_invalidated_in_every_worker(self):
+        """Test that a new generation written by the builder makes workers search again."""
+        shared_cache = LocMemCache("search-result-test", {})
+        calls = []
+        search_many = make_search_many(calls)
+        first_worker = SearchResultCache(shared_cache=shared_cache, generation_check_seconds=0)
+        second_worker = SearchResultCache(shared_cache=shared_cache, generation_check_seconds=0)
+
+        await first_worker.get_or_search_many("bsb", ["Amen"], CONTEXT, search_many)
+        await second_worker.get_or_search_many("bsb", ["Amen"], CONTEXT, search_many)
+        invalidate_search_results(shared_cache, "bsb")
+        await second_worker.get_or_search_many("bsb", ["Amen"], CONTEXT, search_many)
+
+        assert calls == [["Amen"], ["Amen"]]
+        assert second_worker.stats()["shared_hits"] == 1
+        assert second_worker.stats()["invalidations"] == 1
+        assert second_worker.stats()["entries"] == 1
+        assert shared_cache.get(generation_key("bsb")) is not None
+
+    @pytest.mark.asyncio
+    async def test_generation_is_checked_periodically(self):
+        """Test that the shared generation is only re-read once generation_check_seconds have passed."""
+        shared_cache = LocMemCache("search-result-generation-test", {})
+        cache = SearchResultCache(shared_cache=shared_cache, generation_check_seconds=5)
+        calls = []
+        search_many = make_search_many(calls)
+
+        with patch("ai.vdb.result_cache.time.monotonic", return_value=100.0):
+            await cache.get_or_search_many("bsb", ["Amen"], CONTEXT, search_many)
+        invalidate_search_results(shared_cache, "bsb")
+        with patch("ai.vdb.result_cache.time.monotonic", return_value=102.0):
+            await cache.get_or_search_many("bsb", ["Amen"], CONTEXT, search_many)
+        with patch("ai.vdb.result_cache.time.monotonic", return_value=106.0):
+            await cache.get_or_search_many("bsb", ["Amen"], CONTEXT, search_many)
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_errors_are_ignored(self):
+        """Test that an unavailable shared cache falls back to searching."""
+        shared_cache = MagicMock()
+        shared_cache.aget = AsyncMock(side_effect=ConnectionError("Cache unavailable"))
+        shared_cache.aset = AsyncMock(side_effect=ConnectionError("Cache unavailable"))
+        shared_cache.set = MagicMock(side_effect=ConnectionError("Cache unavailable"))
+        cache = SearchResultCache(shared_cache=shared_cache)
+        calls = []
+
+        with patch("ai.vdb.result_cache.logger"), patch("ai.vdb.coalescing_cache.logger"):
+            results = await cache.get_or_search_many("bsb", ["Amen"], CONTEXT, make_search_many(calls))
+            invalidate_search_results(shared_cache, "bsb")
+
+        assert results[0][0]["id"] == 35
+
+    def test_invalid_settings(self):
+        """Test that a non-positive size is rejected."""
+        with patch("ai.vdb.result_cache.logger"):
+            with pytest.raises(ValueError, match="must be positive"):
+                SearchResultCache(max_entries=0)
@@ -0,0 +1,67 @@
+from unittest.mock import patch
+
+import pytest
+from django.test import SimpleTestCase
+
+from ai.vdb.scope import books_in_testament, passage_scope, scope_filter
+
+BOOKS = ["Genesis"] * 38 + ["Malachi", "Matthew", "John"]
+
+
+class TestScopeFilter(SimpleTestCase):
+    """Tests for scope_filter function."""
+
+    def setUp(self):
+        patcher = patch("fAIth.bible_globals.IN_ORDER_BOOKS", BOOKS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_unscoped(self):
+        """Test that no scope gives an empty filter."""
+        assert scope_filter() == ""
+
+    def test_book_and_chapter_range(self):
+        """Test book, single chapter and chapter range filters."""
+        assert scope_filter(book="John") == 'book == "John"'
+        assert scope_filter(book="John", chapter_start=3) == 'book == "John" and chapter == 3'
+        assert scope_filter(book="John", chapter_start=3, chapter_end=5) == (
+            'book == "John" and chapter >= 3 and chapter <= 5'
+        )
+
+    def test_testament(self):
+        """Test that a testament filter lists its books and is dropped when the book is inside it."""
+        assert books_in_testament("NEW") == ["Matthew", "John"]
+        assert scope_filter(testament="new") == 'book in ["Matthew", "John"]'
+        assert scope_filter(book="John", testament="new") == 'book == "John"'
+
+    def test_invalid_scopes(self):
+        """Test that unknown values and inconsistent scopes are rejected."""
+        with patch("ai.vdb.scope.logger"):
+            with pytest.raises(ValueError, match="Invalid book"):
+                scope_filter(book='John" or book != "')
+            with pytest.raises(ValueError, match="Invalid testament"):
+                scope_filter(testament="apocrypha")
+            with pytest.raises(ValueError, match="not in the old testament"):
+                scope_filter(book="John", testament="old")
+            with pytest.raises(ValueError, match="requires a book"):
+                scope_filter(chapter_start=3)
+            with pytest.raises(ValueError, match="Invalid chapter range"):
+                scope_filter(book="John", chapter_start=5, chapter_end=3)
+
+
+class TestPassageScope(SimpleTestCase):
+    """Tests for passage_scope function."""
+
+    def test_scopes(self):
+        """Test the search arguments of each scope around a passage."""
+        with patch("fAIth.bible_globals.IN_ORDER_BOOKS", BOOKS):
+            assert passage_scope("all", "John", "3") == {}
+            assert passage_scope("Testament", "Malachi", "3") == {"testament": "old"}
+            assert passage_scope("book", "John", "3") == {"book": "John"}
+            assert passage_scope("chapter", "John", "3") == {"book": "John", "chapter_start": 3, "chapter_end": 3}
+
+    def test_invalid_scope(self):
+        """Test that unknown scopes are rejected."""
+        with patch("ai.vdb.scope.logger"):
+            with pytest.raises(ValueError, match="Invalid search scope"):
+                passage_scope("verse", "John", "3")
@@ -0,0 +1,117 @@
+from unittest.mock import patch
+
+import pytest
+from django.test import SimpleTestCase
+
+from ai.vdb.search_profiles import LatencyTracker, SearchProfile, load_search_profiles, parse_profile_settings
+
+
+def create_mock_getenv(**env_vars):
+    """Create a mock getenv function with predefined environment variables."""
+
+    def mock_getenv(key, default=None):
+        return env_vars.get(key, default)
+
+    return mock_getenv
+
+
+class TestSearchProfile(SimpleTestCase):
+    """Tests for SearchProfile class."""
+
+    def test_dense_search_params(self):
+        """Test that ef and nprobe follow the profile, the effort and the result limit."""
+        profile = SearchProfile("fast", ef=64, nprobe_factor=0.5)
+        hnsw_params = {"metric_type": "COSINE", "params": {"ef": 128}}
+
+        assert profile.dense_search_params(hnsw_params, limit=10) == {"metric_type": "COSINE", "params": {"ef": 64}}
+        assert profile.dense_search_params(hnsw_params, limit=10, effort=0.5)["params"] == {"ef": 32}
+        assert profile.dense_search_params(hnsw_params, limit=40, effort=0.5)["params"] == {"ef": 40}
+        assert profile.dense_search_params({"metric_type": "COSINE", "params": {"nprobe": 32}}, 10)["params"] == {
+            "nprobe": 16
+        }
+        assert profile.dense_search_params({"metric_type": "HAMMING", "params": {}}, 10)["params"] == {}
+        assert hnsw_params["params"] == {"ef": 128}
+
+    def test_rankers(self):
+        """Test that hybrid results are fused by weights or by reciprocal rank."""
+        weighted = SearchProfile("balanced").hybrid_ranker(0.3, 0.7)
+        rrf = SearchProfile("balanced", ranker="rrf", rrf_k=30).hybrid_ranker(0.3, 0.7)
+
+        assert weighted.dict()["params"]["weights"] == [0.3, 0.7]
+        assert rrf.dict() == {"strategy": "rrf", "params": {"k": 30}}
+
+    def test_invalid_settings(self):
+        """Test that unknown rankers and out-of-range settings are rejected."""
+        with patch("ai.vdb.search_profiles.logger"):
+            with pytest.raises(ValueError, match="Invalid ranker"):
+                SearchProfile("fast", ranker="max")
+            with pytest.raises(ValueError, match="Invalid settings"):
+                SearchProfile("fast", drop_ratio=1.0)
+            with pytest.raises(ValueError, match="Invalid settings"):
+                SearchProfile("fast", ef=0)
+
+
+class TestLoadSearchProfiles(SimpleTestCase):
+    """Tests for load_search_profiles and parse_profile_settings functions."""
+
+    def test_defaults(self):
+        """Test that the balanced profile keeps the previous search settings."""
+        with patch("ai.vdb.search_profiles.os.getenv", side_effect=create_mock_getenv()):
+            profiles = load_search_profiles()
+
+        assert list(profiles) == ["fast", "balanced", "accurate"]
+        assert (profiles["balanced"].ef, profiles["balanced"].drop_ratio, profiles["balanced"].ranker) == (
+            128,
+            0.2,
+            "weighted",
+        )
+        assert profiles["fast"].adaptive
+        assert not profiles["accurate"].adaptive
+
+    def test_overrides(self):
+        """Test that SEARCH_RANKER and per-profile settings override the defaults."""
+        env_vars = {"SEARCH_RANKER": "rrf", "SEARCH_PROFILE_FAST": "ef=32, ranker=weighted, adaptive=false"}
+        with patch("ai.vdb.search_profiles.os.getenv", side_effect=create_mock_getenv(**env_vars)):
+            profiles = load_search_profiles()
+
+        assert (profiles["fast"].ef, profiles["fast"].ranker, profiles["fast"].adaptive) == (32, "weighted", False)
+        assert profiles["accurate"].ranker == "rrf"
+
+    def test_invalid_overrides(self):
+        """Test that unknown keys and malformed values are rejected."""
+        with patch("ai.vdb.search_profiles.logger"):
+            with pytest.raises(ValueError, match="Invalid setting for search profile fast: m=16"):
+                parse_profile_settings("fast", "m=16", {})
+            with pytest.raises(ValueError, match="Invalid setting"):
+                parse_profile_settings("fast", "ef=many", {})
+            with pytest.raises(ValueError, match="Invalid setting"):
+                parse_profile_settings("fast", "ef", {})
+
+
+class TestLatencyTracker(SimpleTestCase):
+    """Tests for LatencyTracker class."""
+
+    def test_effort_follows_p95(self):
+        """Test that the effort drops while p95 is above target and recovers when it is well below."""
+        tracker = LatencyTracker(target_seconds=0.1, window=10, adjust_every=5, min_effort=0.5)
+
+        with patch("ai.vdb.search_profiles.logger"):
+            for _ in range(4):
+                tracker.record(0.2)
+            assert tracker.effort == 1.0
+            tracker.record(0.2)
+            assert tracker.effort == pytest.approx(0.8)
+            for _ in range(15):
+                tracker.record(0.2)
+            assert tracker.effort == 0.5
+            for _ in range(10):
+                tracker.record(0.01)
+
+        assert tracker.p95() == pytest.approx(0.01)
+        assert tracker.effort == pytest.approx(0.625)
+
+    def test_invalid_settings(self):
+        """Test that a non-positive target is rejected."""
+        with patch("ai.vdb.search_profiles.logger"):
+            with pytest.raises(ValueError, match="Invalid latency tracker settings"):
+                LatencyTracker(target_seconds=0)
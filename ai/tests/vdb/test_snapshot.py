@@ -0,0 +1,130 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from django.test import SimpleTestCase
+
+from ai.vdb.snapshot import (
+    VectorSnapshot,
+    snapshot_path,
+    sort_canonically,
+    source_data_checksum,
+    write_snapshot,
+)
+
+METADATA = {"collection": "bsb", "embedding_model": "test-model", "document_template": "", "source_checksum": "abc"}
+
+
+def make_records():
+    """Create verse records in canonical order."""
+    return [
+        {"text": "In the beginning", "version": "bsb", "book": "Genesis", "chapter": 1, "verse": 1},
+        {"text": "Now the earth", "version": "bsb", "book": "Genesis", "chapter": 1, "verse": 2},
+        {"text": "These are the names", "version": "bsb", "book": "Exodus", "chapter": 1, "verse": 1},
+    ]
+
+
+class TestSnapshotPath(SimpleTestCase):
+    """Tests for snapshot_path function."""
+
+    def test_snapshot_path_is_filename_safe(self):
+        """Test that the model ID is turned into a safe file name."""
+        path = snapshot_path("/snapshots", "bsb", "Qwen/Qwen3-Embedding-0.6B")
+
+        assert path == Path("/snapshots/bsb--Qwen_Qwen3-Embedding-0.6B.npz")
+
+
+class TestSourceDataChecksum(SimpleTestCase):
+    """Tests for source_data_checksum function."""
+
+    def test_checksum_changes_with_data(self):
+        """Test that editing a chapter file changes the checksum."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            root.joinpath("bsb", "Genesis").mkdir(parents=True)
+            chapter_path = root.joinpath("bsb", "Genesis", "1.json")
+            chapter_path.write_text(json.dumps({"1": "In the beginning"}), encoding="utf-8")
+            with patch("fAIth.bible_globals.BIBLE_DATA_ROOT", root):
+                with patch("fAIth.bible_globals.IN_ORDER_BOOKS", ["Genesis"]):
+                    with patch("fAIth.bible_globals.CHAPTER_SELECTION", {"Genesis": 1}):
+                        before = source_data_checksum("bsb")
+                        chapter_path.write_text(json.dumps({"1": "In the very beginning"}), encoding="utf-8")
+                        after = source_data_checksum("bsb")
+
+        assert before != after
+
+
+class TestVectorSnapshot(SimpleTestCase):
+    """Tests for write_snapshot and VectorSnapshot."""
+
+    def setUp(self):
+        """Set up a temporary snapshot directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name).joinpath("bsb--test-model.npz")
+
+    def tearDown(self):
+        """Clean up temporary files."""
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        """Test that records and vectors survive a write and read."""
+        dense_embeddings = np.arange(6, dtype=np.float32).reshape(3, 2)
+        write_snapshot(self.path, METADATA, make_records(), dense_embeddings)
+
+        snapshot = VectorSnapshot(self.path)
+        records = list(snapshot.iter_records())
+
+        assert len(snapshot) == 3
+        assert snapshot.metadata["embedding_model"] == "test-model"
+        assert [{key: value for key, value in record.items() if key != "dense_embedding"} for record in records] == (
+            make_records()
+        )
+        assert records[2]["dense_embedding"].tolist() == [4.0, 5.0]
+        assert not list(Path(self.temp_dir.name).glob("*.tmp*"))
+
+    def test_iter_records_without_dense(self):
+        """Test that dense vectors can be left out for sparse collections."""
+        write_snapshot(self.path, METADATA, make_records(), np.zeros((3, 2), dtype=np.float32))
+
+        records = list(VectorSnapshot(self.path).iter_records(include_dense=False))
+
+        assert all("dense_embedding" not in record for record in records)
+
+    def test_records_by_chapter(self):
+        """Test that records are grouped by book and chapter."""
+        write_snapshot(self.path, METADATA, make_records(), None)
+
+        chapters = VectorSnapshot(self.path).records_by_chapter()
+
+        assert [len(chapters[key]) for key in [("Genesis", 1), ("Exodus", 1)]] == [2, 1]
+
+    def test_incompatibility(self):
+        """Test that mismatched settings and missing vectors are reported."""
+        write_snapshot(self.path, METADATA, make_records(), None)
+        snapshot = VectorSnapshot(self.path)
+
+        assert snapshot.incompatibility({"collection": "bsb", "embedding_model": "test-model"}) is None
+        assert snapshot.incompatibility({"embedding_model": "other-model"}) == "its embedding_model differs"
+        assert snapshot.incompatibility({"needs_dense": True}) == "it has no dense vectors"
+
+    def test_unsupported_format(self):
+        """Test that files of another snapshot format are rejected."""
+        np.savez_compressed(self.path, metadata=np.array(json.dumps({"format_version": 999})))
+
+        with patch("ai.vdb.snapshot.logger"):
+            with pytest.raises(ValueError, match="Unsupported snapshot format"):
+                VectorSnapshot(self.path)
+
+
+class TestSortCanonically(SimpleTestCase):
+    """Tests for sort_canonically function."""
+
+    def test_sort_canonically(self):
+        """Test that records are ordered by canonical book order, chapter and verse."""
+        records = list(reversed(make_records()))
+
+        with patch("fAIth.bible_globals.IN_ORDER_BOOKS", ["Genesis", "Exodus"]):
+            assert sort_canonically(records) == make_records()
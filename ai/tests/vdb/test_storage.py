@@ -0,0 +1,167 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from django.test import SimpleTestCase
+from pymilvus import DataType
+
+from ai.vdb.storage import EmbeddingStorage, evaluate_storage_modes, scalar_quantize
+
+
+def create_mock_getenv(**env_vars):
+    """Create a mock getenv function with predefined environment variables."""
+
+    def mock_getenv(key, default=None):
+        return env_vars.get(key, default)
+
+    return mock_getenv
+
+
+class TestEmbeddingStorageInit(SimpleTestCase):
+    """Tests for EmbeddingStorage configuration."""
+
+    def test_from_env_defaults(self):
+        """Test that full-precision HNSW storage is the default."""
+        with patch("ai.vdb.storage.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv()
+            storage = EmbeddingStorage.from_env()
+
+        assert storage.mode == "float"
+        assert storage.dimensions == 0
+        assert storage.signature == "float:0"
+        assert storage.index_params()["index_type"] == "HNSW"
+
+    def test_from_env_custom_values(self):
+        """Test reading binary storage settings from the environment."""
+        env_vars = {
+            "EMBEDDING_STORAGE_MODE": "Binary",
+            "EMBEDDING_DIMENSIONS": "256",
+            "EMBEDDING_BINARY_RERANK": "False",
+            "EMBEDDING_BINARY_OVERSAMPLING": "8",
+        }
+        with patch("ai.vdb.storage.os.getenv") as mock_getenv:
+            mock_getenv.side_effect = create_mock_getenv(**env_vars)
+            storage = EmbeddingStorage.from_env()
+
+        assert storage.signature == "binary:256"
+        assert storage.binary_oversampling == 8
+        assert not storage.reranks
+
+    def test_invalid_mode(self):
+        """Test that unknown storage modes are rejected."""
+        with patch("ai.vdb.storage.logger"):
+            with pytest.raises(ValueError, match="Invalid embedding storage mode"):
+                EmbeddingStorage("pq")
+
+    def test_binary_dimensions_must_be_multiple_of_eight(self):
+        """Test that binary storage rejects dimensions that do not fill whole bytes."""
+        with patch("ai.vdb.storage.logger"):
+            with pytest.raises(ValueError, match="multiple of 8"):
+                EmbeddingStorage("binary", 100)
+
+    def test_stored_dimension(self):
+        """Test the dense field dimension for full and truncated vectors."""
+        assert EmbeddingStorage().stored_dimension(1024) == 1024
+        assert EmbeddingStorage("sq8", 256).stored_dimension(1024) == 256
+        with patch("ai.vdb.storage.logger"):
+            with pytest.raises(ValueError, match="exceeds the model dimension"):
+                EmbeddingStorage("float", 2048).stored_dimension(1024)
+
+
+class TestEmbeddingStorageEncoding(SimpleTestCase):
+    """Tests for converting embeddings into stored vectors."""
+
+    def test_encode_float_truncates(self):
+        """Test Matryoshka truncation keeps the leading dimensions."""
+        storage = EmbeddingStorage("float", 2)
+
+        assert storage.encode([0.5, -0.25, 0.75]) == [0.5, -0.25]
+        assert storage.vector_data_type == DataType.FLOAT_VECTOR
+
+    def test_encode_binary_packs_sign_bits(self):
+        """Test binary storage keeps one sign bit per dimension."""
+        storage = EmbeddingStorage("binary")
+
+        encoded = storage.encode([0.1, -0.2, 0.3, -0.4, 0.5, 0.6, -0.7, 0.8])
+
+        assert encoded == bytes([0b10101101])
+        assert storage.vector_data_type == DataType.BINARY_VECTOR
+
+    def test_array_round_trip(self):
+        """Test that stored values survive conversion to a snapshot matrix and back."""
+        storage = EmbeddingStorage("binary")
+        values = [storage.encode(np.linspace(-1, 1, 16)), [storage.encode(np.linspace(1, -1, 16))]]
+
+        matrix = storage.to_array(values)
+
+        assert matrix.dtype == np.uint8
+        assert [storage.encode_array_row(row) for row in matrix] == [values[0], values[1][0]]
+
+    def test_to_float_array(self):
+        """Test that binary values become +1/-1 rows comparable by cosine similarity."""
+        storage = EmbeddingStorage("binary")
+
+        matrix = storage.to_float_array([storage.encode([0.5, -0.5, 0.1, 0.2, -0.3, 0.4, 0.5, -0.6])])
+
+        assert matrix.tolist() == [[1, -1, 1, 1, -1, 1, 1, -1]]
+        assert EmbeddingStorage().to_float_array([[0.5, 0.25]]).tolist() == [[0.5, 0.25]]
+
+    def test_search_params_per_mode(self):
+        """Test that each mode searches its own index type."""
+        assert EmbeddingStorage().search_params() == {"metric_type": "COSINE", "params": {"ef": 128}}
+        assert EmbeddingStorage("sq8", ivf_nprobe=16).search_params()["params"] == {"nprobe": 16}
+        assert EmbeddingStorage("binary").search_params()["metric_type"] == "HAMMING"
+        assert EmbeddingStorage("sq8").index_params()["index_type"] == "IVF_SQ8"
+
+
+class TestEmbeddingStorageRerank(SimpleTestCase):
+    """Tests for re-ranking binary search candidates."""
+
+    def test_rerank_orders_by_float_query(self):
+        """Test that candidates are re-scored with the float query and trimmed to the limit."""
+        storage = EmbeddingStorage("binary")
+        query = [0.9, 0.1, -0.1, -0.1, 0.1, 0.1, 0.1, 0.1]
+        hits = [
+            {"id": 1, "distance": 1, "entity": {"text": "far", "dense_embedding": [storage.encode([-1.0] * 8)]}},
+            {"id": 2, "distance": 2, "entity": {"text": "near", "dense_embedding": storage.encode(query)}},
+        ]
+
+        results = storage.rerank(query, hits, limit=1)
+
+        assert [result["entity"]["text"] for result in results] == ["near"]
+        assert "dense_embedding" not in results[0]["entity"]
+        assert results[0]["distance"] > 0
+
+    def test_candidate_limit(self):
+        """Test that only re-ranked binary searches oversample."""
+        assert EmbeddingStorage("binary", binary_oversampling=3).candidate_limit(10) == 30
+        assert EmbeddingStorage("binary", binary_rerank=False).candidate_limit(10) == 10
+        assert EmbeddingStorage("sq8").candidate_limit(10) == 10
+
+
+class TestStorageReport(SimpleTestCase):
+    """Tests for the offline recall report."""
+
+    def test_scalar_quantize_is_close(self):
+        """Test that 8-bit quantization error is bounded by one quantization step."""
+        vectors = np.random.default_rng(0).normal(size=(50, 8)).astype(np.float32)
+
+        quantized = scalar_quantize(vectors)
+
+        step = (vectors.max(axis=0) - vectors.min(axis=0)) / 255
+        assert np.all(np.abs(quantized - vectors) <= step / 2 + 1e-6)
+
+    def test_evaluate_storage_modes(self):
+        """Test that full precision has perfect recall and compact modes report their size."""
+        rng = np.random.default_rng(1)
+        documents = rng.normal(size=(200, 32)).astype(np.float32)
+        queries = documents[:5] + rng.normal(scale=0.01, size=(5, 32)).astype(np.float32)
+
+        report = evaluate_storage_modes(
+            documents, queries, [EmbeddingStorage(), EmbeddingStorage("sq8"), EmbeddingStorage("binary")], k=5
+        )
+
+        assert [row["mode"] for row in report] == ["float", "sq8", "binary"]
+        assert report[0]["recall_at_k"] == 1.0
+        assert [row["bytes_per_vector"] for row in report] == [128, 32, 4]
+        assert all(0 <= row["recall_at_k"] <= 1 for row in report)
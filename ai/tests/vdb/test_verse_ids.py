@@ -0,0 +1,68 @@
+from unittest.mock import patch
+
+import pytest
+from django.test import SimpleTestCase
+
+from ai.vdb.verse_ids import hydrate_hits, pack_verse_id, unpack_verse_id, verse_text
+
+BOOKS = ["Genesis", "Exodus", "John"]
+ALL_VERSES = {
+    "bsb": {
+        "John": {
+            11: {
+                "header_1": '<span class="header">The Death of Lazarus</span>',
+                "35": '35) <span class="wj">Jesus wept.</span>',
+            }
+        }
+    }
+}
+
+
+class TestVerseIds(SimpleTestCase):
+    """Tests for pack_verse_id and unpack_verse_id functions."""
+
+    def setUp(self):
+        for patcher in (
+            patch("fAIth.bible_globals.IN_ORDER_BOOKS", BOOKS),
+            patch("fAIth.bible_globals.ALL_VERSES", ALL_VERSES),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_round_trip(self):
+        """Test that packed ids unpack to the same reference and follow canonical order."""
+        verse_id = pack_verse_id("John", 11, 35)
+
+        assert verse_id == (2 << 20) | (11 << 10) | 35
+        assert unpack_verse_id(verse_id) == ("John", 11, 35)
+        assert pack_verse_id("Genesis", 50, 26) < pack_verse_id("Exodus", 1, 1)
+
+    def test_invalid_references(self):
+        """Test that unknown books, out-of-range numbers and foreign ids are rejected."""
+        with patch("ai.vdb.verse_ids.logger"):
+            with pytest.raises(ValueError, match="Invalid book"):
+                pack_verse_id("Hezekiah", 1, 1)
+            with pytest.raises(ValueError, match="Invalid verse reference"):
+                pack_verse_id("John", 1, 1024)
+            with pytest.raises(ValueError, match="Invalid verse id"):
+                unpack_verse_id(3 << 20)
+
+    def test_verse_text(self):
+        """Test that the verse number and display markup of ALL_VERSES are removed."""
+        assert verse_text("bsb", "John", 11, 35) == "Jesus wept."
+        assert verse_text("bsb", "John", 11, 36) is None
+        assert verse_text("kjv", "John", 11, 35) is None
+
+    def test_hydrate_hits(self):
+        """Test that hits carrying only an id get the entity a full search would return."""
+        hits = [{"id": pack_verse_id("John", 11, 35), "distance": 0.9, "entity": {}}]
+
+        with patch("ai.vdb.verse_ids.logger"):
+            hydrated = hydrate_hits("bsb", hits + [{"id": pack_verse_id("John", 11, 36), "distance": 0.1}])
+
+        assert hydrated[0] == {
+            "id": hits[0]["id"],
+            "distance": 0.9,
+            "entity": {"version": "bsb", "book": "John", "chapter": 11, "verse": 35, "text": "Jesus wept."},
+        }
+        assert hydrated[1]["entity"]["text"] == ""
@@ -56,7 +56,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.render_to_string") as mock_render,
         ):
             # Mock the database and LLM calls
-            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
             request.state["completions_obj"].completions = AsyncMock(return_value="The Son of God!")
 
             # Mock file reads
@@ -81,15 +81,11 @@ class TestAskSelectedView(SimpleTestCase):
             assert "text/html" in response["content-type"]
             assert b"Response" in response.content
 
-            # Verify database search was called twice (once for query, once for selected_text)
-            assert request.state["milvus_db"].search.call_count == 2
-            search_calls = request.state["milvus_db"].search.call_args_list
-            # Both calls should have same collection_name
-            assert search_calls[0][1]["collection_name"] == "bsb"
-            assert search_calls[1][1]["collection_name"] == "bsb"
-            # Verify queries
-            assert search_calls[0][1]["query"] == "What does this mean?"
-            assert search_calls[1][1]["query"] == "For God so loved the world"
+            # Verify the query and selected_text were searched together in one call
+            request.state["milvus_db"].search_many.assert_called_once()
+            search_kwargs = request.state["milvus_db"].search_many.call_args.kwargs
+            assert search_kwargs["collection_name"] == "bsb"
+            assert search_kwargs["queries"] == ["What does this mean?", "For God so loved the world"]
 
     def test_ask_selected_calls_llm_completions(self):
         """Test that ask_selected calls the LLM completions service."""
@@ -102,7 +98,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.clean_llm_output") as mock_clean,
             patch("ai.views.ask_selected.render_to_string") as mock_render,
         ):
-            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
             request.state["completions_obj"].completions = AsyncMock(return_value="The Son of God!")
 
             async def mock_read(path):
@@ -150,7 +146,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.clean_llm_output") as mock_clean,
             patch("ai.views.ask_selected.render_to_string") as mock_render,
         ):
-            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
             request.state["completions_obj"].completions = AsyncMock(return_value="The Son of God!")
 
             async def mock_read(path):
@@ -179,7 +175,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.clean_llm_output") as mock_clean,
             patch("ai.views.ask_selected.render_to_string") as mock_render,
         ):
-            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
             request.state["completions_obj"].completions = AsyncMock(return_value="The Son of God!")
 
             async def mock_read(path):
@@ -212,7 +208,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.clean_llm_output") as mock_clean,
             patch("ai.views.ask_selected.render_to_string") as mock_render,
         ):
-            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
             request.state["completions_obj"].completions = AsyncMock(return_value="The Son of God!")
 
             async def mock_read(path):
@@ -244,7 +240,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.clean_llm_output") as mock_clean,
             patch("ai.views.ask_selected.render_to_string") as mock_render,
         ):
-            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
             request.state["completions_obj"].completions = AsyncMock(return_value="The Son of God!")
 
             async def mock_read(path):
@@ -274,7 +270,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.render_to_string") as mock_render,
             patch("ai.views.ask_selected.MILVUS_SEARCH_LIMIT", 10),
         ):
-            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
             request.state["completions_obj"].completions = AsyncMock(return_value="The Son of God!")
 
             async def mock_read(path):
@@ -289,12 +285,41 @@ class TestAskSelectedView(SimpleTestCase):
 
             _ = self._call_ask_selected(request, payload)
 
-            # Verify MILVUS_SEARCH_LIMIT was used in searches (half limit for each search)
-            assert request.state["milvus_db"].search.call_count == 2
-            search_calls = request.state["milvus_db"].search.call_args_list
-            # Each search should use half the limit (10 / 2 = 5)
-            assert search_calls[0][1]["limit"] == 5
-            assert search_calls[1][1]["limit"] == 5
+            # Verify MILVUS_SEARCH_LIMIT was used in searches (half limit for each query)
+            request.state["milvus_db"].search_many.assert_called_once()
+            # Each query should use half the limit (10 / 2 = 5)
+            assert request.state["milvus_db"].search_many.call_args.kwargs["limit"] == 5
+
+    def test_ask_selected_uses_search_scope(self):
+        """Test that ASK_SELECTED_SEARCH_SCOPE restricts both searches to the selected passage."""
+        request = self._build_request()
+        payload = self._build_payload()
+
+        with (
+            patch("ai.views.ask_selected.async_read_file") as mock_read_file,
+            patch("ai.views.ask_selected.stringify_vdb_results") as mock_stringify,
+            patch("ai.views.ask_selected.clean_llm_output") as mock_clean,
+            patch("ai.views.ask_selected.render_to_string") as mock_render,
+            patch("ai.views.ask_selected.ASK_SELECTED_SEARCH_SCOPE", "chapter"),
+            patch("fAIth.bible_globals.IN_ORDER_BOOKS", ["John"]),
+        ):
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
+            request.state["completions_obj"].completions = AsyncMock(return_value="The Son of God!")
+
+            async def mock_read(path):
+                return "Bible study prompt"
+
+            mock_read_file.side_effect = mock_read
+            mock_stringify.return_value = "For God so loved the world (John 3:16)"
+            mock_clean.return_value = "<p>The Son of God!</p>"
+            mock_render.return_value = "<html>Response</html>"
+
+            _ = self._call_ask_selected(request, payload)
+
+            search_kwargs = request.state["milvus_db"].search_many.call_args.kwargs
+            assert search_kwargs["book"] == "John"
+            assert search_kwargs["chapter_start"] == 3
+            assert search_kwargs["chapter_end"] == 3
 
     def test_ask_selected_extracts_payload_fields(self):
         """Test that ask_selected correctly extracts fields from payload."""
@@ -307,7 +332,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.clean_llm_output") as mock_clean,
             patch("ai.views.ask_selected.render_to_string") as mock_render,
         ):
-            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
             request.state["completions_obj"].completions = AsyncMock(return_value="The Son of God!")
 
             async def mock_read(path):
@@ -323,13 +348,11 @@ class TestAskSelectedView(SimpleTestCase):
             _ = self._call_ask_selected(request, payload)
 
             # Verify correct fields were extracted and used
-            search_calls = request.state["milvus_db"].search.call_args_list
-            # Both searches use same collection
-            assert search_calls[0][1]["collection_name"] == "bsb"
-            assert search_calls[1][1]["collection_name"] == "bsb"
-            # Query is used for first search, selected_text for second
-            assert search_calls[0][1]["query"] == "What does this mean?"
-            assert search_calls[1][1]["query"] == "For God so loved the world"
+            search_kwargs = request.state["milvus_db"].search_many.call_args.kwargs
+            # Both queries search the same collection
+            assert search_kwargs["collection_name"] == "bsb"
+            # Query comes first, selected_text second
+            assert search_kwargs["queries"] == ["What does this mean?", "For God so loved the world"]
 
     def test_ask_selected_combines_vector_results(self):
         """Test that ask_selected combines results from both searches."""
@@ -343,7 +366,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.clean_llm_output") as mock_clean,
             patch("ai.views.ask_selected.render_to_string") as mock_render,
         ):
-            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
             request.state["completions_obj"].completions = AsyncMock(return_value="The Son of God!")
 
             async def mock_read(path):
@@ -384,7 +407,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.unify_vdb_results") as mock_unify,
             patch("ai.views.ask_selected.render_to_string") as mock_render,
         ):
-            request.state["milvus_db"].search = AsyncMock(side_effect=RuntimeError("Milvus unreachable"))
+            request.state["milvus_db"].search_many = AsyncMock(side_effect=RuntimeError("Milvus unreachable"))
 
             async def mock_read(path):
                 return "Bible study prompt"
@@ -407,7 +430,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.unify_vdb_results") as mock_unify,
             patch("ai.views.ask_selected.render_to_string") as mock_render,
         ):
-            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
             mock_unify.side_effect = RuntimeError("unify failed")
 
             async def mock_read(path):
@@ -430,7 +453,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.unify_vdb_results") as mock_unify,
             patch("ai.views.ask_selected.render_to_string") as mock_render,
         ):
-            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
             mock_unify.return_value = []
             # async_read_file raises before any prompt formatting can happen
             mock_read_file.side_effect = FileNotFoundError("missing system.md")
@@ -454,7 +477,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.unify_vdb_results") as mock_unify,
             patch("ai.views.ask_selected.render_to_string") as mock_render,
         ):
-            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
             mock_unify.return_value = []
 
             async def mock_read(path):
@@ -482,7 +505,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.clean_llm_output") as mock_clean,
             patch("ai.views.ask_selected.render_to_string") as mock_render,
         ):
-            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
             mock_unify.return_value = []
             request.state["completions_obj"].completions = AsyncMock(side_effect=RuntimeError("LLM unavailable"))
 
@@ -508,7 +531,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.clean_llm_output") as mock_clean,
             patch("ai.views.ask_selected.render_to_string") as mock_render,
         ):
-            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
             mock_unify.return_value = []
             request.state["completions_obj"].completions = AsyncMock(return_value="raw markdown")
             mock_clean.side_effect = RuntimeError("cleaner failed")
@@ -535,7 +558,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.render_to_string") as mock_render,
             patch("ai.views.ask_selected.ServerTextResponseSerializer") as mock_serializer,
         ):
-            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
             mock_unify.return_value = []
             request.state["completions_obj"].completions = AsyncMock(return_value="raw markdown")
             mock_clean.return_value = "<p>Response</p>"
@@ -563,7 +586,7 @@ class TestAskSelectedView(SimpleTestCase):
             patch("ai.views.ask_selected.render_to_string") as mock_render,
             patch("ai.views.ask_selected.ServerTextResponseSerializer") as mock_serializer,
         ):
-            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["milvus_db"].search_many = AsyncMock(return_value=[[], []])
             mock_unify.return_value = []
             request.state["completions_obj"].completions = AsyncMock(return_value="raw markdown")
             mock_clean.return_value = "<p>Response</p>"
@@ -304,6 +304,37 @@ class TestGeneralQuestionView(SimpleTestCase):
             assert request.state["milvus_db"].search.call_args[1]["query"] == "Who is Jesus Christ?"
             assert request.state["milvus_db"].search.call_args[1]["collection_name"] == "bsb"
 
+    def test_general_question_uses_search_profile(self):
+        """Test that the request's search profile overrides GENERAL_QUESTION_SEARCH_PROFILE."""
+        request = self._build_request()
+        payload = self._build_payload()
+
+        with (
+            patch("ai.views.general_question.async_read_file") as mock_read_file,
+            patch("ai.views.general_question.stringify_vdb_results") as mock_stringify,
+            patch("ai.views.general_question.clean_llm_output") as mock_clean,
+            patch("ai.views.general_question.render_to_string") as mock_render,
+            patch("ai.views.general_question.GENERAL_QUESTION_SEARCH_PROFILE", "fast"),
+        ):
+            request.state["milvus_db"].search = AsyncMock(return_value=[])
+            request.state["completions_obj"].completions = AsyncMock(return_value="The Son of God!")
+
+            async def mock_read(path):
+                return "Bible study prompt"
+
+            mock_read_file.side_effect = mock_read
+            mock_stringify.return_value = "For God so loved the world (John 3:16)"
+            mock_clean.return_value = "<p>The Son of God!</p>"
+            mock_render.return_value = "<html>Response</html>"
+
+            payload.search_profile = None
+            _ = self._call_general_question(request, payload)
+            assert request.state["milvus_db"].search.call_args.kwargs["profile"] == "fast"
+
+            payload.search_profile = "accurate"
+            _ = self._call_general_question(request, payload)
+            assert request.state["milvus_db"].search.call_args.kwargs["profile"] == "accurate"
+
     def _assert_500_error(self, response, message_substring):
         """Assert a 500 HTML error response containing the given message."""
         assert response.status_code == 500
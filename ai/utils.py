@@ -6,6 +6,8 @@ from typing import Any
 import httpx
 import markdown
 
+from ai.vdb.search_profiles import SEARCH_PROFILES
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -24,6 +26,28 @@ def remove_newlines_whitespace(text: str) -> str:
     return "\n".join(line.strip() for line in text.splitlines() if line.strip())
 
 
+def validate_search_profile(value: str | None) -> str | None:
+    """
+    Validate that an optional search profile name names a known search profile.
+
+    Parameters:
+        value (str | None): The search profile name from the request.
+
+    Returns:
+        str | None: Lowercase profile name, or None to use the endpoint's default profile.
+
+    Raises:
+        ValueError: If the search profile is not one of the search profiles.
+    """
+    value = (value or "").strip().lower()
+    if not value:
+        return None
+    if value not in SEARCH_PROFILES:
+        logger.error(f"search_profile must be one of: {', '.join(SEARCH_PROFILES)}")
+        raise ValueError(f"search_profile must be one of: {', '.join(SEARCH_PROFILES)}")
+    return value
+
+
 async def async_read_file(file_path: str | Path, encoding: str = "utf-8") -> str | None:
     """
     Asynchronously read a file without blocking the event loop.
@@ -84,12 +108,30 @@ async def unify_vdb_results(vdb_results: list[dict[str, Any]]) -> list[dict[str,
         return []
 
 
+def verse_reference(entity: dict[str, Any]) -> str:
+    """
+    Format the citation of a search result entity.
+
+    Parameters:
+        entity (dict[str, Any]): Entity of a search result with book, chapter, verse and version.
+
+    Returns:
+        str: "{book} {chapter}:{verse} {version}", with a verse range for passages of merged
+            neighboring verses (e.g. "John 3:16-17 bsb").
+    """
+    verse = entity.get("verse", "")
+    # Passages of merged neighboring verses end at verse_end
+    if entity.get("verse_end") and entity.get("verse_end") != verse:
+        verse = f"{verse}-{entity['verse_end']}"
+    return f"{entity.get('book', '')} {entity.get('chapter', '')}:{verse} {entity.get('version', '')}"
+
+
 async def stringify_vdb_results(vdb_results: list[dict[str, Any]]) -> str:
     """
     Format vector database search results into a human-readable string.
 
     Extracts text and metadata from each result and formats them as:
-    "{text} ({book} {chapter}:{verse} {version})"
+    "{text} ({book} {chapter}:{verse} {version})", with a verse range for merged passages.
 
     Each result is joined with newlines for readability.
 
@@ -106,14 +148,8 @@ async def stringify_vdb_results(vdb_results: list[dict[str, Any]]) -> str:
             for result in vdb_results:
                 entity = result.get("entity", {})
                 if entity:
-                    # Extract metadata from result
-                    text = entity.get("text", "")
-                    book = entity.get("book", "")
-                    chapter = entity.get("chapter", "")
-                    verse = entity.get("verse", "")
-                    version = entity.get("version", "")
                     # Format as "text (book chapter:verse version)"
-                    result_string = f"{text} ({book} {chapter}:{verse} {version})"
+                    result_string = f"{entity.get('text', '')} ({verse_reference(entity)})"
                     result_strings.append(result_string)
             return "\n".join(result_strings)
         except Exception as e:
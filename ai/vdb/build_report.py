@@ -0,0 +1,248 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Build stages timed for every collection
+BUILD_STAGES = ["parse", "embed", "insert", "index"]
+
+
+def peak_rss_bytes() -> int | None:
+    """
+    Get the peak resident set size of this process.
+
+    Returns:
+        int | None: Peak RSS in bytes, or None where the platform does not report it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def estimate_record_bytes(record: dict) -> int:
+    """
+    Estimate the payload size of a verse record sent to Milvus.
+
+    Parameters:
+        record (dict): Verse record (text, version, book, chapter, verse and optionally dense_embedding).
+
+    Returns:
+        int: Approximate number of bytes (UTF-8 strings, 2-byte integers, 4 bytes per float dimension).
+    """
+    size = 0
+    for value in record.values():
+        if isinstance(value, str):
+            size += len(value.encode("utf-8"))
+        elif isinstance(value, (bytes, bytearray)):
+            size += len(value)
+        elif isinstance(value, int):
+            size += 2
+        elif hasattr(value, "__len__"):
+            size += 4 * len(value)
+    return size
+
+
+class BuildReport:
+    """
+    Collects timings and throughput of a collection build and writes them as a JSON report.
+
+    Stage times are busy time summed over all threads working on a collection: with concurrent
+    embedding requests, the "embed" time of a collection can exceed its wall time. Comparing the
+    stages shows whether a slow build is bound by reading the Bible data, the embedding service
+    or Milvus. Thread-safe.
+    """
+
+    def __init__(self, settings: dict | None = None):
+        """
+        Start a new report.
+
+        Parameters:
+            settings (dict | None): Build settings to include in the report (e.g., database type and model).
+        """
+        self.settings = dict(settings or {})
+        self._lock = threading.Lock()
+        self.started_at = datetime.now(timezone.utc)
+        self._start_time = time.perf_counter()
+        self.collections = {}
+        self.embedding_batch_sizes = {}
+
+    def _collection(self, collection_name: str) -> dict:
+        """Get (creating if needed) the entry of a collection. Must be called with the lock held."""
+        if collection_name not in self.collections:
+            self.collections[collection_name] = {
+                "stage_seconds": {stage: 0.0 for stage in BUILD_STAGES},
+                "records_sent": 0,
+                "bytes_sent": 0,
+            }
+        return self.collections[collection_name]
+
+    def add_stage_time(self, collection_name: str, stage: str, seconds: float):
+        """
+        Add time spent in a build stage.
+
+        Parameters:
+            collection_name (str): Collection being built.
+            stage (str): One of BUILD_STAGES.
+            seconds (float): Time spent.
+        """
+        with self._lock:
+            self._collection(collection_name)["stage_seconds"][stage] += seconds
+
+    @contextmanager
+    def stage(self, collection_name: str, stage: str):
+        """
+        Time a block of work as part of a build stage.
+
+        Parameters:
+            collection_name (str): Collection being built.
+            stage (str): One of BUILD_STAGES.
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(collection_name, stage, time.perf_counter() - start_time)
+
+    def timed_iter(self, collection_name: str, stage: str, iterable: Iterable) -> Iterator:
+        """
+        Time how long producing each item of an iterable takes.
+
+        Parameters:
+            collection_name (str): Collection being built.
+            stage (str): One of BUILD_STAGES.
+            iterable (Iterable): Lazily produced items, e.g. verse records read from JSON files.
+
+        Yields:
+            The items of the iterable.
+        """
+        iterator = iter(iterable)
+        while True:
+            start_time = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_stage_time(collection_name, stage, time.perf_counter() - start_time)
+                return
+            self.add_stage_time(collection_name, stage, time.perf_counter() - start_time)
+            yield item
+
+    def record_embedding_batch(self, size: int):
+        """
+        Count an embedding request by its number of texts.
+
+        Parameters:
+            size (int): Number of texts sent in the request.
+        """
+        with self._lock:
+            self.embedding_batch_sizes[size] = self.embedding_batch_sizes.get(size, 0) + 1
+
+    def record_sent(self, collection_name: str, records: list[dict]):
+        """
+        Count records sent to Milvus and their approximate payload size.
+
+        Parameters:
+            collection_name (str): Target collection.
+            records (list[dict]): Records sent.
+        """
+        payload_bytes = sum(estimate_record_bytes(record) for record in records)
+        with self._lock:
+            entry = self._collection(collection_name)
+            entry["records_sent"] += len(records)
+            entry["bytes_sent"] += payload_bytes
+
+    def record_result(self, collection_name: str, stats: dict | None = None, error: Exception | None = None):
+        """
+        Record the outcome of a collection build.
+
+        Parameters:
+            collection_name (str): Collection that was built.
+            stats (dict | None): Ingest statistics returned by IngestPipeline.run().
+            error (Exception | None): Error that stopped the build.
+        """
+        with self._lock:
+            entry = self._collection(collection_name)
+            if stats is not None:
+                entry.update(
+                    {
+                        "verses": stats["verses"],
+                        "seconds": stats["seconds"],
+                        "verses_per_second": stats["verses_per_second"],
+                    }
+                )
+            if error is not None:
+                entry["error"] = str(error)
+
+    def to_dict(self) -> dict:
+        """
+        Summarize the build.
+
+        Returns:
+            dict: Start time, settings, wall seconds, peak RSS, embedding batch-size histogram and per-collection entries
+                (stage_seconds, records_sent, bytes_sent and, once finished, verses, seconds and verses_per_second).
+        """
+        with self._lock:
+            return {
+                "started_at": self.started_at.isoformat(),
+                "settings": self.settings,
+                "wall_seconds": round(time.perf_counter() - self._start_time, 3),
+                "peak_rss_bytes": peak_rss_bytes(),
+                "embedding_requests": sum(self.embedding_batch_sizes.values()),
+                "embedding_batch_size_histogram": {
+                    str(size): count for size, count in sorted(self.embedding_batch_sizes.items())
+                },
+                "collections": {
+                    collection_name: {
+                        **entry,
+                        "stage_seconds": {
+                            stage: round(seconds, 3) for stage, seconds in entry["stage_seconds"].items()
+                        },
+                    }
+                    for collection_name, entry in self.collections.items()
+                },
+            }
+
+    @property
+    def has_activity(self) -> bool:
+        """
+        Whether any record was sent or any build failed (no-op resumes have nothing to report).
+
+        Returns:
+            bool: True if the report has something to show.
+        """
+        with self._lock:
+            return any(entry["records_sent"] or "error" in entry for entry in self.collections.values())
+
+    def write(self, report_directory: str | Path) -> Path:
+        """
+        Write the report as "build-{timestamp}.json" into a directory.
+
+        Parameters:
+            report_directory (str | Path): Directory holding build reports.
+
+        Returns:
+            Path: Path of the written report.
+        """
+        report_directory = Path(report_directory)
+        report_directory.mkdir(parents=True, exist_ok=True)
+        path = report_directory.joinpath(f"build-{self.started_at.strftime('%Y%m%dT%H%M%SZ')}.json")
+        temporary_path = path.with_suffix(".json.tmp")
+        with temporary_path.open("w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2, default=str)
+        os.replace(temporary_path, path)
+        return path
@@ -0,0 +1,222 @@
+import importlib
+import logging
+import shutil
+import tempfile
+import time
+from collections import Counter
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Import job states reported by Milvus
+IMPORT_COMPLETED_STATE = "Completed"
+IMPORT_FAILED_STATE = "Failed"
+
+
+def load_bulk_writer():
+    """
+    Import the optional pymilvus bulk writer module.
+
+    Returns:
+        module: The pymilvus.bulk_writer module.
+
+    Raises:
+        ImportError: If the pymilvus bulk_writer extra is not installed.
+    """
+    try:
+        return importlib.import_module("pymilvus.bulk_writer")
+    except ImportError as e:
+        logger.error(f"Milvus bulk import requires the pymilvus bulk_writer extra: {e}")
+        raise ImportError(
+            "Milvus bulk import requires the pymilvus bulk_writer extra. "
+            'Install it with `pip install "pymilvus[bulk_writer]"` or set MILVUS_BULK_IMPORT to False.'
+        ) from e
+
+
+class BulkImportWriter:
+    """
+    Writes verse records of one collection to Parquet files in Milvus' object storage.
+
+    Rows are buffered column by column by pymilvus' RemoteBulkWriter and uploaded in
+    chunks, so the collection never has to be held in memory as a list of dicts.
+    The append() method has the same signature as the builder's insert callback, so a
+    writer can take the place of row-wise inserts in the ingest pipeline.
+    """
+
+    def __init__(self, writer, local_path: str):
+        """
+        Wrap a RemoteBulkWriter.
+
+        Parameters:
+            writer (RemoteBulkWriter): Writer created for the collection schema.
+            local_path (str): Temporary directory the writer stages files in.
+        """
+        self.writer = writer
+        self.local_path = local_path
+        # Number of verses written per (book, chapter), recorded in the checkpoint once the import completes
+        self.chapter_counts = Counter()
+
+    def append(self, collection_name: str, records: list[dict]):
+        """
+        Buffer records for the import files.
+
+        Parameters:
+            collection_name (str): Target collection (only used for logging).
+            records (list[dict]): Records with every non-generated field of the schema.
+
+        Returns:
+            int: Number of records written.
+        """
+        for record in records:
+            self.writer.append_row(record)
+            self.chapter_counts[(record["book"], record["chapter"])] += 1
+        logger.info(
+            f"Wrote {len(records)} verses to {collection_name} import files "
+            f"(through {records[-1]['book']} {records[-1]['chapter']})"
+        )
+        return len(records)
+
+    def commit(self):
+        """
+        Flush the remaining rows and upload all files to object storage.
+
+        Returns:
+            list[list[str]]: Remote files grouped per import batch, as expected by bulk_import().
+        """
+        self.writer.commit()
+        return self.writer.batch_files
+
+    def close(self):
+        """
+        Remove the temporary staging directory.
+        """
+        shutil.rmtree(self.local_path, ignore_errors=True)
+
+
+class BulkImporter:
+    """
+    Loads collections through Milvus bulk import instead of row-wise inserts.
+
+    Records are written as Parquet files into the bucket Milvus itself uses for storage
+    (SeaweedFS in docker-compose), then a single import job per collection loads them
+    server-side. Requires the optional pymilvus bulk_writer extra.
+    """
+
+    def __init__(
+        self,
+        milvus_url: str,
+        database_name: str,
+        api_key: str,
+        endpoint: str,
+        bucket_name: str,
+        access_key: str,
+        secret_key: str,
+        secure: bool = False,
+        timeout: float = 1800,
+        poll_interval: float = 5,
+    ):
+        """
+        Initialize the bulk importer.
+
+        Parameters:
+            milvus_url (str): Milvus URL (the import REST API is served on the same port).
+            database_name (str): Milvus database holding the collections.
+            api_key (str): Milvus credentials in the form "username:password".
+            endpoint (str): S3 endpoint of Milvus' object storage, e.g. "seaweedfs-s3:8333".
+            bucket_name (str): Bucket Milvus reads import files from.
+            access_key (str): S3 access key.
+            secret_key (str): S3 secret key.
+            secure (bool): Use HTTPS for the S3 endpoint.
+            timeout (float): Seconds to wait for an import job to finish.
+            poll_interval (float): Seconds between import progress checks.
+
+        Raises:
+            ImportError: If the pymilvus bulk_writer extra is not installed.
+        """
+        self.bulk_writer = load_bulk_writer()
+        self.milvus_url = milvus_url
+        self.database_name = database_name
+        self.api_key = api_key
+        self.endpoint = endpoint
+        self.bucket_name = bucket_name
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.secure = secure
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    def open_writer(self, schema, collection_name: str):
+        """
+        Create a writer that stages Parquet files for a collection.
+
+        Parameters:
+            schema (CollectionSchema): Schema of the target collection.
+            collection_name (str): Target collection.
+
+        Returns:
+            BulkImportWriter: Writer whose files can be passed to import_files().
+        """
+        local_path = tempfile.mkdtemp(prefix=f"bulk_import_{collection_name}_")
+        writer = self.bulk_writer.RemoteBulkWriter(
+            schema=schema,
+            remote_path=f"bulk_import/{self.database_name}/{collection_name}",
+            connect_param=self.bulk_writer.RemoteBulkWriter.S3ConnectParam(
+                bucket_name=self.bucket_name,
+                endpoint=self.endpoint,
+                access_key=self.access_key,
+                secret_key=self.secret_key,
+                secure=self.secure,
+            ),
+            file_type=self.bulk_writer.BulkFileType.PARQUET,
+            local_path=local_path,
+        )
+        return BulkImportWriter(writer, local_path)
+
+    def import_files(self, collection_name: str, files: list[list[str]]):
+        """
+        Run a bulk import job for uploaded files and wait for it to finish.
+
+        Parameters:
+            collection_name (str): Target collection.
+            files (list[list[str]]): Remote files grouped per import batch.
+
+        Returns:
+            int: Number of rows imported.
+
+        Raises:
+            RuntimeError: If the import job fails.
+            TimeoutError: If the import job does not finish within the timeout.
+        """
+        if not files:
+            logger.info(f"No import files for {collection_name} collection")
+            return 0
+
+        response = self.bulk_writer.bulk_import(
+            url=self.milvus_url,
+            api_key=self.api_key,
+            db_name=self.database_name,
+            collection_name=collection_name,
+            files=files,
+        )
+        job_id = response.json()["data"]["jobId"]
+        logger.info(f"Started bulk import job {job_id} for {collection_name} collection ({len(files)} files)")
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            progress = self.bulk_writer.get_import_progress(
+                url=self.milvus_url, job_id=job_id, api_key=self.api_key, db_name=self.database_name
+            )
+            data = progress.json().get("data", {})
+            state = data.get("state")
+            if state == IMPORT_COMPLETED_STATE:
+                imported_rows = int(data.get("importedRows") or data.get("totalRows") or 0)
+                logger.info(f"Bulk import job {job_id} imported {imported_rows} rows into {collection_name}")
+                return imported_rows
+            if state == IMPORT_FAILED_STATE:
+                logger.error(f"Bulk import job {job_id} failed: {data.get('reason')}")
+                raise RuntimeError(f"Bulk import job {job_id} for {collection_name} failed: {data.get('reason')}")
+            if time.monotonic() >= deadline:
+                logger.error(f"Bulk import job {job_id} did not finish within {self.timeout} seconds")
+                raise TimeoutError(f"Bulk import job {job_id} for {collection_name} did not finish in time")
+            logger.info(f"Bulk import job {job_id} is {state} ({data.get('progress', 0)}%)")
+            time.sleep(self.poll_interval)
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def file_checksum(path: str | Path) -> str:
+    """
+    Compute the SHA-256 checksum of a file.
+
+    Parameters:
+        path (str | Path): File to hash.
+
+    Returns:
+        str: Hex SHA-256 digest of the file contents.
+    """
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+class IngestCheckpoint:
+    """
+    Per-chapter progress record for a collection build, persisted as JSON.
+
+    Each chapter entry stores the checksum of its source JSON file and whether all of its
+    verses have been inserted. A chapter is marked as started before any of its verses are
+    sent to Milvus, so after a crash the builder knows exactly which chapters may hold
+    partial data. The checkpoint also stores a signature of the build settings (database
+    type, embedding model, ...); a checkpoint with a different signature cannot be resumed.
+
+    Chapter states reported by chapter_state():
+        - "complete": Fully inserted from a file with the same checksum; nothing to do
+        - "stale": Partially inserted, or completed from a different file; existing rows must be replaced
+        - "new": No rows were ever inserted
+
+    Thread-safe: chapters are registered by the reading stage while inserts are recorded by
+    the insert stage of the ingest pipeline.
+    """
+
+    def __init__(self, checkpoint_directory: str | Path, database_name: str, collection_name: str):
+        """
+        Locate the checkpoint file of a collection. Nothing is read or written yet.
+
+        Parameters:
+            checkpoint_directory (str | Path): Root directory for checkpoint files.
+            database_name (str): Milvus database name.
+            collection_name (str): Collection (Bible version) name.
+        """
+        self.collection_name = collection_name
+        self.path = Path(checkpoint_directory).joinpath(database_name, f"{collection_name}.json")
+        self.signature = {}
+        self._chapters = {}
+        self._remaining = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    @staticmethod
+    def chapter_key(book: str, chapter: int) -> str:
+        """
+        Build the key used to store a chapter.
+
+        Parameters:
+            book (str): Book name.
+            chapter (int): Chapter number.
+
+        Returns:
+            str: Key in the form "{book}:{chapter}".
+        """
+        return f"{book}:{chapter}"
+
+    def exists(self) -> bool:
+        """
+        Check whether a checkpoint file has been written for the collection.
+
+        Returns:
+            bool: True if the checkpoint file exists.
+        """
+        return self.path.exists()
+
+    def load(self, signature: dict) -> bool:
+        """
+        Load the checkpoint if it was written with the same build signature.
+
+        Parameters:
+            signature (dict): Settings the collection content depends on.
+
+        Returns:
+            bool: True if the checkpoint was loaded and can be resumed, False otherwise.
+        """
+        self.signature = signature
+        if not self.exists():
+            return False
+        try:
+            with self.path.open("r", encoding="utf-8") as file:
+                data = json.load(file)
+        except Exception as e:
+            logger.warning(f"Ingest checkpoint {self.path} could not be read: {e}")
+            return False
+        if data.get("signature") != signature:
+            logger.info(f"Ingest checkpoint for {self.collection_name} was written with different settings")
+            return False
+        with self._lock:
+            self._chapters = data.get("chapters", {})
+        return True
+
+    def reset(self, signature: dict):
+        """
+        Start a fresh checkpoint, removing any previous checkpoint file.
+
+        Parameters:
+            signature (dict): Settings the collection content depends on.
+        """
+        with self._lock:
+            self.signature = signature
+            self._chapters = {}
+            self._remaining = {}
+            self._dirty = False
+        self.path.unlink(missing_ok=True)
+
+    def chapter_state(self, book: str, chapter: int, checksum: str) -> str:
+        """
+        Report whether a chapter needs ingesting.
+
+        Parameters:
+            book (str): Book name.
+            chapter (int): Chapter number.
+            checksum (str): Checksum of the chapter's current source file.
+
+        Returns:
+            str: "complete", "stale" or "new".
+        """
+        with self._lock:
+            entry = self._chapters.get(self.chapter_key(book, chapter))
+        if entry is None:
+            return "new"
+        if entry["complete"]:
+            return "complete" if entry["checksum"] == checksum else "stale"
+        # Incomplete chapters only hold rows if inserts had started
+        return "stale" if entry["started"] else "new"
+
+    def expect_chapter(self, book: str, chapter: int, checksum: str, verse_count: int):
+        """
+        Register a chapter that is about to be ingested.
+
+        Chapters without verses are marked complete immediately.
+
+        Parameters:
+            book (str): Book name.
+            chapter (int): Chapter number.
+            checksum (str): Checksum of the chapter's source file.
+            verse_count (int): Number of verse records that will be inserted for the chapter.
+        """
+        key = self.chapter_key(book, chapter)
+        with self._lock:
+            self._chapters[key] = {"checksum": checksum, "complete": verse_count == 0, "started": False}
+            if verse_count:
+                self._remaining[key] = verse_count
+            self._dirty = True
+
+    def mark_started(self, records: list[dict]):
+        """
+        Persist that the chapters of these records are about to receive inserts.
+
+        Called before records are sent to Milvus; saves the checkpoint if any chapter is
+        started for the first time.
+
+        Parameters:
+            records (list[dict]): Records about to be inserted.
+        """
+        self.mark_chapters_started((record["book"], record["chapter"]) for record in records)
+
+    def mark_chapters_started(self, chapters: Iterable[tuple[str, int]]):
+        """
+        Persist that these chapters are about to receive inserts (see mark_started()).
+
+        Parameters:
+            chapters (Iterable[tuple[str, int]]): (book, chapter) pairs about to be inserted.
+        """
+        newly_started = False
+        with self._lock:
+            for book, chapter in chapters:
+                entry = self._chapters.get(self.chapter_key(book, chapter))
+                if entry is not None and not entry["started"]:
+                    entry["started"] = True
+                    newly_started = True
+                    self._dirty = True
+        if newly_started:
+            self.save()
+
+    def record_inserted(self, records: list[dict]):
+        """
+        Count inserted records and mark chapters complete once all their verses are in.
+
+        Saves the checkpoint if any chapter was completed.
+
+        Parameters:
+            records (list[dict]): Records that were inserted.
+        """
+        self.record_chapter_counts(Counter((record["book"], record["chapter"]) for record in records))
+
+    def record_chapter_counts(self, chapter_counts: dict[tuple[str, int], int]):
+        """
+        Count inserted verses per chapter and mark chapters complete once all their verses are in.
+
+        Saves the checkpoint if any chapter was completed.
+
+        Parameters:
+            chapter_counts (dict[tuple[str, int], int]): Number of inserted verses of each (book, chapter).
+        """
+        newly_completed = False
+        with self._lock:
+            for (book, chapter), count in chapter_counts.items():
+                key = self.chapter_key(book, chapter)
+                if key not in self._remaining:
+                    continue
+                self._remaining[key] -= count
+                if self._remaining[key] <= 0:
+                    del self._remaining[key]
+                    self._chapters[key]["complete"] = True
+                    newly_completed = True
+                    self._dirty = True
+        if newly_completed:
+            self.save()
+
+    def save(self):
+        """
+        Atomically write the checkpoint file if anything changed since it was loaded or last saved.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"collection": self.collection_name, "signature": self.signature, "chapters": self._chapters}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path = self.path.with_suffix(".json.tmp")
+            with temporary_path.open("w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(temporary_path, self.path)
+            self._dirty = False
+
+    def is_complete(self) -> bool:
+        """
+        Check whether every registered chapter has been fully inserted.
+
+        Returns:
+            bool: True if no registered chapter is still missing verses.
+        """
+        with self._lock:
+            return all(entry["complete"] for entry in self._chapters.values())
@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class CoalescingCache:
+    """
+    Base of the bounded in-process caches of the querier (see QueryEmbeddingCache and SearchResultCache).
+
+    Values are kept with least-recently-used and time-to-live eviction. An optional Django cache
+    (e.g. the "shared" file-based cache) is consulted on local misses, so every worker process
+    benefits from values computed by the others, and concurrent lookups of the same key wait for
+    a single computation.
+
+    Subclasses build the keys and define how computed values are prepared (prepare_value()) and
+    stored in the shared cache (encode_shared() and decode_shared()).
+
+    Counters (hits, shared_hits, misses, coalesced, evictions, expirations) are available via stats().
+    """
+
+    # Name of the cache in log messages
+    description = "cache"
+
+    def __init__(self, max_entries: int, ttl_seconds: float, shared_cache=None):
+        """
+        Initialize the cache.
+
+        Parameters:
+            max_entries (int): Maximum number of values kept in this process.
+            ttl_seconds (float): Seconds a value stays valid (0 keeps values until evicted).
+            shared_cache (BaseCache | None): Django cache shared between worker processes.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.shared_cache = shared_cache
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def prepare_value(self, value):
+        """
+        Convert a freshly computed value into the form that is cached and returned.
+
+        Parameters:
+            value: Value returned by the compute function.
+
+        Returns:
+            The value to cache (the value itself by default).
+        """
+        return value
+
+    def encode_shared(self, value):
+        """
+        Encode a cached value for the shared cache.
+
+        Parameters:
+            value: Cached value.
+
+        Returns:
+            The value to store in the shared cache (the value itself by default).
+        """
+        return value
+
+    def decode_shared(self, stored):
+        """
+        Decode a value read from the shared cache.
+
+        Parameters:
+            stored: Value stored by encode_shared().
+
+        Returns:
+            The cached value (the stored value itself by default).
+        """
+        return stored
+
+    async def get_or_compute_many(
+        self, keys: list[str], items: list, compute_many: Callable[[list], Awaitable[list]]
+    ) -> list:
+        """
+        Get the values of several keys, computing all misses in a single call.
+
+        Parameters:
+            keys (list[str]): Cache keys.
+            items (list): Input of each key passed to compute_many (e.g. the query text), in the order of keys.
+            compute_many (Callable): Coroutine function returning the values of a list of items, in order.
+
+        Returns:
+            list: Cached values (shared with other lookups, so they must not be modified), in the order of keys.
+
+        Raises:
+            Exception: Any error raised by compute_many (not cached, so the next lookup retries).
+        """
+        values = {}
+        waiting = {}
+        claimed = {}
+        for key, item in zip(keys, items, strict=True):
+            if key in values or key in waiting or key in claimed:
+                continue
+            value = self._get_local(key)
+            if value is not None:
+                values[key] = value
+            elif key in self._in_flight:
+                # Share one computation between concurrent lookups of the same key
+                waiting[key] = (item, self._in_flight[key])
+            else:
+                self._in_flight[key] = asyncio.get_running_loop().create_future()
+                claimed[key] = item
+
+        if claimed:
+            try:
+                values.update(await self._compute_claimed(claimed, compute_many))
+                for key in claimed:
+                    self._in_flight[key].set_result(values[key])
+            except asyncio.CancelledError:
+                for key in claimed:
+                    self._in_flight[key].cancel()
+                raise
+            except Exception as e:
+                for key in claimed:
+                    self._in_flight[key].set_exception(e)
+                    # Mark the exception as retrieved when nobody else was waiting for it
+                    self._in_flight[key].exception()
+                raise
+            finally:
+                for key in claimed:
+                    self._in_flight.pop(key, None)
+
+        for key, (item, in_flight) in waiting.items():
+            try:
+                values[key] = await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                if not in_flight.cancelled():
+                    raise
+                # The lookup this one waited for was cancelled, so compute the value here instead
+                values[key] = (await self.get_or_compute_many([key], [item], compute_many))[0]
+                continue
+            with self._lock:
+                self.coalesced += 1
+        return [values[key] for key in keys]
+
+    def stats(self) -> dict:
+        """
+        Get cache counters.
+
+        Returns:
+            dict: entries, hits, shared_hits, misses, coalesced, evictions, expirations and hit_rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round((self.hits + self.shared_hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self):
+        """
+        Drop every value held in this process (the shared cache is left as is).
+        """
+        with self._lock:
+            self._entries.clear()
+
+    async def _compute_claimed(self, claimed: dict, compute_many: Callable[[list], Awaitable[list]]) -> dict:
+        """Resolve claimed keys from the shared cache, computing the rest in one call."""
+        values = {}
+        missing = []
+        for key in claimed:
+            value = await self._get_shared(key)
+            if value is None:
+                missing.append(key)
+            else:
+                values[key] = value
+        if missing:
+            with self._lock:
+                self.misses += len(missing)
+            new_values = await compute_many([claimed[key] for key in missing])
+            for key, value in zip(missing, new_values, strict=True):
+                values[key] = self.prepare_value(value)
+                await self._put_shared(key, values[key])
+        for key, value in values.items():
+            self._put_local(key, value)
+        return values
+
+    def _get_local(self, key: str):
+        """Look up a key in this process, counting hits and expirations."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _put_local(self, key: str, value):
+        """Store a value in this process, evicting the least recently used entries."""
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def _get_shared(self, key: str):
+        """Look up a key in the shared cache. Failures are logged and treated as misses."""
+        if self.shared_cache is None:
+            return None
+        try:
+            stored = await self.shared_cache.aget(key)
+        except Exception as e:
+            logger.warning(f"Shared {self.description} lookup failed: {e}")
+            return None
+        if stored is None:
+            return None
+        with self._lock:
+            self.shared_hits += 1
+        return self.decode_shared(stored)
+
+    async def _put_shared(self, key: str, value):
+        """Store a value in the shared cache. Failures are logged and ignored."""
+        if self.shared_cache is None:
+            return
+        try:
+            await self.shared_cache.aset(key, self.encode_shared(value), timeout=self.ttl_seconds or None)
+        except Exception as e:
+            logger.warning(f"Shared {self.description} update failed: {e}")
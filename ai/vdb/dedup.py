@@ -0,0 +1,113 @@
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+
+import numpy as np
+
+from ai.vdb.embedding_cache import EmbeddingCache
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class DeduplicatingEmbedder:
+    """
+    Embeds each distinct document text only once across all collections being built.
+
+    Many verse strings are identical across Bible versions (and short verses repeat within
+    a version). Every text is claimed by the first batch that needs it; batches from other
+    versions that need the same text wait for that embedding instead of requesting their own.
+
+    With an embedding cache, finished vectors are handed to the cache and only in-flight
+    texts are tracked here. Without one, finished vectors are kept (as float32) until reset()
+    so later versions can reuse them. Thread-safe.
+    """
+
+    def __init__(self, embed_texts: Callable[[list[str]], list], embedding_cache: EmbeddingCache | None = None):
+        """
+        Initialize the deduplicating embedder.
+
+        Parameters:
+            embed_texts (Callable): Embeds a list of texts and returns one vector per text.
+            embedding_cache (EmbeddingCache | None): Persistent cache consulted before embedding.
+        """
+        self.embed_texts = embed_texts
+        self.embedding_cache = embedding_cache
+        self._lock = threading.Lock()
+        self._futures = {}
+        self.requested_texts = 0
+        self.embedded_texts = 0
+
+    def embed(self, texts: list[str]) -> list[np.ndarray]:
+        """
+        Get embeddings for texts, embedding only those no other batch has claimed.
+
+        Parameters:
+            texts (list[str]): Texts to embed (may contain duplicates).
+
+        Returns:
+            list[np.ndarray]: A float32 vector per input text, in input order.
+
+        Raises:
+            Exception: Any error raised while embedding the texts this call (or the batch it waited on) claimed.
+        """
+        results = {}
+        waiting = {}
+        claimed = []
+        distinct_texts = list(dict.fromkeys(texts))
+        # Read the cache in one call outside the lock; a text finishing elsewhere in between is
+        # at worst embedded twice, which costs a request but never changes a result
+        cached = self.embedding_cache.get_many(distinct_texts) if self.embedding_cache is not None else []
+        results.update((text, vector) for text, vector in zip(distinct_texts, cached) if vector is not None)
+        with self._lock:
+            self.requested_texts += len(texts)
+            for text in distinct_texts:
+                if text in results:
+                    continue
+                if text in self._futures:
+                    waiting[text] = self._futures[text]
+                    continue
+                self._futures[text] = Future()
+                claimed.append(text)
+            self.embedded_texts += len(claimed)
+
+        if claimed:
+            try:
+                embeddings = [np.asarray(embedding, dtype=np.float32) for embedding in self.embed_texts(claimed)]
+            except Exception as e:
+                with self._lock:
+                    for text in claimed:
+                        self._futures.pop(text).set_exception(e)
+                raise
+            # Hand the vectors to waiting batches before anything else can fail
+            with self._lock:
+                for text, embedding in zip(claimed, embeddings):
+                    results[text] = embedding
+                    self._futures[text].set_result(embedding)
+            if self.embedding_cache is not None:
+                try:
+                    self.embedding_cache.put_many(claimed, embeddings)
+                finally:
+                    # The cache serves finished texts, so only keep the vector when there is no cache
+                    with self._lock:
+                        for text in claimed:
+                            self._futures.pop(text, None)
+
+        for text, future in waiting.items():
+            results[text] = future.result()
+        return [results[text] for text in texts]
+
+    def reset(self):
+        """
+        Log deduplication statistics and release all retained vectors.
+        """
+        with self._lock:
+            if self.requested_texts:
+                logger.info(
+                    f"Embedded {self.embedded_texts} unique texts for {self.requested_texts} verses "
+                    f"({self.requested_texts - self.embedded_texts} served by deduplication or the cache)"
+                )
+            self._futures = {}
+            self.requested_texts = 0
+            self.embedded_texts = 0
@@ -1,12 +1,412 @@
+import asyncio
+import base64
 import logging
 import os
+import re
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from functools import partial
 
 import numpy as np
-from openai import AsyncOpenAI, OpenAI
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI, InternalServerError, OpenAI, RateLimitError
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Rough characters-per-token ratio used to estimate request sizes without a tokenizer.
+# Deliberately pessimistic (real English text is closer to 4) so estimates err on the large side.
+CHARACTERS_PER_TOKEN = 3
+
+# Errors worth retrying: the service was unreachable, overloaded or failed internally
+TRANSIENT_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+# Bad request messages of services rejecting a batch for its size (e.g. llama.cpp "input is too large
+# to process", vLLM "maximum context length"); any other 400 is a permanent client error
+OVERSIZED_REQUEST_MESSAGE = re.compile(
+    r"maximum context length|context length exceeded|too many tokens|input is too (large|long)|batch size",
+    re.IGNORECASE,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate how many tokens a text will occupy in the embedding model.
+
+    Parameters:
+        text (str): Text to estimate.
+
+    Returns:
+        int: Estimated token count (always at least 1).
+    """
+    return len(text) // CHARACTERS_PER_TOKEN + 1
+
+
+def split_prompts(prompts: list[str], max_items: int, max_tokens: int) -> list[list[str]]:
+    """
+    Split prompts into consecutive sub-batches that each fit in one embedding request.
+
+    A sub-batch is closed when adding the next prompt would exceed either max_items prompts
+    or max_tokens estimated tokens. A single prompt larger than max_tokens still gets its own
+    sub-batch so no prompt is ever dropped.
+
+    Parameters:
+        prompts (list[str]): Prompts to embed.
+        max_items (int): Maximum number of prompts per request.
+        max_tokens (int): Maximum estimated tokens per request.
+
+    Returns:
+        list[list[str]]: Sub-batches, in the order of prompts.
+    """
+    batches = []
+    batch = []
+    batch_tokens = 0
+    for prompt in prompts:
+        prompt_tokens = estimate_tokens(prompt)
+        # Close the current sub-batch if this prompt would overflow it
+        if batch and (len(batch) >= max_items or batch_tokens + prompt_tokens > max_tokens):
+            batches.append(batch)
+            batch = []
+            batch_tokens = 0
+        batch.append(prompt)
+        batch_tokens += prompt_tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def is_oversized_request_error(error: APIStatusError) -> bool:
+    """
+    Check whether the embedding service rejected a request because of its size.
+
+    Parameters:
+        error (APIStatusError): Error raised by the OpenAI client.
+
+    Returns:
+        bool: True for 413 responses and for 400 responses naming a context, token or batch size limit.
+    """
+    if error.status_code == 413:
+        return True
+    return error.status_code == 400 and bool(OVERSIZED_REQUEST_MESSAGE.search(f"{error.message} {error.body}"))
+
+
+def decode_embeddings(data: list) -> np.ndarray:
+    """
+    Decode the embeddings of an embedding response into one float32 matrix.
+
+    Embeddings requested with encoding_format="base64" arrive as base64 strings of little-endian
+    float32 values and are decoded without building Python floats. Services that ignore the
+    encoding format and return lists of floats are handled too.
+
+    Parameters:
+        data (list): Items of the embedding response, each with an "embedding" attribute.
+
+    Returns:
+        np.ndarray: Contiguous float32 matrix of shape (number of items, dimension).
+    """
+    rows = [
+        np.frombuffer(base64.b64decode(item.embedding), dtype="<f4")
+        if isinstance(item.embedding, str)
+        else np.asarray(item.embedding, dtype=np.float32)
+        for item in data
+    ]
+    if not rows:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.stack(rows).astype(np.float32, copy=False)
+
+
+def normalize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize every row of an embedding matrix in one vectorized operation.
+
+    Parameters:
+        embeddings (np.ndarray): Float32 matrix, one embedding per row.
+
+    Returns:
+        np.ndarray: Float32 matrix of unit length rows (rows of zeros stay zero).
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.where(norms > 0, norms, 1.0)
+
+
+class EmbeddingMicroBatcher:
+    """
+    Coalesces concurrent embedding calls into batched requests.
+
+    Texts of calls made within `max_wait_seconds` of each other are collected, identical texts
+    are embedded once, and the batch is sent as soon as the wait is over or `max_batch_size`
+    texts are pending. Each caller gets back the embeddings of its own texts, in order.
+    If the request fails, every caller of the batch receives the error.
+
+    Counters (calls, requests, texts) are available via stats().
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[list[str]], Awaitable[list]],
+        max_wait_seconds: float = 0.002,
+        max_batch_size: int = 64,
+    ):
+        """
+        Initialize the batcher.
+
+        Parameters:
+            send_batch (Callable): Coroutine function embedding a list of prompts in one request.
+            max_wait_seconds (float): How long the first call of a batch waits for others to join.
+            max_batch_size (int): Number of texts sent per request at most (larger batches are split).
+
+        Raises:
+            ValueError: If the wait is negative or the batch size is not positive.
+        """
+        if max_wait_seconds < 0 or max_batch_size < 1:
+            logger.error("Embedding micro-batch wait must not be negative and its size must be positive")
+            raise ValueError("Embedding micro-batch wait must not be negative and its size must be positive")
+        self.send_batch = send_batch
+        self.max_wait_seconds = max_wait_seconds
+        self.max_batch_size = max_batch_size
+        self._loop = None
+        self._pending = []
+        self._pending_size = 0
+        self._timer = None
+        self._tasks = set()
+        self.calls = 0
+        self.requests = 0
+        self.texts = 0
+
+    async def embed(self, texts: list[str]) -> list:
+        """
+        Embed texts together with the texts of concurrent calls.
+
+        Parameters:
+            texts (list[str]): Prompts to embed.
+
+        Returns:
+            list: One embedding per text, in order.
+
+        Raises:
+            Exception: Any error raised by send_batch for the batch these texts were sent in.
+        """
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Pending calls can only belong to the running event loop
+            self._loop = loop
+            self._pending = []
+            self._pending_size = 0
+            self._timer = None
+        future = loop.create_future()
+        self._pending.append((list(texts), future))
+        self._pending_size += len(texts)
+        self.calls += 1
+        if self._pending_size >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_seconds, self._flush)
+        return await future
+
+    def stats(self) -> dict:
+        """
+        Get batcher counters.
+
+        Returns:
+            dict: calls, requests, texts (distinct texts sent) and texts_per_request.
+        """
+        return {
+            "calls": self.calls,
+            "requests": self.requests,
+            "texts": self.texts,
+            "texts_per_request": round(self.texts / self.requests, 2) if self.requests else 0.0,
+        }
+
+    def _flush(self):
+        """Send every pending call as one batch (called by the timer or when the batch is full)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._pending_size = self._pending, [], 0
+        if not pending:
+            return
+        task = asyncio.ensure_future(self._send(pending))
+        # Keep a reference so the task is not garbage collected while it runs
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, pending: list):
+        """Embed the distinct texts of a batch and hand each caller its embeddings."""
+        distinct_texts = list(dict.fromkeys(text for texts, _ in pending for text in texts))
+        chunks = [
+            distinct_texts[start : start + self.max_batch_size]
+            for start in range(0, len(distinct_texts), self.max_batch_size)
+        ]
+        self.requests += len(chunks)
+        self.texts += len(distinct_texts)
+        try:
+            chunk_embeddings = await asyncio.gather(*(self.send_batch(chunk) for chunk in chunks))
+            embeddings_by_text = {}
+            for chunk, embeddings in zip(chunks, chunk_embeddings, strict=True):
+                embeddings_by_text.update(zip(chunk, embeddings, strict=True))
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for texts, future in pending:
+            if not future.done():
+                future.set_result([embeddings_by_text[text] for text in texts])
+
+
+class EmbeddingEndpoint:
+    """
+    One OpenAI-compatible embedding service behind an EmbeddingLoadBalancer.
+
+    Holds the endpoint's sync and async clients and the counters the balancer routes by:
+    requests in flight, consecutive failures and a moving average of request latency.
+    """
+
+    def __init__(self, base_url: str, client, async_client):
+        """
+        Initialize the endpoint.
+
+        Parameters:
+            base_url (str): Base URL of the embedding service.
+            client (OpenAI): Synchronous client of the service.
+            async_client (AsyncOpenAI): Asynchronous client of the service.
+        """
+        self.base_url = base_url
+        self.client = client
+        self.async_client = async_client
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.latency_seconds = None
+
+
+class EmbeddingLoadBalancer:
+    """
+    Routes embedding requests across several endpoints by least outstanding requests.
+
+    Each request goes to the healthy endpoint with the fewest requests in flight (ties go to the
+    endpoint with fewer recent failures, then the lower average latency, then round-robin).
+    An endpoint failing `failure_threshold` requests in a row is ejected for `ejection_seconds`,
+    after which it receives requests again; one success resets its failure count. When every
+    endpoint is ejected, requests are spread over all of them rather than refused.
+
+    Per-endpoint counters and latencies are available via stats().
+    """
+
+    def __init__(
+        self,
+        endpoints: list[EmbeddingEndpoint],
+        failure_threshold: int = 3,
+        ejection_seconds: float = 30,
+        latency_smoothing: float = 0.2,
+    ):
+        """
+        Initialize the load balancer.
+
+        Parameters:
+            endpoints (list[EmbeddingEndpoint]): Endpoints to route requests to.
+            failure_threshold (int): Consecutive failures that eject an endpoint.
+            ejection_seconds (float): How long an ejected endpoint receives no requests.
+            latency_smoothing (float): Weight of the latest request in the latency moving average.
+
+        Raises:
+            ValueError: If there are no endpoints or a setting is out of range.
+        """
+        if not endpoints or failure_threshold < 1 or ejection_seconds < 0 or not 0 < latency_smoothing <= 1:
+            logger.error("Embedding load balancer needs endpoints, a positive failure threshold and valid durations")
+            raise ValueError(
+                "Embedding load balancer needs endpoints, a positive failure threshold and valid durations"
+            )
+        self.endpoints = list(endpoints)
+        self.failure_threshold = failure_threshold
+        self.ejection_seconds = ejection_seconds
+        self.latency_smoothing = latency_smoothing
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def acquire(self) -> EmbeddingEndpoint:
+        """
+        Pick the endpoint for a request and count the request as in flight.
+
+        Every acquire() must be followed by a release() of the same endpoint.
+
+        Returns:
+            EmbeddingEndpoint: The chosen endpoint.
+        """
+        with self._lock:
+            now = time.monotonic()
+            # Rotate the starting point so ties are spread round-robin
+            start = self._next % len(self.endpoints)
+            self._next += 1
+            ordered = self.endpoints[start:] + self.endpoints[:start]
+            candidates = [endpoint for endpoint in ordered if endpoint.ejected_until <= now] or ordered
+            endpoint = min(
+                candidates,
+                key=lambda endpoint: (
+                    endpoint.outstanding,
+                    endpoint.consecutive_failures,
+                    endpoint.latency_seconds or 0.0,
+                ),
+            )
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint: EmbeddingEndpoint, elapsed_seconds: float, failed: bool = False):
+        """
+        Record the outcome of a request sent to an endpoint.
+
+        Parameters:
+            endpoint (EmbeddingEndpoint): Endpoint returned by acquire().
+            elapsed_seconds (float): Duration of the request.
+            failed (bool): Whether the endpoint failed (unreachable, overloaded or a server error).
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.requests += 1
+            if not failed:
+                endpoint.consecutive_failures = 0
+                endpoint.ejected_until = 0.0
+                if endpoint.latency_seconds is None:
+                    endpoint.latency_seconds = elapsed_seconds
+                else:
+                    endpoint.latency_seconds += self.latency_smoothing * (elapsed_seconds - endpoint.latency_seconds)
+                return
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if len(self.endpoints) > 1 and endpoint.consecutive_failures >= self.failure_threshold:
+                endpoint.ejected_until = time.monotonic() + self.ejection_seconds
+                logger.warning(
+                    f"Embedding endpoint {endpoint.base_url} failed {endpoint.consecutive_failures} requests in a row, "
+                    f"ejecting it for {self.ejection_seconds:.0f} s"
+                )
+
+    def stats(self) -> list[dict]:
+        """
+        Get per-endpoint counters.
+
+        Returns:
+            list[dict]: url, outstanding, requests, failures, ejected and latency_ms of each endpoint.
+        """
+        with self._lock:
+            now = time.monotonic()
+            return [
+                {
+                    "url": endpoint.base_url,
+                    "outstanding": endpoint.outstanding,
+                    "requests": endpoint.requests,
+                    "failures": endpoint.failures,
+                    "ejected": endpoint.ejected_until > now,
+                    "latency_ms": round(endpoint.latency_seconds * 1000, 1)
+                    if endpoint.latency_seconds is not None
+                    else None,
+                }
+                for endpoint in self.endpoints
+            ]
+
 
 class Embedding:
     """
@@ -20,10 +420,20 @@ class Embedding:
 
     Configuration from environment variables:
         - EMBEDDING_MODEL_ID: Model identifier (default: "Qwen/Qwen3-Embedding-0.6B")
-        - BASE_EMBEDDING_URL: Service endpoint (default: http://embedding:11435/v1)
+        - BASE_EMBEDDING_URL: Service endpoint (default: http://embedding:11435/v1), or a comma-separated list
+          of endpoints serving the same model, balanced by EmbeddingLoadBalancer
+        - EMBEDDING_EJECTION_FAILURES, EMBEDDING_EJECTION_SECONDS: Consecutive failures that take an endpoint
+          out of rotation (3 default) and for how long (30 default)
         - EMBEDDING_API_KEY: Authentication key
         - EMBEDDING_MODEL_QUERY_PROMPT: Template for query embeddings (optional)
         - EMBEDDING_MODEL_DOCUMENT_PROMPT: Template for document embeddings (optional)
+        - EMBEDDING_MICRO_BATCH_WAIT_MS, EMBEDDING_MICRO_BATCH_MAX_SIZE: Concurrent async_embed calls are
+          coalesced for up to this many milliseconds (2 default, 0 disables it) into requests of at most
+          this many texts (64 default), see EmbeddingMicroBatcher
+        - EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_MAX_TOKENS: Limits for each embedding request (128/4096 default),
+          larger batches are split into several requests
+        - EMBEDDING_MAX_RETRIES, EMBEDDING_RETRY_BACKOFF_MS: Retries of a failed request (3 default) and the
+          delay before the first one (500 ms default), doubled for every further retry
     """
 
     def __init__(self):
@@ -34,7 +444,8 @@ class Embedding:
         The embedding model ID must be set; raises ValueError if not provided.
 
         Raises:
-            ValueError: If EMBEDDING_MODEL_ID is not set.
+            ValueError: If EMBEDDING_MODEL_ID or BASE_EMBEDDING_URL is not set, or the request or load
+                balancing limits are invalid.
         """
         # Load and validate embedding model configuration
         self.model_name = str(os.getenv("EMBEDDING_MODEL_ID") or "Qwen/Qwen3-Embedding-0.6B").strip()
@@ -43,21 +454,36 @@ class Embedding:
             raise ValueError("Embedding model ID is not set")
         logger.info(f"Embedding model ID: {self.model_name}")
 
-        # Use pre-computed embedding URL from docker-compose or environment
-        base_url = str(os.getenv("BASE_EMBEDDING_URL") or "").strip()
-        if not base_url:
+        # Use pre-computed embedding URL(s) from docker-compose or environment
+        base_urls = [url.strip() for url in str(os.getenv("BASE_EMBEDDING_URL") or "").split(",") if url.strip()]
+        if not base_urls:
             logger.error("Base embedding URL is not set")
             raise ValueError("Base embedding URL is not set")
-        logger.info(f"Base embedding URL: {base_url}")
+        logger.info(f"Base embedding URL: {', '.join(base_urls)}")
 
         # Validate embedding API key
         api_key = str(os.getenv("EMBEDDING_API_KEY") or "").strip()
         if not api_key:
             logger.warning("Embedding API key is not set")
 
-        # Initialize both sync and async clients for OpenAI-compatible API
-        self.client = OpenAI(base_url=base_url, api_key=api_key)
-        self.async_client = AsyncOpenAI(base_url=base_url, api_key=api_key)
+        # Initialize both sync and async clients for each OpenAI-compatible endpoint. The clients do not retry
+        # on their own: retries go through EMBEDDING_MAX_RETRIES and the load balancer sees every failure
+        endpoints = [
+            EmbeddingEndpoint(
+                url,
+                OpenAI(base_url=url, api_key=api_key, max_retries=0),
+                AsyncOpenAI(base_url=url, api_key=api_key, max_retries=0),
+            )
+            for url in base_urls
+        ]
+        self.load_balancer = EmbeddingLoadBalancer(
+            endpoints,
+            failure_threshold=int(str(os.getenv("EMBEDDING_EJECTION_FAILURES") or 3).strip()),
+            ejection_seconds=float(str(os.getenv("EMBEDDING_EJECTION_SECONDS") or 30).strip()),
+        )
+        # Clients of the first endpoint (requests themselves go through the load balancer)
+        self.client = endpoints[0].client
+        self.async_client = endpoints[0].async_client
 
         # Load optional prompt templates for specialized embeddings
         self.query_template = str(os.getenv("EMBEDDING_MODEL_QUERY_PROMPT") or "").strip()
@@ -67,24 +493,73 @@ class Embedding:
         if not self.document_template:
             logger.warning("Embedding document template is not set")
 
+        # Coalesce concurrent async_embed calls (e.g. one query per web request) into batched requests
+        micro_batch_wait_ms = float(str(os.getenv("EMBEDDING_MICRO_BATCH_WAIT_MS") or 2).strip())
+        micro_batch_size = int(str(os.getenv("EMBEDDING_MICRO_BATCH_MAX_SIZE") or 64).strip())
+        if micro_batch_wait_ms > 0:
+            # Separate batchers for each return format, as arrays are requested base64-encoded
+            self.micro_batcher = EmbeddingMicroBatcher(
+                self._async_create_embeddings, micro_batch_wait_ms / 1000, micro_batch_size
+            )
+            self.array_micro_batcher = EmbeddingMicroBatcher(
+                partial(self._async_create_embeddings, as_array=True), micro_batch_wait_ms / 1000, micro_batch_size
+            )
+        else:
+            self.micro_batcher = None
+            self.array_micro_batcher = None
+
+        # Split large batches into requests the embedding runner accepts, retrying transient failures
+        self.max_batch_items = int(str(os.getenv("EMBEDDING_BATCH_SIZE") or 128).strip())
+        self.max_batch_tokens = int(str(os.getenv("EMBEDDING_BATCH_MAX_TOKENS") or 4096).strip())
+        self.max_retries = int(str(os.getenv("EMBEDDING_MAX_RETRIES") or 3).strip())
+        self.retry_backoff_seconds = float(str(os.getenv("EMBEDDING_RETRY_BACKOFF_MS") or 500).strip()) / 1000
+        if (
+            self.max_batch_items < 1
+            or self.max_batch_tokens < 1
+            or self.max_retries < 0
+            or self.retry_backoff_seconds < 0
+        ):
+            logger.error("Embedding request limits must be positive and retries must not be negative")
+            raise ValueError("Embedding request limits must be positive and retries must not be negative")
+
+        # Embedding dimension, discovered on first use by embedding_size()
+        self._embedding_size = None
+
     def embedding_size(self):
         """
         Get the dimensionality of embeddings from the model.
 
-        Makes a test embedding request to determine vector size.
+        Makes a test embedding request the first time it is called and caches the result.
+        The request is load balanced and retried like any other, so one unavailable endpoint
+        does not prevent startup.
 
         Returns:
             int: Embedding dimension (e.g., 256, 768, 1024).
         """
-        response = self.client.embeddings.create(model=self.model_name, input=["Hello, world!"])
-        return len(response.data[0].embedding)
+        if self._embedding_size is None:
+            self._embedding_size = len(self._create_embeddings(["Hello, world!"])[0])
+        return self._embedding_size
 
-    def embed(self, batch: list[str], prompt_type: str = "document", normalize: bool = False):
+    def stats(self) -> dict:
+        """
+        Get embedding request counters.
+
+        Returns:
+            dict: micro_batcher (query micro-batching counters, None when disabled) and endpoints
+                (per-endpoint counters and latency, see EmbeddingLoadBalancer.stats()).
+        """
+        return {
+            "micro_batcher": self.array_micro_batcher.stats() if self.array_micro_batcher is not None else None,
+            "endpoints": self.load_balancer.stats(),
+        }
+
+    def embed(self, batch: list[str], prompt_type: str = "document", normalize: bool = False, as_array: bool = False):
         """
         Generate embeddings for a batch of texts synchronously.
 
         Used primarily during vector database building for batch processing large volumes.
         Applies prompt templates if configured to optimize embeddings for search vs. indexing.
+        Batches over the request limits are split, and failed requests are retried (see _create_embeddings()).
 
         Parameters:
             batch (list[str]): List of text strings to embed.
@@ -92,54 +567,39 @@ class Embedding:
                 - "document": Text from documents being indexed (uses EMBEDDING_MODEL_DOCUMENT_PROMPT)
                 - "query": User search queries (uses EMBEDDING_MODEL_QUERY_PROMPT)
             normalize (bool): If True, L2-normalizes embeddings to unit vectors (default: False).
+            as_array (bool): If True, requests base64-encoded embeddings and returns them as one float32
+                matrix instead of lists of Python floats (default: False).
 
         Returns:
-            list: List of embedding vectors (each is a list of floats).
+            list | np.ndarray: List of embedding vectors (each is a list of floats), or a float32
+                matrix of shape (len(batch), dimension) when as_array is set.
 
         Raises:
             ValueError: If prompt_type is not "document" or "query".
         """
-        # Prepare prompts by applying template if configured
-        embeddings = []
+        batch_prompts = self._apply_template(batch, prompt_type)
+        if as_array:
+            embeddings = self._create_embeddings(batch_prompts, as_array=True)
+            return normalize_embeddings(embeddings) if normalize else embeddings
 
-        if prompt_type == "query":
-            # Apply query template if available, else use text as-is
-            batch_prompts = (
-                batch if self.query_template == "" else [self.query_template.format(text=text) for text in batch]
-            )
-            response = self.client.embeddings.create(model=self.model_name, input=batch_prompts)
-            embeddings = [item.embedding for item in response.data]
-        elif prompt_type == "document":
-            # Apply document template if available, else use text as-is
-            batch_prompts = (
-                batch if self.document_template == "" else [self.document_template.format(text=text) for text in batch]
-            )
-            response = self.client.embeddings.create(model=self.model_name, input=batch_prompts)
-            embeddings = [item.embedding for item in response.data]
-        else:
-            raise ValueError(f"Unknown prompt type: {prompt_type}")
+        embeddings = self._create_embeddings(batch_prompts)
 
         # Skip normalization if not requested
         if not normalize:
             return embeddings
 
         # L2-normalize embeddings to unit length vectors
-        normalized = []
-        for embedding in embeddings:
-            array = np.asarray(embedding, dtype=np.float32)
-            norm = np.linalg.norm(array)
-            if norm > 0:
-                array = array / norm
-            normalized.append(array.tolist())
-
-        return normalized
+        return normalize_embeddings(embeddings).tolist()
 
-    async def async_embed(self, batch: list[str], prompt_type: str = "document", normalize: bool = False):
+    async def async_embed(
+        self, batch: list[str], prompt_type: str = "document", normalize: bool = False, as_array: bool = False
+    ):
         """
         Generate embeddings for a batch of texts asynchronously.
 
         Used during query time and other async operations to avoid blocking the event loop.
         Applies prompt templates if configured to optimize embeddings for search vs. indexing.
+        Concurrent calls are sent together when micro-batching is enabled (see EmbeddingMicroBatcher).
 
         Parameters:
             batch (list[str]): List of text strings to embed.
@@ -147,44 +607,205 @@ class Embedding:
                 - "document": Text from documents being indexed (uses EMBEDDING_MODEL_DOCUMENT_PROMPT)
                 - "query": User search queries (uses EMBEDDING_MODEL_QUERY_PROMPT)
             normalize (bool): If True, L2-normalizes embeddings to unit vectors (default: False).
+            as_array (bool): If True, requests base64-encoded embeddings and returns them as one float32
+                matrix instead of lists of Python floats (default: False).
 
         Returns:
-            list: List of embedding vectors (each is a list of floats).
+            list | np.ndarray: List of embedding vectors (each is a list of floats), or a float32
+                matrix of shape (len(batch), dimension) when as_array is set.
 
         Raises:
             ValueError: If prompt_type is not "document" or "query".
         """
-        # Prepare prompts by applying template if configured
-        embeddings = []
+        batch_prompts = self._apply_template(batch, prompt_type)
+        if as_array:
+            rows = await self._async_embed_prompts(batch_prompts, as_array=True)
+            embeddings = np.stack(rows) if len(rows) else np.zeros((0, 0), dtype=np.float32)
+            return normalize_embeddings(embeddings) if normalize else embeddings
 
-        if prompt_type == "query":
-            # Apply query template if available, else use text as-is
-            batch_prompts = (
-                batch if self.query_template == "" else [self.query_template.format(text=text) for text in batch]
-            )
-            response = await self.async_client.embeddings.create(model=self.model_name, input=batch_prompts)
-            embeddings = [item.embedding for item in response.data]
-        elif prompt_type == "document":
-            # Apply document template if available, else use text as-is
-            batch_prompts = (
-                batch if self.document_template == "" else [self.document_template.format(text=text) for text in batch]
-            )
-            response = await self.async_client.embeddings.create(model=self.model_name, input=batch_prompts)
-            embeddings = [item.embedding for item in response.data]
-        else:
-            raise ValueError(f"Unknown prompt type: {prompt_type}")
+        embeddings = await self._async_embed_prompts(batch_prompts)
 
         # Skip normalization if not requested
         if not normalize:
             return embeddings
 
         # L2-normalize embeddings to unit length vectors
-        normalized = []
-        for embedding in embeddings:
-            array = np.asarray(embedding, dtype=np.float32)
-            norm = np.linalg.norm(array)
-            if norm > 0:
-                array = array / norm
-            normalized.append(array.tolist())
-
-        return normalized
+        return normalize_embeddings(embeddings).tolist()
+
+    def _apply_template(self, batch: list[str], prompt_type: str) -> list[str]:
+        """
+        Apply the prompt template of a prompt type to texts.
+
+        Parameters:
+            batch (list[str]): Texts to embed.
+            prompt_type (str): "document" or "query".
+
+        Returns:
+            list[str]: Prompts (the texts as-is when the template is not set).
+
+        Raises:
+            ValueError: If prompt_type is not "document" or "query".
+        """
+        if prompt_type == "query":
+            template = self.query_template
+        elif prompt_type == "document":
+            template = self.document_template
+        else:
+            raise ValueError(f"Unknown prompt type: {prompt_type}")
+        return batch if template == "" else [template.format(text=text) for text in batch]
+
+    async def _async_embed_prompts(self, prompts: list[str], as_array: bool = False):
+        """
+        Embed prompts (templates already applied), through the micro-batcher when it is enabled.
+
+        Parameters:
+            prompts (list[str]): Prompts to embed.
+            as_array (bool): Return float32 rows decoded from base64 instead of lists of floats.
+
+        Returns:
+            list | np.ndarray: One embedding vector per prompt.
+        """
+        micro_batcher = self.array_micro_batcher if as_array else self.micro_batcher
+        if micro_batcher is None:
+            return await self._async_create_embeddings(prompts, as_array=as_array)
+        return await micro_batcher.embed(prompts)
+
+    async def _async_create_embeddings(self, prompts: list[str], as_array: bool = False):
+        """
+        Embed prompts asynchronously, split into requests within the batch limits.
+
+        Sub-batches are sent concurrently and retried like in _create_embeddings().
+
+        Parameters:
+            prompts (list[str]): Prompts to embed.
+            as_array (bool): Request base64-encoded embeddings and decode them into a float32 matrix.
+
+        Returns:
+            list | np.ndarray: One embedding vector per prompt, in order.
+        """
+        batches = split_prompts(prompts, self.max_batch_items, self.max_batch_tokens)
+        results = await asyncio.gather(*(self._async_create_sub_batch(batch, as_array) for batch in batches))
+        return self._join_embeddings(results, as_array)
+
+    async def _async_create_sub_batch(self, prompts: list[str], as_array: bool):
+        """Send one sub-batch, retrying transient failures and halving oversized requests."""
+        attempt = 0
+        while True:
+            try:
+                return await self._async_request(prompts, as_array)
+            except TRANSIENT_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self._retry_delay(len(prompts), attempt, e))
+                attempt += 1
+            except APIStatusError as e:
+                if not is_oversized_request_error(e) or len(prompts) < 2:
+                    raise
+                logger.warning(
+                    f"Embedding request of {len(prompts)} texts was rejected ({e.status_code}), splitting it"
+                )
+                half = len(prompts) // 2
+                results = await asyncio.gather(
+                    self._async_create_sub_batch(prompts[:half], as_array),
+                    self._async_create_sub_batch(prompts[half:], as_array),
+                )
+                return self._join_embeddings(results, as_array)
+
+    def _create_embeddings(self, prompts: list[str], as_array: bool = False):
+        """
+        Embed prompts, split into requests within the batch limits.
+
+        Each sub-batch holds at most EMBEDDING_BATCH_SIZE prompts and EMBEDDING_BATCH_MAX_TOKENS
+        estimated tokens. Connection errors, rate limits and server errors are retried with
+        exponential backoff, and a sub-batch the service rejects as too large is split in half.
+
+        Parameters:
+            prompts (list[str]): Prompts to embed.
+            as_array (bool): Request base64-encoded embeddings and decode them into a float32 matrix.
+
+        Returns:
+            list | np.ndarray: One embedding vector per prompt, in order.
+
+        Raises:
+            openai.APIError: If a sub-batch still fails after all retries, or a single prompt is rejected.
+        """
+        batches = split_prompts(prompts, self.max_batch_items, self.max_batch_tokens)
+        return self._join_embeddings([self._create_sub_batch(batch, as_array) for batch in batches], as_array)
+
+    def _create_sub_batch(self, prompts: list[str], as_array: bool):
+        """Send one sub-batch, retrying transient failures and halving oversized requests."""
+        attempt = 0
+        while True:
+            try:
+                return self._request(prompts, as_array)
+            except TRANSIENT_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._retry_delay(len(prompts), attempt, e))
+                attempt += 1
+            except APIStatusError as e:
+                if not is_oversized_request_error(e) or len(prompts) < 2:
+                    raise
+                logger.warning(
+                    f"Embedding request of {len(prompts)} texts was rejected ({e.status_code}), splitting it"
+                )
+                half = len(prompts) // 2
+                results = [
+                    self._create_sub_batch(prompts[:half], as_array),
+                    self._create_sub_batch(prompts[half:], as_array),
+                ]
+                return self._join_embeddings(results, as_array)
+
+    def _request(self, prompts: list[str], as_array: bool):
+        """Send one request to the endpoint picked by the load balancer."""
+        endpoint = self.load_balancer.acquire()
+        started = time.perf_counter()
+        failed = False
+        try:
+            if as_array:
+                response = endpoint.client.embeddings.create(
+                    model=self.model_name, input=prompts, encoding_format="base64"
+                )
+                return decode_embeddings(response.data)
+            response = endpoint.client.embeddings.create(model=self.model_name, input=prompts)
+            return [item.embedding for item in response.data]
+        except TRANSIENT_ERRORS:
+            failed = True
+            raise
+        finally:
+            self.load_balancer.release(endpoint, time.perf_counter() - started, failed)
+
+    async def _async_request(self, prompts: list[str], as_array: bool):
+        """Send one asynchronous request to the endpoint picked by the load balancer."""
+        endpoint = self.load_balancer.acquire()
+        started = time.perf_counter()
+        failed = False
+        try:
+            if as_array:
+                response = await endpoint.async_client.embeddings.create(
+                    model=self.model_name, input=prompts, encoding_format="base64"
+                )
+                return decode_embeddings(response.data)
+            response = await endpoint.async_client.embeddings.create(model=self.model_name, input=prompts)
+            return [item.embedding for item in response.data]
+        except TRANSIENT_ERRORS:
+            failed = True
+            raise
+        finally:
+            self.load_balancer.release(endpoint, time.perf_counter() - started, failed)
+
+    def _retry_delay(self, size: int, attempt: int, error: Exception) -> float:
+        """Log a failed request and get the exponential backoff delay before retrying it."""
+        delay = self.retry_backoff_seconds * 2**attempt
+        logger.warning(
+            f"Embedding request of {size} texts failed ({type(error).__name__}), "
+            f"retry {attempt + 1}/{self.max_retries} in {delay:.2f} s"
+        )
+        return delay
+
+    @staticmethod
+    def _join_embeddings(results: list, as_array: bool):
+        """Concatenate the embeddings of consecutive sub-batches."""
+        if as_array:
+            return np.concatenate(results) if results else np.zeros((0, 0), dtype=np.float32)
+        return [embedding for embeddings in results for embedding in embeddings]
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Number of new embeddings held in memory before they are written to disk
+DEFAULT_FLUSH_THRESHOLD = 4096
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed cache of document embeddings.
+
+    Entries are keyed by (embedding model ID, document prompt template, SHA-256 of the text).
+    The model and template select a namespace directory, so changing either one never
+    returns stale vectors. Each namespace holds:
+        - embeddings.f32: Row-major float32 matrix of vectors, read through a memory map
+        - index.json: Mapping of text hash to row number in the matrix
+        - meta.json: Model ID, prompt template and vector dimension of the namespace
+
+    Rows are only ever appended after the last complete row, and the index is written after the
+    rows it points to, so an interrupted build leaves the cache consistent. The class is thread-safe.
+    """
+
+    def __init__(
+        self,
+        cache_directory: str | Path,
+        model_name: str,
+        document_template: str,
+        flush_threshold: int = DEFAULT_FLUSH_THRESHOLD,
+    ):
+        """
+        Open (or prepare) the cache namespace for a model and prompt template.
+
+        Nothing is written to disk until new embeddings are flushed.
+
+        Parameters:
+            cache_directory (str | Path): Root directory holding all cache namespaces.
+            model_name (str): Embedding model ID (EMBEDDING_MODEL_ID).
+            document_template (str): Document prompt template (EMBEDDING_MODEL_DOCUMENT_PROMPT).
+            flush_threshold (int): Number of pending embeddings that triggers a flush to disk.
+        """
+        self.model_name = model_name
+        self.document_template = document_template
+        self.flush_threshold = flush_threshold
+        namespace = hashlib.sha256(f"{model_name}\0{document_template}".encode("utf-8")).hexdigest()[:16]
+        self.directory = Path(cache_directory).joinpath(namespace)
+        self.matrix_path = self.directory.joinpath("embeddings.f32")
+        self.index_path = self.directory.joinpath("index.json")
+        self.meta_path = self.directory.joinpath("meta.json")
+
+        self._lock = threading.Lock()
+        self._index = {}
+        self._matrix = None
+        self._pending = {}
+        self.dimension = None
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @staticmethod
+    def text_key(text: str) -> str:
+        """
+        Hash a text into its cache key.
+
+        Parameters:
+            text (str): Text to hash.
+
+        Returns:
+            str: Hex SHA-256 digest of the UTF-8 text.
+        """
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._index) + len(self._pending)
+
+    def _load(self):
+        """
+        Load the index and memory-map the matrix of an existing namespace.
+
+        Index entries pointing past the end of the matrix (from an interrupted write) are dropped.
+        """
+        if not self.meta_path.exists() or not self.index_path.exists() or not self.matrix_path.exists():
+            return
+        try:
+            with self.meta_path.open("r", encoding="utf-8") as file:
+                self.dimension = int(json.load(file)["dimension"])
+            with self.index_path.open("r", encoding="utf-8") as file:
+                index = json.load(file)
+            rows = self._map_matrix()
+            self._index = {key: row for key, row in index.items() if row < rows}
+            logger.info(f"Loaded embedding cache with {len(self._index)} entries from {self.directory}")
+        except Exception as e:
+            logger.warning(f"Embedding cache at {self.directory} could not be loaded and will be ignored: {e}")
+            self._index = {}
+            self._matrix = None
+            self.dimension = None
+
+    def _map_matrix(self):
+        """
+        Memory-map the on-disk matrix read-only.
+
+        Returns:
+            int: Number of complete rows in the matrix.
+        """
+        rows = self.matrix_path.stat().st_size // (self.dimension * np.dtype(np.float32).itemsize)
+        self._matrix = (
+            np.memmap(self.matrix_path, dtype=np.float32, mode="r", shape=(rows, self.dimension)) if rows else None
+        )
+        return rows
+
+    def get_many(self, texts: list[str]) -> list[np.ndarray | None]:
+        """
+        Look up cached embeddings for a list of texts.
+
+        Parameters:
+            texts (list[str]): Texts to look up.
+
+        Returns:
+            list[np.ndarray | None]: A float32 vector for each hit, None for each miss, in input order.
+        """
+        results = []
+        with self._lock:
+            for text in texts:
+                key = self.text_key(text)
+                if key in self._pending:
+                    results.append(self._pending[key])
+                elif key in self._index:
+                    results.append(np.array(self._matrix[self._index[key]]))
+                else:
+                    results.append(None)
+            hit_count = sum(result is not None for result in results)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, texts: list[str], embeddings: list):
+        """
+        Add embeddings to the cache, flushing to disk once enough are pending.
+
+        Parameters:
+            texts (list[str]): Texts that were embedded.
+            embeddings (list): Embedding vectors, in the same order as texts.
+
+        Raises:
+            ValueError: If the vectors do not match the namespace dimension.
+        """
+        with self._lock:
+            for text, embedding in zip(texts, embeddings):
+                vector = np.asarray(embedding, dtype=np.float32)
+                if self.dimension is None:
+                    self.dimension = int(vector.shape[0])
+                if vector.shape != (self.dimension,):
+                    raise ValueError(
+                        f"Embedding dimension {vector.shape[0]} does not match cache dimension {self.dimension}"
+                    )
+                key = self.text_key(text)
+                if key not in self._index:
+                    self._pending[key] = vector
+            should_flush = len(self._pending) >= self.flush_threshold
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """
+        Write pending embeddings after the last indexed row of the matrix file and persist the index.
+
+        Does nothing if there are no pending embeddings.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+            # Write the new rows first so the index never points at missing data. They start right after
+            # the last complete row of the loaded matrix: a partial trailing row from an interrupted write,
+            # or a matrix the index could not be loaded for, is cut off so new index entries line up
+            first_row = self._matrix.shape[0] if self._matrix is not None else 0
+            keys = list(self._pending.keys())
+            offset_bytes = first_row * self.dimension * np.dtype(np.float32).itemsize
+            with self.matrix_path.open("r+b" if self.matrix_path.exists() else "wb") as file:
+                file.truncate(offset_bytes)
+                file.seek(offset_bytes)
+                file.write(np.stack([self._pending[key] for key in keys]).astype(np.float32).tobytes())
+            for offset, key in enumerate(keys):
+                self._index[key] = first_row + offset
+
+            self._write_json(
+                self.meta_path,
+                {"model": self.model_name, "document_template": self.document_template, "dimension": self.dimension},
+            )
+            self._write_json(self.index_path, self._index)
+            self._pending = {}
+            self._map_matrix()
+        logger.info(f"Flushed embedding cache to {self.directory} ({len(self._index)} entries)")
+
+    @staticmethod
+    def _write_json(path: Path, data: dict):
+        """
+        Atomically replace a JSON file.
+
+        Parameters:
+            path (Path): Destination file.
+            data (dict): JSON-serializable data.
+        """
+        temporary_path = path.with_suffix(path.suffix + ".tmp")
+        with temporary_path.open("w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(temporary_path, path)
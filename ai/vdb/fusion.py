@@ -0,0 +1,74 @@
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def normalize_scores(hits: list, higher_is_better: bool = True) -> list[float]:
+    """
+    Min-max normalize the distances of one result list into scores between 0 and 1.
+
+    Scores of different collections are not comparable as is (BM25 depends on each
+    collection's term statistics), so every list is rescaled before results are merged.
+
+    Parameters:
+        hits (list): Search results with a "distance" each.
+        higher_is_better (bool): Whether a larger distance means a better match (False for Hamming distance).
+
+    Returns:
+        list[float]: Normalized score of each hit (1.0 for the best, 0.0 for the worst, all 1.0 when they tie).
+    """
+    distances = [float(hit.get("distance", 0.0)) for hit in hits]
+    if not distances:
+        return []
+    if not higher_is_better:
+        distances = [-distance for distance in distances]
+    lowest = min(distances)
+    spread = max(distances) - lowest
+    if spread == 0:
+        return [1.0 for _ in distances]
+    return [(distance - lowest) / spread for distance in distances]
+
+
+def verse_key(hit: dict) -> tuple:
+    """
+    Identify the verse of a search result independently of its Bible version.
+
+    Parameters:
+        hit (dict): Search result with an "entity".
+
+    Returns:
+        tuple: (book, chapter, verse) of the hit.
+    """
+    entity = hit.get("entity", {})
+    return entity.get("book"), entity.get("chapter"), entity.get("verse")
+
+
+def merge_version_results(results_by_collection: dict[str, list], limit: int, higher_is_better: bool = True) -> list:
+    """
+    Merge the results of one query searched in several Bible versions.
+
+    Each collection's scores are normalized, verses found in several versions are kept
+    once (with the version that matched best), and the merged list is sorted by score.
+
+    Parameters:
+        results_by_collection (dict[str, list]): Search results per collection, in collection priority order.
+        limit (int): Maximum number of merged results.
+        higher_is_better (bool): Whether a larger distance means a better match.
+
+    Returns:
+        list[dict]: Hits with an added "score" (normalized, 0-1) and "versions" (collections that found the verse).
+    """
+    merged = {}
+    for collection_name, hits in results_by_collection.items():
+        for hit, score in zip(hits, normalize_scores(hits, higher_is_better)):
+            key = verse_key(hit)
+            if key not in merged:
+                merged[key] = {**hit, "score": score, "versions": [collection_name]}
+                continue
+            entry = merged[key]
+            entry["versions"].append(collection_name)
+            # Ties keep the earlier collection's wording
+            if score > entry["score"]:
+                merged[key] = {**hit, "score": score, "versions": entry["versions"]}
+    return sorted(merged.values(), key=lambda hit: hit["score"], reverse=True)[:limit]
@@ -0,0 +1,319 @@
+import json
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+
+import fAIth.bible_globals as bible_globals
+from ai.vdb.embedding import estimate_tokens
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def clean_verse_text(verse_text: str) -> str:
+    """
+    Remove the HTML tags used for display (e.g., <span class="wj">...</span>) from a verse.
+
+    Parameters:
+        verse_text (str): Verse text from the Bible data files.
+
+    Returns:
+        str: Verse text as stored and embedded.
+    """
+    return verse_text.replace('<span class="wj">', "").replace("</span>", "").strip()
+
+
+def read_chapter_verses(collection_name: str, book: str, chapter: int) -> list[dict]:
+    """
+    Load the verses of a single chapter as Milvus-ready records.
+
+    Header entries are skipped and HTML tags used for display (e.g., <span class="wj">...</span>)
+    are removed so only the verse text is stored and embedded.
+
+    Parameters:
+        collection_name (str): Bible version (also the collection name), e.g. "bsb".
+        book (str): Book name, e.g. "Genesis".
+        chapter (int): Chapter number.
+
+    Returns:
+        list[dict]: Records with text, version, book, chapter and verse keys.
+            Empty if the chapter file does not exist.
+    """
+    path = bible_globals.BIBLE_DATA_ROOT.joinpath(collection_name, book, f"{chapter}.json")
+    if not path.exists():
+        logger.error(f"Bible data file not found: {path}")
+        return []
+
+    with path.open("r", encoding="utf-8") as file:
+        json_data = json.load(file)
+
+    records = []
+    for verse, verse_text in json_data.items():
+        # Skip section headers
+        if "header_" in verse:
+            continue
+        records.append(
+            {
+                "text": clean_verse_text(verse_text),
+                "version": collection_name,
+                "book": book,
+                "chapter": chapter,
+                "verse": int(verse),
+            }
+        )
+    return records
+
+
+def iter_collection_chapters(collection_name: str) -> Iterator[tuple[str, int, Path]]:
+    """
+    Stream the chapter files of a Bible version in canonical order.
+
+    Parameters:
+        collection_name (str): Bible version (also the collection name), e.g. "bsb".
+
+    Yields:
+        tuple[str, int, Path]: Book name, chapter number and path of the chapter JSON file.
+    """
+    for book in bible_globals.IN_ORDER_BOOKS:
+        for chapter in range(1, bible_globals.CHAPTER_SELECTION[book] + 1):
+            yield book, chapter, bible_globals.BIBLE_DATA_ROOT.joinpath(collection_name, book, f"{chapter}.json")
+
+
+def iter_collection_verses(collection_name: str) -> Iterator[dict]:
+    """
+    Stream every verse record of a Bible version in canonical order.
+
+    Parameters:
+        collection_name (str): Bible version (also the collection name), e.g. "bsb".
+
+    Yields:
+        dict: Verse records as returned by read_chapter_verses().
+    """
+    for book, chapter, _ in iter_collection_chapters(collection_name):
+        yield from read_chapter_verses(collection_name, book, chapter)
+
+
+def chapter_progress(book: str, chapter: int) -> float:
+    """
+    Estimate how far through a Bible version a chapter is.
+
+    Parameters:
+        book (str): Book name, e.g. "Psalms".
+        chapter (int): Chapter number.
+
+    Returns:
+        float: Percentage of all chapters up to and including this one (0-100).
+    """
+    total_chapters = sum(bible_globals.CHAPTER_SELECTION[name] for name in bible_globals.IN_ORDER_BOOKS)
+    if not total_chapters or book not in bible_globals.IN_ORDER_BOOKS:
+        return 0.0
+    chapters_before = 0
+    for name in bible_globals.IN_ORDER_BOOKS:
+        if name == book:
+            break
+        chapters_before += bible_globals.CHAPTER_SELECTION[name]
+    return round(100 * (chapters_before + chapter) / total_chapters, 1)
+
+
+def batch_verses(records: Iterable[dict], max_items: int, max_tokens: int) -> Iterator[list[dict]]:
+    """
+    Group verse records into embedding batches, ignoring chapter and book boundaries.
+
+    A batch is closed when adding the next record would exceed either max_items records
+    or max_tokens estimated tokens. A single record larger than max_tokens still gets
+    its own batch so no verse is ever dropped.
+
+    Parameters:
+        records (Iterable[dict]): Verse records with a "text" key.
+        max_items (int): Maximum number of records per batch.
+        max_tokens (int): Maximum estimated tokens per batch.
+
+    Yields:
+        list[dict]: Consecutive batches of records.
+    """
+    batch = []
+    batch_tokens = 0
+    for record in records:
+        record_tokens = estimate_tokens(record["text"])
+        # Close the current batch if this record would overflow it
+        if batch and (len(batch) >= max_items or batch_tokens + record_tokens > max_tokens):
+            yield batch
+            batch = []
+            batch_tokens = 0
+        batch.append(record)
+        batch_tokens += record_tokens
+    if batch:
+        yield batch
+
+
+class IngestPipeline:
+    """
+    Bounded producer/consumer pipeline for loading verse batches into a collection.
+
+    Three stages run concurrently so neither the embedding service nor Milvus sits idle:
+        1. The calling thread reads chapter JSON and produces embedding batches.
+        2. A pool of embedding workers embeds up to `embedding_concurrency` batches at once.
+        3. A dedicated insert thread buffers embedded records in reading order and flushes them to Milvus.
+
+    The number of batches in flight is bounded, so memory stays flat regardless of how far
+    reading runs ahead of embedding or embedding runs ahead of inserting.
+
+    Several pipelines (one per collection) can share one embedding executor, so building
+    multiple versions at once never exceeds the embedding service's concurrency budget.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[list[dict]], list[dict]],
+        insert_records: Callable[[str, list[dict]], int],
+        embedding_concurrency: int = 1,
+        insert_batch_size: int = 2000,
+        embedding_executor: Executor | None = None,
+    ):
+        """
+        Initialize the pipeline.
+
+        Parameters:
+            embed_batch (Callable): Adds embeddings to a batch of records and returns it.
+                Called from worker threads, so it must be thread-safe.
+            insert_records (Callable): Inserts records into the named collection and returns
+                how many were inserted. Only ever called from the insert thread.
+            embedding_concurrency (int): Number of embedding requests allowed in flight.
+            insert_batch_size (int): Number of records buffered before each insert.
+            embedding_executor (Executor | None): Shared executor to embed batches on. If None, each
+                run uses its own pool of embedding_concurrency workers.
+
+        Raises:
+            ValueError: If embedding_concurrency or insert_batch_size is not positive.
+        """
+        if embedding_concurrency < 1 or insert_batch_size < 1:
+            raise ValueError("Embedding concurrency and insert batch size must be positive integers")
+        self.embed_batch = embed_batch
+        self.insert_records = insert_records
+        self.embedding_concurrency = embedding_concurrency
+        self.insert_batch_size = insert_batch_size
+        self.embedding_executor = embedding_executor
+        # Allow each worker one queued batch on top of the one it is embedding
+        self.max_pending_batches = embedding_concurrency * 2
+
+    def run(self, collection_name: str, batches: Iterable[list[dict]]) -> dict:
+        """
+        Embed and insert all batches into a collection.
+
+        Parameters:
+            collection_name (str): Target collection.
+            batches (Iterable[list[dict]]): Verse record batches, e.g. from batch_verses().
+
+        Returns:
+            dict: Ingest statistics with collection, verses, seconds and verses_per_second keys.
+
+        Raises:
+            Exception: The first error raised by an embedding or insert call.
+        """
+        start_time = time.perf_counter()
+        errors = []
+        inserted = [0]
+        insert_queue = queue.Queue(maxsize=self.max_pending_batches)
+        pending_slots = threading.BoundedSemaphore(self.max_pending_batches)
+
+        inserter = threading.Thread(
+            target=self._insert_worker,
+            args=(collection_name, insert_queue, pending_slots, errors, inserted),
+            name=f"ingest-insert-{collection_name}",
+            daemon=True,
+        )
+        inserter.start()
+
+        executor = self.embedding_executor
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=self.embedding_concurrency, thread_name_prefix=f"ingest-embed-{collection_name}"
+            )
+        try:
+            for batch in batches:
+                pending_slots.acquire()
+                # Stop producing work as soon as any stage has failed
+                if errors:
+                    pending_slots.release()
+                    break
+                try:
+                    future = executor.submit(self.embed_batch, batch)
+                except Exception:
+                    pending_slots.release()
+                    raise
+                # Queue batches in reading order, so they are inserted in order whichever finishes embedding first.
+                # The insert thread frees the slot once it has taken the embedded batch
+                insert_queue.put(future)
+        finally:
+            # Signal the insert thread that no more batches are coming and wait for it to drain
+            insert_queue.put(None)
+            inserter.join()
+            if executor is not self.embedding_executor:
+                executor.shutdown()
+
+        if errors:
+            raise errors[0]
+
+        seconds = time.perf_counter() - start_time
+        stats = {
+            "collection": collection_name,
+            "verses": inserted[0],
+            "seconds": round(seconds, 3),
+            "verses_per_second": round(inserted[0] / seconds, 2) if seconds > 0 else 0.0,
+        }
+        logger.info(
+            f"Ingested {stats['verses']} verses into {collection_name} in {stats['seconds']}s "
+            f"({stats['verses_per_second']} verses/sec)"
+        )
+        return stats
+
+    def _insert_worker(
+        self,
+        collection_name: str,
+        insert_queue: queue.Queue,
+        pending_slots: threading.BoundedSemaphore,
+        errors: list,
+        inserted: list,
+    ):
+        """
+        Consume embedded batches in reading order and flush them to Milvus in insert_batch_size chunks.
+
+        Keeps draining the queue after a failure so the reading thread never blocks on a full queue.
+
+        Parameters:
+            collection_name (str): Target collection.
+            insert_queue (queue.Queue): Futures of embedded batches in reading order, terminated by None.
+            pending_slots (threading.BoundedSemaphore): Batch slots of the run, freed as batches are taken.
+            errors (list): Shared list collecting the first errors of any stage.
+            inserted (list): Single-item list holding the running insert count.
+        """
+        insert_buffer = []
+        while True:
+            future = insert_queue.get()
+            if future is None:
+                break
+            try:
+                if errors:
+                    continue
+                insert_buffer.extend(future.result())
+                if len(insert_buffer) >= self.insert_batch_size:
+                    inserted[0] += self.insert_records(collection_name, insert_buffer)
+                    insert_buffer = []
+            except Exception as e:
+                logger.error(f"Error ingesting batch into {collection_name}: {e}")
+                errors.append(e)
+            finally:
+                # The batch has left the pipeline, so the reading thread may submit another one
+                pending_slots.release()
+
+        # Flush any remaining records
+        if insert_buffer and not errors:
+            try:
+                inserted[0] += self.insert_records(collection_name, insert_buffer)
+            except Exception as e:
+                logger.error(f"Error ingesting batch into {collection_name}: {e}")
+                errors.append(e)
@@ -0,0 +1,545 @@
+import logging
+import math
+import re
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from ai.vdb.dedup import DeduplicatingEmbedder
+from ai.vdb.ingest import batch_verses, iter_collection_verses
+from ai.vdb.scope import books_in_testament, scope_filter
+from ai.vdb.snapshot import VectorSnapshot, snapshot_path, source_data_checksum, write_snapshot
+from ai.vdb.storage import EmbeddingStorage
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# How the querier uses the in-process index: not at all, when Milvus fails or times out, or instead of Milvus
+LOCAL_SEARCH_MODES = ["off", "fallback", "primary"]
+
+# Words as split by Milvus' standard analyzer (lowercased)
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Lookup table of the 8 sign bits (+1/-1) of every byte value, most significant bit first (as np.packbits)
+BYTE_SIGNS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).astype(np.float32) * 2 - 1
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into lowercase words for BM25.
+
+    Parameters:
+        text (str): Verse or query text.
+
+    Returns:
+        list[str]: Lowercase words.
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Compact in-memory BM25 inverted index.
+
+    Postings are stored as flat NumPy arrays grouped by term, each with its precomputed BM25
+    weight, so scoring a query is one vectorized addition per query term. Uses the same
+    k1/b parameters as the Milvus sparse index.
+    """
+
+    def __init__(self, texts: list[str], k1: float = 1.2, b: float = 0.75):
+        """
+        Build the index.
+
+        Parameters:
+            texts (list[str]): Document texts; document IDs are their positions.
+            k1 (float): Term frequency saturation.
+            b (float): Document length normalization.
+        """
+        self.document_count = len(texts)
+        self.term_ids = {}
+        term_column, document_column, frequency_column = [], [], []
+        document_lengths = np.zeros(self.document_count, dtype=np.float32)
+        for document_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            document_lengths[document_id] = len(tokens)
+            for term, frequency in Counter(tokens).items():
+                term_column.append(self.term_ids.setdefault(term, len(self.term_ids)))
+                document_column.append(document_id)
+                frequency_column.append(frequency)
+
+        terms = np.asarray(term_column, dtype=np.int32)
+        order = np.argsort(terms, kind="stable")
+        self.postings = np.asarray(document_column, dtype=np.int32)[order]
+        frequencies = np.asarray(frequency_column, dtype=np.float32)[order]
+        document_frequencies = np.bincount(terms, minlength=len(self.term_ids))
+        self.offsets = np.concatenate([[0], np.cumsum(document_frequencies)]).astype(np.int64)
+
+        average_length = float(document_lengths.mean()) if self.document_count else 0.0
+        inverse_frequencies = np.log(
+            1 + (self.document_count - document_frequencies + 0.5) / (document_frequencies + 0.5)
+        ).astype(np.float32)
+        lengths = document_lengths[self.postings]
+        normalization = k1 * (1 - b + b * lengths / (average_length or 1.0))
+        self.weights = (
+            np.repeat(inverse_frequencies, document_frequencies)
+            * frequencies
+            * (k1 + 1)
+            / (frequencies + normalization)
+        ).astype(np.float32)
+
+    def scores(self, query: str) -> np.ndarray:
+        """
+        Score every document against a query.
+
+        Parameters:
+            query (str): Query text.
+
+        Returns:
+            np.ndarray: Float32 BM25 score per document (0 for documents without any query term).
+        """
+        scores = np.zeros(self.document_count, dtype=np.float32)
+        for term, count in Counter(tokenize(query)).items():
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            # Postings of a term are unique per document, so plain fancy-index addition is safe
+            scores[self.postings[start:end]] += count * self.weights[start:end]
+        return scores
+
+
+class LocalCollection:
+    """
+    One Bible version searchable in-process: verse columns, a BM25 index and optionally a dense matrix.
+
+    Dense vectors come from a snapshot (see VectorDatabaseBuilder.export_snapshot()), so they are
+    exactly the vectors Milvus holds. Float vectors are searched by cosine similarity with one
+    matrix product; binary vectors are scored asymmetrically against the float query, like
+    EmbeddingStorage.rerank(), through a per-byte lookup table.
+    """
+
+    def __init__(self, columns: dict, dense_matrix: np.ndarray | None = None):
+        """
+        Build the collection.
+
+        Parameters:
+            columns (dict): Arrays "text", "version", "book", "chapter" and "verse" with one entry per verse.
+            dense_matrix (np.ndarray | None): Unit-length float32 rows or packed uint8 sign bits, one row per verse.
+        """
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+        self.dense_matrix = dense_matrix
+        self.bm25 = BM25Index([str(text) for text in self.columns["text"]])
+
+    def __len__(self):
+        return len(self.columns["text"])
+
+    @classmethod
+    def from_bible_data(cls, collection_name: str):
+        """
+        Build a keyword-only collection from the Bible data files.
+
+        Parameters:
+            collection_name (str): Bible version, e.g. "bsb".
+
+        Returns:
+            LocalCollection: Collection without dense vectors.
+        """
+        records = list(iter_collection_verses(collection_name))
+        columns = {field: [record[field] for record in records] for field in ["text", "version", "book"]}
+        columns["chapter"] = np.array([record["chapter"] for record in records], dtype=np.int16)
+        columns["verse"] = np.array([record["verse"] for record in records], dtype=np.int16)
+        return cls(columns)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: VectorSnapshot, matrix_path: str | Path | None = None):
+        """
+        Build a collection from a snapshot, memory-mapping its dense vectors when a path is given.
+
+        The compressed snapshot cannot be memory-mapped, so its (normalized) dense matrix is written
+        once as a plain .npy file and mapped from there; it is rewritten when the snapshot is newer.
+
+        Parameters:
+            snapshot (VectorSnapshot): Loaded snapshot.
+            matrix_path (str | Path | None): .npy file for the memory-mapped dense matrix (None keeps it in memory).
+
+        Returns:
+            LocalCollection: Collection with the snapshot's verses and dense vectors (if any).
+        """
+        dense_matrix = snapshot.dense_embeddings
+        if dense_matrix is not None and dense_matrix.dtype != np.uint8:
+            dense_matrix = dense_matrix.astype(np.float32)
+            norms = np.linalg.norm(dense_matrix, axis=1, keepdims=True)
+            dense_matrix /= np.where(norms > 0, norms, 1.0)
+        if dense_matrix is not None and matrix_path is not None:
+            matrix_path = Path(matrix_path)
+            if not matrix_path.exists() or matrix_path.stat().st_mtime < snapshot.path.stat().st_mtime:
+                matrix_path.parent.mkdir(parents=True, exist_ok=True)
+                temporary_path = matrix_path.with_name(f"{matrix_path.stem}.tmp.npy")
+                np.save(temporary_path, dense_matrix)
+                temporary_path.replace(matrix_path)
+            dense_matrix = np.load(matrix_path, mmap_mode="r")
+        return cls(snapshot.columns, dense_matrix)
+
+    def scope_mask(
+        self,
+        book: str | None = None,
+        chapter_start: int | None = None,
+        chapter_end: int | None = None,
+        testament: str | None = None,
+    ) -> np.ndarray | None:
+        """
+        Select the verses within a search scope (see scope_filter()).
+
+        Parameters:
+            book (str | None): Only this book.
+            chapter_start (int | None): First chapter (requires book).
+            chapter_end (int | None): Last chapter (requires book, defaults to chapter_start).
+            testament (str | None): Only the "old" or "new" testament.
+
+        Returns:
+            np.ndarray | None: Boolean mask per verse, or None when unscoped.
+
+        Raises:
+            ValueError: If the scope is invalid.
+        """
+        # Validates the scope exactly like Milvus searches do
+        if not scope_filter(book=book, chapter_start=chapter_start, chapter_end=chapter_end, testament=testament):
+            return None
+        books = self.columns["book"]
+        mask = np.ones(len(self), dtype=bool)
+        if testament:
+            mask &= np.isin(books, books_in_testament(testament))
+        if book is not None:
+            mask &= books == book
+        if chapter_start is not None or chapter_end is not None:
+            chapter_start = int(chapter_start if chapter_start is not None else 1)
+            chapter_end = int(chapter_end if chapter_end is not None else chapter_start)
+            chapters = self.columns["chapter"]
+            mask &= (chapters >= chapter_start) & (chapters <= chapter_end)
+        return mask
+
+    def sparse_scores(self, query: str) -> np.ndarray:
+        """
+        Score every verse by BM25.
+
+        Parameters:
+            query (str): Query text.
+
+        Returns:
+            np.ndarray: Float32 score per verse.
+        """
+        return self.bm25.scores(query)
+
+    def dense_scores(self, query_embedding) -> np.ndarray:
+        """
+        Score every verse by similarity to the query embedding.
+
+        Parameters:
+            query_embedding (list | np.ndarray): Full float query embedding.
+
+        Returns:
+            np.ndarray: Float32 cosine similarity per verse (between the query and the signs for binary vectors).
+
+        Raises:
+            ValueError: If the collection has no dense vectors.
+        """
+        if self.dense_matrix is None:
+            logger.error("Local collection has no dense vectors")
+            raise ValueError("Local collection has no dense vectors")
+        if self.dense_matrix.dtype == np.uint8:
+            byte_count = self.dense_matrix.shape[1]
+            query = np.zeros(byte_count * 8, dtype=np.float32)
+            query_values = np.asarray(query_embedding, dtype=np.float32)[: byte_count * 8]
+            query[: query_values.shape[0]] = query_values
+            # Contribution of every possible byte value at every byte position, then one gather per verse
+            table = query.reshape(byte_count, 8) @ BYTE_SIGNS.T
+            scores = table[np.arange(byte_count), self.dense_matrix].sum(axis=1)
+            norm = float(np.linalg.norm(query_values)) * np.sqrt(query_values.shape[0])
+            return (scores / (norm if norm > 0 else 1.0)).astype(np.float32)
+        query = np.asarray(query_embedding, dtype=np.float32)[: self.dense_matrix.shape[1]]
+        norm = float(np.linalg.norm(query))
+        return np.asarray(self.dense_matrix @ (query / (norm if norm > 0 else 1.0)), dtype=np.float32)
+
+    def top_hits(self, scores: np.ndarray, limit: int, mask: np.ndarray | None, positive_only: bool = False) -> list:
+        """
+        Select the best verses of a score array as Milvus-style search hits.
+
+        Parameters:
+            scores (np.ndarray): Score per verse (higher is better).
+            limit (int): Maximum number of hits.
+            mask (np.ndarray | None): Verses allowed by the search scope.
+            positive_only (bool): Drop verses scoring 0 or less (BM25 verses without any query term).
+
+        Returns:
+            list[dict]: Hits with "id", "distance" and "entity" (version, book, chapter, verse, text).
+        """
+        candidates = np.ones(len(scores), dtype=bool) if mask is None else mask.copy()
+        if positive_only:
+            candidates &= scores > 0
+        indices = np.flatnonzero(candidates)
+        if limit < len(indices):
+            indices = indices[np.argpartition(-scores[indices], limit - 1)[:limit]]
+        indices = indices[np.argsort(-scores[indices], kind="stable")]
+        return [self._hit(int(index), float(scores[index])) for index in indices]
+
+    def _hit(self, index: int, score: float) -> dict:
+        """Build the search hit of a verse."""
+        return {
+            "id": index,
+            "distance": score,
+            "entity": {
+                "version": str(self.columns["version"][index]),
+                "book": str(self.columns["book"][index]),
+                "chapter": int(self.columns["chapter"][index]),
+                "verse": int(self.columns["verse"][index]),
+                "text": str(self.columns["text"][index]),
+            },
+        }
+
+
+def weighted_fusion(sparse_hits: list, dense_hits: list, sparse_weight: float, dense_weight: float, limit: int):
+    """
+    Fuse sparse and dense hits like Milvus' WeightedRanker.
+
+    BM25 scores are mapped to 0-1 with arctan and cosine similarities with (1 + x) / 2, then
+    combined as a weighted sum where a verse missing from one list contributes 0 for it.
+
+    Parameters:
+        sparse_hits (list): BM25 hits.
+        dense_hits (list): Dense hits.
+        sparse_weight (float): Weight of the BM25 score (SPARSE_WEIGHT).
+        dense_weight (float): Weight of the dense score (DENSE_WEIGHT).
+        limit (int): Maximum number of fused hits.
+
+    Returns:
+        list[dict]: Fused hits sorted by weighted score.
+    """
+    fused = {}
+    for hit in sparse_hits:
+        fused[hit["id"]] = {**hit, "distance": sparse_weight * (0.5 + math.atan(hit["distance"]) / math.pi)}
+    for hit in dense_hits:
+        score = dense_weight * (1 + hit["distance"]) / 2
+        if hit["id"] in fused:
+            fused[hit["id"]]["distance"] += score
+        else:
+            fused[hit["id"]] = {**hit, "distance": score}
+    return sorted(fused.values(), key=lambda hit: hit["distance"], reverse=True)[:limit]
+
+
+class LocalVectorIndex:
+    """
+    In-process search engine with the same results format as VectorDatabaseQuerier.search_many().
+
+    Serves searches from NumPy when Milvus is slow or down, or replaces Milvus entirely on small
+    single-node installs. A Bible version has about 31k verses, so brute-force scoring takes
+    milliseconds.
+    """
+
+    def __init__(self, database_type: str, sparse_weight: float = 0.2, dense_weight: float = 0.8):
+        """
+        Create an empty index.
+
+        Parameters:
+            database_type (str): "sparse", "dense" or "hybrid" (DATABASE_TYPE).
+            sparse_weight (float): Weight of BM25 scores in hybrid search.
+            dense_weight (float): Weight of dense scores in hybrid search.
+        """
+        self.database_type = database_type
+        self.sparse_weight = sparse_weight
+        self.dense_weight = dense_weight
+        self.collections = {}
+
+    def __contains__(self, collection_name: str) -> bool:
+        return collection_name in self.collections
+
+    @property
+    def collection_names(self) -> list[str]:
+        """
+        Names of the searchable collections.
+
+        Returns:
+            list[str]: Collection names in load order.
+        """
+        return list(self.collections)
+
+    @classmethod
+    def load(
+        cls,
+        collection_names: list[str],
+        database_type: str,
+        storage: EmbeddingStorage,
+        model_name: str,
+        document_template: str,
+        snapshot_directory: str | Path,
+        index_directory: str | Path | None = None,
+        sparse_weight: float = 0.2,
+        dense_weight: float = 0.8,
+    ):
+        """
+        Load the collections that can be searched locally.
+
+        Dense and hybrid databases need a snapshot built with the same embedding model, document
+        template, storage settings and Bible data. Without one, hybrid collections fall back to
+        BM25 only and dense collections are skipped (with a warning).
+
+        Parameters:
+            collection_names (list[str]): Bible versions to load.
+            database_type (str): "sparse", "dense" or "hybrid".
+            storage (EmbeddingStorage): Dense vector storage the snapshots must have been exported with.
+            model_name (str): Embedding model ID.
+            document_template (str): Document prompt template.
+            snapshot_directory (str | Path): Directory holding snapshots.
+            index_directory (str | Path | None): Directory for memory-mapped dense matrices (None keeps them in memory).
+            sparse_weight (float): Weight of BM25 scores in hybrid search.
+            dense_weight (float): Weight of dense scores in hybrid search.
+
+        Returns:
+            LocalVectorIndex: Index with every collection that could be loaded.
+        """
+        index = cls(database_type, sparse_weight, dense_weight)
+        for collection_name in collection_names:
+            try:
+                collection = cls._load_collection(
+                    collection_name=collection_name,
+                    database_type=database_type,
+                    storage=storage,
+                    model_name=model_name,
+                    document_template=document_template,
+                    snapshot_directory=snapshot_directory,
+                    index_directory=index_directory,
+                )
+            except Exception as e:
+                logger.warning(f"Local index for {collection_name} could not be loaded: {e}")
+                continue
+            if collection is not None:
+                index.collections[collection_name] = collection
+                logger.info(f"Loaded local index for {collection_name} ({len(collection)} verses)")
+        return index
+
+    @staticmethod
+    def _load_collection(
+        collection_name, database_type, storage, model_name, document_template, snapshot_directory, index_directory
+    ):
+        """Load one collection from its snapshot or, without dense vectors, from the Bible data files."""
+        path = snapshot_path(snapshot_directory, collection_name, model_name)
+        if database_type != "sparse" and path.exists():
+            snapshot = VectorSnapshot(path)
+            reason = snapshot.incompatibility(
+                {
+                    "embedding_model": model_name,
+                    "document_template": document_template,
+                    "embedding_storage": storage.signature,
+                    "source_checksum": source_data_checksum(collection_name),
+                    "needs_dense": True,
+                }
+            )
+            if reason is None:
+                matrix_path = Path(index_directory).joinpath(f"{path.stem}.npy") if index_directory else None
+                return LocalCollection.from_snapshot(snapshot, matrix_path)
+            logger.warning(f"Snapshot {path} cannot be searched locally because {reason}")
+        if database_type == "dense":
+            logger.warning(f"No usable snapshot for {collection_name}; it cannot be searched locally")
+            return None
+        if database_type == "hybrid":
+            logger.warning(f"No usable snapshot for {collection_name}; local searches use BM25 only")
+        return LocalCollection.from_bible_data(collection_name)
+
+    def search_many(
+        self,
+        collection_name: str,
+        queries: list[str],
+        query_embeddings: list | None,
+        limit: int = 10,
+        scope: dict | None = None,
+    ) -> list[list]:
+        """
+        Search one collection for several queries.
+
+        Parameters:
+            collection_name (str): Loaded collection.
+            queries (list[str]): Query texts.
+            query_embeddings (list | None): Full float query embeddings (None for sparse databases).
+            limit (int): Maximum number of results per query.
+            scope (dict | None): book, chapter_start, chapter_end and/or testament.
+
+        Returns:
+            list[list]: Hits of each query, in the order of queries.
+
+        Raises:
+            ValueError: If the collection is not loaded or the scope is invalid.
+        """
+        collection = self.collections.get(collection_name)
+        if collection is None:
+            logger.error(f"Collection {collection_name} is not in the local index")
+            raise ValueError(f"Collection {collection_name} is not in the local index")
+        mask = collection.scope_mask(**(scope or {}))
+        use_sparse = self.database_type != "dense"
+        use_dense = self.database_type != "sparse" and collection.dense_matrix is not None
+
+        results = []
+        for index, query in enumerate(queries):
+            sparse_hits = dense_hits = None
+            if use_sparse:
+                sparse_hits = collection.top_hits(collection.sparse_scores(query), limit, mask, positive_only=True)
+            if use_dense:
+                dense_hits = collection.top_hits(collection.dense_scores(query_embeddings[index]), limit, mask)
+            if sparse_hits is not None and dense_hits is not None:
+                results.append(weighted_fusion(sparse_hits, dense_hits, self.sparse_weight, self.dense_weight, limit))
+            else:
+                results.append(sparse_hits if sparse_hits is not None else dense_hits)
+        return results
+
+
+def build_local_snapshot(
+    collection_name: str,
+    database_type: str,
+    embedding_engine,
+    storage: EmbeddingStorage,
+    snapshot_directory: str | Path,
+    batch_size: int = 128,
+    batch_max_tokens: int = 4096,
+    embedding_cache=None,
+) -> Path:
+    """
+    Embed a Bible version without Milvus and write it as a snapshot the local index can load.
+
+    The snapshot is the same as one exported from a Milvus collection built with the same settings,
+    so it can also seed a later Milvus build (MILVUS_SNAPSHOT_RESTORE).
+
+    Parameters:
+        collection_name (str): Bible version, e.g. "bsb".
+        database_type (str): "dense" or "hybrid".
+        embedding_engine (Embedding): Embedding client.
+        storage (EmbeddingStorage): How dense vectors are stored.
+        snapshot_directory (str | Path): Directory to write the snapshot into.
+        batch_size (int): Maximum number of verses per embedding request.
+        batch_max_tokens (int): Maximum estimated tokens per embedding request.
+        embedding_cache (EmbeddingCache | None): Cache of document embeddings from previous builds.
+
+    Returns:
+        Path: Path of the written snapshot.
+    """
+    embedder = DeduplicatingEmbedder(
+        lambda texts: embedding_engine.embed(texts, prompt_type="document", normalize=False, as_array=True),
+        embedding_cache,
+    )
+    records = []
+    encoded = []
+    for batch in batch_verses(iter_collection_verses(collection_name), batch_size, batch_max_tokens):
+        embeddings = embedder.embed([record["text"] for record in batch])
+        records.extend(batch)
+        encoded.extend(storage.encode(embedding) for embedding in embeddings)
+    if embedding_cache is not None:
+        embedding_cache.flush()
+    metadata = {
+        "collection": collection_name,
+        "database_type": database_type,
+        "embedding_model": embedding_engine.model_name,
+        "document_template": embedding_engine.document_template,
+        "embedding_storage": storage.signature,
+        "source_checksum": source_data_checksum(collection_name),
+    }
+    path = snapshot_path(snapshot_directory, collection_name, embedding_engine.model_name)
+    write_snapshot(path, metadata, records, storage.to_array(encoded))
+    return path
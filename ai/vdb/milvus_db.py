@@ -1,8 +1,14 @@
+import asyncio
 import inspect
 import json
 import logging
 import os
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from pathlib import Path
 
+from django.core.cache import caches
 from pymilvus import (
     AnnSearchRequest,
     AsyncMilvusClient,
@@ -12,28 +18,85 @@ from pymilvus import (
     Function,
     FunctionType,
     MilvusClient,
-    WeightedRanker,
 )
 
 import fAIth.bible_globals as bible_globals
+from ai.vdb.build_report import BuildReport
+from ai.vdb.bulk_import import BulkImporter, BulkImportWriter
+from ai.vdb.checkpoint import IngestCheckpoint, file_checksum
+from ai.vdb.dedup import DeduplicatingEmbedder
 from ai.vdb.embedding import Embedding
+from ai.vdb.embedding_cache import EmbeddingCache
+from ai.vdb.fusion import merge_version_results
+from ai.vdb.ingest import (
+    IngestPipeline,
+    batch_verses,
+    chapter_progress,
+    iter_collection_chapters,
+    iter_collection_verses,
+    read_chapter_verses,
+)
+from ai.vdb.local_index import LOCAL_SEARCH_MODES, LocalVectorIndex
+from ai.vdb.query_cache import QueryEmbeddingCache
+from ai.vdb.rerank import diversify_results
+from ai.vdb.reranker import load_reranker
+from ai.vdb.result_cache import SearchResultCache, invalidate_search_results
+from ai.vdb.scope import scope_filter
+from ai.vdb.search_profiles import SEARCH_PROFILES, LatencyTracker, load_search_profiles
+from ai.vdb.snapshot import (
+    SNAPSHOT_FIELDS,
+    VectorSnapshot,
+    snapshot_path,
+    sort_canonically,
+    source_data_checksum,
+    write_snapshot,
+)
+from ai.vdb.storage import EmbeddingStorage
+from ai.vdb.verse_ids import hydrate_hits, pack_verse_id
+from fAIth.function_globals import derive_boolean_from_string
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Build artifacts (caches, checkpoints, ...) live under the git-ignored volumes directory by default
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_EMBEDDING_CACHE_DIRECTORY = PROJECT_ROOT.joinpath("volumes", "embedding_cache")
+DEFAULT_CHECKPOINT_DIRECTORY = PROJECT_ROOT.joinpath("volumes", "ingest_checkpoints")
+DEFAULT_SNAPSHOT_DIRECTORY = PROJECT_ROOT.joinpath("volumes", "vector_snapshots")
+DEFAULT_BUILD_REPORT_DIRECTORY = PROJECT_ROOT.joinpath("volumes", "build_reports")
+DEFAULT_LOCAL_INDEX_DIRECTORY = PROJECT_ROOT.joinpath("volumes", "local_index")
+
+# Partitions of collections that use "book" as partition key (books are hashed into partitions)
+BOOK_PARTITIONS = 64
+
 
 class VectorDatabaseBuilder:
     """
     Synchronous client for building and managing Milvus vector database collections.
 
     This class handles database and collection creation, schema definition, and data insertion.
-    It supports three embedding strategies: sparse (BM25), dense (HNSW), or hybrid (both).
+    It supports three embedding strategies: sparse (BM25), dense (HNSW, IVF_SQ8 or binary), or hybrid (both).
 
     Configuration is read from environment variables:
         - MILVUS_HOST, MILVUS_PORT: Connection details
         - MILVUS_DATABASE_NAME: Database name
         - MILVUS_USERNAME, MILVUS_PASSWORD: Authentication credentials
         - DATABASE_TYPE: "sparse", "dense", or "hybrid"
+        - EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_MAX_TOKENS: Limits for each embedding request (128/4096 default)
+        - MILVUS_INSERT_BATCH_SIZE: Number of records sent per insert request (2000 default)
+        - EMBEDDING_BUILD_CONCURRENCY: Number of embedding requests in flight while building (1 default)
+        - MILVUS_PARALLEL_COLLECTION_BUILDS: Number of collections built at the same time (4 default)
+        - MILVUS_INSERT_CONCURRENCY: Number of insert requests in flight across all builds (2 default)
+        - EMBEDDING_CACHE_ENABLED, EMBEDDING_CACHE_DIRECTORY: On-disk cache of document embeddings
+        - MILVUS_RESUMABLE_INGEST, MILVUS_CHECKPOINT_DIRECTORY: Per-chapter ingest checkpoints for resumable builds
+        - MILVUS_BULK_IMPORT (+ MILVUS_BULK_IMPORT_*): Load new collections with Milvus bulk import (False default)
+        - MILVUS_SNAPSHOT_DIRECTORY, MILVUS_SNAPSHOT_RESTORE: Prebuilt collection snapshots restored instead of embedding
+        - EMBEDDING_STORAGE_MODE, EMBEDDING_DIMENSIONS (+ see EmbeddingStorage): Dense vector storage and truncation
+        - MILVUS_BUILD_REPORT, MILVUS_BUILD_REPORT_DIRECTORY: JSON report of stage timings written after each build
+        - MILVUS_COMPACT_VERSE_IDS: Use packed verse ids as primary keys and drop "version" (and "text" for dense
+          databases) from the schema; searches hydrate them from ALL_VERSES (False default)
+        - SEARCH_RESULT_CACHE_ALIAS: Django cache shared with the web workers, used to invalidate their cached
+          search results of rebuilt collections
     """
 
     def __init__(self):
@@ -78,6 +141,85 @@ class VectorDatabaseBuilder:
                 f"Invalid database type: {self.database_type}. Valid database types are: sparse, dense, hybrid"
             )
 
+        # Load dense vector storage configuration (float, int8 or binary, optionally truncated)
+        self.embedding_storage = EmbeddingStorage.from_env()
+
+        # Use "book" as partition key so book and testament scoped searches only touch matching partitions
+        self.book_partition_key = derive_boolean_from_string(os.getenv("MILVUS_BOOK_PARTITION_KEY") or "True")
+
+        # Key verses by packed (book, chapter, verse) ids and leave out fields searches can hydrate from ALL_VERSES
+        self.compact_verse_ids = derive_boolean_from_string(os.getenv("MILVUS_COMPACT_VERSE_IDS") or "False")
+
+        # Load ingest batching configuration (batches span chapter and book boundaries)
+        self.embedding_batch_size = int(str(os.getenv("EMBEDDING_BATCH_SIZE") or 128).strip())
+        self.embedding_batch_max_tokens = int(str(os.getenv("EMBEDDING_BATCH_MAX_TOKENS") or 4096).strip())
+        self.insert_batch_size = int(str(os.getenv("MILVUS_INSERT_BATCH_SIZE") or 2000).strip())
+        if self.embedding_batch_size < 1 or self.embedding_batch_max_tokens < 1 or self.insert_batch_size < 1:
+            logger.error("Ingest batch sizes must be positive integers")
+            raise ValueError("Ingest batch sizes must be positive integers")
+        self.embedding_concurrency = int(str(os.getenv("EMBEDDING_BUILD_CONCURRENCY") or 1).strip())
+        if self.embedding_concurrency < 1:
+            logger.error("Embedding build concurrency must be a positive integer")
+            raise ValueError("Embedding build concurrency must be a positive integer")
+
+        # Load parallel build configuration (collections built at once and concurrent Milvus inserts)
+        self.parallel_collection_builds = int(str(os.getenv("MILVUS_PARALLEL_COLLECTION_BUILDS") or 4).strip())
+        self.insert_concurrency = int(str(os.getenv("MILVUS_INSERT_CONCURRENCY") or 2).strip())
+        if self.parallel_collection_builds < 1 or self.insert_concurrency < 1:
+            logger.error("Parallel collection builds and insert concurrency must be positive integers")
+            raise ValueError("Parallel collection builds and insert concurrency must be positive integers")
+        self._insert_slots = threading.BoundedSemaphore(self.insert_concurrency)
+        self._inserted_counts = {}
+
+        # Reuse document embeddings from previous builds with the same model and prompt template
+        if derive_boolean_from_string(os.getenv("EMBEDDING_CACHE_ENABLED") or "True"):
+            cache_directory = str(os.getenv("EMBEDDING_CACHE_DIRECTORY") or DEFAULT_EMBEDDING_CACHE_DIRECTORY).strip()
+            self.embedding_cache = EmbeddingCache(
+                cache_directory, self.embedding_engine.model_name, self.embedding_engine.document_template
+            )
+        else:
+            self.embedding_cache = None
+        # Share embeddings of identical verse texts across batches and versions
+        self.document_embedder = DeduplicatingEmbedder(self._embed_documents, self.embedding_cache)
+
+        # Record per-chapter ingest progress so interrupted or outdated builds can be resumed
+        self.resumable_ingest_enabled = derive_boolean_from_string(os.getenv("MILVUS_RESUMABLE_INGEST") or "True")
+        self.checkpoint_directory = str(
+            os.getenv("MILVUS_CHECKPOINT_DIRECTORY") or DEFAULT_CHECKPOINT_DIRECTORY
+        ).strip()
+        self._active_checkpoints = {}
+
+        # Prebuilt collection snapshots (exported with export_snapshot()) restored instead of re-embedding
+        self.snapshot_directory = str(os.getenv("MILVUS_SNAPSHOT_DIRECTORY") or DEFAULT_SNAPSHOT_DIRECTORY).strip()
+        self.snapshot_restore_enabled = derive_boolean_from_string(os.getenv("MILVUS_SNAPSHOT_RESTORE") or "True")
+
+        # Stage timings, payload sizes and memory use of the current build, written as JSON when it ends
+        self.build_report_enabled = derive_boolean_from_string(os.getenv("MILVUS_BUILD_REPORT") or "True")
+        self.build_report_directory = str(
+            os.getenv("MILVUS_BUILD_REPORT_DIRECTORY") or DEFAULT_BUILD_REPORT_DIRECTORY
+        ).strip()
+        self.build_report = BuildReport(self._build_signature())
+
+        # Web workers cache search results until a collection's generation in this cache changes
+        shared_cache_alias = str(os.getenv("SEARCH_RESULT_CACHE_ALIAS") or "").strip()
+        self.search_result_cache = caches[shared_cache_alias] if shared_cache_alias else None
+
+        # Optionally load new collections through Parquet files and a Milvus bulk import job
+        if derive_boolean_from_string(os.getenv("MILVUS_BULK_IMPORT") or "False"):
+            self.bulk_importer = BulkImporter(
+                milvus_url=self.milvus_url,
+                database_name=self.milvus_database_name,
+                api_key=f"{self.milvus_username}:{self.milvus_password}",
+                endpoint=str(os.getenv("MILVUS_BULK_IMPORT_S3_ENDPOINT") or "seaweedfs-s3:8333").strip(),
+                bucket_name=str(os.getenv("MILVUS_BULK_IMPORT_BUCKET") or "milvus-bucket").strip(),
+                access_key=str(os.getenv("MILVUS_BULK_IMPORT_ACCESS_KEY") or "minioadmin").strip(),
+                secret_key=str(os.getenv("MILVUS_BULK_IMPORT_SECRET_KEY") or "minioadmin").strip(),
+                secure=derive_boolean_from_string(os.getenv("MILVUS_BULK_IMPORT_S3_SECURE") or "False"),
+                timeout=float(str(os.getenv("MILVUS_BULK_IMPORT_TIMEOUT") or 1800).strip()),
+            )
+        else:
+            self.bulk_importer = None
+
         # Always create a root client with default credentials for initialization
         # This is needed to set up custom credentials, create databases, and manage users
         self.root_client = MilvusClient(uri=self.milvus_url, token="root:Milvus")
@@ -190,16 +332,27 @@ class VectorDatabaseBuilder:
             self.client.drop_collection(collection_name=collection_name)
         except Exception as e:
             logger.warning(f"Error dropping collection or collection does not exist: {e}")
+        invalidate_search_results(self.search_result_cache, collection_name)
 
-    def create_collections(self, collection_names: list[str] | None = None):
+    def create_collections(self, collection_names: list[str] | None = None, resume: bool = False):
         """
         Create collections with appropriate schema and build indices for all Bible verses.
 
         If no collection_names provided, creates collections for all enabled Bible versions.
         For each collection, drops any existing version, creates schema/indices, then loads verse data.
 
+        With resume=True (and MILVUS_RESUMABLE_INGEST enabled), existing collections are not dropped.
+        Instead their ingest checkpoint is used to finish interrupted builds and to re-ingest only
+        the chapters whose source JSON changed. Existing collections without a checkpoint are left
+        untouched, and collections whose checkpoint was written with different settings, or whose
+        schema no longer matches the embedding model and storage settings, are rebuilt.
+
         Parameters:
             collection_names (list): Specific collection names to create. If empty, uses VERSION_SELECTION.
+            resume (bool): Resume or incrementally update existing collections instead of rebuilding them.
+
+        Returns:
+            dict: Ingest statistics per populated collection name.
 
         Raises:
             ValueError: If any collection name is not in VERSION_SELECTION.
@@ -209,17 +362,17 @@ class VectorDatabaseBuilder:
             2. Create schema based on database_type (sparse/dense/hybrid)
             3. Configure indices (BM25 for sparse, HNSW for dense)
             4. Load verse data from Bible JSON files
-            5. Generate embeddings and insert into collections
+            5. Generate embeddings and insert into collections (several versions in parallel)
         """
         # Determine which collections to create
         collections_to_create = []
+        collections_to_resume = []
+        self.build_report = BuildReport(self._build_signature())
 
         # Option 1: Create all collections from VERSION_SELECTION
         if not collection_names:
             logger.info(f"Creating collections: {bible_globals.VERSION_SELECTION}")
-            for collection_name in bible_globals.VERSION_SELECTION:
-                self.drop_collection(collection_name)
-                collections_to_create.append(collection_name)
+            requested_collections = list(bible_globals.VERSION_SELECTION)
         # Option 2: Create only specified collections
         else:
             logger.info(f"Checking validity of collections: {collection_names}")
@@ -229,64 +382,353 @@ class VectorDatabaseBuilder:
                     logger.error(f"Collection {collection_name} does not exist. Skipping.")
                     raise ValueError(f"Collection {collection_name} does not exist.")
             logger.info(f"All collections are valid. Creating collections: {collection_names}")
-            for collection_name in collection_names:
-                self.drop_collection(collection_name)
+            requested_collections = list(collection_names)
+
+        # Decide which existing collections can be resumed instead of rebuilt
+        existing_collections = self.list_collections_in_database() if resume and self.resumable_ingest_enabled else []
+        for collection_name in requested_collections:
+            if collection_name not in existing_collections:
+                collections_to_create.append(collection_name)
+                continue
+            reason = self.schema_incompatibility(collection_name)
+            if reason is not None:
+                logger.info(f"Collection {collection_name} cannot be reused because {reason}. Rebuilding it.")
                 collections_to_create.append(collection_name)
+                continue
+            checkpoint = self._get_checkpoint(collection_name)
+            if not checkpoint.exists():
+                logger.info(f"Collection {collection_name} exists without an ingest checkpoint. Leaving it as is.")
+            elif checkpoint.load(self._build_signature()):
+                collections_to_resume.append(collection_name)
+            else:
+                logger.info(f"Collection {collection_name} was built with different settings. Rebuilding it.")
+                collections_to_create.append(collection_name)
+
+        if collections_to_create:
+            # Read the embedding dimension from existing collections before any of them are dropped
+            model_dimension = self._model_dimension() if self.database_type != "sparse" else None
+            for collection_name in collections_to_create:
+                self.drop_collection(collection_name)
+
+            # Define collection schema and indices based on database type
+            logger.info(f"Creating schema for {self.milvus_database_name}")
+            schema = self._create_schema(model_dimension)
+            index_params = self._create_index_params(schema)
+
+            # Create collections and indices
+            logger.info(f"Creating collections for {collections_to_create}")
+            for collection_name in collections_to_create:
+                self.client.create_collection(
+                    collection_name=collection_name, schema=schema, **self._partition_options()
+                )
+                with self.build_report.stage(collection_name, "index"):
+                    self.client.create_index(collection_name=collection_name, index_params=index_params, sync=True)
+            logger.info(f"Collections created: {collections_to_create}")
 
-        # Define collection schema based on database type
-        logger.info(f"Creating schema for {self.milvus_database_name}")
+        # Populate collections with Bible verse data
+        logger.info("Populating collections with verse data")
+        build_jobs = [(collection_name, {"schema": schema}) for collection_name in collections_to_create]
+        build_jobs += [(collection_name, {"resume": True}) for collection_name in collections_to_resume]
+        return self._populate_collections(build_jobs)
+
+    def _populate_collections(self, build_jobs: list[tuple[str, dict]]):
+        """
+        Populate several collections in parallel.
+
+        Up to MILVUS_PARALLEL_COLLECTION_BUILDS collections are read and inserted at once, while all of them
+        share one embedding executor (EMBEDDING_BUILD_CONCURRENCY workers) and one insert budget
+        (MILVUS_INSERT_CONCURRENCY), so adding a version does not add load on the embedding service or Milvus.
+        Collections that fail do not stop the others; the first error is raised once all builds have finished.
+
+        Parameters:
+            build_jobs (list[tuple[str, dict]]): Collection names with keyword arguments for populate_collection().
+
+        Returns:
+            dict: Ingest statistics per collection name.
+
+        Raises:
+            Exception: The first error raised while populating a collection.
+        """
+        results = {}
+        errors = []
+        if not build_jobs:
+            return results
+
+        with ThreadPoolExecutor(
+            max_workers=self.embedding_concurrency, thread_name_prefix="ingest-embed"
+        ) as embedding_executor:
+            with ThreadPoolExecutor(
+                max_workers=min(self.parallel_collection_builds, len(build_jobs)), thread_name_prefix="collection-build"
+            ) as build_executor:
+                futures = {}
+                for collection_name, options in build_jobs:
+                    if options.get("resume"):
+                        logger.info(f"Resuming ingest for {collection_name} collection")
+                    future = build_executor.submit(
+                        self.populate_collection, collection_name, embedding_executor=embedding_executor, **options
+                    )
+                    futures[future] = collection_name
+                for future in as_completed(futures):
+                    collection_name = futures[future]
+                    try:
+                        results[collection_name] = future.result()
+                    except Exception as e:
+                        logger.error(f"Error populating {collection_name} collection: {e}")
+                        errors.append(e)
+                    # Even a failed build may have changed the collection's verses
+                    invalidate_search_results(self.search_result_cache, collection_name)
+
+        self.document_embedder.reset()
+
+        # Per-version progress report
+        report = self.build_report.to_dict()
+        for collection_name, stats in results.items():
+            stage_seconds = report["collections"].get(collection_name, {}).get("stage_seconds", {})
+            logger.info(
+                f"{collection_name}: {stats['verses']} verses in {stats['seconds']}s "
+                f"({stats['verses_per_second']} verses/sec; "
+                + ", ".join(f"{stage} {seconds}s" for stage, seconds in stage_seconds.items())
+                + ")"
+            )
+        if self.database_type != "sparse":
+            logger.info(f"Embedding endpoints: {self.embedding_engine.load_balancer.stats()}")
+        self.write_build_report()
+        if errors:
+            raise errors[0]
+        return results
+
+    def write_build_report(self):
+        """
+        Write the report of the current build to MILVUS_BUILD_REPORT_DIRECTORY.
+
+        Nothing is written when reports are disabled or the build had nothing to do.
+        Failing to write the report never fails the build.
+
+        Returns:
+            Path | None: Path of the written report.
+        """
+        if not self.build_report_enabled or not self.build_report.has_activity:
+            return None
+        try:
+            path = self.build_report.write(self.build_report_directory)
+        except Exception as e:
+            logger.warning(f"Build report could not be written: {e}")
+            return None
+        logger.info(f"Build report written to {path}")
+        return path
+
+    def _create_schema(self, model_dimension: int | None = None):
+        """
+        Define the collection schema for the configured database type.
+
+        The embedding settings the collection is built with are stored as JSON in the schema
+        description (see read_collection_metadata()).
+
+        Parameters:
+            model_dimension (int | None): Full embedding dimension of the model. Requested from the
+                embedding service when not given (dense and hybrid only).
+
+        Returns:
+            CollectionSchema: Schema with the vector fields needed for sparse, dense or hybrid search.
+        """
+        if self.database_type != "sparse":
+            if model_dimension is None:
+                model_dimension = self.embedding_engine.embedding_size()
+            vector_data_type = self.embedding_storage.vector_data_type
+            vector_dimension = self.embedding_storage.stored_dimension(model_dimension)
+        description = json.dumps(self._collection_metadata(model_dimension))
+
+        # Compact collections use packed verse ids as primary key (see pack_verse_id())
+        id_field = FieldSchema(name="id", dtype=DataType.INT64, is_primary=True)
+        verse_fields = [
+            FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=2048, enable_analyzer=True),
+            FieldSchema(name="version", dtype=DataType.VARCHAR, max_length=8),
+            FieldSchema(name="book", dtype=DataType.VARCHAR, max_length=32, is_partition_key=self.book_partition_key),
+            FieldSchema(name="chapter", dtype=DataType.INT16),
+            FieldSchema(name="verse", dtype=DataType.INT16),
+        ]
+        hydrated_fields = self._hydrated_fields()
+        verse_fields = [field for field in verse_fields if field.name not in hydrated_fields]
 
         if self.database_type == "sparse":
             # Sparse-only schema (BM25 keyword search)
-            schema = CollectionSchema(
-                fields=[
-                    FieldSchema(name="id", dtype=DataType.INT64, is_primary=True),
-                    FieldSchema(name="sparse_embedding", dtype=DataType.SPARSE_FLOAT_VECTOR),
-                    FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=2048, enable_analyzer=True),
-                    FieldSchema(name="version", dtype=DataType.VARCHAR, max_length=8),
-                    FieldSchema(name="book", dtype=DataType.VARCHAR, max_length=32),
-                    FieldSchema(name="chapter", dtype=DataType.INT16),
-                    FieldSchema(name="verse", dtype=DataType.INT16),
-                ],
-                auto_id=True,
-            )
+            vector_fields = [FieldSchema(name="sparse_embedding", dtype=DataType.SPARSE_FLOAT_VECTOR)]
         elif self.database_type == "dense":
             # Dense-only schema (semantic similarity search)
-            schema = CollectionSchema(
-                fields=[
-                    FieldSchema(name="id", dtype=DataType.INT64, is_primary=True),
-                    FieldSchema(
-                        name="dense_embedding", dtype=DataType.FLOAT_VECTOR, dim=self.embedding_engine.embedding_size()
-                    ),
-                    FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=2048, enable_analyzer=True),
-                    FieldSchema(name="version", dtype=DataType.VARCHAR, max_length=8),
-                    FieldSchema(name="book", dtype=DataType.VARCHAR, max_length=32),
-                    FieldSchema(name="chapter", dtype=DataType.INT16),
-                    FieldSchema(name="verse", dtype=DataType.INT16),
-                ],
-                auto_id=True,
-            )
+            vector_fields = [FieldSchema(name="dense_embedding", dtype=vector_data_type, dim=vector_dimension)]
         elif self.database_type == "hybrid":
             # Hybrid schema (both keyword and semantic search)
-            schema = CollectionSchema(
-                fields=[
-                    FieldSchema(name="id", dtype=DataType.INT64, is_primary=True),
-                    FieldSchema(
-                        name="dense_embedding", dtype=DataType.FLOAT_VECTOR, dim=self.embedding_engine.embedding_size()
-                    ),
-                    FieldSchema(name="sparse_embedding", dtype=DataType.SPARSE_FLOAT_VECTOR),
-                    FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=2048, enable_analyzer=True),
-                    FieldSchema(name="version", dtype=DataType.VARCHAR, max_length=8),
-                    FieldSchema(name="book", dtype=DataType.VARCHAR, max_length=32),
-                    FieldSchema(name="chapter", dtype=DataType.INT16),
-                    FieldSchema(name="verse", dtype=DataType.INT16),
-                ],
-                auto_id=True,
+            vector_fields = [
+                FieldSchema(name="dense_embedding", dtype=vector_data_type, dim=vector_dimension),
+                FieldSchema(name="sparse_embedding", dtype=DataType.SPARSE_FLOAT_VECTOR),
+            ]
+
+        schema = CollectionSchema(
+            fields=[id_field, *vector_fields, *verse_fields],
+            auto_id=not self.compact_verse_ids,
+            description=description,
+        )
+        return schema
+
+    def _hydrated_fields(self):
+        """
+        List the verse fields compact collections leave out because searches hydrate them from ALL_VERSES.
+
+        Returns:
+            set[str]: "version" (the collection name), and "text" for dense databases (BM25 needs the text).
+                Empty unless MILVUS_COMPACT_VERSE_IDS is enabled.
+        """
+        if not self.compact_verse_ids:
+            return set()
+        return {"version", "text"} if self.database_type == "dense" else {"version"}
+
+    def _compact_record(self, record: dict):
+        """
+        Convert a verse record to the row stored in a compact collection.
+
+        Parameters:
+            record (dict): Verse record with text, version, book, chapter and verse keys.
+
+        Returns:
+            dict: Row with the packed verse id and without the hydrated fields.
+        """
+        hydrated_fields = self._hydrated_fields()
+        row = {key: value for key, value in record.items() if key not in hydrated_fields}
+        row["id"] = pack_verse_id(record["book"], record["chapter"], record["verse"])
+        return row
+
+    def _collection_metadata(self, model_dimension: int | None):
+        """
+        Describe the embedding settings a collection is built with.
+
+        Parameters:
+            model_dimension (int | None): Full embedding dimension of the model (None for sparse databases).
+
+        Returns:
+            dict: Database type, and for dense and hybrid databases the embedding model,
+                its full dimension and the dense vector storage. Compact collections also record
+                "verse_ids": "packed".
+        """
+        metadata = {"database_type": self.database_type}
+        if self.database_type != "sparse":
+            metadata["embedding_model"] = str(self.embedding_engine.model_name)
+            metadata["embedding_dimension"] = model_dimension
+            metadata["embedding_storage"] = self.embedding_storage.signature
+        if self.compact_verse_ids:
+            metadata["verse_ids"] = "packed"
+        return metadata
+
+    def read_collection_metadata(self, collection_name: str):
+        """
+        Read the embedding settings recorded in a collection's schema description.
+
+        Parameters:
+            collection_name (str): Collection name.
+
+        Returns:
+            tuple[dict, dict | None]: The collection description from Milvus, and the recorded
+                settings (None for collections created before they were recorded).
+        """
+        description = self.client.describe_collection(collection_name=collection_name)
+        recorded_settings = description.get("description")
+        if not isinstance(recorded_settings, str):
+            return description, None
+        try:
+            metadata = json.loads(recorded_settings)
+        except ValueError:
+            return description, None
+        return description, metadata if isinstance(metadata, dict) else None
+
+    def _model_dimension(self):
+        """
+        Get the full embedding dimension of the model without an embedding request if possible.
+
+        Uses the dimension recorded by any existing collection built with the same model,
+        and asks the embedding service (once per process) otherwise.
+
+        Returns:
+            int: Full embedding dimension of the model.
+        """
+        for collection_name in self.list_collections_in_database():
+            _, metadata = self.read_collection_metadata(collection_name)
+            if (
+                metadata
+                and metadata.get("embedding_model") == str(self.embedding_engine.model_name)
+                and metadata.get("embedding_dimension")
+            ):
+                return int(metadata["embedding_dimension"])
+        return self.embedding_engine.embedding_size()
+
+    def schema_incompatibility(self, collection_name: str):
+        """
+        Check whether an existing collection matches the current database type, model and storage settings.
+
+        Only Milvus metadata is compared, so this never calls the embedding service. A different book
+        partition key is only logged, as searches work either way.
+
+        Parameters:
+            collection_name (str): Existing collection name.
+
+        Returns:
+            str | None: Why the collection cannot be reused, or None if it matches.
+        """
+        description, metadata = self.read_collection_metadata(collection_name)
+        fields = {field.get("name"): field for field in description.get("fields", [])}
+        needs_dense = self.database_type != "sparse"
+        needs_sparse = self.database_type != "dense"
+        if ("dense_embedding" in fields) != needs_dense or ("sparse_embedding" in fields) != needs_sparse:
+            return "its vector fields do not match DATABASE_TYPE"
+        if bool(fields.get("book", {}).get("is_partition_key")) != self.book_partition_key:
+            # Searches work either way, so collections built before the setting existed are not re-embedded
+            logger.warning(
+                f"{collection_name} book partition key does not match MILVUS_BOOK_PARTITION_KEY, "
+                "rebuild the collection to change it"
             )
+        if bool(metadata and metadata.get("verse_ids") == "packed") != self.compact_verse_ids:
+            return "its verse ids do not match MILVUS_COMPACT_VERSE_IDS"
+        if not needs_dense:
+            return None
+        dense_field = fields["dense_embedding"]
+        if dense_field.get("type") != self.embedding_storage.vector_data_type:
+            return "its dense vector type does not match EMBEDDING_STORAGE_MODE"
+        if metadata is None:
+            # Created before the embedding settings were recorded; only the field type can be checked
+            return None
+        if metadata.get("embedding_model") != str(self.embedding_engine.model_name):
+            return "it was built with a different embedding model"
+        if metadata.get("embedding_storage") != self.embedding_storage.signature:
+            return "it was built with different embedding storage settings"
+        if not metadata.get("embedding_dimension"):
+            return None
+        stored_dimension = self.embedding_storage.stored_dimension(int(metadata["embedding_dimension"]))
+        if int(dense_field.get("params", {}).get("dim", 0)) != stored_dimension:
+            return "its dense vector dimension differs"
+        return None
+
+    def _partition_options(self):
+        """
+        Get the create_collection() options for the book partition key.
 
-        # Configure indices for the schema
+        Returns:
+            dict: num_partitions when "book" is the partition key, otherwise nothing.
+        """
+        return {"num_partitions": BOOK_PARTITIONS} if self.book_partition_key else {}
+
+    def _create_index_params(self, schema: CollectionSchema):
+        """
+        Configure the indices for a schema, adding the BM25 function to the schema when needed.
+
+        Parameters:
+            schema (CollectionSchema): Schema returned by _create_schema().
+
+        Returns:
+            IndexParams: Index parameters to pass to create_index().
+        """
         index_params = self.client.prepare_index_params()
 
+        # Sorted scalar index for chapter range filters of scoped searches
+        index_params.add_index(field_name="chapter", index_type="STL_SORT")
+
         # Add sparse (BM25) index if using sparse or hybrid mode
         if self.database_type == "sparse" or self.database_type == "hybrid":
             # BM25 function generates sparse embeddings from text field
@@ -305,78 +747,417 @@ class VectorDatabaseBuilder:
                 params={"inverted_index_algo": "DAAT_MAXSCORE", "bm25_k1": 1.2, "bm25_b": 0.75},
             )
 
-        # Add dense (HNSW) index if using dense or hybrid mode
+        # Add dense index if using dense or hybrid mode
         if self.database_type == "dense" or self.database_type == "hybrid":
-            # HNSW index for fast approximate nearest neighbor search
-            index_params.add_index(
-                field_name="dense_embedding",
-                index_type="HNSW",
-                metric_type="COSINE",
-                params={"M": 32, "efConstruction": 256},
-                index_name="hnsw_embedding",
+            # HNSW (float), IVF_SQ8 (int8) or BIN_FLAT (binary) index depending on EMBEDDING_STORAGE_MODE
+            index_params.add_index(field_name="dense_embedding", **self.embedding_storage.index_params())
+
+        return index_params
+
+    def populate_collection(
+        self,
+        collection_name: str,
+        resume: bool = False,
+        schema: CollectionSchema | None = None,
+        embedding_executor: Executor | None = None,
+    ):
+        """
+        Stream every verse of a Bible version into its collection.
+
+        Verses are grouped into token-aware embedding batches that span chapter and book
+        boundaries. Reading, embedding (EMBEDDING_BUILD_CONCURRENCY requests in flight) and
+        inserting run as overlapping pipeline stages, and embedded records are buffered so
+        Milvus receives a few large inserts instead of one per chapter.
+
+        When resumable ingest is enabled, per-chapter progress is recorded in an ingest
+        checkpoint. With resume=True, chapters already completed from an unchanged source
+        file are skipped, and partially ingested or changed chapters are deleted and re-ingested.
+
+        Time spent reading the Bible data, embedding and inserting is recorded in the build report.
+
+        When MILVUS_BULK_IMPORT is enabled and the schema of a freshly created collection is
+        given, records are written to Parquet files in object storage instead of being inserted
+        row-wise, and loaded with a single Milvus bulk import job once all verses are embedded.
+
+        A fresh build restores a compatible snapshot from MILVUS_SNAPSHOT_DIRECTORY (see
+        export_snapshot()) when MILVUS_SNAPSHOT_RESTORE is enabled, so no verse is re-embedded.
+
+        Parameters:
+            collection_name (str): Name of the (already created) collection to populate.
+            resume (bool): Continue from the collection's checkpoint instead of starting fresh.
+            schema (CollectionSchema): Schema of a freshly created collection, required for bulk import.
+            embedding_executor (Executor | None): Embedding executor shared with other collection builds.
+
+        Returns:
+            dict: Ingest statistics (verses inserted, seconds and verses_per_second).
+        """
+        checkpoint = None
+        if self.resumable_ingest_enabled:
+            checkpoint = self._get_checkpoint(collection_name)
+            if not resume or not checkpoint.load(self._build_signature()):
+                checkpoint.reset(self._build_signature())
+            self._active_checkpoints[collection_name] = checkpoint
+
+        bulk_writer = None
+        if self.bulk_importer is not None and schema is not None:
+            bulk_writer = self.bulk_importer.open_writer(schema, collection_name)
+
+        build_report = self.build_report
+        insert_records = self._flush_inserts if bulk_writer is None else bulk_writer.append
+
+        def embed_batch(batch: list[dict]):
+            with build_report.stage(collection_name, "embed"):
+                return self._embed_batch(batch)
+
+        def send_records(target_collection: str, records: list[dict]):
+            if self.compact_verse_ids:
+                records = [self._compact_record(record) for record in records]
+            with build_report.stage(target_collection, "insert"):
+                inserted = insert_records(target_collection, records)
+            build_report.record_sent(target_collection, records)
+            return inserted
+
+        pipeline = IngestPipeline(
+            embed_batch=embed_batch,
+            insert_records=send_records,
+            embedding_concurrency=self.embedding_concurrency,
+            insert_batch_size=self.insert_batch_size,
+            embedding_executor=embedding_executor,
+        )
+        self._inserted_counts[collection_name] = 0
+        snapshot = None if resume else self._load_snapshot(collection_name)
+        if checkpoint is not None:
+            records = self._iter_pending_verses(collection_name, checkpoint, snapshot)
+        elif snapshot is not None:
+            records = snapshot.iter_records(include_dense=self.database_type != "sparse")
+        else:
+            records = iter_collection_verses(collection_name)
+        records = build_report.timed_iter(collection_name, "parse", records)
+        batches = batch_verses(records, self.embedding_batch_size, self.embedding_batch_max_tokens)
+        try:
+            stats = pipeline.run(collection_name, batches)
+            if bulk_writer is not None:
+                with build_report.stage(collection_name, "insert"):
+                    self._import_bulk_files(collection_name, bulk_writer, checkpoint)
+            build_report.record_result(collection_name, stats)
+            return stats
+        except Exception as e:
+            build_report.record_result(collection_name, error=e)
+            raise
+        finally:
+            # Persist new embeddings and progress even if the build failed part way through
+            if self.embedding_cache is not None:
+                self.embedding_cache.flush()
+            # Parallel builds share deduplicated embeddings until all versions are done
+            if embedding_executor is None:
+                self.document_embedder.reset()
+            if checkpoint is not None:
+                checkpoint.save()
+                self._active_checkpoints.pop(collection_name, None)
+            if bulk_writer is not None:
+                bulk_writer.close()
+
+    def _import_bulk_files(
+        self, collection_name: str, bulk_writer: BulkImportWriter, checkpoint: IngestCheckpoint | None
+    ):
+        """
+        Upload the staged import files of a collection and load them with a bulk import job.
+
+        An import job is all-or-nothing, so the checkpoint only records the chapters once the job has completed.
+
+        Parameters:
+            collection_name (str): Target collection.
+            bulk_writer (BulkImportWriter): Writer holding the collection's records.
+            checkpoint (IngestCheckpoint | None): Checkpoint of the collection, if resumable ingest is enabled.
+
+        Returns:
+            int: Number of rows imported.
+        """
+        files = bulk_writer.commit()
+        imported_rows = self.bulk_importer.import_files(collection_name, files)
+        if checkpoint is not None:
+            checkpoint.mark_chapters_started(bulk_writer.chapter_counts)
+            checkpoint.record_chapter_counts(bulk_writer.chapter_counts)
+        return imported_rows
+
+    def _iter_pending_verses(
+        self, collection_name: str, checkpoint: IngestCheckpoint, snapshot: VectorSnapshot | None = None
+    ):
+        """
+        Stream the verses of chapters that still need ingesting, registering them in the checkpoint.
+
+        Completed chapters with unchanged source files are skipped. Rows of stale chapters
+        (partially inserted, or built from a file that has since changed) are deleted first.
+
+        Parameters:
+            collection_name (str): Collection being populated.
+            checkpoint (IngestCheckpoint): Checkpoint of the collection.
+            snapshot (VectorSnapshot | None): Snapshot to take verse records from instead of the chapter files.
+
+        Yields:
+            dict: Verse records of chapters that need ingesting.
+        """
+        skipped_chapters = 0
+        collection_loaded = False
+        snapshot_chapters = (
+            snapshot.records_by_chapter(include_dense=self.database_type != "sparse") if snapshot is not None else None
+        )
+        for book, chapter, path in iter_collection_chapters(collection_name):
+            if not path.exists():
+                logger.error(f"Bible data file not found: {path}")
+                continue
+            checksum = file_checksum(path)
+            chapter_state = checkpoint.chapter_state(book, chapter, checksum)
+            if chapter_state == "complete":
+                skipped_chapters += 1
+                continue
+            if chapter_state == "stale":
+                logger.info(f"Replacing {book} {chapter} in {collection_name} collection")
+                # Deleting by filter requires the collection to be loaded
+                if not collection_loaded:
+                    self.client.load_collection(collection_name=collection_name)
+                    collection_loaded = True
+                self.client.delete(collection_name=collection_name, filter=f'book == "{book}" and chapter == {chapter}')
+            if snapshot_chapters is not None:
+                records = snapshot_chapters.get((book, chapter), [])
+            else:
+                records = read_chapter_verses(collection_name, book, chapter)
+            checkpoint.expect_chapter(book, chapter, checksum, len(records))
+            yield from records
+        if skipped_chapters:
+            logger.info(f"Skipped {skipped_chapters} unchanged chapters already in {collection_name} collection")
+
+    def _get_checkpoint(self, collection_name: str):
+        """
+        Get the ingest checkpoint of a collection.
+
+        Parameters:
+            collection_name (str): Collection name.
+
+        Returns:
+            IngestCheckpoint: Checkpoint stored under MILVUS_CHECKPOINT_DIRECTORY.
+        """
+        return IngestCheckpoint(self.checkpoint_directory, self.milvus_database_name, collection_name)
+
+    def _build_signature(self):
+        """
+        Describe the settings that determine a collection's content.
+
+        A checkpoint can only be resumed by a build with the same signature.
+
+        Returns:
+            dict: Database type, embedding model, document prompt template and dense vector storage.
+        """
+        return {
+            "database_type": self.database_type,
+            "embedding_model": self.embedding_engine.model_name,
+            "document_template": self.embedding_engine.document_template,
+            "embedding_storage": self.embedding_storage.signature,
+        }
+
+    def export_snapshot(self, collection_name: str):
+        """
+        Export a fully built collection to a portable snapshot file.
+
+        The snapshot holds every verse record and its dense vector (for dense and hybrid databases),
+        together with the embedding model, document prompt template and a checksum of the Bible data
+        it was built from. It is written to MILVUS_SNAPSHOT_DIRECTORY as "{version}--{model}.npz".
+
+        Parameters:
+            collection_name (str): Collection to export.
+
+        Returns:
+            Path: Path of the written snapshot file.
+
+        Raises:
+            Exception: If the collection cannot be read.
+        """
+        hydrated_fields = self._hydrated_fields()
+        output_fields = [field for field in SNAPSHOT_FIELDS if field not in hydrated_fields]
+        if self.database_type != "sparse":
+            output_fields.append("dense_embedding")
+
+        try:
+            self.client.load_collection(collection_name=collection_name)
+            iterator = self.client.query_iterator(
+                collection_name=collection_name, batch_size=1000, output_fields=output_fields
             )
+            records = []
+            while True:
+                batch = iterator.next()
+                if not batch:
+                    iterator.close()
+                    break
+                records.extend(batch)
+        except Exception as e:
+            logger.error(f"Error reading {collection_name} collection for snapshot: {e}")
+            raise e
 
-        # Create collections and indices
-        logger.info(f"Creating collections for {collections_to_create}")
-        for collection_name in collections_to_create:
-            self.client.create_collection(collection_name=collection_name, schema=schema)
-            self.client.create_index(collection_name=collection_name, index_params=index_params, sync=True)
-        logger.info(f"Collections created: {collections_to_create}")
+        if hydrated_fields:
+            records = self._restore_hydrated_fields(collection_name, records)
+        records = sort_canonically(records)
+        dense_embeddings = None
+        if self.database_type != "sparse":
+            dense_embeddings = self.embedding_storage.to_array([record["dense_embedding"] for record in records])
+        path = snapshot_path(self.snapshot_directory, collection_name, self.embedding_engine.model_name)
+        write_snapshot(path, self._snapshot_metadata(collection_name), records, dense_embeddings)
+        logger.info(f"Exported {len(records)} verses of {collection_name} collection to {path}")
+        return path
+
+    def _restore_hydrated_fields(self, collection_name: str, records: list[dict]):
+        """
+        Add the fields compact collections do not store back to records read from Milvus.
 
-        # Populate collections with Bible verse data
-        logger.info("Populating collections with verse data")
-        for collection_name in collections_to_create:
-            # Iterate through all books and chapters
-            for book in bible_globals.IN_ORDER_BOOKS:
-                for chapter in range(1, bible_globals.CHAPTER_SELECTION[book] + 1):
-                    # Load chapter JSON file
-                    path = bible_globals.BIBLE_DATA_ROOT.joinpath(collection_name, book, f"{chapter}.json")
-                    if not path.exists():
-                        logger.error(f"Bible data file not found: {path}")
-                        continue
-
-                    with path.open("r", encoding="utf-8") as file:
-                        verse_numbers = []
-                        verse_texts = []
-                        json_data = json.load(file)
-
-                        # Extract verse data, skipping headers
-                        for verse in json_data.keys():
-                            if "header_" in verse:
-                                continue
-                            verse_numbers.append(int(verse))
-                            verse_clean_text = json_data[verse]
-                            # Remove HTML tags for cleaner storage (e.g., <span class="wj">...</span>)
-                            verse_clean_text = (
-                                verse_clean_text.replace('<span class="wj">', "").replace("</span>", "").strip()
-                            )
-                            verse_texts.append(verse_clean_text)
-
-                        # Generate embeddings for all verses
-                        verse_embeddings = self.embedding_engine.embed(
-                            verse_texts, prompt_type="document", normalize=False
-                        )
+        Parameters:
+            collection_name (str): Collection the records were read from.
+            records (list[dict]): Records with book, chapter and verse keys.
+
+        Returns:
+            list[dict]: The same records with version and text set (texts are read from the Bible data files).
+        """
+        texts = {
+            (record["book"], record["chapter"], record["verse"]): record["text"]
+            for record in iter_collection_verses(collection_name)
+        }
+        for record in records:
+            record["version"] = collection_name
+            if "text" not in record:
+                record["text"] = texts.get((record["book"], record["chapter"], record["verse"]), "")
+        return records
+
+    def _snapshot_metadata(self, collection_name: str):
+        """
+        Describe the settings a snapshot of a collection must be restored with.
 
-                        # Build data records with embeddings
-                        data = []
-                        for verse_number, verse_text, verse_embedding in zip(
-                            verse_numbers, verse_texts, verse_embeddings
-                        ):
-                            record = {
-                                "text": verse_text,
-                                "version": collection_name,
-                                "book": book,
-                                "chapter": chapter,
-                                "verse": verse_number,
-                            }
-                            # Include appropriate embedding(s) based on database type
-                            if self.database_type == "dense" or self.database_type == "hybrid":
-                                record["dense_embedding"] = verse_embedding
-                            data.append(record)
-
-                        # Insert records into collection
-                        self.client.insert(collection_name=collection_name, data=data)
-                        logger.info(f"Added {book} {chapter} to {collection_name} collection")
+        Parameters:
+            collection_name (str): Collection name.
+
+        Returns:
+            dict: Collection, database type, embedding model, document template, dense vector storage
+                and Bible data checksum.
+        """
+        return {
+            "collection": collection_name,
+            "database_type": self.database_type,
+            "embedding_model": self.embedding_engine.model_name,
+            "document_template": self.embedding_engine.document_template,
+            "embedding_storage": self.embedding_storage.signature,
+            "source_checksum": source_data_checksum(collection_name),
+        }
+
+    def _load_snapshot(self, collection_name: str):
+        """
+        Load the snapshot of a collection if restoring is enabled and it matches the current settings.
+
+        The embedding model, document template and vector storage must match for dense and hybrid databases,
+        and the Bible data must be unchanged since the snapshot was exported.
+
+        Parameters:
+            collection_name (str): Collection name.
+
+        Returns:
+            VectorSnapshot | None: The snapshot to restore from, or None to build from the chapter files.
+        """
+        if not self.snapshot_restore_enabled:
+            return None
+        path = snapshot_path(self.snapshot_directory, collection_name, self.embedding_engine.model_name)
+        if not path.exists():
+            return None
+
+        try:
+            snapshot = VectorSnapshot(path)
+        except Exception as e:
+            logger.warning(f"Snapshot {path} could not be read and will be ignored: {e}")
+            return None
+
+        metadata = self._snapshot_metadata(collection_name)
+        expected = {
+            "collection": collection_name,
+            "source_checksum": metadata["source_checksum"],
+            "needs_dense": self.database_type != "sparse",
+        }
+        if self.database_type != "sparse":
+            expected["embedding_model"] = metadata["embedding_model"]
+            expected["document_template"] = metadata["document_template"]
+            expected["embedding_storage"] = metadata["embedding_storage"]
+        reason = snapshot.incompatibility(expected)
+        if reason is not None:
+            logger.info(f"Snapshot {path} cannot be restored because {reason}. Building from Bible data.")
+            return None
+
+        logger.info(f"Restoring {collection_name} collection from snapshot {path} ({len(snapshot)} verses)")
+        return snapshot
+
+    def _embed_batch(self, batch: list[dict]):
+        """
+        Attach dense embeddings to a batch of verse records.
+
+        Sparse embeddings are generated by Milvus from the text, so sparse-only collections
+        never call the embedding service. Each distinct text is embedded once across all
+        versions being built, and texts found in the embedding cache are not embedded at all.
+        Full-precision embeddings are cached; they are truncated or binarized for storage here.
+
+        Parameters:
+            batch (list[dict]): Verse records with a "text" key.
+
+        Returns:
+            list[dict]: The same records, with "dense_embedding" set for dense and hybrid databases.
+        """
+        if self.database_type == "sparse":
+            return batch
+
+        # Records restored from a snapshot already carry their vector in storage form
+        pending_records = [record for record in batch if "dense_embedding" not in record]
+        for record in batch:
+            if "dense_embedding" in record:
+                # Milvus expects plain lists of floats (or bytes for binary vectors)
+                record["dense_embedding"] = self.embedding_storage.encode_array_row(record["dense_embedding"])
+        verse_embeddings = self.document_embedder.embed([record["text"] for record in pending_records])
+        for record, verse_embedding in zip(pending_records, verse_embeddings):
+            record["dense_embedding"] = self.embedding_storage.encode(verse_embedding)
+        return batch
+
+    def _embed_documents(self, texts: list[str]):
+        """
+        Embed document texts with the embedding service.
+
+        Parameters:
+            texts (list[str]): Distinct verse texts.
+
+        Returns:
+            list: One embedding vector per text.
+        """
+        self.build_report.record_embedding_batch(len(texts))
+        return self.embedding_engine.embed(texts, prompt_type="document", normalize=False, as_array=True)
+
+    def _flush_inserts(self, collection_name: str, records: list[dict]):
+        """
+        Insert buffered records into a collection, recording progress in its checkpoint.
+
+        Parameters:
+            collection_name (str): Target collection.
+            records (list[dict]): Records to insert.
+
+        Returns:
+            int: Number of records inserted.
+        """
+        checkpoint = self._active_checkpoints.get(collection_name)
+        if checkpoint is not None:
+            checkpoint.mark_started(records)
+        # All collection builds share one insert budget
+        with self._insert_slots:
+            self.client.insert(collection_name=collection_name, data=records)
+        if checkpoint is not None:
+            checkpoint.record_inserted(records)
+        last_record = records[-1]
+        self._inserted_counts[collection_name] = self._inserted_counts.get(collection_name, 0) + len(records)
+        logger.info(
+            f"Added {len(records)} verses to {collection_name} collection "
+            f"(through {last_record['book']} {last_record['chapter']}, "
+            f"{chapter_progress(last_record['book'], last_record['chapter'])}% of chapters, "
+            f"{self._inserted_counts[collection_name]} verses so far)"
+        )
+        return len(records)
 
     def close(self):
         """
@@ -405,6 +1186,30 @@ class VectorDatabaseQuerier:
         - MILVUS_USERNAME, MILVUS_PASSWORD: Authentication credentials
         - DATABASE_TYPE: "sparse", "dense", or "hybrid"
         - SPARSE_WEIGHT, DENSE_WEIGHT: Weights for hybrid search combination (0.2/0.8 default)
+        - EMBEDDING_STORAGE_MODE, EMBEDDING_DIMENSIONS (+ see EmbeddingStorage): Must match the builder's settings
+        - QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_CACHE_TTL: In-process query embedding cache (1024 entries/3600s
+          default, size 0 disables)
+        - QUERY_EMBEDDING_CACHE_ALIAS: Django cache shared by all workers for query embeddings (e.g. "shared")
+        - SEARCH_RESULT_CACHE_SIZE, SEARCH_RESULT_CACHE_TTL: In-process search result cache (1024 entries/600s default,
+          size 0 disables)
+        - SEARCH_RESULT_CACHE_ALIAS: Django cache shared by all workers and the builder for search results and
+          collection generations (see SearchResultCache); SEARCH_RESULT_CACHE_GENERATION_CHECK sets how often
+          (seconds, 5 default) workers look for rebuilt collections
+        - LOCAL_SEARCH_MODE: "off" (default), "fallback" (search in-process when Milvus fails or exceeds
+          MILVUS_SEARCH_TIMEOUT seconds, 5 default) or "primary" (never use Milvus)
+        - MILVUS_SNAPSHOT_DIRECTORY, LOCAL_INDEX_DIRECTORY: Snapshots with the dense vectors of the local index and
+          where their memory-mapped matrices are kept
+        - SEARCH_PROFILE: Default search profile, "fast", "balanced" (default) or "accurate" (see SearchProfile)
+        - SEARCH_RANKER, SEARCH_PROFILE_FAST/BALANCED/ACCURATE: Hybrid ranker and per-profile overrides
+          (see load_search_profiles())
+        - SEARCH_TARGET_P95_MS: p95 latency adaptive profiles lower their ef/nprobe to stay under (250 default)
+        - SEARCH_DIVERSITY: Weight of novelty against relevance when re-ranking results by maximal marginal relevance
+          (0 default disables it); SEARCH_DIVERSITY_CANDIDATES sets how many times `limit` candidates are fetched for
+          it (3 default) and SEARCH_MERGE_NEIGHBOR_VERSES whether consecutive verses become passages (False default)
+        - RERANKER, RERANK_BUDGET_MS, RERANK_CANDIDATES (+ BASE_RERANK_URL, RERANK_MODEL_ID, RERANK_API_KEY):
+          Re-rank candidates with a cross-encoder endpoint or in-process BM25 (see load_reranker())
+        - MILVUS_COMPACT_VERSE_IDS: Collections were built with packed verse ids; searches only return ids and
+          hydrate the verses from ALL_VERSES (False default, must match the builder)
     """
 
     def __init__(self):
@@ -433,8 +1238,46 @@ class VectorDatabaseQuerier:
         self.sparse_weight = float(str(os.getenv("SPARSE_WEIGHT") or 0.2).strip())
         self.dense_weight = float(str(os.getenv("DENSE_WEIGHT") or 0.8).strip())
 
+        # Search profiles trade recall for latency per endpoint or request
+        self.search_profiles = load_search_profiles()
+        self.default_search_profile = str(os.getenv("SEARCH_PROFILE") or "balanced").strip().lower()
+        self.get_search_profile(self.default_search_profile)
+        target_seconds = float(str(os.getenv("SEARCH_TARGET_P95_MS") or 250).strip()) / 1000
+        self.latency_trackers = {
+            name: LatencyTracker(target_seconds) for name, profile in self.search_profiles.items() if profile.adaptive
+        }
+
         # Initialize embedding engine for query embeddings
         self.embedding_engine = Embedding()
+        # Query vectors are truncated/binarized the same way the stored vectors were
+        self.embedding_storage = EmbeddingStorage.from_env()
+
+        # Cache query embeddings so repeated queries skip the embedding service
+        query_cache_size = int(str(os.getenv("QUERY_EMBEDDING_CACHE_SIZE") or 1024).strip())
+        if query_cache_size > 0:
+            shared_cache_alias = str(os.getenv("QUERY_EMBEDDING_CACHE_ALIAS") or "").strip()
+            self.query_embedding_cache = QueryEmbeddingCache(
+                model_name=self.embedding_engine.model_name,
+                query_template=self.embedding_engine.query_template,
+                max_entries=query_cache_size,
+                ttl_seconds=float(str(os.getenv("QUERY_EMBEDDING_CACHE_TTL") or 3600).strip()),
+                shared_cache=caches[shared_cache_alias] if shared_cache_alias else None,
+            )
+        else:
+            self.query_embedding_cache = None
+
+        # Cache search results so identical searches from different users reach Milvus once
+        result_cache_size = int(str(os.getenv("SEARCH_RESULT_CACHE_SIZE") or 1024).strip())
+        if result_cache_size > 0:
+            shared_cache_alias = str(os.getenv("SEARCH_RESULT_CACHE_ALIAS") or "").strip()
+            self.search_result_cache = SearchResultCache(
+                max_entries=result_cache_size,
+                ttl_seconds=float(str(os.getenv("SEARCH_RESULT_CACHE_TTL") or 600).strip()),
+                shared_cache=caches[shared_cache_alias] if shared_cache_alias else None,
+                generation_check_seconds=float(str(os.getenv("SEARCH_RESULT_CACHE_GENERATION_CHECK") or 5).strip()),
+            )
+        else:
+            self.search_result_cache = None
 
         # Validate and load database type (determines search strategy)
         self.database_type = str(os.getenv("DATABASE_TYPE") or "hybrid").strip().lower()
@@ -444,8 +1287,37 @@ class VectorDatabaseQuerier:
                 f"Invalid database type: {self.database_type}. Valid database types are: sparse, dense, hybrid"
             )
 
-        # Async client is initialized by load_database_and_collections()
+        # Optional maximal marginal relevance re-ranking of search results (SEARCH_DIVERSITY 0 disables it)
+        self.search_diversity = float(str(os.getenv("SEARCH_DIVERSITY") or 0).strip())
+        self.diversity_candidates = int(str(os.getenv("SEARCH_DIVERSITY_CANDIDATES") or 3).strip())
+        self.merge_neighbor_verses = derive_boolean_from_string(os.getenv("SEARCH_MERGE_NEIGHBOR_VERSES") or "False")
+        self._validate_diversity(self.search_diversity)
+        if self.diversity_candidates < 1:
+            logger.error("Search diversity candidates must be a positive integer")
+            raise ValueError("Search diversity candidates must be a positive integer")
+
+        # Optional re-ranking of search candidates by a cross-encoder endpoint or a local scorer, within a time budget
+        self.reranker = load_reranker()
+
+        # Compact collections only return packed verse ids, which are hydrated from ALL_VERSES
+        self.compact_verse_ids = derive_boolean_from_string(os.getenv("MILVUS_COMPACT_VERSE_IDS") or "False")
+        self.output_fields = [] if self.compact_verse_ids else ["version", "book", "chapter", "verse", "text"]
+
+        # Optional in-process index used when Milvus fails ("fallback") or instead of Milvus ("primary")
+        self.local_search_mode = str(os.getenv("LOCAL_SEARCH_MODE") or "off").strip().lower()
+        if self.local_search_mode not in LOCAL_SEARCH_MODES:
+            logger.error(f"Invalid local search mode: {self.local_search_mode}")
+            raise ValueError(
+                f"Invalid local search mode: {self.local_search_mode}. Valid modes are: {', '.join(LOCAL_SEARCH_MODES)}"
+            )
+        self.milvus_search_timeout = float(str(os.getenv("MILVUS_SEARCH_TIMEOUT") or 5).strip())
+        self.snapshot_directory = str(os.getenv("MILVUS_SNAPSHOT_DIRECTORY") or DEFAULT_SNAPSHOT_DIRECTORY).strip()
+        self.local_index_directory = str(os.getenv("LOCAL_INDEX_DIRECTORY") or DEFAULT_LOCAL_INDEX_DIRECTORY).strip()
+        self.local_index = None
+
+        # Async client and loaded collections are set by load_database_and_collections()
         self.async_client = None
+        self.loaded_collections = []
 
     @classmethod
     async def load_database_and_collections(cls):
@@ -455,14 +1327,59 @@ class VectorDatabaseQuerier:
         Creates an instance, verifies the database exists, and loads all collections.
         This should be called during application startup via lifespan manager.
 
+        With LOCAL_SEARCH_MODE "fallback" or "primary", the local index is loaded first. "primary"
+        never connects to Milvus; with "fallback", a Milvus connection failure is logged and the
+        local index serves every search.
+
         Returns:
             VectorDatabaseQuerier: Initialized and ready-to-query instance.
 
         Raises:
-            ValueError: If the database doesn't exist.
+            ValueError: If the database doesn't exist (and no local index can serve searches instead).
         """
         self = cls()
 
+        if self.local_search_mode != "off":
+            self.local_index = await asyncio.to_thread(self._load_local_index)
+            self.loaded_collections = self.local_index.collection_names
+        if self.local_search_mode == "primary":
+            logger.info(f"Searching the local index instead of Milvus: {self.loaded_collections}")
+            return self
+
+        try:
+            await self._connect_and_load_collections()
+        except Exception as e:
+            if self.local_index is None or not self.local_index.collection_names:
+                raise
+            logger.error(f"Error connecting to Milvus, searching the local index until restart: {e}")
+        return self
+
+    def _load_local_index(self):
+        """
+        Load the in-process index of every enabled Bible version.
+
+        Returns:
+            LocalVectorIndex: Index of the versions that could be loaded.
+        """
+        return LocalVectorIndex.load(
+            collection_names=bible_globals.VERSION_SELECTION,
+            database_type=self.database_type,
+            storage=self.embedding_storage,
+            model_name=self.embedding_engine.model_name,
+            document_template=self.embedding_engine.document_template,
+            snapshot_directory=self.snapshot_directory,
+            index_directory=self.local_index_directory,
+            sparse_weight=self.sparse_weight,
+            dense_weight=self.dense_weight,
+        )
+
+    async def _connect_and_load_collections(self):
+        """
+        Connect to the Milvus database and load all collections into memory.
+
+        Raises:
+            ValueError: If the database doesn't exist.
+        """
         # Create temporary client to check database existence
         temp_client = AsyncMilvusClient(
             uri=self.milvus_url,
@@ -491,8 +1408,7 @@ class VectorDatabaseQuerier:
         for collection in collections:
             await self.async_client.load_collection(collection_name=collection)
             logger.info(f"Loaded collection: {collection}")
-
-        return self
+        self.loaded_collections = list(collections)
 
     async def list_collections_in_database(self):
         """
@@ -504,97 +1420,587 @@ class VectorDatabaseQuerier:
         Raises:
             Exception: If the query fails.
         """
+        if self.async_client is None and self.local_index is not None:
+            return self.local_index.collection_names
         try:
             return await self.async_client.list_collections()
         except Exception as e:
             logger.error(f"Error listing collections in database: {e}")
             raise e
 
-    async def search(self, collection_name: str, query: str, limit: int = 10):
+    async def search(
+        self,
+        collection_name: str,
+        query: str,
+        limit: int = 10,
+        book: str | None = None,
+        chapter_start: int | None = None,
+        chapter_end: int | None = None,
+        testament: str | None = None,
+        profile: str | None = None,
+        diversity: float | None = None,
+    ):
         """
         Search for verses asynchronously using the configured search strategy.
 
         For sparse: Uses BM25 keyword matching on text field.
-        For dense: Uses HNSW index for semantic similarity search.
-        For hybrid: Combines both with weighted rank fusion (BM25 and HNSW).
+        For dense: Uses the dense index (HNSW, IVF_SQ8 or binary) for semantic similarity search.
+            Binary candidates are oversampled and re-ranked with the float query vector.
+        For hybrid: Combines both with weighted rank fusion (BM25 and dense). Binary storage
+            is fused by Hamming distance without the float re-rank.
+
+        The optional scope (book, chapter range or testament) is applied by Milvus as a filter
+        expression (see scope_filter()). The search profile sets ef/nprobe, the BM25 drop ratio
+        and the hybrid ranker (see SearchProfile).
+
+        With a diversity above 0, `limit` times SEARCH_DIVERSITY_CANDIDATES candidates are fetched
+        and re-ranked by maximal marginal relevance, and consecutive verses are merged into passages
+        (see diversify_results()), so fewer than `limit` results may be returned. With RERANKER set,
+        candidates are first re-ordered by the reranker, or keep the search order when it exceeds
+        RERANK_BUDGET_MS (see SearchReranker).
 
         Parameters:
             collection_name (str): Name of the Bible version collection to search.
             query (str): User's search query (text or natural language).
             limit (int): Maximum number of results to return (default: 10).
+            book (str | None): Only search this book.
+            chapter_start (int | None): First chapter to search (requires book).
+            chapter_end (int | None): Last chapter to search (requires book).
+            testament (str | None): Only search the "old" or "new" testament.
+            profile (str | None): Search profile name (default: SEARCH_PROFILE).
+            diversity (float | None): Weight of novelty against relevance, 0 to 1 (default: SEARCH_DIVERSITY).
 
         Returns:
-            list: Search results with entity metadata (text, book, chapter, verse, version).
+            list: Search results with entity metadata (text, book, chapter, verse, version, and
+                verse_end for merged passages).
 
         Raises:
+            ValueError: If the scope or profile is invalid.
             Exception: If the search fails.
         """
-        # Generate query embedding for dense/hybrid search
-        if self.database_type == "dense" or self.database_type == "hybrid":
-            # Async embedding generation
-            query_embedding = (await self.embedding_engine.async_embed([query], prompt_type="query", normalize=False))[
-                0
+        results = await self.search_many(
+            collection_name=collection_name,
+            queries=[query],
+            limit=limit,
+            book=book,
+            chapter_start=chapter_start,
+            chapter_end=chapter_end,
+            testament=testament,
+            profile=profile,
+            diversity=diversity,
+        )
+        return results[0]
+
+    async def search_many(
+        self,
+        collection_name: str,
+        queries: list[str],
+        limit: int = 10,
+        book: str | None = None,
+        chapter_start: int | None = None,
+        chapter_end: int | None = None,
+        testament: str | None = None,
+        profile: str | None = None,
+        diversity: float | None = None,
+    ):
+        """
+        Search for verses matching several queries in one round-trip.
+
+        All query embeddings are requested in a single embedding call (cached queries are skipped)
+        and all queries are sent to Milvus as one multi-vector search or hybrid_search.
+        Each query is searched exactly as search() would, including the diversity re-ranking.
+
+        Results are served from the search result cache when the same query was searched in the
+        collection with the same limit, profile, diversity and scope (see SearchResultCache). Cached hits
+        only keep id, distance and the entity's version, book, chapter, verse and text.
+
+        Parameters:
+            collection_name (str): Name of the Bible version collection to search.
+            queries (list[str]): User's search queries (text or natural language).
+            limit (int): Maximum number of results to return per query (default: 10).
+            book (str | None): Only search this book.
+            chapter_start (int | None): First chapter to search (requires book).
+            chapter_end (int | None): Last chapter to search (requires book).
+            testament (str | None): Only search the "old" or "new" testament.
+            profile (str | None): Search profile name (default: SEARCH_PROFILE).
+            diversity (float | None): Weight of novelty against relevance, 0 to 1 (default: SEARCH_DIVERSITY).
+
+        Returns:
+            list[list]: Search results of each query, in the order of queries.
+
+        Raises:
+            ValueError: If the scope, profile or diversity is invalid.
+            Exception: If the search fails.
+        """
+        # Restrict the search to the requested part of the Bible (validated before anything is embedded)
+        scope = {"book": book, "chapter_start": chapter_start, "chapter_end": chapter_end, "testament": testament}
+        scope_filter(**scope)
+        search_profile = self.get_search_profile(profile)
+        diversity = self.search_diversity if diversity is None else diversity
+        self._validate_diversity(diversity)
+        if not queries:
+            return []
+
+        async def search_uncached(uncached_queries: list[str]):
+            # Generate query embeddings for dense/hybrid search
+            if self.database_type == "dense" or self.database_type == "hybrid":
+                query_embeddings = await self.embed_queries(uncached_queries)
+            else:
+                query_embeddings = None
+            if not diversity and self.reranker is None:
+                return await self._search_embedded(
+                    collection_name, uncached_queries, query_embeddings, limit, scope, search_profile
+                )
+            # Fetch a larger candidate set once (with vectors for diversity) and keep the best top-k of it
+            candidate_factor = max(
+                self.diversity_candidates if diversity else 1,
+                self.reranker.candidate_factor if self.reranker is not None else 1,
+            )
+            candidates = await self._search_embedded(
+                collection_name,
+                uncached_queries,
+                query_embeddings,
+                limit * candidate_factor,
+                scope,
+                search_profile,
+                with_vectors=bool(diversity),
+            )
+            if self.reranker is not None:
+                ranked = await asyncio.gather(
+                    *(self.reranker.rerank(query, hits) for query, hits in zip(uncached_queries, candidates))
+                )
+            else:
+                ranked = [(list(hits), False) for hits in candidates]
+            if not diversity:
+                return [hits[:limit] for hits, _ in ranked]
+            # Re-scored distances are relevance scores, so higher is better whatever the index metric
+            return [
+                self._diversify(hits, limit, diversity, higher_is_better=True if rescored else None)
+                for hits, rescored in ranked
             ]
-        else:
-            query_embedding = None
+
+        if self.search_result_cache is None:
+            return await search_uncached(queries)
+        context = {
+            "database_type": self.database_type,
+            "limit": limit,
+            "profile": search_profile.name,
+            "diversity": diversity,
+            "merge_neighbors": self.merge_neighbor_verses,
+            "reranker": self.reranker.signature if self.reranker is not None else None,
+            **scope,
+        }
+        return await self.search_result_cache.get_or_search_many(collection_name, queries, context, search_uncached)
+
+    async def _search_embedded(
+        self,
+        collection_name: str,
+        queries: list[str],
+        query_embeddings: list | None,
+        limit: int,
+        scope: dict,
+        search_profile=None,
+        with_vectors: bool = False,
+    ):
+        """
+        Search one collection with queries whose embeddings were already computed.
+
+        Uses Milvus, or the local index when LOCAL_SEARCH_MODE is "primary", Milvus is not connected,
+        or (with "fallback") the Milvus search fails or takes longer than MILVUS_SEARCH_TIMEOUT.
+
+        Parameters:
+            collection_name (str): Name of the Bible version collection to search.
+            queries (list[str]): User's search queries.
+            query_embeddings (list | None): Embeddings of the queries (None for sparse databases).
+            limit (int): Maximum number of results to return per query.
+            scope (dict): book, chapter_start, chapter_end and testament (see scope_filter()).
+            search_profile (SearchProfile | None): Milvus search settings (default: SEARCH_PROFILE).
+            with_vectors (bool): Return the dense_embedding of Milvus hits (local index hits have none).
+
+        Returns:
+            list[list]: Search results of each query, in the order of queries.
+        """
+        filter_expression = scope_filter(**scope)
+        search_profile = search_profile or self.get_search_profile()
+        milvus_arguments = (
+            collection_name,
+            queries,
+            query_embeddings,
+            limit,
+            filter_expression,
+            search_profile,
+            with_vectors,
+        )
+        if self.local_index is None or collection_name not in self.local_index:
+            return await self._search_milvus(*milvus_arguments)
+
+        if self.local_search_mode == "fallback" and self.async_client is not None:
+            try:
+                return await asyncio.wait_for(
+                    self._search_milvus(*milvus_arguments), timeout=self.milvus_search_timeout or None
+                )
+            except Exception as e:
+                logger.warning(f"Milvus search failed ({type(e).__name__}: {e}), searching the local index instead")
+        return await asyncio.to_thread(
+            self.local_index.search_many, collection_name, queries, query_embeddings, limit, scope
+        )
+
+    async def _search_milvus(
+        self,
+        collection_name: str,
+        queries: list[str],
+        query_embeddings: list | None,
+        limit: int,
+        filter_expression: str,
+        search_profile,
+        with_vectors: bool = False,
+    ):
+        """
+        Search one Milvus collection with queries whose embeddings were already computed.
+
+        Searches with an adaptive profile are timed, and their ef/nprobe follow the profile's
+        LatencyTracker effort.
+
+        Parameters:
+            collection_name (str): Name of the Bible version collection to search.
+            queries (list[str]): User's search queries.
+            query_embeddings (list | None): Embeddings of the queries (None for sparse databases).
+            limit (int): Maximum number of results to return per query.
+            filter_expression (str): Milvus filter expression built by scope_filter().
+            search_profile (SearchProfile): Search settings.
+            with_vectors (bool): Return the dense_embedding of each hit.
+
+        Returns:
+            list[list]: Search results of each query, in the order of queries.
+        """
+        search_arguments = (collection_name, queries, query_embeddings, limit, filter_expression, search_profile)
+        latency_tracker = self.latency_trackers.get(search_profile.name)
+        if latency_tracker is None:
+            return await self._run_milvus_search(*search_arguments, effort=1.0, with_vectors=with_vectors)
+        started = time.perf_counter()
+        results = await self._run_milvus_search(
+            *search_arguments, effort=latency_tracker.effort, with_vectors=with_vectors
+        )
+        latency_tracker.record(time.perf_counter() - started)
+        return results
+
+    async def _run_milvus_search(
+        self,
+        collection_name: str,
+        queries: list[str],
+        query_embeddings: list | None,
+        limit: int,
+        filter_expression: str,
+        search_profile,
+        effort: float,
+        with_vectors: bool = False,
+    ):
+        """
+        Send the search requests of one collection to Milvus.
+
+        Parameters:
+            collection_name (str): Name of the Bible version collection to search.
+            queries (list[str]): User's search queries.
+            query_embeddings (list | None): Embeddings of the queries (None for sparse databases).
+            limit (int): Maximum number of results to return per query.
+            filter_expression (str): Milvus filter expression built by scope_filter().
+            search_profile (SearchProfile): Search settings.
+            effort (float): Share of the profile's ef/nprobe to use.
+            with_vectors (bool): Return the dense_embedding of each hit (dense and hybrid databases).
+
+        Returns:
+            list[list]: Search results of each query, in the order of queries.
+        """
+        # Only dense-only searches re-rank binary candidates, so hybrid hits only carry vectors on request
+        output_fields = list(self.output_fields)
+        if self.database_type != "sparse" and (
+            with_vectors or (self.database_type == "dense" and self.embedding_storage.reranks)
+        ):
+            output_fields.append("dense_embedding")
 
         # Build search request list for hybrid search
         request_types = []
 
         # Configure sparse (BM25) search if applicable
         if self.database_type == "sparse" or self.database_type == "hybrid":
-            sparse_search_params = {"metric_type": "BM25", "params": {"drop_ratio_search": 0.2}}
-            sparse_request = AnnSearchRequest([query], "sparse_embedding", sparse_search_params, limit=limit)
+            sparse_search_params = search_profile.sparse_search_params()
+            sparse_request = AnnSearchRequest(
+                list(queries), "sparse_embedding", sparse_search_params, limit=limit, expr=filter_expression or None
+            )
             request_types.append(sparse_request)
 
-        # Configure dense (HNSW) search if applicable
+        # Configure dense search if applicable
         if self.database_type == "dense" or self.database_type == "hybrid":
-            dense_search_params = {"metric_type": "COSINE", "params": {"ef": 128}}
-            dense_request = AnnSearchRequest([query_embedding], "dense_embedding", dense_search_params, limit=limit)
+            dense_search_params = search_profile.dense_search_params(
+                self.embedding_storage.search_params(), self.embedding_storage.candidate_limit(limit), effort
+            )
+            dense_queries = [self.embedding_storage.encode(query_embedding) for query_embedding in query_embeddings]
+            dense_request = AnnSearchRequest(
+                dense_queries, "dense_embedding", dense_search_params, limit=limit, expr=filter_expression or None
+            )
             request_types.append(dense_request)
 
         # Perform sparse-only search (BM25 keyword matching)
         if self.database_type == "sparse":
             sparse_results = await self.async_client.search(
                 collection_name=collection_name,
-                data=[query],
+                data=list(queries),
                 anns_field="sparse_embedding",
                 limit=limit,
                 search_params=sparse_search_params,
-                output_fields=["version", "book", "chapter", "verse", "text"],
+                filter=filter_expression,
+                output_fields=output_fields,
             )
-            return sparse_results[0]
+            return self._hydrate_results(collection_name, [sparse_results[index] for index in range(len(queries))])
 
         # Perform dense-only search (semantic similarity)
         if self.database_type == "dense":
             dense_results = await self.async_client.search(
                 collection_name=collection_name,
-                data=[query_embedding],
+                data=dense_queries,
                 anns_field="dense_embedding",
-                limit=limit,
+                limit=self.embedding_storage.candidate_limit(limit),
                 search_params=dense_search_params,
-                output_fields=["version", "book", "chapter", "verse", "text"],
+                filter=filter_expression,
+                output_fields=output_fields,
             )
-            return dense_results[0]
+            if self.embedding_storage.reranks:
+                return self._hydrate_results(
+                    collection_name,
+                    [
+                        self.embedding_storage.rerank(
+                            query_embedding, list(dense_results[index]), limit, keep_vectors=with_vectors
+                        )
+                        for index, query_embedding in enumerate(query_embeddings)
+                    ],
+                )
+            return self._hydrate_results(collection_name, [dense_results[index] for index in range(len(queries))])
 
-        # Perform hybrid search (combining sparse and dense with weighted rank fusion)
+        # Perform hybrid search (combining sparse and dense with weighted or reciprocal rank fusion)
         if self.database_type == "hybrid":
-            # Hybrid search combines BM25 and semantic similarity via reciprocal rank fusion
             hybrid_results = await self.async_client.hybrid_search(
                 collection_name=collection_name,
                 reqs=request_types,
-                ranker=WeightedRanker(self.sparse_weight, self.dense_weight),
+                ranker=search_profile.hybrid_ranker(self.sparse_weight, self.dense_weight),
                 limit=limit,
-                output_fields=["version", "book", "chapter", "verse", "text"],
+                output_fields=output_fields,
             )
-            return hybrid_results[0]
+            return self._hydrate_results(collection_name, [hybrid_results[index] for index in range(len(queries))])
+
+    def _hydrate_results(self, collection_name: str, results: list):
+        """
+        Fill in the verse fields of Milvus results from compact collections.
+
+        Parameters:
+            collection_name (str): Name of the searched collection.
+            results (list): Search results of each query.
+
+        Returns:
+            list: The results as is, or with every hit hydrated (see hydrate_hits()) when
+                MILVUS_COMPACT_VERSE_IDS is enabled.
+        """
+        if not self.compact_verse_ids:
+            return results
+        return [hydrate_hits(collection_name, hits) for hits in results]
+
+    async def search_versions(
+        self,
+        query: str,
+        limit: int = 10,
+        collection_names: list[str] | None = None,
+        book: str | None = None,
+        chapter_start: int | None = None,
+        chapter_end: int | None = None,
+        testament: str | None = None,
+        profile: str | None = None,
+    ):
+        """
+        Search several Bible versions at once and merge their results.
+
+        The query is embedded once and every collection is searched concurrently. Scores are
+        normalized per collection and verses found in several versions are returned once
+        (see merge_version_results()). A collection that fails to search is logged and skipped.
+
+        Parameters:
+            query (str): User's search query (text or natural language).
+            limit (int): Maximum number of merged results (default: 10).
+            collection_names (list[str] | None): Collections to search, in priority order (default: all loaded collections).
+            book (str | None): Only search this book.
+            chapter_start (int | None): First chapter to search (requires book).
+            chapter_end (int | None): Last chapter to search (requires book).
+            testament (str | None): Only search the "old" or "new" testament.
+            profile (str | None): Search profile name (default: SEARCH_PROFILE).
+
+        Returns:
+            list[dict]: Merged results with a normalized "score" and the "versions" that found each verse.
+
+        Raises:
+            ValueError: If the scope or profile is invalid.
+            Exception: If the search fails in every collection.
+        """
+        scope = {"book": book, "chapter_start": chapter_start, "chapter_end": chapter_end, "testament": testament}
+        scope_filter(**scope)
+        search_profile = self.get_search_profile(profile)
+        if collection_names is None:
+            collection_names = self.loaded_collections or await self.list_collections_in_database()
+        if not collection_names:
+            return []
+
+        # One query embedding is shared by every collection
+        if self.database_type == "dense" or self.database_type == "hybrid":
+            query_embeddings = await self.embed_queries([query])
+        else:
+            query_embeddings = None
+
+        searches = [
+            self._search_embedded(collection_name, [query], query_embeddings, limit, scope, search_profile)
+            for collection_name in collection_names
+        ]
+        outcomes = await asyncio.gather(*searches, return_exceptions=True)
+
+        results_by_collection = {}
+        errors = []
+        for collection_name, outcome in zip(collection_names, outcomes):
+            if isinstance(outcome, BaseException):
+                if not isinstance(outcome, Exception):
+                    raise outcome
+                logger.warning(f"Error searching collection {collection_name}: {outcome}")
+                errors.append(outcome)
+            else:
+                results_by_collection[collection_name] = list(outcome[0])
+        if not results_by_collection:
+            raise errors[0]
+
+        return merge_version_results(results_by_collection, limit, self._scores_higher_is_better())
+
+    def _scores_higher_is_better(self):
+        """
+        Whether a larger search distance means a better match.
+
+        Returns:
+            bool: False only for Hamming distances (dense binary storage without re-ranking).
+        """
+        return not (
+            self.database_type == "dense"
+            and self.embedding_storage.mode == "binary"
+            and not self.embedding_storage.reranks
+        )
+
+    def _diversify(self, hits, limit: int, diversity: float, higher_is_better: bool | None = None):
+        """
+        Re-rank the candidates of one query into a diverse top-k (see diversify_results()).
+
+        Dense vectors are used when every candidate carries one; they are removed from the returned entities.
+
+        Parameters:
+            hits (list): Candidate search results of one query.
+            limit (int): Number of results to keep.
+            diversity (float): Weight of novelty against relevance.
+            higher_is_better (bool | None): Whether a larger distance means a better match (default: depends on
+                the index metric, see _scores_higher_is_better()).
+
+        Returns:
+            list[dict]: Diverse results, with consecutive verses merged when SEARCH_MERGE_NEIGHBOR_VERSES is enabled.
+        """
+        hits = list(hits)
+        vectors = None
+        if hits and all("dense_embedding" in (hit.get("entity") or {}) for hit in hits):
+            vectors = self.embedding_storage.to_float_array([hit["entity"]["dense_embedding"] for hit in hits])
+        selected = diversify_results(
+            hits,
+            limit,
+            diversity,
+            vectors,
+            self.merge_neighbor_verses,
+            self._scores_higher_is_better() if higher_is_better is None else higher_is_better,
+        )
+        return [
+            {
+                **hit,
+                "entity": {key: value for key, value in (hit.get("entity") or {}).items() if key != "dense_embedding"},
+            }
+            for hit in selected
+        ]
+
+    def _validate_diversity(self, diversity: float):
+        """
+        Check a diversity weight.
+
+        Parameters:
+            diversity (float): Weight of novelty against relevance.
+
+        Raises:
+            ValueError: If the weight is not between 0 and 1.
+        """
+        if not 0 <= diversity <= 1:
+            logger.error(f"Invalid search diversity: {diversity}")
+            raise ValueError(f"Invalid search diversity: {diversity}. It must be between 0 and 1")
+
+    def get_search_profile(self, name: str | None = None):
+        """
+        Get a search profile by name.
+
+        Parameters:
+            name (str | None): "fast", "balanced" or "accurate" (default: SEARCH_PROFILE).
+
+        Returns:
+            SearchProfile: The profile.
+
+        Raises:
+            ValueError: If the profile is unknown.
+        """
+        name = str(name or self.default_search_profile).strip().lower()
+        if name not in self.search_profiles:
+            logger.error(f"Invalid search profile: {name}")
+            raise ValueError(f"Invalid search profile: {name}. Valid search profiles are: {', '.join(SEARCH_PROFILES)}")
+        return self.search_profiles[name]
+
+    async def embed_queries(self, queries: list[str]):
+        """
+        Get the embeddings of search queries, from the query embedding cache when possible.
+
+        Queries missing from the cache are embedded together in a single request.
+
+        Parameters:
+            queries (list[str]): User's search queries.
+
+        Returns:
+            list: Query embeddings, in the order of queries.
+        """
+        if self.query_embedding_cache is None:
+            return await self._embed_queries_uncached(queries)
+        return await self.query_embedding_cache.get_or_embed_many(queries, self._embed_queries_uncached)
+
+    async def _embed_queries_uncached(self, queries: list[str]):
+        """
+        Embed search queries with the embedding service in one request.
+
+        Parameters:
+            queries (list[str]): User's search queries.
+
+        Returns:
+            list: Query embeddings, in the order of queries.
+        """
+        return await self.embedding_engine.async_embed(
+            list(queries), prompt_type="query", normalize=False, as_array=True
+        )
 
     async def close(self):
         """
         Close the async database connection.
 
         Safely handles both awaitable and non-awaitable close operations.
+        Cache, embedding and reranker counters are logged first, and the reranker's HTTP client is closed.
         """
+        if self.query_embedding_cache is not None:
+            logger.info(f"Query embedding cache: {self.query_embedding_cache.stats()}")
+        if self.database_type != "sparse":
+            logger.info(f"Embedding: {self.embedding_engine.stats()}")
+        if self.search_result_cache is not None:
+            logger.info(f"Search result cache: {self.search_result_cache.stats()}")
+        if self.reranker is not None:
+            logger.info(f"Reranker: {self.reranker.stats()}")
+            await self.reranker.close()
         if self.async_client is None:
             return
         close_result = self.async_client.close()
@@ -0,0 +1,159 @@
+import hashlib
+import logging
+import unicodedata
+from collections.abc import Awaitable, Callable
+
+import numpy as np
+
+from ai.vdb.coalescing_cache import CoalescingCache
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query so trivially different spellings share a cache entry.
+
+    Applies Unicode NFC normalization and collapses whitespace. Case is kept because
+    embedding models are case-sensitive.
+
+    Parameters:
+        query (str): Query text as typed by the user.
+
+    Returns:
+        str: Normalized query text.
+    """
+    return " ".join(unicodedata.normalize("NFC", query).split())
+
+
+class QueryEmbeddingCache(CoalescingCache):
+    """
+    Bounded cache of query embeddings with least-recently-used and time-to-live eviction.
+
+    Entries are keyed by embedding model ID, query prompt template and normalized query text.
+    An optional Django cache (e.g. the "shared" file-based cache) is consulted on local misses,
+    so every worker process benefits from queries embedded by the others. Concurrent lookups
+    of the same query wait for a single embedding request (see CoalescingCache).
+
+    Counters (hits, shared_hits, misses, coalesced, evictions, expirations) are available via stats().
+    """
+
+    description = "query embedding cache"
+
+    def __init__(
+        self,
+        model_name: str,
+        query_template: str,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        shared_cache=None,
+    ):
+        """
+        Initialize the cache.
+
+        Parameters:
+            model_name (str): Embedding model ID (EMBEDDING_MODEL_ID).
+            query_template (str): Query prompt template (EMBEDDING_MODEL_QUERY_PROMPT).
+            max_entries (int): Maximum number of embeddings kept in this process.
+            ttl_seconds (float): Seconds an embedding stays valid (0 keeps entries until evicted).
+            shared_cache (BaseCache | None): Django cache shared between worker processes.
+
+        Raises:
+            ValueError: If max_entries is not positive or ttl_seconds is negative.
+        """
+        if max_entries < 1 or ttl_seconds < 0:
+            logger.error("Query embedding cache size must be positive and its TTL must not be negative")
+            raise ValueError("Query embedding cache size must be positive and its TTL must not be negative")
+        super().__init__(max_entries, ttl_seconds, shared_cache)
+        self._namespace = f"{model_name}\0{query_template}\0"
+
+    def key(self, query: str) -> str:
+        """
+        Build the cache key of a query.
+
+        Parameters:
+            query (str): Query text.
+
+        Returns:
+            str: Hex SHA-256 digest of the model, query template and normalized query.
+        """
+        digest = hashlib.sha256(f"{self._namespace}{normalize_query(query)}".encode("utf-8")).hexdigest()
+        return f"query-embedding:{digest}"
+
+    def get(self, query: str) -> np.ndarray | None:
+        """
+        Look up a query in this process.
+
+        Parameters:
+            query (str): Query text.
+
+        Returns:
+            np.ndarray | None: The cached float32 embedding, or None if missing or expired.
+        """
+        return self._get_local(self.key(query))
+
+    def put(self, query: str, embedding):
+        """
+        Store a query embedding in this process.
+
+        Parameters:
+            query (str): Query text.
+            embedding (list | np.ndarray): Query embedding.
+        """
+        self._put_local(self.key(query), self.prepare_value(embedding))
+
+    async def get_or_embed(self, query: str, embed: Callable[[str], Awaitable]) -> np.ndarray:
+        """
+        Get a query embedding from the cache, embedding it on a miss.
+
+        Parameters:
+            query (str): Query text.
+            embed (Callable): Coroutine function returning the embedding of a query.
+
+        Returns:
+            np.ndarray: Float32 query embedding (read-only, as it is shared with other lookups).
+
+        Raises:
+            Exception: Any error raised by embed (not cached, so the next lookup retries).
+        """
+
+        async def embed_many(queries: list[str]) -> list:
+            return [await embed(queries[0])]
+
+        return (await self.get_or_embed_many([query], embed_many))[0]
+
+    async def get_or_embed_many(
+        self, queries: list[str], embed_many: Callable[[list[str]], Awaitable[list]]
+    ) -> list[np.ndarray]:
+        """
+        Get the embeddings of several queries, embedding all misses in a single request.
+
+        Parameters:
+            queries (list[str]): Query texts.
+            embed_many (Callable): Coroutine function returning the embeddings of a list of queries, in order.
+
+        Returns:
+            list[np.ndarray]: Float32 query embeddings (read-only), in the order of queries.
+
+        Raises:
+            Exception: Any error raised by embed_many (not cached, so the next lookup retries).
+        """
+        return await self.get_or_compute_many([self.key(query) for query in queries], queries, embed_many)
+
+    def prepare_value(self, value) -> np.ndarray:
+        """Convert an embedding to a float32 array."""
+        return np.asarray(value, dtype=np.float32)
+
+    def encode_shared(self, value: np.ndarray) -> bytes:
+        """Store an embedding in the shared cache as raw float32 bytes."""
+        return value.tobytes()
+
+    def decode_shared(self, stored: bytes) -> np.ndarray:
+        """Read an embedding stored by encode_shared()."""
+        return np.frombuffer(stored, dtype=np.float32).copy()
+
+    def _put_local(self, key: str, value: np.ndarray):
+        """Store an embedding in this process, read-only as it is shared with other lookups."""
+        value.setflags(write=False)
+        super()._put_local(key, value)
@@ -0,0 +1,157 @@
+import logging
+
+import numpy as np
+
+from ai.vdb.fusion import normalize_scores
+from ai.vdb.local_index import tokenize
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def cosine_similarity_matrix(vectors: np.ndarray) -> np.ndarray:
+    """
+    Compute the pairwise cosine similarity of a matrix of vectors.
+
+    Parameters:
+        vectors (np.ndarray): One vector per row.
+
+    Returns:
+        np.ndarray: Square matrix of similarities (rows of zeros are similar to nothing).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit_vectors = vectors / np.where(norms > 0, norms, 1.0)
+    return unit_vectors @ unit_vectors.T
+
+
+def text_similarity_matrix(texts: list[str]) -> np.ndarray:
+    """
+    Compute the pairwise word overlap (Jaccard similarity) of texts.
+
+    Used instead of vector similarity when no dense vectors are available (sparse databases,
+    local index results).
+
+    Parameters:
+        texts (list[str]): Verse texts.
+
+    Returns:
+        np.ndarray: Square matrix of similarities between 0 and 1.
+    """
+    word_sets = [set(tokenize(text or "")) for text in texts]
+    similarity = np.eye(len(texts), dtype=np.float32)
+    for row, words in enumerate(word_sets):
+        for column in range(row + 1, len(texts)):
+            union = len(words | word_sets[column])
+            similarity[row, column] = similarity[column, row] = len(words & word_sets[column]) / union if union else 0.0
+    return similarity
+
+
+def maximal_marginal_relevance(relevance, similarity: np.ndarray, limit: int, diversity: float) -> list[int]:
+    """
+    Select results that are relevant to the query but not redundant with each other.
+
+    Each step picks the candidate maximizing
+    (1 - diversity) * relevance - diversity * (highest similarity to an already selected candidate).
+
+    Parameters:
+        relevance (list[float] | np.ndarray): Relevance of each candidate, between 0 and 1.
+        similarity (np.ndarray): Pairwise similarity of the candidates.
+        limit (int): Number of candidates to select.
+        diversity (float): Weight of novelty against relevance (0 keeps the relevance order, 1 only seeks novelty).
+
+    Returns:
+        list[int]: Indices of the selected candidates, in selection order.
+    """
+    relevance = np.asarray(relevance, dtype=np.float32)
+    remaining = list(range(len(relevance)))
+    selected = []
+    redundancy = np.zeros(len(relevance), dtype=np.float32)
+    while remaining and len(selected) < limit:
+        scores = (1 - diversity) * relevance[remaining] - diversity * redundancy[remaining]
+        best = remaining.pop(int(np.argmax(scores)))
+        selected.append(best)
+        redundancy = np.maximum(redundancy, similarity[best])
+    return selected
+
+
+def merge_neighbor_verses(hits: list) -> list[dict]:
+    """
+    Merge results that are consecutive verses of the same chapter into passages.
+
+    A passage takes the position, id and distance of its best-ranked verse. Its entity keeps
+    the first verse in "verse", adds the last one as "verse_end" and joins the verse texts.
+
+    Parameters:
+        hits (list): Search results in ranking order.
+
+    Returns:
+        list[dict]: Results with neighboring verses merged, in ranking order.
+    """
+    verses_by_chapter = {}
+    for position, hit in enumerate(hits):
+        entity = hit.get("entity") or {}
+        chapter_key = (entity.get("version"), entity.get("book"), entity.get("chapter"))
+        verses_by_chapter.setdefault(chapter_key, []).append((int(entity.get("verse") or 0), position))
+
+    passages = []
+    for verses in verses_by_chapter.values():
+        verses.sort()
+        run = [verses[0]]
+        for verse, position in verses[1:]:
+            if verse == run[-1][0] + 1:
+                run.append((verse, position))
+                continue
+            passages.append(run)
+            run = [(verse, position)]
+        passages.append(run)
+
+    merged = []
+    for run in sorted(passages, key=lambda run: min(position for _, position in run)):
+        best = hits[min(position for _, position in run)]
+        if len(run) == 1:
+            merged.append(best)
+            continue
+        entity = dict(best.get("entity") or {})
+        entity["verse"] = run[0][0]
+        entity["verse_end"] = run[-1][0]
+        entity["text"] = " ".join(str(hits[position]["entity"].get("text") or "") for _, position in run)
+        merged.append({**best, "entity": entity})
+    return merged
+
+
+def diversify_results(
+    hits: list,
+    limit: int,
+    diversity: float,
+    vectors: np.ndarray | None = None,
+    merge_neighbors: bool = False,
+    higher_is_better: bool = True,
+) -> list[dict]:
+    """
+    Re-rank an oversized candidate list into a compact, diverse top-k.
+
+    Candidates are selected by maximal marginal relevance over their dense vectors (or their
+    word overlap when no vectors are given), then neighboring verses are merged into passages.
+
+    Parameters:
+        hits (list): Candidate search results in ranking order.
+        limit (int): Number of candidates to select.
+        diversity (float): Weight of novelty against relevance (see maximal_marginal_relevance()).
+        vectors (np.ndarray | None): Dense vector of each candidate, one per row.
+        merge_neighbors (bool): Merge selected verses that follow each other into passages (default: False).
+        higher_is_better (bool): Whether a larger distance means a better match.
+
+    Returns:
+        list[dict]: At most `limit` results (fewer when verses were merged).
+    """
+    hits = list(hits)
+    if not hits:
+        return []
+    relevance = normalize_scores(hits, higher_is_better)
+    if vectors is not None:
+        similarity = cosine_similarity_matrix(vectors)
+    else:
+        similarity = text_similarity_matrix([(hit.get("entity") or {}).get("text") for hit in hits])
+    selected = [hits[index] for index in maximal_marginal_relevance(relevance, similarity, limit, diversity)]
+    return merge_neighbor_verses(selected) if merge_neighbors else selected
@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+
+import httpx
+
+from ai.vdb.local_index import BM25Index
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Scorers accepted by RERANKER ("off" disables re-ranking)
+RERANKERS = ["off", "endpoint", "lexical"]
+
+
+class EndpointScorer:
+    """
+    Scores query/document pairs with a cross-encoder behind an OpenAI-compatible rerank endpoint.
+
+    Sends POST {base_url}/rerank with {"model", "query", "documents", "top_n"}, as served by
+    llama.cpp, vLLM, Infinity or Text Embeddings Inference. Both the {"results": [{"index",
+    "relevance_score"}]} and the [{"index", "score"}] response formats are understood.
+    """
+
+    def __init__(self, base_url: str, model_name: str, api_key: str = "", client: httpx.AsyncClient | None = None):
+        """
+        Initialize the scorer.
+
+        Parameters:
+            base_url (str): Base URL of the rerank service, e.g. http://reranker:11436/v1.
+            model_name (str): Reranker model identifier.
+            api_key (str): Bearer token for the service (empty sends none).
+            client (httpx.AsyncClient | None): HTTP client to use (default: a new one).
+
+        Raises:
+            ValueError: If the base URL or model is not set.
+        """
+        if not base_url or not model_name:
+            logger.error("Rerank URL or model ID is not set")
+            raise ValueError("Rerank URL or model ID is not set")
+        self.model_name = model_name
+        self.url = f"{base_url.rstrip('/')}/rerank"
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.client = client or httpx.AsyncClient(headers=headers)
+
+    @property
+    def signature(self) -> str:
+        """
+        Identify the scores this scorer produces (part of search result cache keys).
+
+        Returns:
+            str: "endpoint:{model}".
+        """
+        return f"endpoint:{self.model_name}"
+
+    async def scores(self, query: str, texts: list[str]) -> list[float]:
+        """
+        Score every text against the query.
+
+        Parameters:
+            query (str): Search query.
+            texts (list[str]): Candidate texts.
+
+        Returns:
+            list[float]: Relevance score of each text (higher is better; texts the service skipped score -inf).
+
+        Raises:
+            httpx.HTTPError: If the request fails.
+            ValueError: If the response cannot be read.
+        """
+        response = await self.client.post(
+            self.url, json={"model": self.model_name, "query": query, "documents": texts, "top_n": len(texts)}
+        )
+        response.raise_for_status()
+        data = response.json()
+        results = data.get("results") if isinstance(data, dict) else data
+        if not isinstance(results, list):
+            logger.error(f"Invalid rerank response: {data}")
+            raise ValueError(f"Invalid rerank response: {data}")
+        scores = [float("-inf")] * len(texts)
+        for result in results:
+            scores[int(result["index"])] = float(result.get("relevance_score", result.get("score", float("-inf"))))
+        return scores
+
+    async def close(self):
+        """
+        Close the HTTP client.
+        """
+        await self.client.aclose()
+
+
+class LexicalScorer:
+    """
+    Scores texts in-process by BM25 over the candidate set, without a model.
+
+    A cheap local alternative to a cross-encoder: candidates that share the query's rarer words
+    move up, which mostly helps dense results that missed exact names and terms.
+    """
+
+    signature = "lexical"
+
+    async def scores(self, query: str, texts: list[str]) -> list[float]:
+        """
+        Score every text against the query.
+
+        Parameters:
+            query (str): Search query.
+            texts (list[str]): Candidate texts.
+
+        Returns:
+            list[float]: BM25 score of each text (higher is better).
+        """
+        return await asyncio.to_thread(lambda: BM25Index(texts).scores(query).tolist())
+
+    async def close(self):
+        """
+        Nothing to release.
+        """
+
+
+class SearchReranker:
+    """
+    Re-orders search candidates with a scorer within a strict time budget.
+
+    When scoring fails or takes longer than the budget, candidates keep their original order,
+    so re-ranking can only add latency up to the budget. Counters (reranked, timeouts, errors)
+    are available via stats().
+    """
+
+    def __init__(self, scorer, budget_seconds: float = 0.3, candidate_factor: int = 3):
+        """
+        Initialize the reranker.
+
+        Parameters:
+            scorer (EndpointScorer | LexicalScorer): Scores query/text pairs.
+            budget_seconds (float): Longest time scoring one query may take.
+            candidate_factor (int): How many times the result limit is fetched as candidates.
+
+        Raises:
+            ValueError: If the budget or candidate factor is not positive.
+        """
+        if budget_seconds <= 0 or candidate_factor < 1:
+            logger.error("Rerank budget and candidate factor must be positive")
+            raise ValueError("Rerank budget and candidate factor must be positive")
+        self.scorer = scorer
+        self.budget_seconds = budget_seconds
+        self.candidate_factor = candidate_factor
+        self._lock = threading.Lock()
+        self.reranked = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    @property
+    def signature(self) -> str:
+        """
+        Identify the ordering this reranker produces (part of search result cache keys).
+
+        Returns:
+            str: Signature of the scorer.
+        """
+        return self.scorer.signature
+
+    async def rerank(self, query: str, hits) -> tuple[list, bool]:
+        """
+        Order the candidates of one query by the scorer.
+
+        Parameters:
+            query (str): Search query.
+            hits (Iterable): Candidate search results, in their original order.
+
+        Returns:
+            tuple[list, bool]: The candidates, and whether they were re-scored. Re-scored hits are
+                sorted by their new "distance" (the scorer's relevance, higher is better); otherwise
+                they are returned unchanged.
+        """
+        hits = list(hits)
+        if len(hits) < 2:
+            return hits, False
+        texts = [str((hit.get("entity") or {}).get("text") or "") for hit in hits]
+        started = time.perf_counter()
+        try:
+            scores = await asyncio.wait_for(self.scorer.scores(query, texts), timeout=self.budget_seconds)
+        except TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            logger.warning(f"Re-ranking exceeded its {self.budget_seconds * 1000:.0f} ms budget, keeping search order")
+            return hits, False
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            logger.warning(f"Re-ranking failed ({type(e).__name__}: {e}), keeping search order")
+            return hits, False
+        with self._lock:
+            self.reranked += 1
+        logger.debug(f"Re-ranked {len(hits)} candidates in {(time.perf_counter() - started) * 1000:.0f} ms")
+        rescored = [{**hit, "distance": score} for hit, score in zip(hits, scores)]
+        # Stable sort, so ties keep the search order
+        return sorted(rescored, key=lambda hit: hit["distance"], reverse=True), True
+
+    def stats(self) -> dict:
+        """
+        Get reranker counters.
+
+        Returns:
+            dict: reranked, timeouts and errors.
+        """
+        with self._lock:
+            return {"reranked": self.reranked, "timeouts": self.timeouts, "errors": self.errors}
+
+    async def close(self):
+        """
+        Release the scorer's resources.
+        """
+        await self.scorer.close()
+
+
+def load_reranker():
+    """
+    Create the reranker configured by environment variables.
+
+    Configuration:
+        - RERANKER: "off" (default), "endpoint" (BASE_RERANK_URL, RERANK_MODEL_ID, RERANK_API_KEY)
+          or "lexical" (in-process BM25 over the candidates)
+        - RERANK_BUDGET_MS: Longest time scoring one query may take before the search order is kept (300 default)
+        - RERANK_CANDIDATES: How many times the result limit is fetched as candidates (3 default)
+
+    Returns:
+        SearchReranker | None: The reranker, or None when re-ranking is off.
+
+    Raises:
+        ValueError: If RERANKER is unknown or its settings are invalid.
+    """
+    reranker = str(os.getenv("RERANKER") or "off").strip().lower()
+    if reranker not in RERANKERS:
+        logger.error(f"Invalid reranker: {reranker}")
+        raise ValueError(f"Invalid reranker: {reranker}. Valid rerankers are: {', '.join(RERANKERS)}")
+    if reranker == "off":
+        return None
+    if reranker == "endpoint":
+        scorer = EndpointScorer(
+            base_url=str(os.getenv("BASE_RERANK_URL") or "").strip(),
+            model_name=str(os.getenv("RERANK_MODEL_ID") or "").strip(),
+            api_key=str(os.getenv("RERANK_API_KEY") or "").strip(),
+        )
+    else:
+        scorer = LexicalScorer()
+    return SearchReranker(
+        scorer,
+        budget_seconds=float(str(os.getenv("RERANK_BUDGET_MS") or 300).strip()) / 1000,
+        candidate_factor=int(str(os.getenv("RERANK_CANDIDATES") or 3).strip()),
+    )
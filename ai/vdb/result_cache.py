@@ -0,0 +1,232 @@
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from ai.vdb.coalescing_cache import CoalescingCache
+from ai.vdb.query_cache import normalize_query
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Entity fields kept for each cached hit
+RESULT_FIELDS = ["version", "book", "chapter", "verse", "text"]
+# Entity fields kept only when present (last verse of passages merged by diversify_results())
+OPTIONAL_RESULT_FIELDS = ["verse_end"]
+
+
+def generation_key(collection_name: str) -> str:
+    """
+    Build the shared cache key holding the data generation of a collection.
+
+    Parameters:
+        collection_name (str): Name of the Bible version collection.
+
+    Returns:
+        str: Cache key.
+    """
+    return f"search-results:generation:{collection_name}"
+
+
+def invalidate_search_results(shared_cache, collection_name: str):
+    """
+    Invalidate every cached search result of a collection in all web workers.
+
+    Used by VectorDatabaseBuilder after a collection is rebuilt or updated. A new generation
+    token is written to the shared cache, so result cache keys of the previous data no longer match.
+    Failures are logged and ignored (cached results then expire with their TTL).
+
+    Parameters:
+        shared_cache (BaseCache | None): Django cache shared with the web workers (None does nothing).
+        collection_name (str): Name of the rebuilt collection.
+    """
+    if shared_cache is None:
+        return
+    try:
+        shared_cache.set(generation_key(collection_name), str(time.time_ns()), timeout=None)
+    except Exception as e:
+        logger.warning(f"Could not invalidate cached search results of {collection_name}: {e}")
+
+
+def compact_hit(hit) -> dict:
+    """
+    Reduce a search hit to the fields the views use.
+
+    Parameters:
+        hit (dict): Search result from Milvus or the local index.
+
+    Returns:
+        dict: id, distance and entity (version, book, chapter, verse, text, and verse_end of passages).
+    """
+    entity = hit.get("entity") or {}
+    compact_entity = {field: entity.get(field) for field in RESULT_FIELDS}
+    compact_entity.update({field: entity[field] for field in OPTIONAL_RESULT_FIELDS if field in entity})
+    return {
+        "id": hit.get("id"),
+        "distance": float(hit.get("distance") or 0.0),
+        "entity": compact_entity,
+    }
+
+
+class SearchResultCache(CoalescingCache):
+    """
+    Bounded cache of search results with least-recently-used and time-to-live eviction.
+
+    Entries are keyed by collection, normalized query, limit, search profile, scope and the
+    collection's data generation. Generations come from an optional Django cache shared with
+    the builder (see invalidate_search_results()) and are re-read at most every
+    `generation_check_seconds`, so a rebuilt collection stops serving old results within that time.
+    This only works when the builder and the web workers use the same cache storage (e.g. a
+    FileBasedCache directory on a mounted volume).
+    Results are also stored in the shared cache, and concurrent searches of the same query wait
+    for a single search (see CoalescingCache).
+
+    Counters (hits, shared_hits, misses, coalesced, evictions, expirations, invalidations) are
+    available via stats().
+    """
+
+    description = "search result cache"
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 600,
+        shared_cache=None,
+        generation_check_seconds: float = 5,
+    ):
+        """
+        Initialize the cache.
+
+        Parameters:
+            max_entries (int): Maximum number of result lists kept in this process.
+            ttl_seconds (float): Seconds a result list stays valid (0 keeps entries until evicted or invalidated).
+            shared_cache (BaseCache | None): Django cache shared between worker processes and the builder.
+            generation_check_seconds (float): Seconds a collection's generation is trusted before it is re-read.
+
+        Raises:
+            ValueError: If max_entries is not positive or a duration is negative.
+        """
+        if max_entries < 1 or ttl_seconds < 0 or generation_check_seconds < 0:
+            logger.error("Search result cache size must be positive and its durations must not be negative")
+            raise ValueError("Search result cache size must be positive and its durations must not be negative")
+        super().__init__(max_entries, ttl_seconds, shared_cache)
+        self.generation_check_seconds = generation_check_seconds
+        self._generations = {}
+        self.invalidations = 0
+
+    def key(self, collection_name: str, query: str, context: dict, generation: str) -> str:
+        """
+        Build the cache key of a search.
+
+        Parameters:
+            collection_name (str): Name of the Bible version collection.
+            query (str): Query text.
+            context (dict): Everything else that changes the results (limit, profile, scope, database type).
+            generation (str): Data generation of the collection.
+
+        Returns:
+            str: Key with the collection name and a hex SHA-256 digest of the search.
+        """
+        settings = json.dumps(context, sort_keys=True, default=str)
+        digest = hashlib.sha256(f"{generation}\0{settings}\0{normalize_query(query)}".encode("utf-8")).hexdigest()
+        return f"search-results:{collection_name}:{digest}"
+
+    async def get_or_search_many(
+        self,
+        collection_name: str,
+        queries: list[str],
+        context: dict,
+        search_many: Callable[[list[str]], Awaitable[list]],
+    ) -> list[list]:
+        """
+        Get the results of several queries, searching all misses together.
+
+        Parameters:
+            collection_name (str): Name of the Bible version collection.
+            queries (list[str]): Query texts.
+            context (dict): Limit, profile, scope and database type of the search.
+            search_many (Callable): Coroutine function returning the results of a list of queries, in order.
+
+        Returns:
+            list[list]: Compact results (see compact_hit()) of each query, in the order of queries.
+                Lists are shared with other lookups and must not be modified.
+
+        Raises:
+            Exception: Any error raised by search_many (not cached, so the next lookup retries).
+        """
+        generation = await self._generation(collection_name)
+        keys = [self.key(collection_name, query, context, generation) for query in queries]
+        return await self.get_or_compute_many(keys, queries, search_many)
+
+    def invalidate(self, collection_name: str):
+        """
+        Drop the cached results of a collection held in this process.
+
+        Parameters:
+            collection_name (str): Name of the Bible version collection.
+        """
+        with self._lock:
+            self._drop_entries(collection_name)
+            self._generations.pop(collection_name, None)
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        """
+        Get cache counters.
+
+        Returns:
+            dict: entries, hits, shared_hits, misses, coalesced, evictions, expirations, invalidations and hit_rate.
+        """
+        stats = super().stats()
+        with self._lock:
+            stats["invalidations"] = self.invalidations
+        return stats
+
+    def clear(self):
+        """
+        Drop every result held in this process (the shared cache is left as is).
+        """
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+    def prepare_value(self, value: list) -> list:
+        """Reduce the hits of a search to the fields the views use (see compact_hit())."""
+        return [compact_hit(hit) for hit in value]
+
+    def encode_shared(self, value: list) -> str:
+        """Store results in the shared cache as JSON."""
+        return json.dumps(value)
+
+    def decode_shared(self, stored: str) -> list:
+        """Read results stored by encode_shared()."""
+        return json.loads(stored)
+
+    async def _generation(self, collection_name: str) -> str:
+        """Get the data generation of a collection, re-reading the shared cache when it is due."""
+        now = time.monotonic()
+        with self._lock:
+            known = self._generations.get(collection_name)
+        if known is not None and now - known[0] < self.generation_check_seconds:
+            return known[1]
+        generation = "0"
+        if self.shared_cache is not None:
+            try:
+                generation = str(await self.shared_cache.aget(generation_key(collection_name)) or "0")
+            except Exception as e:
+                logger.warning(f"Search result cache generation lookup failed: {e}")
+                generation = known[1] if known is not None else "0"
+        with self._lock:
+            if known is not None and known[1] != generation:
+                # The collection was rebuilt, so results of the previous generation are never used again
+                self._drop_entries(collection_name)
+                self.invalidations += 1
+            self._generations[collection_name] = (now, generation)
+        return generation
+
+    def _drop_entries(self, collection_name: str):
+        """Remove the results of a collection from this process (the lock must be held)."""
+        prefix = f"search-results:{collection_name}:"
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
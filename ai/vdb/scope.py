@@ -0,0 +1,125 @@
+import logging
+
+from fAIth import bible_globals
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Testaments accepted by scope_filter() (the first 39 books of IN_ORDER_BOOKS are the Old Testament)
+TESTAMENTS = ["old", "new"]
+OLD_TESTAMENT_BOOK_COUNT = 39
+
+# Scopes around a passage accepted by passage_scope(), from widest to narrowest
+PASSAGE_SCOPES = ["all", "testament", "book", "chapter"]
+
+
+def books_in_testament(testament: str) -> list[str]:
+    """
+    List the books of a testament in canonical order.
+
+    Parameters:
+        testament (str): "old" or "new" (case-insensitive).
+
+    Returns:
+        list[str]: Book names of the testament.
+
+    Raises:
+        ValueError: If the testament is unknown.
+    """
+    testament = testament.strip().lower()
+    if testament not in TESTAMENTS:
+        logger.error(f"Invalid testament: {testament}. Must be one of {TESTAMENTS}")
+        raise ValueError(f"Invalid testament: {testament}. Must be one of {TESTAMENTS}")
+    if testament == "old":
+        return bible_globals.IN_ORDER_BOOKS[:OLD_TESTAMENT_BOOK_COUNT]
+    return bible_globals.IN_ORDER_BOOKS[OLD_TESTAMENT_BOOK_COUNT:]
+
+
+def scope_filter(
+    book: str | None = None,
+    chapter_start: int | None = None,
+    chapter_end: int | None = None,
+    testament: str | None = None,
+) -> str:
+    """
+    Build a Milvus filter expression restricting a search to part of the Bible.
+
+    Book and testament filters use the "book" field, which is the partition key of collections
+    built with MILVUS_BOOK_PARTITION_KEY, so Milvus only searches the matching partitions.
+    Values are checked against IN_ORDER_BOOKS, so user input never reaches the expression as is.
+
+    Parameters:
+        book (str | None): Only search this book, e.g. "John".
+        chapter_start (int | None): First chapter to search (requires book).
+        chapter_end (int | None): Last chapter to search (requires book, defaults to chapter_start).
+        testament (str | None): Only search the "old" or "new" testament.
+
+    Returns:
+        str: Filter expression, or an empty string when nothing is restricted.
+
+    Raises:
+        ValueError: If the book or testament is unknown, a chapter range is given without a book,
+            the chapter range is invalid, or the book is not in the testament.
+    """
+    expressions = []
+    if testament:
+        books = books_in_testament(testament)
+        if book is None:
+            quoted_books = ", ".join(f'"{name}"' for name in books)
+            expressions.append(f"book in [{quoted_books}]")
+        elif book not in books:
+            logger.error(f"{book} is not in the {testament.strip().lower()} testament")
+            raise ValueError(f"{book} is not in the {testament.strip().lower()} testament")
+
+    if book is not None:
+        if book not in bible_globals.IN_ORDER_BOOKS:
+            logger.error(f"Invalid book: {book}")
+            raise ValueError(f"Invalid book: {book}")
+        expressions.append(f'book == "{book}"')
+
+    if chapter_start is not None or chapter_end is not None:
+        if book is None:
+            logger.error("A chapter range requires a book")
+            raise ValueError("A chapter range requires a book")
+        chapter_start = int(chapter_start if chapter_start is not None else 1)
+        chapter_end = int(chapter_end if chapter_end is not None else chapter_start)
+        if chapter_start < 1 or chapter_end < chapter_start:
+            logger.error(f"Invalid chapter range: {chapter_start}-{chapter_end}")
+            raise ValueError(f"Invalid chapter range: {chapter_start}-{chapter_end}")
+        if chapter_start == chapter_end:
+            expressions.append(f"chapter == {chapter_start}")
+        else:
+            expressions.append(f"chapter >= {chapter_start} and chapter <= {chapter_end}")
+
+    return " and ".join(expressions)
+
+
+def passage_scope(scope: str, book: str, chapter: int | str) -> dict:
+    """
+    Get the search() scope arguments that keep a search around a passage the user is reading.
+
+    Parameters:
+        scope (str): One of PASSAGE_SCOPES ("all" searches the whole collection).
+        book (str): Book of the passage.
+        chapter (int | str): Chapter of the passage.
+
+    Returns:
+        dict: Keyword arguments (book, chapter_start, chapter_end or testament) for search() and search_many().
+
+    Raises:
+        ValueError: If the scope or book is unknown.
+    """
+    scope = scope.strip().lower()
+    if scope not in PASSAGE_SCOPES:
+        logger.error(f"Invalid search scope: {scope}. Must be one of {PASSAGE_SCOPES}")
+        raise ValueError(f"Invalid search scope: {scope}. Must be one of {PASSAGE_SCOPES}")
+    if scope == "all":
+        return {}
+    if book not in bible_globals.IN_ORDER_BOOKS:
+        logger.error(f"Invalid book: {book}")
+        raise ValueError(f"Invalid book: {book}")
+    if scope == "testament":
+        return {"testament": "old" if book in books_in_testament("old") else "new"}
+    if scope == "book":
+        return {"book": book}
+    return {"book": book, "chapter_start": int(chapter), "chapter_end": int(chapter)}
@@ -0,0 +1,247 @@
+import logging
+import os
+from collections import deque
+
+import numpy as np
+from pymilvus import RRFRanker, WeightedRanker
+
+from fAIth.function_globals import derive_boolean_from_string
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Built-in search profiles, from cheapest to most thorough
+SEARCH_PROFILES = ["fast", "balanced", "accurate"]
+
+# Rank fusion strategies for hybrid search
+RANKERS = ["weighted", "rrf"]
+
+# Settings of the built-in profiles ("balanced" matches the search settings used before profiles existed)
+DEFAULT_PROFILE_SETTINGS = {
+    "fast": {"ef": 64, "nprobe_factor": 0.5, "drop_ratio": 0.4, "adaptive": True},
+    "balanced": {"ef": 128, "nprobe_factor": 1.0, "drop_ratio": 0.2, "adaptive": False},
+    "accurate": {"ef": 256, "nprobe_factor": 2.0, "drop_ratio": 0.0, "adaptive": False},
+}
+
+
+class SearchProfile:
+    """
+    Trade-off between search latency and recall for one kind of request.
+
+    A profile sets how much of each index is explored (HNSW ef, IVF nprobe, BM25 drop ratio)
+    and how hybrid results are fused (WeightedRanker or RRFRanker). Adaptive profiles lower
+    their ef/nprobe while the recent p95 search latency is above target (see LatencyTracker).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ef: int = 128,
+        nprobe_factor: float = 1.0,
+        drop_ratio: float = 0.2,
+        ranker: str = "weighted",
+        rrf_k: int = 60,
+        adaptive: bool = False,
+    ):
+        """
+        Initialize the profile.
+
+        Parameters:
+            name (str): Profile name.
+            ef (int): HNSW candidate list size (raised to the result limit when smaller).
+            nprobe_factor (float): Multiplier of MILVUS_IVF_NPROBE for sq8 storage.
+            drop_ratio (float): Share of the smallest query term weights BM25 search ignores (0 to <1).
+            ranker (str): "weighted" (SPARSE_WEIGHT/DENSE_WEIGHT) or "rrf" (reciprocal rank fusion).
+            rrf_k (int): Smoothing constant of reciprocal rank fusion.
+            adaptive (bool): Lower ef/nprobe automatically when the p95 latency exceeds its target.
+
+        Raises:
+            ValueError: If the ranker is unknown or a setting is out of range.
+        """
+        if ranker not in RANKERS:
+            logger.error(f"Invalid ranker: {ranker}")
+            raise ValueError(f"Invalid ranker: {ranker}. Valid rankers are: {', '.join(RANKERS)}")
+        if ef < 1 or nprobe_factor <= 0 or rrf_k < 1 or not 0 <= drop_ratio < 1:
+            logger.error(f"Invalid settings for search profile {name}")
+            raise ValueError(f"Invalid settings for search profile {name}")
+        self.name = name
+        self.ef = ef
+        self.nprobe_factor = nprobe_factor
+        self.drop_ratio = drop_ratio
+        self.ranker = ranker
+        self.rrf_k = rrf_k
+        self.adaptive = adaptive
+
+    def sparse_search_params(self) -> dict:
+        """
+        Search settings for the sparse_embedding (BM25) field.
+
+        Returns:
+            dict: metric_type and params for a sparse search request.
+        """
+        return {"metric_type": "BM25", "params": {"drop_ratio_search": self.drop_ratio}}
+
+    def dense_search_params(self, base_params: dict, limit: int, effort: float = 1.0) -> dict:
+        """
+        Apply the profile to the search settings of the dense_embedding field.
+
+        Parameters:
+            base_params (dict): Settings from EmbeddingStorage.search_params().
+            limit (int): Number of candidates requested (HNSW needs ef >= limit).
+            effort (float): Share of the profile's ef/nprobe to use (1.0 unless adapted to latency).
+
+        Returns:
+            dict: metric_type and params for a dense search request.
+        """
+        params = dict(base_params["params"])
+        if "ef" in params:
+            params["ef"] = max(limit, round(self.ef * effort))
+        if "nprobe" in params:
+            params["nprobe"] = max(1, round(params["nprobe"] * self.nprobe_factor * effort))
+        return {**base_params, "params": params}
+
+    def hybrid_ranker(self, sparse_weight: float, dense_weight: float):
+        """
+        Create the ranker that fuses sparse and dense results.
+
+        Parameters:
+            sparse_weight (float): Weight of BM25 results for the weighted ranker.
+            dense_weight (float): Weight of dense results for the weighted ranker.
+
+        Returns:
+            WeightedRanker | RRFRanker: Ranker for hybrid_search().
+        """
+        if self.ranker == "rrf":
+            return RRFRanker(self.rrf_k)
+        return WeightedRanker(sparse_weight, dense_weight)
+
+
+def parse_profile_settings(name: str, specification: str, defaults: dict) -> dict:
+    """
+    Parse profile overrides such as "ef=96,ranker=rrf,adaptive=true".
+
+    Parameters:
+        name (str): Profile name (used in error messages).
+        specification (str): Comma-separated key=value settings (empty keeps the defaults).
+        defaults (dict): Settings the overrides apply to.
+
+    Returns:
+        dict: Profile settings.
+
+    Raises:
+        ValueError: If a setting is unknown or malformed.
+    """
+    settings = dict(defaults)
+    converters = {
+        "ef": int,
+        "nprobe_factor": float,
+        "drop_ratio": float,
+        "ranker": lambda value: value.lower(),
+        "rrf_k": int,
+        "adaptive": derive_boolean_from_string,
+    }
+    for item in specification.split(","):
+        if not item.strip():
+            continue
+        key, separator, value = item.partition("=")
+        key = key.strip().lower()
+        if not separator or key not in converters:
+            logger.error(f"Invalid setting for search profile {name}: {item.strip()}")
+            raise ValueError(f"Invalid setting for search profile {name}: {item.strip()}")
+        try:
+            settings[key] = converters[key](value.strip())
+        except ValueError as e:
+            logger.error(f"Invalid setting for search profile {name}: {item.strip()}")
+            raise ValueError(f"Invalid setting for search profile {name}: {item.strip()}") from e
+    return settings
+
+
+def load_search_profiles() -> dict[str, SearchProfile]:
+    """
+    Create the search profiles, with overrides from environment variables.
+
+    Each built-in profile can be tuned with SEARCH_PROFILE_FAST, SEARCH_PROFILE_BALANCED and
+    SEARCH_PROFILE_ACCURATE (see parse_profile_settings()). SEARCH_RANKER sets the ranker of
+    every profile that does not override it.
+
+    Returns:
+        dict[str, SearchProfile]: Profiles by name.
+
+    Raises:
+        ValueError: If a profile setting is invalid.
+    """
+    default_ranker = str(os.getenv("SEARCH_RANKER") or "weighted").strip().lower()
+    profiles = {}
+    for name in SEARCH_PROFILES:
+        defaults = {**DEFAULT_PROFILE_SETTINGS[name], "ranker": default_ranker}
+        specification = str(os.getenv(f"SEARCH_PROFILE_{name.upper()}") or "").strip()
+        profiles[name] = SearchProfile(name, **parse_profile_settings(name, specification, defaults))
+    return profiles
+
+
+class LatencyTracker:
+    """
+    Sliding window of search latencies that scales the search effort to a p95 target.
+
+    Every `adjust_every` searches the p95 of the window is compared with the target: above it,
+    the effort is lowered by 20% (down to `min_effort`); below half of it, the effort is raised
+    by 25% (up to 1.0, the profile's own settings).
+    """
+
+    def __init__(self, target_seconds: float, window: int = 200, adjust_every: int = 20, min_effort: float = 0.25):
+        """
+        Initialize the tracker.
+
+        Parameters:
+            target_seconds (float): Target p95 latency in seconds.
+            window (int): Number of recent searches the p95 is computed over.
+            adjust_every (int): Number of searches between effort adjustments.
+            min_effort (float): Lowest share of the profile's ef/nprobe that may be used.
+
+        Raises:
+            ValueError: If a setting is out of range.
+        """
+        if target_seconds <= 0 or window < 1 or adjust_every < 1 or not 0 < min_effort <= 1:
+            logger.error("Invalid latency tracker settings")
+            raise ValueError("Invalid latency tracker settings")
+        self.target_seconds = target_seconds
+        self.adjust_every = adjust_every
+        self.min_effort = min_effort
+        self.effort = 1.0
+        self._latencies = deque(maxlen=window)
+        self._since_adjustment = 0
+
+    def p95(self) -> float:
+        """
+        Get the 95th percentile of the recent latencies.
+
+        Returns:
+            float: p95 latency in seconds (0.0 before any search).
+        """
+        if not self._latencies:
+            return 0.0
+        return float(np.percentile(np.fromiter(self._latencies, dtype=np.float64), 95))
+
+    def record(self, seconds: float):
+        """
+        Record the latency of a search and adjust the effort when due.
+
+        Parameters:
+            seconds (float): Duration of the search.
+        """
+        self._latencies.append(seconds)
+        self._since_adjustment += 1
+        if self._since_adjustment < self.adjust_every:
+            return
+        self._since_adjustment = 0
+        p95 = self.p95()
+        if p95 > self.target_seconds and self.effort > self.min_effort:
+            self.effort = max(self.min_effort, self.effort * 0.8)
+            logger.info(
+                f"Search p95 latency {p95 * 1000:.0f} ms is above target, lowering search effort to {self.effort:.2f}"
+            )
+        elif p95 < self.target_seconds / 2 and self.effort < 1.0:
+            self.effort = min(1.0, self.effort * 1.25)
+            logger.info(
+                f"Search p95 latency {p95 * 1000:.0f} ms is below target, raising search effort to {self.effort:.2f}"
+            )
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+
+import fAIth.bible_globals as bible_globals
+from ai.vdb.checkpoint import file_checksum
+from ai.vdb.ingest import iter_collection_chapters
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the snapshot layout changes; older snapshots are ignored
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Scalar fields stored in every snapshot, in schema order
+SNAPSHOT_FIELDS = ["text", "version", "book", "chapter", "verse"]
+
+
+def source_data_checksum(collection_name: str) -> str:
+    """
+    Fingerprint the Bible data files a collection is built from.
+
+    Parameters:
+        collection_name (str): Bible version (also the collection name), e.g. "bsb".
+
+    Returns:
+        str: SHA-256 over the checksums of every chapter file, in canonical order.
+    """
+    digest = hashlib.sha256()
+    for book, chapter, path in iter_collection_chapters(collection_name):
+        chapter_checksum = file_checksum(path) if path.exists() else "missing"
+        digest.update(f"{book}:{chapter}:{chapter_checksum}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def snapshot_path(snapshot_directory: str | Path, collection_name: str, model_name: str) -> Path:
+    """
+    Build the snapshot file path for a Bible version and embedding model.
+
+    Parameters:
+        snapshot_directory (str | Path): Directory holding snapshot files.
+        collection_name (str): Bible version (also the collection name), e.g. "bsb".
+        model_name (str): Embedding model ID.
+
+    Returns:
+        Path: Path in the form "{directory}/{version}--{model}.npz" with the model ID made filename-safe.
+    """
+    model_slug = re.sub(r"[^A-Za-z0-9._-]+", "_", str(model_name))
+    return Path(snapshot_directory).joinpath(f"{collection_name}--{model_slug}.npz")
+
+
+def write_snapshot(path: str | Path, metadata: dict, records: list[dict], dense_embeddings: np.ndarray | None):
+    """
+    Atomically write a snapshot file.
+
+    Parameters:
+        path (str | Path): Destination .npz file.
+        metadata (dict): Build settings the snapshot was produced with (JSON-serializable).
+        records (list[dict]): Verse records with the SNAPSHOT_FIELDS keys, in canonical order.
+        dense_embeddings (np.ndarray | None): Matrix with one row per record (float32, or uint8 packed bits
+            for binary storage), or None for sparse databases.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    arrays = {
+        "metadata": np.array(
+            json.dumps({**metadata, "format_version": SNAPSHOT_FORMAT_VERSION, "count": len(records)})
+        ),
+        "text": np.array([record["text"] for record in records], dtype=str),
+        "version": np.array([record["version"] for record in records], dtype=str),
+        "book": np.array([record["book"] for record in records], dtype=str),
+        "chapter": np.array([record["chapter"] for record in records], dtype=np.int16),
+        "verse": np.array([record["verse"] for record in records], dtype=np.int16),
+    }
+    if dense_embeddings is not None:
+        dense_embeddings = np.asarray(dense_embeddings)
+        arrays["dense_embedding"] = (
+            dense_embeddings if dense_embeddings.dtype == np.uint8 else dense_embeddings.astype(np.float32)
+        )
+    # np.savez appends .npz to names without it, so keep the suffix on the temporary file
+    temporary_path = path.with_name(f"{path.stem}.tmp.npz")
+    np.savez_compressed(temporary_path, **arrays)
+    os.replace(temporary_path, path)
+
+
+class VectorSnapshot:
+    """
+    A prebuilt collection (verse records and dense vectors) loaded from a snapshot file.
+
+    Sparse BM25 vectors are not stored: Milvus regenerates them from the text with the
+    collection's BM25 function on insert, so restoring a snapshot yields the same sparse index.
+    """
+
+    def __init__(self, path: str | Path):
+        """
+        Load a snapshot file.
+
+        Parameters:
+            path (str | Path): Snapshot .npz file.
+
+        Raises:
+            ValueError: If the file is not a snapshot of the supported format.
+        """
+        self.path = Path(path)
+        with np.load(self.path, allow_pickle=False) as data:
+            self.metadata = json.loads(str(data["metadata"]))
+            if self.metadata.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+                logger.error(f"Unsupported snapshot format in {self.path}")
+                raise ValueError(f"Unsupported snapshot format in {self.path}")
+            self.columns = {field: data[field] for field in SNAPSHOT_FIELDS}
+            self.dense_embeddings = data["dense_embedding"] if "dense_embedding" in data.files else None
+
+    def __len__(self):
+        return int(self.metadata["count"])
+
+    def incompatibility(self, expected: dict) -> str | None:
+        """
+        Check whether the snapshot can be restored with the current settings.
+
+        Parameters:
+            expected (dict): Current values of the metadata keys that must match
+                (e.g., collection, embedding_model, document_template, source_checksum).
+                A "needs_dense" key requires the snapshot to contain dense vectors.
+
+        Returns:
+            str | None: Why the snapshot cannot be used, or None if it is compatible.
+        """
+        for key, value in expected.items():
+            if key == "needs_dense":
+                if value and self.dense_embeddings is None:
+                    return "it has no dense vectors"
+            elif self.metadata.get(key) != value:
+                return f"its {key} differs"
+        return None
+
+    def iter_records(self, include_dense: bool = True) -> Iterator[dict]:
+        """
+        Stream the snapshot as Milvus-ready verse records.
+
+        Parameters:
+            include_dense (bool): Attach the dense vectors (False for sparse-only collections).
+
+        Yields:
+            dict: Verse records, with "dense_embedding" (a row of the snapshot matrix)
+                set when requested and available.
+        """
+        for index in range(len(self)):
+            record = {
+                "text": str(self.columns["text"][index]),
+                "version": str(self.columns["version"][index]),
+                "book": str(self.columns["book"][index]),
+                "chapter": int(self.columns["chapter"][index]),
+                "verse": int(self.columns["verse"][index]),
+            }
+            if include_dense and self.dense_embeddings is not None:
+                record["dense_embedding"] = self.dense_embeddings[index]
+            yield record
+
+    def records_by_chapter(self, include_dense: bool = True) -> dict[tuple[str, int], list[dict]]:
+        """
+        Group the snapshot records by chapter.
+
+        Parameters:
+            include_dense (bool): Attach the dense vectors (False for sparse-only collections).
+
+        Returns:
+            dict: Verse records keyed by (book, chapter).
+        """
+        chapters = {}
+        for record in self.iter_records(include_dense):
+            chapters.setdefault((record["book"], record["chapter"]), []).append(record)
+        return chapters
+
+
+def sort_canonically(records: list[dict]) -> list[dict]:
+    """
+    Sort verse records into canonical Bible order.
+
+    Parameters:
+        records (list[dict]): Verse records with book, chapter and verse keys.
+
+    Returns:
+        list[dict]: Records ordered by book (IN_ORDER_BOOKS), chapter and verse.
+    """
+    book_order = {book: index for index, book in enumerate(bible_globals.IN_ORDER_BOOKS)}
+    return sorted(
+        records,
+        key=lambda record: (book_order.get(record["book"], len(book_order)), record["chapter"], record["verse"]),
+    )
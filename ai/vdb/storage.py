@@ -0,0 +1,401 @@
+import logging
+import os
+import time
+
+import numpy as np
+from pymilvus import DataType
+
+from fAIth.function_globals import derive_boolean_from_string
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Supported dense embedding storage modes
+STORAGE_MODES = ["float", "sq8", "binary"]
+
+
+class EmbeddingStorage:
+    """
+    How dense embeddings are stored, indexed and searched in Milvus.
+
+    Storage modes:
+        - "float": FLOAT_VECTOR with an HNSW index (4 bytes per dimension)
+        - "sq8": FLOAT_VECTOR with an IVF_SQ8 index, which keeps 1 byte per dimension in memory
+        - "binary": BINARY_VECTOR holding the sign bit of each dimension (1 bit per dimension),
+          searched by Hamming distance and re-ranked with the float query vector
+
+    Independently, vectors can be truncated to their first EMBEDDING_DIMENSIONS dimensions,
+    which keeps most of the quality for Matryoshka-trained models such as Qwen3-Embedding.
+    Builder and querier must use the same settings.
+
+    Configuration from environment variables:
+        - EMBEDDING_STORAGE_MODE: "float" (default), "sq8" or "binary"
+        - EMBEDDING_DIMENSIONS: Number of leading dimensions to keep (0/empty keeps all)
+        - EMBEDDING_BINARY_RERANK: Re-rank binary candidates with the float query vector (True default)
+        - EMBEDDING_BINARY_OVERSAMPLING: Candidates fetched per requested result before re-ranking (4 default)
+        - MILVUS_IVF_NLIST, MILVUS_IVF_NPROBE: IVF_SQ8 cluster count and clusters probed per search (512/32 default)
+    """
+
+    def __init__(
+        self,
+        mode: str = "float",
+        dimensions: int = 0,
+        binary_rerank: bool = True,
+        binary_oversampling: int = 4,
+        ivf_nlist: int = 512,
+        ivf_nprobe: int = 32,
+    ):
+        """
+        Initialize the storage settings.
+
+        Parameters:
+            mode (str): "float", "sq8" or "binary".
+            dimensions (int): Number of leading dimensions to keep, or 0 to keep all.
+            binary_rerank (bool): Re-rank binary search candidates with the float query vector.
+            binary_oversampling (int): Candidates fetched per requested result when re-ranking.
+            ivf_nlist (int): Number of IVF clusters for the sq8 index.
+            ivf_nprobe (int): Number of IVF clusters probed per sq8 search.
+
+        Raises:
+            ValueError: If the mode is unknown or a numeric setting is out of range.
+        """
+        if mode not in STORAGE_MODES:
+            logger.error(f"Invalid embedding storage mode: {mode}")
+            raise ValueError(
+                f"Invalid embedding storage mode: {mode}. Valid storage modes are: {', '.join(STORAGE_MODES)}"
+            )
+        if dimensions < 0 or binary_oversampling < 1 or ivf_nlist < 1 or ivf_nprobe < 1:
+            logger.error("Embedding storage settings must be positive integers")
+            raise ValueError("Embedding storage settings must be positive integers")
+        if mode == "binary" and dimensions % 8:
+            logger.error("Binary embedding storage requires EMBEDDING_DIMENSIONS to be a multiple of 8")
+            raise ValueError("Binary embedding storage requires EMBEDDING_DIMENSIONS to be a multiple of 8")
+        self.mode = mode
+        self.dimensions = dimensions
+        self.binary_rerank = binary_rerank
+        self.binary_oversampling = binary_oversampling
+        self.ivf_nlist = ivf_nlist
+        self.ivf_nprobe = ivf_nprobe
+
+    @classmethod
+    def from_env(cls):
+        """
+        Create the storage settings from environment variables.
+
+        Returns:
+            EmbeddingStorage: Settings shared by the builder and the querier.
+        """
+        return cls(
+            mode=str(os.getenv("EMBEDDING_STORAGE_MODE") or "float").strip().lower(),
+            dimensions=int(str(os.getenv("EMBEDDING_DIMENSIONS") or 0).strip()),
+            binary_rerank=derive_boolean_from_string(os.getenv("EMBEDDING_BINARY_RERANK") or "True"),
+            binary_oversampling=int(str(os.getenv("EMBEDDING_BINARY_OVERSAMPLING") or 4).strip()),
+            ivf_nlist=int(str(os.getenv("MILVUS_IVF_NLIST") or 512).strip()),
+            ivf_nprobe=int(str(os.getenv("MILVUS_IVF_NPROBE") or 32).strip()),
+        )
+
+    @property
+    def signature(self) -> str:
+        """
+        Describe the settings that determine stored vectors, e.g. "binary:512".
+
+        Returns:
+            str: Storage mode and kept dimensions (0 for all).
+        """
+        return f"{self.mode}:{self.dimensions}"
+
+    @property
+    def vector_data_type(self):
+        """
+        Milvus data type of the dense_embedding field.
+
+        Returns:
+            DataType: BINARY_VECTOR for binary storage, FLOAT_VECTOR otherwise.
+        """
+        return DataType.BINARY_VECTOR if self.mode == "binary" else DataType.FLOAT_VECTOR
+
+    def stored_dimension(self, model_dimension: int) -> int:
+        """
+        Dimension of the dense_embedding field for a model.
+
+        Parameters:
+            model_dimension (int): Full embedding dimension of the model.
+
+        Returns:
+            int: Number of dimensions kept (bits for binary storage).
+
+        Raises:
+            ValueError: If more dimensions are requested than the model produces.
+        """
+        if self.dimensions > model_dimension:
+            logger.error(f"EMBEDDING_DIMENSIONS ({self.dimensions}) exceeds the model dimension ({model_dimension})")
+            raise ValueError(
+                f"EMBEDDING_DIMENSIONS ({self.dimensions}) exceeds the model dimension ({model_dimension})"
+            )
+        dimension = self.dimensions or model_dimension
+        if self.mode == "binary" and dimension % 8:
+            logger.error(f"Binary embedding storage requires a multiple of 8 dimensions, got {dimension}")
+            raise ValueError(f"Binary embedding storage requires a multiple of 8 dimensions, got {dimension}")
+        return dimension
+
+    def truncate(self, vector) -> np.ndarray:
+        """
+        Keep the leading EMBEDDING_DIMENSIONS dimensions of a vector.
+
+        Parameters:
+            vector (list | np.ndarray): Full embedding vector.
+
+        Returns:
+            np.ndarray: Float32 vector with the kept dimensions.
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector[: self.dimensions] if self.dimensions else vector
+
+    def encode(self, vector):
+        """
+        Convert an embedding into the value stored in (or searched against) the dense_embedding field.
+
+        Parameters:
+            vector (list | np.ndarray): Full embedding vector.
+
+        Returns:
+            list[float] | bytes: Truncated floats, or packed sign bits for binary storage.
+        """
+        vector = self.truncate(vector)
+        if self.mode == "binary":
+            return np.packbits(vector > 0).tobytes()
+        return vector.tolist()
+
+    def encode_array_row(self, row: np.ndarray):
+        """
+        Convert a row of an exported vector matrix (see to_array()) back into a field value.
+
+        Parameters:
+            row (np.ndarray): Float32 row, or uint8 row of packed bits for binary storage.
+
+        Returns:
+            list[float] | bytes: Value for the dense_embedding field.
+        """
+        return row.tobytes() if self.mode == "binary" else row.tolist()
+
+    def to_array(self, values: list) -> np.ndarray:
+        """
+        Stack dense_embedding field values read from Milvus into a matrix.
+
+        Parameters:
+            values (list): Field values (float lists, or bytes for binary storage).
+
+        Returns:
+            np.ndarray: Float32 matrix, or uint8 matrix of packed bits for binary storage.
+        """
+        if self.mode == "binary":
+            rows = [np.frombuffer(self._binary_bytes(value), dtype=np.uint8) for value in values]
+            return np.stack(rows) if rows else np.zeros((0, 0), dtype=np.uint8)
+        return np.asarray(values, dtype=np.float32)
+
+    def to_float_array(self, values: list) -> np.ndarray:
+        """
+        Stack dense_embedding field values into float rows that can be compared by cosine similarity.
+
+        Parameters:
+            values (list): Field values (float lists, or bytes for binary storage).
+
+        Returns:
+            np.ndarray: Float32 matrix (sign bits of binary storage become +1/-1).
+        """
+        matrix = self.to_array(values)
+        if self.mode == "binary":
+            return np.unpackbits(matrix, axis=1).astype(np.float32) * 2 - 1
+        return matrix
+
+    def index_params(self) -> dict:
+        """
+        Index settings for the dense_embedding field.
+
+        Returns:
+            dict: index_type, metric_type, params and index_name for IndexParams.add_index().
+        """
+        if self.mode == "binary":
+            return {"index_type": "BIN_FLAT", "metric_type": "HAMMING", "params": {}, "index_name": "binary_embedding"}
+        if self.mode == "sq8":
+            return {
+                "index_type": "IVF_SQ8",
+                "metric_type": "COSINE",
+                "params": {"nlist": self.ivf_nlist},
+                "index_name": "ivf_sq8_embedding",
+            }
+        return {
+            "index_type": "HNSW",
+            "metric_type": "COSINE",
+            "params": {"M": 32, "efConstruction": 256},
+            "index_name": "hnsw_embedding",
+        }
+
+    def search_params(self) -> dict:
+        """
+        Search settings for the dense_embedding field.
+
+        Returns:
+            dict: metric_type and params for a dense search request.
+        """
+        if self.mode == "binary":
+            return {"metric_type": "HAMMING", "params": {}}
+        if self.mode == "sq8":
+            return {"metric_type": "COSINE", "params": {"nprobe": self.ivf_nprobe}}
+        return {"metric_type": "COSINE", "params": {"ef": 128}}
+
+    @property
+    def reranks(self) -> bool:
+        """
+        Whether dense search results are re-ranked with the float query vector.
+
+        Returns:
+            bool: True for binary storage with re-ranking enabled.
+        """
+        return self.mode == "binary" and self.binary_rerank
+
+    def candidate_limit(self, limit: int) -> int:
+        """
+        Number of candidates to fetch from Milvus for a requested number of results.
+
+        Parameters:
+            limit (int): Number of results requested.
+
+        Returns:
+            int: limit, multiplied by the oversampling factor when re-ranking.
+        """
+        return limit * self.binary_oversampling if self.reranks else limit
+
+    def rerank(self, query_vector, hits: list, limit: int, keep_vectors: bool = False) -> list:
+        """
+        Re-rank binary search candidates by the float query vector.
+
+        Each candidate's sign bits are expanded to +1/-1 and scored against the float query
+        (asymmetric scoring), which recovers most of the ranking quality lost to binarization.
+        The dense_embedding field is removed from the returned entities unless keep_vectors is set.
+
+        Parameters:
+            query_vector (list | np.ndarray): Full float query embedding.
+            hits (list): Search hits with entity["dense_embedding"] holding packed bits.
+            limit (int): Number of results to keep.
+            keep_vectors (bool): Leave dense_embedding in the entities (e.g., for diversify_results()).
+
+        Returns:
+            list: The best `limit` hits, with distance set to the cosine between the query and the signs.
+        """
+        if not hits:
+            return []
+        query = self.truncate(query_vector)
+        signs = np.unpackbits(
+            np.stack([np.frombuffer(self._binary_bytes(hit["entity"]["dense_embedding"]), np.uint8) for hit in hits]),
+            axis=1,
+        )[:, : query.shape[0]]
+        norm = float(np.linalg.norm(query)) * np.sqrt(query.shape[0])
+        scores = (signs.astype(np.float32) * 2 - 1) @ query / (norm if norm > 0 else 1.0)
+        for hit, score in zip(hits, scores):
+            hit["distance"] = float(score)
+            if not keep_vectors:
+                hit["entity"].pop("dense_embedding", None)
+        return sorted(hits, key=lambda hit: hit["distance"], reverse=True)[:limit]
+
+    @staticmethod
+    def _binary_bytes(value) -> bytes:
+        """
+        Normalize a binary vector value returned by Milvus to bytes.
+
+        Parameters:
+            value (bytes | list[bytes]): Binary vector, possibly wrapped in a single-item list.
+
+        Returns:
+            bytes: Packed bits.
+        """
+        return value[0] if isinstance(value, list) else bytes(value)
+
+
+def scalar_quantize(vectors: np.ndarray) -> np.ndarray:
+    """
+    Simulate 8-bit scalar quantization (as used by IVF_SQ8) of a matrix.
+
+    Each dimension is mapped onto 256 levels between its minimum and maximum.
+
+    Parameters:
+        vectors (np.ndarray): Float32 matrix.
+
+    Returns:
+        np.ndarray: Dequantized float32 matrix.
+    """
+    minimum = vectors.min(axis=0)
+    scale = (vectors.max(axis=0) - minimum) / 255
+    scale[scale == 0] = 1
+    return (np.round((vectors - minimum) / scale) * scale + minimum).astype(np.float32)
+
+
+def evaluate_storage_modes(
+    document_vectors: np.ndarray, query_vectors: np.ndarray, storages: list[EmbeddingStorage], k: int = 10
+) -> list[dict]:
+    """
+    Measure recall and search time of storage modes against exact full-precision search.
+
+    Runs brute-force searches in NumPy, so timings compare the modes' scoring cost rather
+    than Milvus latency. IVF clustering is not simulated for sq8 (only the quantization error).
+
+    Parameters:
+        document_vectors (np.ndarray): Full float32 document embeddings (one row per verse).
+        query_vectors (np.ndarray): Full float32 query embeddings.
+        storages (list[EmbeddingStorage]): Storage settings to evaluate.
+        k (int): Number of results per query.
+
+    Returns:
+        list[dict]: Per storage: mode, dimensions, bytes_per_vector, recall_at_k and milliseconds_per_query.
+    """
+
+    def normalize(matrix):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return matrix / norms
+
+    k = min(k, document_vectors.shape[0])
+    documents = normalize(document_vectors.astype(np.float32))
+    queries = normalize(query_vectors.astype(np.float32))
+    exact = np.argsort(-(queries @ documents.T), axis=1)[:, :k]
+
+    report = []
+    for storage in storages:
+        dimension = storage.stored_dimension(documents.shape[1])
+        truncated_documents = normalize(documents[:, :dimension])
+        truncated_queries = normalize(queries[:, :dimension])
+        if storage.mode == "sq8":
+            truncated_documents = scalar_quantize(truncated_documents)
+        document_bits = truncated_documents > 0 if storage.mode == "binary" else None
+
+        start_time = time.perf_counter()
+        if storage.mode == "binary":
+            query_bits = truncated_queries > 0
+            # Hamming distance between sign vectors
+            distances = (query_bits[:, None, :] != document_bits[None, :, :]).sum(axis=2)
+            candidates = np.argsort(distances, axis=1, kind="stable")[:, : storage.candidate_limit(k)]
+            if storage.reranks:
+                signs = document_bits.astype(np.float32) * 2 - 1
+                scores = np.einsum("qd,qcd->qc", truncated_queries, signs[candidates])
+                found = np.take_along_axis(candidates, np.argsort(-scores, axis=1), axis=1)[:, :k]
+            else:
+                found = candidates[:, :k]
+        else:
+            found = np.argsort(-(truncated_queries @ truncated_documents.T), axis=1)[:, :k]
+        seconds = time.perf_counter() - start_time
+
+        recall = np.mean([len(set(found[row]) & set(exact[row])) / k for row in range(len(queries))])
+        bytes_per_vector = (
+            dimension // 8 if storage.mode == "binary" else dimension * (1 if storage.mode == "sq8" else 4)
+        )
+        report.append(
+            {
+                "mode": storage.mode,
+                "dimensions": dimension,
+                "rerank": storage.reranks,
+                "bytes_per_vector": bytes_per_vector,
+                "recall_at_k": round(float(recall), 4),
+                "milliseconds_per_query": round(1000 * seconds / max(len(queries), 1), 3),
+            }
+        )
+    return report
@@ -0,0 +1,110 @@
+import logging
+import re
+
+import fAIth.bible_globals as bible_globals
+from ai.vdb.ingest import clean_verse_text
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Bits of a packed verse id: book index (IN_ORDER_BOOKS) << 20 | chapter << 10 | verse
+CHAPTER_SHIFT = 10
+BOOK_SHIFT = 20
+FIELD_MASK = (1 << CHAPTER_SHIFT) - 1
+
+# Verse number prefix ALL_VERSES adds to every verse ("16) For God so loved...")
+VERSE_NUMBER_PREFIX = re.compile(r"^\d+\)\s*")
+
+
+def pack_verse_id(book: str, chapter: int, verse: int) -> int:
+    """
+    Pack a verse reference into the integer used as primary key of compact collections.
+
+    The id is the same in every Bible version, so it also identifies the verse across collections.
+
+    Parameters:
+        book (str): Book name from IN_ORDER_BOOKS, e.g. "John".
+        chapter (int): Chapter number (1 to 1023).
+        verse (int): Verse number (1 to 1023).
+
+    Returns:
+        int: Packed verse id.
+
+    Raises:
+        ValueError: If the book is unknown or the chapter or verse is out of range.
+    """
+    if book not in bible_globals.IN_ORDER_BOOKS:
+        logger.error(f"Invalid book: {book}")
+        raise ValueError(f"Invalid book: {book}")
+    if not 0 < chapter <= FIELD_MASK or not 0 < verse <= FIELD_MASK:
+        logger.error(f"Invalid verse reference: {book} {chapter}:{verse}")
+        raise ValueError(f"Invalid verse reference: {book} {chapter}:{verse}")
+    return (bible_globals.IN_ORDER_BOOKS.index(book) << BOOK_SHIFT) | (chapter << CHAPTER_SHIFT) | verse
+
+
+def unpack_verse_id(verse_id: int) -> tuple[str, int, int]:
+    """
+    Unpack a verse id created by pack_verse_id().
+
+    Parameters:
+        verse_id (int): Packed verse id.
+
+    Returns:
+        tuple[str, int, int]: Book, chapter and verse.
+
+    Raises:
+        ValueError: If the id does not refer to a book of IN_ORDER_BOOKS.
+    """
+    verse_id = int(verse_id)
+    book_index = verse_id >> BOOK_SHIFT
+    if verse_id < 0 or book_index >= len(bible_globals.IN_ORDER_BOOKS):
+        logger.error(f"Invalid verse id: {verse_id}")
+        raise ValueError(f"Invalid verse id: {verse_id}")
+    chapter = (verse_id >> CHAPTER_SHIFT) & FIELD_MASK
+    return bible_globals.IN_ORDER_BOOKS[book_index], chapter, verse_id & FIELD_MASK
+
+
+def verse_text(collection_name: str, book: str, chapter: int, verse: int) -> str | None:
+    """
+    Look up the stored form of a verse in ALL_VERSES.
+
+    Parameters:
+        collection_name (str): Bible version (also the collection name), e.g. "bsb".
+        book (str): Book name.
+        chapter (int): Chapter number.
+        verse (int): Verse number.
+
+    Returns:
+        str | None: Verse text without display markup (as read_chapter_verses() stores it),
+            or None if the verse is not loaded.
+    """
+    chapter_verses = bible_globals.ALL_VERSES.get(collection_name, {}).get(book, {}).get(int(chapter), {})
+    text = chapter_verses.get(str(verse))
+    if text is None:
+        return None
+    return clean_verse_text(VERSE_NUMBER_PREFIX.sub("", text, count=1))
+
+
+def hydrate_hits(collection_name: str, hits) -> list[dict]:
+    """
+    Rebuild the entity of search hits that only carry their packed verse id.
+
+    Parameters:
+        collection_name (str): Bible version the hits were found in.
+        hits (Iterable): Search results with "id" and "distance" (and optionally "entity").
+
+    Returns:
+        list[dict]: Hits with version, book, chapter, verse and text entity fields, in the same order.
+            Verses missing from ALL_VERSES get an empty text.
+    """
+    hydrated = []
+    for hit in hits:
+        book, chapter, verse = unpack_verse_id(hit["id"])
+        text = verse_text(collection_name, book, chapter, verse)
+        if text is None:
+            logger.warning(f"{collection_name} {book} {chapter}:{verse} is not loaded, returning it without text")
+            text = ""
+        entity = dict(hit.get("entity") or {})
+        entity.update({"version": collection_name, "book": book, "chapter": chapter, "verse": verse, "text": text})
+        hydrated.append({"id": hit["id"], "distance": hit["distance"], "entity": entity})
+    return hydrated
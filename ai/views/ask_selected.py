@@ -10,6 +10,7 @@ from ninja import Form, Router
 from ai.serializers.ask_selected import AskSelectedInputSerializer
 from ai.serializers.server_text_response import ServerTextResponseSerializer
 from ai.utils import async_read_file, clean_llm_output, stringify_vdb_results, unify_vdb_results
+from ai.vdb.scope import passage_scope
 from fAIth.api_tags import APITags
 
 # Set up logging
@@ -20,6 +21,10 @@ router = Router()
 
 # Configuration constants
 MILVUS_SEARCH_LIMIT = int(str(os.getenv("MILVUS_SEARCH_LIMIT", 10)).strip())
+# Part of the Bible searched around the selected passage: all, testament, book or chapter
+ASK_SELECTED_SEARCH_SCOPE = str(os.getenv("ASK_SELECTED_SEARCH_SCOPE") or "all").strip().lower()
+# Search profile of this endpoint when the request does not choose one (empty uses SEARCH_PROFILE)
+ASK_SELECTED_SEARCH_PROFILE = str(os.getenv("ASK_SELECTED_SEARCH_PROFILE") or "").strip().lower()
 RAW_PROMPTS_DIRECTORY = Path("ai", "llm", "prompts")
 
 
@@ -49,6 +54,7 @@ async def ask_selected(request, payload: AskSelectedInputSerializer = Form(...))
             - collection_name (str): Milvus vector collection to search
             - selected_text (str): The selected text from the user.
             - query (str): User's question about the selected text
+            - search_profile (str | None): Optional search profile overriding ASK_SELECTED_SEARCH_PROFILE
 
     Returns:
         HttpResponse: Rendered HTML template containing the LLM response.
@@ -68,11 +74,14 @@ async def ask_selected(request, payload: AskSelectedInputSerializer = Form(...))
     # Search vector database for relevant context
     try:
         vector_database = request.state["milvus_db"]
-        # Split in half since we are using two queries
+        # Split in half since we are using two queries, both searched in one round-trip
         half_limit = MILVUS_SEARCH_LIMIT // 2
-        query_results = await vector_database.search(collection_name=collection_name, query=query, limit=half_limit)
-        selected_text_results = await vector_database.search(
-            collection_name=collection_name, query=selected_text, limit=half_limit
+        query_results, selected_text_results = await vector_database.search_many(
+            collection_name=collection_name,
+            queries=[query, selected_text],
+            limit=half_limit,
+            profile=payload.search_profile or ASK_SELECTED_SEARCH_PROFILE or None,
+            **passage_scope(ASK_SELECTED_SEARCH_SCOPE, book, chapter),
         )
     except Exception as e:
         logger.error(f"Error searching vector database: {e}")
@@ -20,6 +20,8 @@ router = Router()
 
 # Configuration constants
 MILVUS_SEARCH_LIMIT = int(str(os.getenv("MILVUS_SEARCH_LIMIT", 10)).strip())
+# Search profile of this endpoint when the request does not choose one (empty uses SEARCH_PROFILE)
+GENERAL_QUESTION_SEARCH_PROFILE = str(os.getenv("GENERAL_QUESTION_SEARCH_PROFILE") or "").strip().lower()
 RAW_PROMPTS_DIRECTORY = Path("ai", "llm", "prompts")
 
 
@@ -48,6 +50,7 @@ async def general_question(request, payload: GeneralQuestionInputSerializer = Fo
         payload: Validated request payload containing:
             - query (str): User's question
             - collection_name (str): Milvus vector collection to search
+            - search_profile (str | None): Optional search profile overriding GENERAL_QUESTION_SEARCH_PROFILE
 
     Returns:
         HttpResponse: Rendered HTML template containing the LLM response.
@@ -64,7 +67,10 @@ async def general_question(request, payload: GeneralQuestionInputSerializer = Fo
     try:
         vector_database = request.state["milvus_db"]
         vector_results = await vector_database.search(
-            collection_name=collection_name, query=query, limit=MILVUS_SEARCH_LIMIT
+            collection_name=collection_name,
+            query=query,
+            limit=MILVUS_SEARCH_LIMIT,
+            profile=payload.search_profile or GENERAL_QUESTION_SEARCH_PROFILE or None,
         )
         stringified_vector_results = await stringify_vdb_results(vector_results)
     except Exception as e:
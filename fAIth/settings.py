@@ -114,6 +114,23 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# "shared" is visible to every process whose SHARED_CACHE_DIRECTORY is the same directory: the uvicorn workers
+# of the container and the collection builder (volumes/shared_cache is a bind mount in docker-compose.yml)
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": str(os.getenv("SHARED_CACHE_DIRECTORY") or BASE_DIR.joinpath("volumes", "shared_cache")).strip(),
+        "OPTIONS": {"MAX_ENTRIES": int(str(os.getenv("SHARED_CACHE_MAX_ENTRIES") or 10000).strip())},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -617,6 +617,13 @@ def build_webapp_setup(
 {depends_on}
     volumes:
       - .:/app
+      # Build artifacts and the "shared" Django cache, which must survive container re-creation
+      - ${{DOCKER_VOLUME_DIRECTORY:-.}}/volumes/embedding_cache:/app/volumes/embedding_cache
+      - ${{DOCKER_VOLUME_DIRECTORY:-.}}/volumes/ingest_checkpoints:/app/volumes/ingest_checkpoints
+      - ${{DOCKER_VOLUME_DIRECTORY:-.}}/volumes/vector_snapshots:/app/volumes/vector_snapshots
+      - ${{DOCKER_VOLUME_DIRECTORY:-.}}/volumes/build_reports:/app/volumes/build_reports
+      - ${{DOCKER_VOLUME_DIRECTORY:-.}}/volumes/local_index:/app/volumes/local_index
+      - ${{DOCKER_VOLUME_DIRECTORY:-.}}/volumes/shared_cache:/app/volumes/shared_cache
 """
     return webapp_setup.lstrip("\n")
 
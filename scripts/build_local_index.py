@@ -0,0 +1,67 @@
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Ensure project root is on sys.path when running this script directly
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# Configure Django so modules that depend on settings can import
+if "DJANGO_SETTINGS_MODULE" not in os.environ:
+    os.environ["DJANGO_SETTINGS_MODULE"] = "fAIth.settings"
+
+# Start Django
+try:
+    import django
+
+    django.setup()
+except Exception as e:
+    # Allow script to proceed; some paths may not require Django
+    logger.warning(f"Warning: Django setup failed: {e}")
+
+from ai.vdb.embedding import Embedding  # noqa: E402
+from ai.vdb.embedding_cache import EmbeddingCache  # noqa: E402
+from ai.vdb.local_index import build_local_snapshot  # noqa: E402
+from ai.vdb.milvus_db import DEFAULT_EMBEDDING_CACHE_DIRECTORY, DEFAULT_SNAPSHOT_DIRECTORY  # noqa: E402
+from ai.vdb.storage import EmbeddingStorage  # noqa: E402
+from fAIth.bible_globals import VERSION_SELECTION  # noqa: E402
+from fAIth.function_globals import derive_boolean_from_string  # noqa: E402
+
+# Embed Bible versions without Milvus and write them as snapshots for LOCAL_SEARCH_MODE="primary"
+# (sparse databases need no snapshot: the local BM25 index is built from the Bible data at startup).
+# Builds the versions given on the command line, or every enabled version.
+collection_names = sys.argv[1:] or VERSION_SELECTION
+
+if __name__ == "__main__":
+    database_type = str(os.getenv("DATABASE_TYPE") or "hybrid").strip().lower()
+    if database_type == "sparse":
+        logger.info("DATABASE_TYPE is sparse, so the local index needs no snapshots")
+        sys.exit(0)
+
+    embedding_engine = Embedding()
+    storage = EmbeddingStorage.from_env()
+    snapshot_directory = str(os.getenv("MILVUS_SNAPSHOT_DIRECTORY") or DEFAULT_SNAPSHOT_DIRECTORY).strip()
+    embedding_cache = None
+    if derive_boolean_from_string(os.getenv("EMBEDDING_CACHE_ENABLED") or "True"):
+        cache_directory = str(os.getenv("EMBEDDING_CACHE_DIRECTORY") or DEFAULT_EMBEDDING_CACHE_DIRECTORY).strip()
+        embedding_cache = EmbeddingCache(
+            cache_directory, embedding_engine.model_name, embedding_engine.document_template
+        )
+
+    for collection_name in collection_names:
+        path = build_local_snapshot(
+            collection_name=collection_name,
+            database_type=database_type,
+            embedding_engine=embedding_engine,
+            storage=storage,
+            snapshot_directory=snapshot_directory,
+            batch_size=int(str(os.getenv("EMBEDDING_BATCH_SIZE") or 128).strip()),
+            batch_max_tokens=int(str(os.getenv("EMBEDDING_BATCH_MAX_TOKENS") or 4096).strip()),
+            embedding_cache=embedding_cache,
+        )
+        logger.info(f"Snapshot of {collection_name} written to {path}")
@@ -48,23 +48,37 @@ except Exception as e:
     raise e
 
 # See if the collections exist
+# New collections are restored from a matching snapshot in MILVUS_SNAPSHOT_DIRECTORY (written by
+# scripts/export_milvus_snapshots.py) when one exists, and built from the Bible data otherwise
 try:
     logger.info("Checking if collections exist")
     existing_collections = vector_database_builder.list_collections_in_database()
     logger.info(f"Existing collections: {existing_collections}")
-    collections_to_create = []
-    # Get the collections that do not exist
-    for collection_name in VERSION_SELECTION:
-        if collection_name not in existing_collections:
-            collections_to_create.append(collection_name)
-    # Create the collections that do not exist
-    if collections_to_create:
-        logger.info(f"The following collections do not exist: {collections_to_create}. Creating them.")
-        vector_database_builder.create_collections(collections_to_create)
-        logger.info("Collections created.")
-    # All collections exist
+    # With resumable ingest, existing collections are finished or updated from their checkpoints
+    if vector_database_builder.resumable_ingest_enabled:
+        logger.info(f"Creating or resuming collections: {VERSION_SELECTION}")
+        vector_database_builder.create_collections(VERSION_SELECTION, resume=True)
+        logger.info("Collections are up to date.")
     else:
-        logger.info(f"All collections exist: {existing_collections}")
+        collections_to_create = []
+        # Get the collections that do not exist, or whose schema does not match the current settings
+        # (checked against Milvus metadata only, so existing collections need no embedding requests)
+        for collection_name in VERSION_SELECTION:
+            if collection_name not in existing_collections:
+                collections_to_create.append(collection_name)
+                continue
+            reason = vector_database_builder.schema_incompatibility(collection_name)
+            if reason is not None:
+                logger.warning(f"Collection {collection_name} will be rebuilt because {reason}.")
+                collections_to_create.append(collection_name)
+        # Create the collections that do not exist
+        if collections_to_create:
+            logger.info(f"The following collections need to be created: {collections_to_create}. Creating them.")
+            vector_database_builder.create_collections(collections_to_create)
+            logger.info("Collections created.")
+        # All collections exist
+        else:
+            logger.info(f"All collections exist: {existing_collections}")
 except Exception as e:
     logger.error(f"Error checking if collections exist: {e}")
     raise e
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Ensure project root is on sys.path when running this script directly
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# Configure Django so modules that depend on settings can import
+if "DJANGO_SETTINGS_MODULE" not in os.environ:
+    os.environ["DJANGO_SETTINGS_MODULE"] = "fAIth.settings"
+
+try:
+    import django
+
+    django.setup()
+except Exception as e:
+    # Allow script to proceed; some paths may not require Django
+    logger.warning(f"Warning: Django setup failed: {e}")
+
+from ai.vdb.embedding import Embedding  # noqa: E402
+from ai.vdb.milvus_db import DEFAULT_SNAPSHOT_DIRECTORY, VectorDatabaseQuerier  # noqa: E402
+from ai.vdb.snapshot import VectorSnapshot, snapshot_path  # noqa: E402
+from ai.vdb.storage import EmbeddingStorage, evaluate_storage_modes  # noqa: E402
+
+# Compare dense storage modes for one collection (default "bsb") against exact full-precision search.
+# Needs a snapshot exported with EMBEDDING_STORAGE_MODE="float" and EMBEDDING_DIMENSIONS=0
+# (see scripts/export_milvus_snapshots.py). Pass --live to also time searches against the running Milvus,
+# which uses the storage mode the collections were built with.
+collection_name = next((argument for argument in sys.argv[1:] if not argument.startswith("--")), "bsb")
+measure_live = "--live" in sys.argv[1:]
+queries = [
+    "In the beginning",
+    "Sodom and Gomorrah",
+    "Garden of Eden",
+    "Tower of Babel",
+    "Adam and Eve",
+    "What was the name of the first man?",
+    "Noah's Ark",
+    "For God so loves the world",
+    "Jesus said",
+    "Love your neighbor as yourself",
+    "The Lord is my shepherd",
+    "Faith without works is dead",
+]
+k = 10
+
+
+async def measure_live_latency():
+    """Time searches with the querier's configured storage mode."""
+    vector_database_querier = await VectorDatabaseQuerier.load_database_and_collections()
+    try:
+        latencies = []
+        for query in queries:
+            start_time = time.perf_counter()
+            await vector_database_querier.search(collection_name=collection_name, query=query, limit=k)
+            latencies.append(1000 * (time.perf_counter() - start_time))
+        return {
+            "mode": vector_database_querier.embedding_storage.mode,
+            "dimensions": vector_database_querier.embedding_storage.dimensions,
+            "median_milliseconds": round(float(np.median(latencies)), 2),
+            "max_milliseconds": round(float(np.max(latencies)), 2),
+        }
+    finally:
+        await vector_database_querier.close()
+
+
+if __name__ == "__main__":
+    embedding_engine = Embedding()
+    snapshot_directory = str(os.getenv("MILVUS_SNAPSHOT_DIRECTORY") or DEFAULT_SNAPSHOT_DIRECTORY).strip()
+    path = snapshot_path(snapshot_directory, collection_name, embedding_engine.model_name)
+    snapshot = VectorSnapshot(path)
+    if snapshot.metadata.get("embedding_storage", "float:0") != "float:0" or snapshot.dense_embeddings is None:
+        raise ValueError(f"Snapshot {path} must hold full-precision float vectors")
+
+    document_vectors = snapshot.dense_embeddings.astype(np.float32)
+    query_vectors = np.asarray(embedding_engine.embed(queries, prompt_type="query", normalize=False), np.float32)
+    model_dimension = document_vectors.shape[1]
+
+    # Full precision at Matryoshka truncations, then the compact modes
+    storages = [EmbeddingStorage("float", dimensions) for dimensions in (0, 1024, 512, 256, 128)]
+    storages += [EmbeddingStorage("sq8", dimensions) for dimensions in (0, 256)]
+    storages += [
+        EmbeddingStorage("binary", 0, binary_rerank=False),
+        EmbeddingStorage("binary", 0),
+        EmbeddingStorage("binary", 512),
+    ]
+    storages = [storage for storage in storages if storage.dimensions < model_dimension]
+
+    report = {
+        "collection": collection_name,
+        "embedding_model": embedding_engine.model_name,
+        "verses": len(snapshot),
+        "queries": len(queries),
+        "k": k,
+        "modes": evaluate_storage_modes(document_vectors, query_vectors, storages, k=k),
+    }
+    if measure_live:
+        report["live"] = asyncio.run(measure_live_latency())
+    logger.info(json.dumps(report, indent=2))
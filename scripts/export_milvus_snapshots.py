@@ -0,0 +1,61 @@
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Ensure project root is on sys.path when running this script directly
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# Configure Django so modules that depend on settings can import
+if "DJANGO_SETTINGS_MODULE" not in os.environ:
+    os.environ["DJANGO_SETTINGS_MODULE"] = "fAIth.settings"
+
+# Start Django
+try:
+    import django
+
+    django.setup()
+except Exception as e:
+    # Allow script to proceed; some paths may not require Django
+    logger.warning(f"Warning: Django setup failed: {e}")
+
+# Import the Milvus database class
+from ai.vdb.milvus_db import VectorDatabaseBuilder  # noqa: E402
+from fAIth.bible_globals import VERSION_SELECTION  # noqa: E402
+
+# Export the versions given on the command line, or every enabled version
+collection_names = sys.argv[1:] or VERSION_SELECTION
+
+# Get DB object
+try:
+    logger.info("Getting Milvus database builder object")
+    vector_database_builder = VectorDatabaseBuilder()
+    vector_database_builder.load_or_create_database()
+    logger.info("Milvus database loaded")
+except Exception as e:
+    logger.error(f"Error loading Milvus database: {e}")
+    raise e
+
+# Export each built collection to MILVUS_SNAPSHOT_DIRECTORY
+try:
+    existing_collections = vector_database_builder.list_collections_in_database()
+    for collection_name in collection_names:
+        if collection_name not in existing_collections:
+            logger.warning(f"Collection {collection_name} does not exist. Skipping.")
+            continue
+        snapshot_path = vector_database_builder.export_snapshot(collection_name)
+        logger.info(f"Snapshot of {collection_name} written to {snapshot_path}")
+except Exception as e:
+    logger.error(f"Error exporting snapshots: {e}")
+    raise e
+
+# Close the database
+try:
+    vector_database_builder.close()
+except Exception as e:
+    logger.warning(f"Milvus database was not closed gracefully: {e}")
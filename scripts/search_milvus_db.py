@@ -24,6 +24,7 @@ except Exception as e:
     # Allow script to proceed; some paths may not require Django
     logger.warning(f"Warning: Django setup failed: {e}")
 
+from ai.utils import verse_reference  # noqa: E402
 from ai.vdb.milvus_db import VectorDatabaseQuerier  # noqa: E402
 
 
@@ -60,7 +61,7 @@ async def main():
         logger.info(f"{vector_database_querier.database_type} Search:")
         for i, result in enumerate(results):
             logger.info(
-                f"{i + 1}. Score: {result['distance']:.4f}, Content: {result['entity']['text']}, Citation: {result['entity']['book']} {result['entity']['chapter']}:{result['entity']['verse']} {result['entity']['version']}"
+                f"{i + 1}. Score: {result['distance']:.4f}, Content: {result['entity']['text']}, Citation: {verse_reference(result['entity'])}"
             )
     # Cleanly close async client to avoid warnings/errors
     await vector_database_querier.close()